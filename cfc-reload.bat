@@ -24,6 +24,9 @@ if %ERRORLEVEL% NEQ 0 (
     exit /b 1
 )
 
+REM Build the completeness index if this database has none yet
+python manage.py rebuild_completeness_index --if-missing
+
 REM Start development server
 echo [4/4] Starting development server...
 echo.
@@ -23,6 +23,9 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
+# Build the completeness index if this database has none yet
+python manage.py rebuild_completeness_index --if-missing
+
 # Start development server
 echo "[4/4] Starting development server..."
 echo
@@ -15,7 +15,7 @@ from council_finance.models import (
 
 # Event Viewer integration
 try:
-    from event_viewer.models import SystemEvent
+    from event_viewer.services.event_sink import record_event
     EVENT_VIEWER_AVAILABLE = True
 except ImportError:
     EVENT_VIEWER_AVAILABLE = False
@@ -37,7 +37,7 @@ def log_counter_event(level, category, title, message, details=None):
         if details:
             event_details.update(details)
         
-        SystemEvent.objects.create(
+        record_event(
             source='counter_agent',
             level=level,
             category=category,
@@ -12,6 +12,7 @@ from .factoid_views import (
     quick_template_preview,
     factoid_instance_api,
     get_factoids_for_counter,
+    materialise_factoids_api,
 )
 
 # Create router for viewsets
@@ -30,6 +31,9 @@ urlpatterns = [
     path('counter/<slug:council_slug>/<slug:counter_slug>/', get_factoids_for_counter, name='factoids-for-counter'),
     path('counter/<slug:council_slug>/<slug:counter_slug>/<path:year_slug>/', get_factoids_for_counter, name='factoids-for-counter-year'),
     
+    # Bulk computation of factoid instances (staff only)
+    path('materialise/', materialise_factoids_api, name='materialise'),
+    
     # ViewSet routes
     path('', include(router.urls)),
 ]
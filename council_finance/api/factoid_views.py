@@ -1124,10 +1124,10 @@ def factoid_instance_api(request, template_slug, council_slug, year_slug):
                 financial_year=year
             )
             
-            # Check if it's expired and needs recomputing
+            # Instances invalidated by data changes are recomputed when
+            # they are next requested
             if instance.is_expired():
-                logger.info(f"Factoid instance {instance.id} is expired, recomputing...")
-                instance = instance.refresh_if_needed()
+                raise FactoidInstance.DoesNotExist
             
         except FactoidInstance.DoesNotExist:
             # Create new instance using the factoid engine
@@ -1399,3 +1399,100 @@ def get_factoids_for_counter_frontend(request, counter_slug, council_slug, year_
             'success': False,
             'error': 'Failed to retrieve factoids'
         }, status=500)
+
+
+MATERIALISE_PROGRESS_KEY = 'factoid_materialisation_progress'
+
+
+def materialise_factoids_api(request):
+    """
+    Staff API hook to compute factoid instances in bulk.
+
+    The work runs in a background thread; progress and the final stats are
+    kept in the cache under ``MATERIALISE_PROGRESS_KEY``.
+
+    POST JSON (all optional):
+        year: Financial year label (default: the current year)
+        councils: List of council slugs (default: all)
+        expired_only: Only recompute missing and expired instances
+    """
+    from django.core.cache import cache
+    from django.db import connection
+    import threading
+    from ..services.factoid_materialiser import factoid_materialiser
+    
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({'error': 'Staff access required'}, status=403)
+    
+    try:
+        data = json.loads(request.body or '{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    
+    if data.get('year'):
+        year = FinancialYear.objects.filter(label=data['year']).first()
+    else:
+        year = FinancialYear.get_current()
+    if not year:
+        return JsonResponse({'error': 'Financial year not found'}, status=404)
+    
+    councils = None
+    if data.get('councils'):
+        councils = list(Council.objects.filter(slug__in=data['councils']).select_related('council_type'))
+    
+    progress_info = cache.get(MATERIALISE_PROGRESS_KEY)
+    if progress_info and progress_info.get('status') == 'running':
+        return JsonResponse({
+            'status': 'already_running',
+            'message': 'Factoid materialisation is already in progress'
+        })
+    
+    start_time = timezone.now()
+    cache.set(MATERIALISE_PROGRESS_KEY, {
+        'status': 'running',
+        'year': year.label,
+        'started_at': start_time.isoformat(),
+    }, 3600)
+    
+    def run_materialisation():
+        try:
+            stats = factoid_materialiser.materialise(
+                year, councils=councils, expired_only=bool(data.get('expired_only'))
+            )
+            cache.set(MATERIALISE_PROGRESS_KEY, {
+                'status': 'completed',
+                'year': year.label,
+                'started_at': start_time.isoformat(),
+                'execution_time_seconds': (timezone.now() - start_time).total_seconds(),
+                **stats
+            }, 3600)
+        except Exception as e:
+            logger.error(f"Factoid materialisation failed: {e}", exc_info=True)
+            cache.set(MATERIALISE_PROGRESS_KEY, {
+                'status': 'failed',
+                'year': year.label,
+                'error': str(e),
+                'failed_at': timezone.now().isoformat(),
+            }, 3600)
+        finally:
+            connection.close()
+    
+    _log_api_activity(
+        request,
+        'materialise_factoids_api',
+        'materialisation_started',
+        extra_data={'year_label': year.label, 'councils': len(councils) if councils else 'all'}
+    )
+    
+    thread = threading.Thread(target=run_materialisation, name="factoid-materialiser")
+    thread.daemon = True
+    thread.start()
+    
+    return JsonResponse({
+        'success': True,
+        'status': 'started',
+        'year': year.label,
+        'progress_key': MATERIALISE_PROGRESS_KEY
+    })
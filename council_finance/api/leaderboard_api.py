@@ -11,23 +11,32 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.cache import cache_page
 from django.utils import timezone
 from rest_framework.decorators import api_view, throttle_classes, permission_classes
-from rest_framework.throttling import AnonRateThrottle
+from rest_framework.throttling import BaseThrottle
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 
 from council_finance.services.leaderboard_service import LeaderboardService
+from council_finance.services.rate_limiter import SlidingWindowRateLimiter
 
 logger = logging.getLogger(__name__)
 
 
-class LeaderboardRateThrottle(AnonRateThrottle):
+class LeaderboardRateThrottle(BaseThrottle):
     """
     Custom throttle for leaderboard API requests.
-    Rate: 60 requests per hour for anonymous users.
+    Rate: 60 requests per hour for anonymous users, over a sliding window.
     """
-    scope = 'leaderboard_api'
-    rate = '60/hour'
+    limiter = SlidingWindowRateLimiter('leaderboard_api', limit=60, window_seconds=3600)
+
+    def allow_request(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return True
+        self.result = self.limiter.hit(self.get_ident(request))
+        return self.result.allowed
+
+    def wait(self):
+        return self.result.retry_after
 
 
 @api_view(['GET'])
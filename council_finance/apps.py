@@ -15,6 +15,42 @@ class CouncilFinanceConfig(AppConfig):
         except ImportError:
             pass
         
+        # Import incremental data issue reassessment signals
+        try:
+            from .signals import data_issue_signals  # noqa: F401
+        except ImportError:
+            pass
+        
+        # Import completeness index signals
+        try:
+            from .signals import completeness_signals  # noqa: F401
+        except ImportError:
+            pass
+        
+        # Import live counter and feed push signals
+        try:
+            from .signals import live_update_signals  # noqa: F401
+        except ImportError:
+            pass
+        
+        # Import failed login counting signals
+        try:
+            from .signals import auth_signals  # noqa: F401
+        except ImportError:
+            pass
+        
+        # Import home page snapshot invalidation signals
+        try:
+            from .signals import home_snapshot_signals  # noqa: F401
+        except ImportError:
+            pass
+        
+        # Import council page fragment purge signals
+        try:
+            from .signals import fragment_cache_signals  # noqa: F401
+        except ImportError:
+            pass
+        
         # Import counter cache invalidation signals
         try:
             from .services import counter_invalidation_service  # noqa: F401
@@ -0,0 +1,205 @@
+"""
+SQLite Channel Layer - cross-process channel layer for a single host.
+
+``InMemoryChannelLayer`` only reaches sockets held by the process that
+sends, so a counter recalculated in one worker never reaches browsers
+connected to another. This layer keeps the in-memory layer's queues and
+groups for the sockets each process holds, and fans messages out between
+processes through a shared SQLite file in WAL mode:
+
+- ``group_send`` appends one row per message (not one per recipient) and
+  delivers straight to this process's group members
+- every process holding sockets polls the file every ``poll_interval``
+  seconds and hands new rows to its own members of the group
+- ``send`` to a specific channel owned by another process goes through the
+  file too; channel names carry the owning process's id
+
+Processes that only send (WSGI workers, management commands) never poll.
+Rows older than ``retention`` seconds are pruned by senders. Messages are
+stored as JSON, so they must be JSON-serialisable.
+
+Configure it in ``CHANNEL_LAYERS``::
+
+    "default": {
+        "BACKEND": "council_finance.channel_layers.SQLiteChannelLayer",
+        "CONFIG": {"path": "/var/run/council_finance/channels.sqlite3"},
+    }
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import string
+import tempfile
+import threading
+import time
+import uuid
+from functools import partial
+
+from channels.exceptions import ChannelFull
+from channels.layers import InMemoryChannelLayer
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteChannelLayer(InMemoryChannelLayer):
+    """In-memory layer per process, fanned out between processes through SQLite."""
+
+    def __init__(self, path=None, poll_interval=0.05, retention=30, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path or os.path.join(tempfile.gettempdir(), 'council_finance_channels.sqlite3')
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Forked workers get their own identity, connections and poller
+        self.process_id = uuid.uuid4().hex[:12]
+        self._local = threading.local()
+        self._poller = None
+        self._poll_loop = None
+        self._pruned_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS messages ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL NOT NULL, '
+                'origin TEXT NOT NULL, grp TEXT, channel TEXT, body TEXT NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def _write(self, group, channel, message, origin):
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            'INSERT INTO messages (created, origin, grp, channel, body) VALUES (?, ?, ?, ?, ?)',
+            (now, origin, group, channel, json.dumps(message, separators=(',', ':'))),
+        )
+        if now - self._pruned_at > self.retention:
+            self._pruned_at = now
+            connection.execute('DELETE FROM messages WHERE created < ?', (now - self.retention,))
+
+    def _read(self, after):
+        connection = self._connection()
+        if after is None:
+            # Start from the end; only messages sent from now on are wanted
+            return connection.execute('SELECT COALESCE(MAX(id), 0) FROM messages').fetchone()[0], []
+        rows = connection.execute(
+            'SELECT id, origin, grp, channel, body FROM messages WHERE id > ? ORDER BY id', (after,)
+        ).fetchall()
+        return (rows[-1][0] if rows else after), rows
+
+    def _clear(self):
+        self._connection().execute('DELETE FROM messages')
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args))
+
+    # ------------------------------------------------------------------
+    # Channel layer API
+    # ------------------------------------------------------------------
+
+    async def new_channel(self, prefix='specific.'):
+        return '%s.%s!%s' % (
+            prefix,
+            self.process_id,
+            ''.join(random.choice(string.ascii_letters) for _ in range(12)),
+        )
+
+    def _is_remote(self, channel):
+        return '!' in channel and not channel.split('!', 1)[0].endswith(self.process_id)
+
+    async def send(self, channel, message):
+        if not self._is_remote(channel):
+            return await super().send(channel, message)
+        assert isinstance(message, dict), 'message is not a dict'
+        self.require_valid_channel_name(channel)
+        await self._run(self._write, None, channel, message, self.process_id)
+
+    async def receive(self, channel):
+        self._ensure_poller()
+        return await super().receive(channel)
+
+    async def group_add(self, group, channel):
+        await super().group_add(group, channel)
+        self._ensure_poller()
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), 'Message is not a dict'
+        self.require_valid_group_name(group)
+        # Queues belong to the poller's event loop; sends from any other
+        # loop (sync code via async_to_sync) reach them through the poller
+        local = self._poll_loop is None or self._poll_loop is asyncio.get_running_loop()
+        await self._run(self._write, group, None, message, self.process_id if local else '')
+        if local:
+            self._deliver(group, message)
+
+    def _deliver(self, group, message):
+        """
+        Queue ``message`` for this process's members of ``group``. The
+        same message object goes to every member, unlike the in-memory
+        layer's copy per channel, so fan-out to many sockets stays cheap.
+        """
+        expires = time.time() + self.expiry
+        for channel in list(self.groups.get(group, ())):
+            queue = self.channels.setdefault(channel, asyncio.Queue(maxsize=self.get_capacity(channel)))
+            try:
+                queue.put_nowait((expires, message))
+            except asyncio.QueueFull:
+                pass
+
+    async def flush(self):
+        await super().flush()
+        await self._run(self._clear)
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+            self._poll_loop = None
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    def _ensure_poller(self):
+        loop = asyncio.get_running_loop()
+        if self._poller is None or self._poller.done() or self._poll_loop is not loop:
+            self._poll_loop = loop
+            self._poller = loop.create_task(self._poll())
+
+    async def _poll(self):
+        after = None
+        while True:
+            try:
+                after, rows = await self._run(self._read, after)
+                for _, origin, group, channel, body in rows:
+                    if origin == self.process_id:
+                        continue  # Delivered when it was sent
+                    if group is not None:
+                        if group in self.groups:
+                            self._deliver(group, json.loads(body))
+                    elif not self._is_remote(channel):
+                        try:
+                            await super().send(channel, json.loads(body))
+                        except ChannelFull:
+                            pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Channel layer poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
@@ -1,9 +1,12 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 import json
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+SLUG_RE = re.compile(r"^[-a-zA-Z0-9_]{1,80}$")
+
 class ContributeConsumer(AsyncWebsocketConsumer):
     """WebSocket consumer broadcasting contribute page updates."""
 
@@ -22,3 +25,39 @@ class ContributeConsumer(AsyncWebsocketConsumer):
     async def contribute_update(self, event):
         # Send a JSON payload to the browser with update info.
         await self.send(text_data=json.dumps(event.get("data", {})))
+
+
+class LiveUpdatesConsumer(AsyncWebsocketConsumer):
+    """
+    WebSocket consumer pushing counter and feed deltas for one council
+    (``ws/councils/<slug>/``) or for site-wide counters
+    (``ws/counters/?counters=a,b``). See ``services.live_updates``.
+    """
+
+    MAX_COUNTERS = 50
+
+    async def connect(self):
+        from urllib.parse import parse_qs
+        from .services.live_updates import council_group, counter_group
+
+        slug = self.scope["url_route"]["kwargs"].get("slug")
+        if slug:
+            self.live_groups = [council_group(slug)]
+        else:
+            query = parse_qs(self.scope.get("query_string", b"").decode())
+            slugs = ",".join(query.get("counters", [])).split(",")
+            self.live_groups = [
+                counter_group(s) for s in dict.fromkeys(slugs) if SLUG_RE.match(s)
+            ][: self.MAX_COUNTERS]
+
+        for group in self.live_groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        for group in getattr(self, "live_groups", []):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def live_update(self, event):
+        # Already encoded once for every socket in the group
+        await self.send(text_data=event["text"])
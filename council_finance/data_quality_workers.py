@@ -0,0 +1,34 @@
+"""
+Process pool entry points for ``parallel_assess_data_issues``.
+
+Spawned workers unpickle these functions by importing this module before
+Django is set up, so it must not import models at module level.
+"""
+
+from typing import Dict
+
+from django.db import connections
+
+
+def init_worker(database_names: Dict[str, str]) -> None:
+    """
+    Give each worker process its own Django setup and connections, to the
+    parent's databases (a test run's test database, for instance).
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+    for alias, name in database_names.items():
+        connections[alias].settings_dict["NAME"] = name
+
+
+def assess_shard(council_ids):
+    from .incremental_data_quality import compute_desired_issues
+
+    try:
+        return compute_desired_issues(council_ids)
+    finally:
+        connections.close_all()
@@ -12,16 +12,45 @@ Examples:
 
 This approach is more reliable than Django templates and provides better
 error handling for missing data.
+
+Templates are compiled once into a ``RenderPlan`` of literal segments and
+parsed expressions (path parts, bound formatter, precision) and cached by
+template text, so repeated renders only look values up and format them.
 """
 
 import re
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Tuple, List, Optional
 from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 
 
+class CompiledExpression:
+    """One ``{path:format:precision}`` expression, parsed once."""
+
+    __slots__ = ('source', 'path', 'parts', 'formatter', 'precision', 'error')
+
+    def __init__(self, source, path='', formatter=None, precision=None, error=None):
+        self.source = source
+        self.path = path
+        self.parts = tuple(path.split('.')) if path else ()
+        self.formatter = formatter
+        self.precision = precision
+        self.error = error  # Set when the expression itself is invalid
+
+
+class RenderPlan:
+    """A compiled template: literal strings and ``CompiledExpression`` segments."""
+
+    __slots__ = ('segments',)
+
+    def __init__(self, segments):
+        self.segments = tuple(segments)
+
+
 class ExpressionRenderer:
     """
     Simple expression renderer for factoid templates.
@@ -30,6 +59,11 @@ class ExpressionRenderer:
     and flexible formatting options.
     """
     
+    # Compiled templates by template text, shared by all renderers
+    plan_cache_size = 512
+    _plans = OrderedDict()
+    _plans_lock = threading.Lock()
+    
     def __init__(self):
         # Pattern to match expressions: {variable} or {variable:format} or {variable:format:precision}
         self.expression_pattern = re.compile(r'\{([^}]+)\}')
@@ -81,25 +115,28 @@ class ExpressionRenderer:
             return "", []
             
         errors = []
-        result = template_text
         
         try:
-            # Find all expressions in the template
-            expressions = self.expression_pattern.findall(result)
+            plan = self.compile(template_text)
             
-            # Process each expression
-            for expr in expressions:
+            output = []
+            for segment in plan.segments:
+                if segment.__class__ is str:
+                    output.append(segment)
+                    continue
                 try:
-                    value = self._evaluate_expression(expr, context)
-                    # Replace the expression with the evaluated value
-                    result = result.replace(f'{{{expr}}}', str(value))
+                    if segment.error is not None:
+                        raise segment.error
+                    value = self._get_nested_value(segment.path, context, segment.parts)
+                    output.append(self._apply_formatter(value, segment))
                 except Exception as e:
-                    error_msg = f"Error evaluating '{expr}': {str(e)}"
+                    error_msg = f"Error evaluating '{segment.source}': {str(e)}"
                     errors.append(error_msg)
                     # Leave the original expression in place on error
                     logger.debug(error_msg)
+                    output.append(f'{{{segment.source}}}')
             
-            return result, errors
+            return ''.join(output), errors
             
         except Exception as e:
             error_msg = f"Critical rendering error: {str(e)}"
@@ -107,6 +144,59 @@ class ExpressionRenderer:
             logger.error(error_msg)
             return template_text, errors  # Return original on critical error
     
+    def compile(self, template_text: str) -> RenderPlan:
+        """
+        Compile a template into a ``RenderPlan``, reusing the cached plan
+        for the same text.
+        """
+        cls = type(self)
+        with cls._plans_lock:
+            plan = cls._plans.get(template_text)
+            if plan is not None:
+                cls._plans.move_to_end(template_text)
+                return plan
+        
+        segments = []
+        position = 0
+        for match in self.expression_pattern.finditer(template_text):
+            if match.start() > position:
+                segments.append(template_text[position:match.start()])
+            segments.append(self._compile_expression(match.group(1)))
+            position = match.end()
+        if position < len(template_text):
+            segments.append(template_text[position:])
+        plan = RenderPlan(segments)
+        
+        with cls._plans_lock:
+            cls._plans[template_text] = plan
+            while len(cls._plans) > cls.plan_cache_size:
+                cls._plans.popitem(last=False)
+        return plan
+    
+    def _compile_expression(self, expr: str) -> CompiledExpression:
+        """Parse an expression like 'calculated.debt:currency:2' once."""
+        try:
+            parts = expr.split(':')
+            variable_path = parts[0].strip()
+            format_type = parts[1].strip() if len(parts) > 1 else 'text'
+            precision = int(parts[2].strip()) if len(parts) > 2 else None
+            if not variable_path:
+                raise ValueError("Empty variable path")
+        except Exception as e:
+            return CompiledExpression(expr, error=e)
+        
+        formatter = self.formatters.get(format_type, self._format_text)
+        return CompiledExpression(expr, variable_path, formatter, precision)
+    
+    def _apply_formatter(self, value: Any, segment: CompiledExpression) -> str:
+        if value is None:
+            return ""
+        try:
+            return str(segment.formatter(value, segment.precision))
+        except Exception as e:
+            logger.warning(f"Formatting error for {value} with {segment.source}: {e}")
+            return str(value)  # Fallback to string representation
+    
     def _evaluate_expression(self, expr: str, context: Dict[str, Any]) -> Any:
         """
         Evaluate a single expression like 'calculated.debt:currency'.
@@ -130,7 +220,7 @@ class ExpressionRenderer:
         # Apply formatting
         return self._format_value(value, format_type, precision)
     
-    def _get_nested_value(self, path: str, context: Dict[str, Any]) -> Any:
+    def _get_nested_value(self, path: str, context: Dict[str, Any], path_parts: Tuple[str, ...] = None) -> Any:
         """
         Get value from nested dictionary using dot notation.
         
@@ -142,8 +232,9 @@ class ExpressionRenderer:
         if not path:
             raise ValueError("Empty variable path")
             
-        # Split path by dots
-        path_parts = path.split('.')
+        # Split path by dots, unless already split when compiled
+        if path_parts is None:
+            path_parts = path.split('.')
         
         # Start with the context
         current = context
@@ -0,0 +1,412 @@
+"""
+Incremental Data Quality Assessment
+
+The rebuild-style assessors in :mod:`council_finance.data_quality` and
+:mod:`council_finance.smart_data_quality` delete every ``DataIssue`` and
+regenerate the full council × field × year matrix. That churns the table and
+its indexes and leaves the contribute queues empty while it runs.
+
+This module instead works out the *desired* issue set as compact tuples and
+diffs it against the issues already stored:
+
+    to_create = desired - existing
+    to_delete = existing - desired
+
+Only those differences are written, in a single transaction, so issues that
+are still valid are never touched. The same routine runs for every council
+(``incremental_assess_data_issues``) or for one council at a time
+(``reassess_council_data_issues``), which the data issue signals call with
+just the fields whose figures or characteristics changed.
+
+Issue keys are ``(council_id, field_id, year_id, issue_type, value)``; the
+value is included so a suspicious figure whose value changes is replaced.
+
+``parallel_assess_data_issues`` computes the desired set for shards of
+councils in a process pool and merges them into the same single diff.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional, Set, Tuple
+import logging
+import multiprocessing
+import os
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from . import data_quality_workers
+from .models import (
+    Council,
+    FinancialYear,
+    DataField,
+    CouncilCharacteristic,
+    FinancialFigure,
+    DataIssue,
+)
+
+logger = logging.getLogger(__name__)
+
+IssueKey = Tuple[int, int, Optional[int], str, str]
+
+# Characteristic slugs stored directly on the ``Council`` model, mapped to a
+# check of whether the council has a value (same rules as the smart assessor)
+COUNCIL_ATTRS = {
+    "council_type": lambda c: c["council_type_id"] is not None,
+    "council_nation": lambda c: c["council_nation_id"] is not None,
+    "council_website": lambda c: bool(c["website"] and c["website"].strip()),
+}
+
+# Zero values in these content types are flagged as suspicious
+NUMERIC_CONTENT_TYPES = {"monetary", "integer"}
+SUSPICIOUS_VALUES = {"0", "0.0"}
+
+BATCH_SIZE = 1000
+
+# Upper bound on the worker processes used when none are configured
+MAX_DEFAULT_WORKERS = 4
+
+
+class CellLayout:
+    """
+    Bit positions for the field × year cells of the financial data matrix.
+
+    Each council's figures, contributions and applicable fields are held as
+    Python integers with one bit per cell, so "applicable, not contributed
+    and not populated" is a couple of bitwise operations per council rather
+    than a lookup per cell.
+    """
+
+    def __init__(self, field_ids: Iterable[int], year_ids: Iterable[int]):
+        self.field_ids = list(field_ids)
+        self.year_ids = list(year_ids)
+        self.field_positions = {field_id: index for index, field_id in enumerate(self.field_ids)}
+        self.year_positions = {year_id: index for index, year_id in enumerate(self.year_ids)}
+        self.year_count = len(self.year_ids)
+        self.year_mask = (1 << self.year_count) - 1
+
+    def bit(self, field_id: int, year_id: Optional[int]) -> Optional[int]:
+        """Bit index of a cell, or None when it is outside the matrix."""
+        field_position = self.field_positions.get(field_id)
+        year_position = self.year_positions.get(year_id)
+        if field_position is None or year_position is None:
+            return None
+        return field_position * self.year_count + year_position
+
+    def field_mask(self, field_ids: Iterable[int]) -> int:
+        """Mask covering every year of the given fields."""
+        mask = 0
+        for field_id in field_ids:
+            position = self.field_positions.get(field_id)
+            if position is not None:
+                mask |= self.year_mask << (position * self.year_count)
+        return mask
+
+    def cells(self, bits: int):
+        """Yield the ``(field_id, year_id)`` of every set bit."""
+        while bits:
+            lowest = bits & -bits
+            index = lowest.bit_length() - 1
+            yield self.field_ids[index // self.year_count], self.year_ids[index % self.year_count]
+            bits ^= lowest
+
+
+def compute_desired_issues(council_ids: Optional[Iterable[int]] = None,
+                           field_ids: Optional[Iterable[int]] = None) -> Set[IssueKey]:
+    """
+    Return the issue keys that should exist for the given councils (all
+    active councils when ``council_ids`` is omitted), limited to
+    ``field_ids`` when given.
+
+    Follows the rules of ``smart_assess_data_issues``: characteristics are
+    yearless, financial fields are checked for every year and only for the
+    council types they apply to, and anything with a contribution is skipped.
+    All data is fetched up front with one query per table; presence is then
+    computed from per-council bitsets (see ``CellLayout``).
+    """
+    councils = Council.objects.filter(status="active")
+    if council_ids is not None:
+        councils = councils.filter(id__in=list(council_ids))
+    councils = list(councils.values("id", "council_type_id", "council_nation_id", "website"))
+    if not councils:
+        return set()
+    scoped_ids = [council["id"] for council in councils]
+    scoped = council_ids is not None
+    fields = DataField.objects.all()
+    if field_ids is not None:
+        field_ids = list(field_ids)
+        fields = fields.filter(id__in=field_ids)
+
+    char_fields = list(
+        fields.filter(category="characteristic")
+        .exclude(slug="council_name")
+        .values_list("id", "slug")
+    )
+    content_types = dict(
+        fields.exclude(category="characteristic").values_list("id", "content_type")
+    )
+    layout = CellLayout(content_types, FinancialYear.objects.values_list("id", flat=True))
+
+    field_council_types: Dict[int, Set[int]] = {}
+    for field_id, council_type_id in DataField.council_types.through.objects.values_list(
+        "datafield_id", "counciltype_id"
+    ):
+        field_council_types.setdefault(field_id, set()).add(council_type_id)
+
+    # Fields without council type restrictions apply to every council
+    universal_mask = layout.field_mask(
+        field_id for field_id in content_types if not field_council_types.get(field_id)
+    )
+    applicable_masks: Dict[Optional[int], int] = {}
+
+    def applicable_mask(council_type_id: Optional[int]) -> int:
+        if council_type_id not in applicable_masks:
+            applicable_masks[council_type_id] = universal_mask | layout.field_mask(
+                field_id for field_id, types in field_council_types.items()
+                if council_type_id in types
+            )
+        return applicable_masks[council_type_id]
+
+    contributed_bits: Dict[int, int] = {}
+    contributed_yearless: Set[Tuple[int, int]] = set()
+    for council_id, field_id, year_id in _contribution_keys(scoped_ids, scoped, field_ids):
+        if year_id is None:
+            contributed_yearless.add((council_id, field_id))
+            continue
+        bit = layout.bit(field_id, year_id)
+        if bit is not None:
+            contributed_bits[council_id] = contributed_bits.get(council_id, 0) | (1 << bit)
+
+    populated_bits: Dict[int, int] = {}
+    zero_values: Dict[Tuple[int, int, int], str] = {}
+    for council_id, field_id, year_id, value in _filter_councils(
+        FinancialFigure.objects, scoped_ids, scoped, field_ids
+    ).values_list("council_id", "field_id", "year_id", "value"):
+        bit = layout.bit(field_id, year_id)
+        if bit is None or value in (None, ""):
+            continue
+        populated_bits[council_id] = populated_bits.get(council_id, 0) | (1 << bit)
+        if content_types[field_id] in NUMERIC_CONTENT_TYPES:
+            text_value = str(value).strip()
+            if text_value in SUSPICIOUS_VALUES:
+                zero_values[(council_id, field_id, year_id)] = text_value
+
+    characteristic_keys = set(
+        _filter_councils(CouncilCharacteristic.objects, scoped_ids, scoped, field_ids)
+        .exclude(value__in=["", None])
+        .values_list("council_id", "field_id")
+    )
+
+    desired: Set[IssueKey] = set()
+    open_bits: Dict[int, int] = {}
+
+    for council in councils:
+        council_id = council["id"]
+
+        # Characteristics (yearless)
+        for field_id, slug in char_fields:
+            if (council_id, field_id) in contributed_yearless:
+                continue
+            attr_check = COUNCIL_ATTRS.get(slug)
+            has_data = attr_check(council) if attr_check else (council_id, field_id) in characteristic_keys
+            if not has_data:
+                desired.add((council_id, field_id, None, "missing", ""))
+
+        # Financial cells that apply to the council and have no contribution
+        open_bits[council_id] = applicable_mask(council["council_type_id"]) & ~contributed_bits.get(council_id, 0)
+        missing_bits = open_bits[council_id] & ~populated_bits.get(council_id, 0)
+        for field_id, year_id in layout.cells(missing_bits):
+            desired.add((council_id, field_id, year_id, "missing", ""))
+
+    for (council_id, field_id, year_id), value in zero_values.items():
+        if open_bits.get(council_id, 0) >> layout.bit(field_id, year_id) & 1:
+            desired.add((council_id, field_id, year_id, "suspicious", value))
+
+    return desired
+
+
+def incremental_assess_data_issues(council_ids: Optional[Iterable[int]] = None,
+                                   batch_size: int = BATCH_SIZE,
+                                   field_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """
+    Bring ``DataIssue`` rows in line with the current data by creating only
+    new issues and deleting only resolved ones, in one transaction.
+
+    Args:
+        council_ids: Limit the assessment to these councils (all when None)
+        batch_size: Rows per bulk insert / delete statement
+        field_ids: Limit the assessment to these fields (all when None)
+
+    Returns:
+        Dictionary with ``created``, ``deleted`` and ``unchanged`` counts
+    """
+    start_time = time.monotonic()
+    if council_ids is not None:
+        council_ids = list(council_ids)
+    if field_ids is not None:
+        field_ids = list(field_ids)
+
+    result = _apply_issue_diff(
+        compute_desired_issues(council_ids, field_ids), council_ids, batch_size, field_ids
+    )
+
+    logger.info(
+        "Incremental data issue assessment (%s) completed in %.2f seconds: "
+        "%d created, %d deleted, %d unchanged",
+        "all councils" if council_ids is None else f"{len(council_ids)} councils",
+        time.monotonic() - start_time,
+        result["created"],
+        result["deleted"],
+        result["unchanged"],
+    )
+    return result
+
+
+def parallel_assess_data_issues(workers: Optional[int] = None,
+                                shard_size: Optional[int] = None,
+                                batch_size: int = BATCH_SIZE,
+                                start_method: Optional[str] = None) -> Dict[str, int]:
+    """
+    Assess every active council in shards across a process pool.
+
+    Each worker opens its own database connection and computes the desired
+    issues for a contiguous shard of councils; the shards are merged and
+    written with a single diff against the stored issues.
+
+    Args:
+        workers: Worker processes (``DATA_QUALITY_WORKERS`` when None, where
+            0 means one per CPU up to ``MAX_DEFAULT_WORKERS``). With one
+            worker the shards run in-process.
+        shard_size: Councils per shard (defaults to an even split, four
+            shards per worker)
+        batch_size: Rows per bulk insert / delete statement
+        start_method: Multiprocessing start method (``DATA_QUALITY_START_METHOD``
+            when None). Defaults to ``spawn``: forking a process that runs
+            background threads (event sink and profiler flushers, cache
+            warming) can copy a held lock into the workers and deadlock them.
+
+    Returns:
+        Dictionary with ``created``, ``deleted`` and ``unchanged`` counts,
+        plus the ``workers`` and ``shards`` used
+    """
+    start_time = time.monotonic()
+    if workers is None:
+        workers = getattr(settings, "DATA_QUALITY_WORKERS", 0)
+    workers = workers or min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS)
+
+    council_ids = list(
+        Council.objects.filter(status="active").order_by("id").values_list("id", flat=True)
+    )
+    if not shard_size:
+        shard_size = max(1, -(-len(council_ids) // (workers * 4)))
+    shards = [council_ids[offset:offset + shard_size] for offset in range(0, len(council_ids), shard_size)]
+
+    desired: Set[IssueKey] = set()
+    if workers <= 1 or len(shards) <= 1:
+        for shard in shards:
+            desired |= compute_desired_issues(shard)
+    else:
+        # Forked workers must not share the parent's open connections
+        connections.close_all()
+        context = multiprocessing.get_context(
+            start_method or getattr(settings, "DATA_QUALITY_START_METHOD", "spawn")
+        )
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)),
+            mp_context=context,
+            initializer=data_quality_workers.init_worker,
+            initargs=({alias: connections[alias].settings_dict["NAME"] for alias in connections},),
+        ) as executor:
+            for shard_issues in executor.map(data_quality_workers.assess_shard, shards):
+                desired |= shard_issues
+
+    result = _apply_issue_diff(desired, None, batch_size)
+    result.update(workers=workers, shards=len(shards))
+
+    logger.info(
+        "Parallel data issue assessment (%d shards, %d workers) completed in %.2f seconds: "
+        "%d created, %d deleted, %d unchanged",
+        len(shards),
+        workers,
+        time.monotonic() - start_time,
+        result["created"],
+        result["deleted"],
+        result["unchanged"],
+    )
+    return result
+
+
+def _apply_issue_diff(desired: Set[IssueKey], council_ids: Optional[list],
+                      batch_size: int, field_ids: Optional[list] = None) -> Dict[str, int]:
+    """
+    Write the difference between ``desired`` and the stored issues of
+    ``council_ids`` (all councils when None) and ``field_ids`` (all fields
+    when None) in one transaction.
+    """
+    existing: Dict[IssueKey, int] = {}
+    delete_ids = []
+    existing_rows = _filter_councils(
+        DataIssue.objects, council_ids or [], council_ids is not None, field_ids
+    )
+    for issue_id, council_id, field_id, year_id, issue_type, value in existing_rows.values_list(
+        "id", "council_id", "field_id", "year_id", "issue_type", "value"
+    ):
+        key = (council_id, field_id, year_id, issue_type, value or "")
+        if key in existing:
+            # Yearless duplicates slip past the unique constraint because
+            # NULL years never compare equal; keep only the first
+            delete_ids.append(issue_id)
+        else:
+            existing[key] = issue_id
+
+    to_create = desired - existing.keys()
+    delete_ids.extend(issue_id for key, issue_id in existing.items() if key not in desired)
+
+    with transaction.atomic():
+        # Deletes first: a suspicious issue whose value changed keeps the
+        # same unique key and must be removed before its replacement is added
+        for offset in range(0, len(delete_ids), batch_size):
+            DataIssue.objects.filter(id__in=delete_ids[offset:offset + batch_size]).delete()
+
+        DataIssue.objects.bulk_create(
+            [
+                DataIssue(
+                    council_id=council_id,
+                    field_id=field_id,
+                    year_id=year_id,
+                    issue_type=issue_type,
+                    value=value,
+                )
+                for council_id, field_id, year_id, issue_type, value in to_create
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+    return {
+        "created": len(to_create),
+        "deleted": len(delete_ids),
+        "unchanged": len(existing.keys() & desired),
+    }
+
+
+def reassess_council_data_issues(council_id: int,
+                                 field_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """Incrementally reassess the issues of a single council, optionally only for ``field_ids``."""
+    return incremental_assess_data_issues([council_id], field_ids=field_ids)
+
+
+def _filter_councils(manager, council_ids, scoped: bool, field_ids=None):
+    """Restrict a queryset to ``council_ids`` when assessing a subset, and to ``field_ids`` when given."""
+    queryset = manager.filter(council_id__in=council_ids) if scoped else manager.all()
+    if field_ids is not None:
+        queryset = queryset.filter(field_id__in=field_ids)
+    return queryset
+
+
+def _contribution_keys(council_ids, scoped: bool, field_ids=None):
+    from .models import Contribution
+
+    return _filter_councils(Contribution.objects, council_ids, scoped, field_ids).values_list(
+        "council_id", "field_id", "year_id"
+    )
@@ -7,6 +7,10 @@ from council_finance.data_quality import (
     assess_data_issues_simple,
     quick_assess_data_issues
 )
+from council_finance.incremental_data_quality import (
+    incremental_assess_data_issues,
+    parallel_assess_data_issues,
+)
 import logging
 
 
@@ -30,8 +34,14 @@ class Command(BaseCommand):
         parser.add_argument(
             "--method",
             default="simple",
-            choices=["simple", "standard", "chunked", "fast", "quick"],
-            help="Assessment method: simple (default, characteristics only), standard, chunked (memory efficient), fast (SQL-based), quick (estimate only)",
+            choices=["simple", "standard", "chunked", "fast", "quick", "incremental", "parallel"],
+            help="Assessment method: simple (default, characteristics only), standard, chunked (memory efficient), fast (SQL-based), quick (estimate only), incremental (only create new / delete resolved issues), parallel (incremental across council shards)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Worker processes for the parallel method (default: DATA_QUALITY_WORKERS, 0 = one per CPU, up to 4)",
         )
 
     def handle(self, *args, **options):
@@ -56,6 +66,16 @@ class Command(BaseCommand):
                 count = assess_data_issues_fast()
             elif method == "quick":
                 count = quick_assess_data_issues()
+            elif method in ("incremental", "parallel"):
+                if method == "parallel":
+                    result = parallel_assess_data_issues(workers=options["workers"])
+                else:
+                    result = incremental_assess_data_issues()
+                count = result["created"]
+                if not options["quiet"]:
+                    self.stdout.write(
+                        f"Deleted {result['deleted']} resolved issues, kept {result['unchanged']} unchanged"
+                    )
             else:
                 count = assess_data_issues()
                 
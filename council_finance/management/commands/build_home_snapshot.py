@@ -0,0 +1,32 @@
+"""
+Management command to build the home page snapshot.
+
+Rebuilds the snapshot when it is missing, marked dirty by a data change,
+older than its maximum age or from a previous day. Scheduled every minute,
+so most runs only read the snapshot row.
+
+Usage:
+    python manage.py build_home_snapshot          # Rebuild if needed
+    python manage.py build_home_snapshot --force  # Always rebuild
+"""
+
+from django.core.management.base import BaseCommand
+
+from council_finance.services.home_snapshot import home_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Build the precomputed home page snapshot if it is stale'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild even if the current snapshot is fresh',
+        )
+
+    def handle(self, *args, **options):
+        if home_snapshot.refresh(force=options['force']):
+            self.stdout.write(self.style.SUCCESS('Home page snapshot rebuilt'))
+        else:
+            self.stdout.write('Home page snapshot is fresh')
@@ -0,0 +1,67 @@
+"""
+Management command to compute factoid instances in bulk.
+
+Computes instances for every active template across councils for a year,
+or recomputes expired instances. Pages recompute the instances they
+request once invalidated; this fills the table after imports and
+template changes.
+
+Usage:
+    python manage.py materialise_factoids                        # Current year, all councils
+    python manage.py materialise_factoids --year=2024/25         # Specific year
+    python manage.py materialise_factoids --council=birmingham   # Specific council(s)
+    python manage.py materialise_factoids --expired              # Refresh expired instances
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from council_finance.models import Council, FinancialYear
+from council_finance.services.factoid_materialiser import factoid_materialiser
+
+
+class Command(BaseCommand):
+    help = 'Compute factoid instances for all active templates and councils in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year',
+            type=str,
+            help='Financial year label (default: the current year)',
+        )
+        parser.add_argument(
+            '--council',
+            action='append',
+            help='Only this council (by slug); may be repeated',
+        )
+        parser.add_argument(
+            '--expired',
+            action='store_true',
+            help='Only recompute missing and expired instances; without --year, every year with expired instances',
+        )
+
+    def handle(self, *args, **options):
+        if options['expired'] and not options['year'] and not options['council']:
+            stats = factoid_materialiser.refresh_expired()
+        else:
+            if options['year']:
+                year = FinancialYear.objects.filter(label=options['year']).first()
+                if year is None:
+                    raise CommandError(f"Financial year {options['year']} not found")
+            else:
+                year = FinancialYear.get_current()
+                if year is None:
+                    raise CommandError('No financial years exist')
+
+            councils = None
+            if options['council']:
+                councils = list(Council.objects.filter(slug__in=options['council']).select_related('council_type'))
+                missing = set(options['council']) - {council.slug for council in councils}
+                if missing:
+                    raise CommandError(f"Councils not found: {', '.join(sorted(missing))}")
+
+            stats = factoid_materialiser.materialise(year, councils=councils, expired_only=options['expired'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Materialised factoids for {stats['councils']} councils: "
+            f"{stats['created']} created, {stats['updated']} updated, {stats['skipped']} already fresh"
+        ))
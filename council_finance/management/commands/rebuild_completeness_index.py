@@ -0,0 +1,39 @@
+"""
+Django management command to rebuild the completeness index.
+
+The index is kept current by signals; rebuild it after bulk imports that
+bypass them (``bulk_create``, raw SQL) or to repair drift. Requests never
+build it: run with ``--if-missing`` on startup so a new database gets one.
+
+Usage:
+    python manage.py rebuild_completeness_index
+    python manage.py rebuild_completeness_index --if-missing   # Only when unbuilt
+"""
+
+from django.core.management.base import BaseCommand
+
+from council_finance.services.completeness_index import completeness_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the completeness bitsets from financial figures and characteristics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-missing',
+            action='store_true',
+            help='Only build the index when it has not been built yet',
+        )
+
+    def handle(self, *args, **options):
+        if options['if_missing'] and completeness_index.built:
+            self.stdout.write('Completeness index already built')
+            return
+
+        count = completeness_index.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt {count:,} completeness bitsets '
+                f'({completeness_index.site_completion_percentage():.1f}% complete)'
+            )
+        )
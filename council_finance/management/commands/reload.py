@@ -177,6 +177,12 @@ class Command(BaseCommand):
         if not options['dont_warm_cache']:
             self.stdout.write(f'[{step_num}/{total_steps}] Warming site-wide counter cache...')
             cache_success = self._warm_sitewide_counter_cache()
+            try:
+                # Home page snapshot reads the totals just warmed
+                call_command('build_home_snapshot', '--force', verbosity=0)
+            except Exception as e:
+                cache_success = False
+                self.stdout.write(self.style.WARNING(f'Home page snapshot build failed: {e}'))
             if cache_success:
                 self.stdout.write(
                     self.style.SUCCESS('Cache warming completed successfully!')
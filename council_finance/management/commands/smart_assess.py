@@ -3,6 +3,10 @@ Management command for smart data quality assessment.
 
 This command provides a way to run the enhanced data quality assessment 
 that only flags realistic missing data based on relevant financial years.
+
+By default the assessment is incremental: only new issues are created and
+resolved ones deleted. Use --full-rebuild to clear and regenerate the table,
+and --workers to spread the incremental assessment across processes.
 """
 
 from django.core.management.base import BaseCommand
@@ -11,7 +15,11 @@ from council_finance.smart_data_quality import (
     get_data_collection_priorities,
     mark_financial_year_as_current
 )
-from council_finance.models import FinancialYear
+from council_finance.incremental_data_quality import (
+    incremental_assess_data_issues,
+    parallel_assess_data_issues,
+)
+from council_finance.models import DataIssue, FinancialYear
 
 
 class Command(BaseCommand):
@@ -28,6 +36,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Show data collection priorities without running assessment'
         )
+        parser.add_argument(
+            '--full-rebuild',
+            action='store_true',
+            help='Delete and regenerate every data issue instead of applying only the changes'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Assess council shards in this many processes (0 = one per CPU, up to 4)'
+        )
         parser.add_argument(
             '--quiet',
             action='store_true',
@@ -88,11 +107,21 @@ class Command(BaseCommand):
         if not options['quiet']:
             self.stdout.write('📋 Running comprehensive data quality assessment...')
         
-        count = smart_assess_data_issues()
+        if options['full_rebuild']:
+            count = smart_assess_data_issues()
+            summary = f'Created {count:,} data issues.'
+        else:
+            if options['workers'] is not None:
+                result = parallel_assess_data_issues(workers=options['workers'])
+            else:
+                result = incremental_assess_data_issues()
+            count = DataIssue.objects.count()
+            summary = (f"Created {result['created']:,} and resolved {result['deleted']:,} data issues "
+                       f"({result['unchanged']:,} unchanged).")
         
         if not options['quiet']:
             self.stdout.write(
-                self.style.SUCCESS(f'✅ Comprehensive assessment complete. Created {count:,} data issues.')
+                self.style.SUCCESS(f'✅ Comprehensive assessment complete. {summary}')
             )
             
             # Show summary
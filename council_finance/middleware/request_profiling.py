@@ -0,0 +1,33 @@
+"""
+Request Profiling Middleware
+
+Records wall time, database queries, cache hits and misses and response
+size for every request, aggregated per route by the event viewer's request
+profiler and shown on its performance page.
+
+Set REQUEST_PROFILING_ENABLED=false (EVENT_VIEWER_SETTINGS
+['REQUEST_PROFILING']['enabled']) to remove the middleware entirely.
+"""
+
+from django.core.exceptions import MiddlewareNotUsed
+
+from event_viewer.services.request_profiler import request_profiler
+
+
+class RequestProfilingMiddleware:
+    """
+    Middleware that hands each request to the request profiler
+
+    Place it first so the measurement covers the other middleware too.
+    """
+
+    def __init__(self, get_response, profiler=None):
+        self.get_response = get_response
+        self.profiler = profiler if profiler is not None else request_profiler
+        if not self.profiler.enabled:
+            raise MiddlewareNotUsed('Request profiling is disabled')
+
+    def __call__(self, request):
+        if not self.profiler.should_profile(request):
+            return self.get_response(request)
+        return self.profiler.profile(request, self.get_response)
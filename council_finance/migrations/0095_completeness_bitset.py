@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('council_finance', '0094_create_counter_result_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompletenessBitset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bits', models.BinaryField(default=b'', help_text='Little-endian bitset of populated field ids')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('council', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completeness_bitsets', to='council_finance.council')),
+                ('year', models.ForeignKey(blank=True, help_text='Financial year (None for characteristics)', null=True, on_delete=django.db.models.deletion.CASCADE, to='council_finance.financialyear')),
+            ],
+            options={
+                'unique_together': {('council', 'year')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:46
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('council_finance', '0095_completeness_bitset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HomeSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0, help_text='Shape of the stored context')),
+                ('context', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('built_at', models.DateTimeField()),
+                ('dirty', models.BooleanField(default=False, help_text='Changed since it was built')),
+            ],
+            options={
+                'verbose_name': 'Home Snapshot',
+            },
+        ),
+    ]
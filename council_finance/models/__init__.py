@@ -91,6 +91,8 @@ from .predictive_analytics import (
     LoadBalancerConfig,
 )
 from .counter_result import CounterResult
+from .completeness_bitset import CompletenessBitset
+from .home_snapshot import HomeSnapshot
 from .site_feedback import SiteFeedback, SiteAnnouncement
 
 __all__ = [
@@ -165,6 +167,8 @@ __all__ = [
     'PerformanceAnomaly',
     'LoadBalancerConfig',
     'CounterResult',
+    'CompletenessBitset',
+    'HomeSnapshot',
     'SiteFeedback',
     'SiteAnnouncement',
 ]
@@ -0,0 +1,43 @@
+"""
+Completeness Bitset Model - Persistent storage for the completeness index.
+
+One row per council and financial year holds the ids of the fields that have
+data as a bitset (bit ``n`` set when field ``n`` is populated). Yearless
+characteristics are stored in the row with no year. See
+``council_finance.services.completeness_index``.
+"""
+
+from django.db import models
+
+
+class CompletenessBitset(models.Model):
+    """Populated field ids for one council and year, packed into a bitset."""
+
+    council = models.ForeignKey(
+        'Council',
+        on_delete=models.CASCADE,
+        related_name='completeness_bitsets',
+    )
+    year = models.ForeignKey(
+        'FinancialYear',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        help_text="Financial year (None for characteristics)",
+    )
+    bits = models.BinaryField(default=b'', help_text="Little-endian bitset of populated field ids")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ['council', 'year']
+
+    def __str__(self):
+        return f"Completeness bitset for council {self.council_id} year {self.year_id or '-'}"
+
+    @staticmethod
+    def pack(bits: int) -> bytes:
+        return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+    @staticmethod
+    def unpack(data) -> int:
+        return int.from_bytes(bytes(data or b''), 'little')
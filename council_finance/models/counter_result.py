@@ -20,7 +20,7 @@ from django.core.cache import cache
 
 # Event Viewer integration
 try:
-    from event_viewer.models import SystemEvent
+    from event_viewer.services.event_sink import record_event
     EVENT_VIEWER_AVAILABLE = True
 except ImportError:
     EVENT_VIEWER_AVAILABLE = False
@@ -40,7 +40,7 @@ def log_counter_result_event(level, category, title, message, details=None):
         if details:
             event_details.update(details)
         
-        SystemEvent.objects.create(
+        record_event(
             source='counter_result',
             level=level,
             category=category,
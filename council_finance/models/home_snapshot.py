@@ -0,0 +1,26 @@
+"""
+Home Snapshot Model - Persistent storage for the precomputed home page.
+
+A single row holds the home page context built by the scheduled
+``build_home_snapshot`` job, so every web process reads the same snapshot
+whatever cache backend is configured. See
+``council_finance.services.home_snapshot``.
+"""
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class HomeSnapshot(models.Model):
+    """The current home page context and whether it needs rebuilding."""
+
+    version = models.PositiveIntegerField(default=0, help_text="Shape of the stored context")
+    context = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    built_at = models.DateTimeField()
+    dirty = models.BooleanField(default=False, help_text="Changed since it was built")
+
+    class Meta:
+        verbose_name = "Home Snapshot"
+
+    def __str__(self):
+        return f"Home snapshot built {self.built_at:%Y-%m-%d %H:%M}"
@@ -1,8 +1,10 @@
 from django.urls import re_path
 
-from .consumers import ContributeConsumer
+from .consumers import ContributeConsumer, LiveUpdatesConsumer
 
 # URL patterns for WebSocket connections.
 websocket_urlpatterns = [
     re_path(r"^ws/contribute/$", ContributeConsumer.as_asgi()),
+    re_path(r"^ws/councils/(?P<slug>[-a-zA-Z0-9_]{1,80})/$", LiveUpdatesConsumer.as_asgi()),
+    re_path(r"^ws/counters/$", LiveUpdatesConsumer.as_asgi()),
 ]
@@ -618,6 +618,7 @@ CRITICAL JSON RULES:
         """Log AI usage for analytics and cost tracking."""
         try:
             from council_finance.models import AIUsageLog
+            from council_finance.services.ai_usage_metrics import ai_usage_metrics
             
             # Estimate tokens used (rough approximation)
             estimated_tokens = factoids_requested * 200  # Approximate tokens per factoid
@@ -627,7 +628,7 @@ CRITICAL JSON RULES:
             estimated_cost = (estimated_tokens / 1000) * cost_per_1k
             
             # Create usage log entry
-            AIUsageLog.objects.create(
+            usage_log = AIUsageLog.objects.create(
                 council=council,
                 model_used=self.model,
                 factoids_requested=factoids_requested,
@@ -646,6 +647,15 @@ CRITICAL JSON RULES:
                 user_agent=user_agent or ''
             )
             
+            # Keep the monitoring dashboard's rolling windows current
+            ai_usage_metrics.record(
+                success=success,
+                processing_time=processing_time,
+                cost=estimated_cost,
+                council_id=council.id,
+                at=usage_log.created_at,
+            )
+            
             logger.debug(f"📊 Logged AI usage: {council.slug} - {factoids_generated} factoids - £{estimated_cost:.6f}")
             
         except Exception as e:
@@ -0,0 +1,269 @@
+"""
+AI Usage Metrics - rolling-window counters for the AI monitoring dashboard.
+
+Keeps request, error, latency and cost totals for AI factoid generation in
+fixed-size ring buffers, so live metrics, anomaly baselines and forecasts
+are sums over a fixed number of slots instead of ``AIUsageLog`` aggregate
+queries:
+
+- a minute ring covering the last two hours
+- an hour ring covering the last eight days
+
+``AIFactoidGenerator._log_usage`` adds each usage log as it is written.
+Other processes' logs are picked up by resyncing from snapshots of the
+log table: a per-minute snapshot of the last two hours every
+``resync_seconds`` and a per-hour snapshot of the last eight days every
+hour. Snapshots are shared through the cache, so one process takes them
+and the rest reuse them; this process's logs since the snapshot are
+replayed on top.
+"""
+
+import logging
+import threading
+from collections import deque
+from datetime import timedelta, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncHour, TruncMinute
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('requests', 'errors', 'latency', 'cost')
+
+MINUTE = 60
+HOUR = 3600
+
+
+def _epoch(moment, slot_seconds):
+    return int(moment.timestamp()) // slot_seconds
+
+
+class RollingWindow:
+    """
+    Ring buffer of ``size`` consecutive slots of ``slot_seconds``, each
+    holding request, error, latency (seconds) and cost totals. Slots are
+    reused as time moves on, so memory and read cost are fixed.
+    """
+
+    def __init__(self, slot_seconds, size):
+        self.slot_seconds = slot_seconds
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        self._epochs = [None] * self.size
+        self._values = [[0, 0, 0.0, 0.0] for _ in range(self.size)]
+
+    def _slot(self, epoch):
+        index = epoch % self.size
+        if self._epochs[index] != epoch:
+            self._epochs[index] = epoch
+            self._values[index] = [0, 0, 0.0, 0.0]
+        return self._values[index]
+
+    def get(self, epoch):
+        index = epoch % self.size
+        return self._values[index] if self._epochs[index] == epoch else [0, 0, 0.0, 0.0]
+
+    def add(self, moment, requests=1, errors=0, latency=0.0, cost=0.0):
+        slot = self._slot(_epoch(moment, self.slot_seconds))
+        slot[0] += requests
+        slot[1] += errors
+        slot[2] += latency
+        slot[3] += cost
+
+    def put(self, epoch, values):
+        self._slot(epoch)[:] = list(values)
+
+    def totals(self, seconds, now=None) -> Dict[str, float]:
+        """
+        Totals over the last ``seconds``. The oldest slot is counted in
+        proportion to the part of it inside the window.
+        """
+        now = now or timezone.now()
+        start = now.timestamp() - seconds
+        current = _epoch(now, self.slot_seconds)
+        first = max(int(start) // self.slot_seconds, current - self.size + 1)
+
+        totals = [0.0, 0.0, 0.0, 0.0]
+        for epoch in range(first, current + 1):
+            values = self.get(epoch)
+            share = min(1.0, max(0.0, (epoch + 1) * self.slot_seconds - start) / self.slot_seconds)
+            for i, value in enumerate(values):
+                totals[i] += value * share
+        return dict(zip(FIELDS, totals))
+
+    def slot_totals(self, moment) -> Dict[str, float]:
+        """Totals of the slot containing ``moment``."""
+        return dict(zip(FIELDS, self.get(_epoch(moment, self.slot_seconds))))
+
+
+class AIUsageMetrics:
+    """Rolling AI usage totals; see the module docstring. One per process."""
+
+    MINUTE_SLOTS = 120
+    HOUR_SLOTS = 8 * 24
+    ACTIVE_COUNCIL_SECONDS = 300
+
+    def __init__(self, resync_seconds=30, cache_prefix='ai_usage_metrics'):
+        self.resync_seconds = resync_seconds
+        self.cache_prefix = cache_prefix
+        self.minutes = RollingWindow(MINUTE, self.MINUTE_SLOTS)
+        self.hours = RollingWindow(HOUR, self.HOUR_SLOTS)
+        self._councils = {}
+        self._journal = deque()
+        self._synced_at = None
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, success=True, processing_time=0.0, cost=0, council_id=None, at=None):
+        """Add one AI request, as logged to ``AIUsageLog``."""
+        entry = (at or timezone.now(), 0 if success else 1, float(processing_time or 0),
+                 float(cost or 0), council_id)
+        with self._lock:
+            self._apply(entry)
+            self._journal.append(entry)
+            horizon = entry[0] - timedelta(seconds=2 * self.resync_seconds + MINUTE)
+            while self._journal and self._journal[0][0] < horizon:
+                self._journal.popleft()
+
+    def _apply(self, entry):
+        at, errors, latency, cost, council_id = entry
+        self.minutes.add(at, 1, errors, latency, cost)
+        self.hours.add(at, 1, errors, latency, cost)
+        if council_id is not None:
+            self._councils[council_id] = max(at, self._councils.get(council_id, at))
+
+    # ------------------------------------------------------------------
+    # Resyncing
+    # ------------------------------------------------------------------
+
+    def ensure_fresh(self):
+        now = timezone.now()
+        with self._lock:
+            if self._synced_at is None or (now - self._synced_at).total_seconds() >= self.resync_seconds:
+                self.resync(now)
+
+    def resync(self, now=None):
+        """Reload the rings from the shared snapshots, then replay this process's newer logs."""
+        now = now or timezone.now()
+        hourly = self._snapshot('hour', HOUR, now)
+        recent = self._snapshot('minute', self.resync_seconds, now)
+
+        with self._lock:
+            self.minutes.clear()
+            self.hours.clear()
+            for epoch, values in hourly['slots'].items():
+                self.hours.put(epoch, values)
+
+            # The minute snapshot replaces the whole hours it covers
+            first_hour = _epoch(recent['start'], HOUR)
+            for epoch in range(first_hour, _epoch(now, HOUR) + 1):
+                self.hours.put(epoch, [0, 0, 0.0, 0.0])
+            for epoch, values in recent['slots'].items():
+                self.minutes.put(epoch, values)
+                hour = self.hours._slot(epoch * MINUTE // HOUR)
+                for i, value in enumerate(values):
+                    hour[i] += value
+            self._councils = dict(recent['councils'])
+
+            for entry in self._journal:
+                if entry[0] > recent['taken_at']:
+                    self._apply(entry)
+            self._synced_at = now
+
+    def _snapshot(self, granularity, max_age, now):
+        key = f"{self.cache_prefix}:{granularity}"
+        snapshot = cache.get(key)
+        if snapshot is None or (now - snapshot['taken_at']).total_seconds() >= max_age:
+            snapshot = self._take_snapshot(granularity, now)
+            cache.set(key, snapshot, max_age)
+        return snapshot
+
+    def _take_snapshot(self, granularity, now):
+        from council_finance.models import AIUsageLog
+
+        if granularity == 'minute':
+            start = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+            slot_seconds, trunc = MINUTE, TruncMinute
+        else:
+            start = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=self.HOUR_SLOTS - 1)
+            slot_seconds, trunc = HOUR, TruncHour
+
+        logs = AIUsageLog.objects.filter(created_at__gte=start)
+        rows = logs.annotate(
+            slot=trunc('created_at', tzinfo=dt_timezone.utc)
+        ).values('slot').annotate(
+            requests=Count('id'),
+            errors=Count('id', filter=Q(success=False)),
+            latency=Sum('processing_time_seconds'),
+            cost=Sum('estimated_cost'),
+        ).order_by()
+
+        snapshot = {
+            'taken_at': now,
+            'start': start,
+            'slots': {
+                _epoch(row['slot'], slot_seconds): [
+                    row['requests'], row['errors'], float(row['latency'] or 0), float(row['cost'] or 0)
+                ]
+                for row in rows
+            },
+            'councils': {},
+        }
+        if granularity == 'minute':
+            snapshot['councils'] = dict(
+                logs.values('council_id').annotate(last=Max('created_at')).values_list('council_id', 'last')
+            )
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def recent(self, seconds) -> Dict[str, float]:
+        """Totals over the last ``seconds`` (up to two hours), from the minute ring."""
+        self.ensure_fresh()
+        with self._lock:
+            return self.minutes.totals(seconds)
+
+    def history(self, seconds) -> Dict[str, float]:
+        """Totals over the last ``seconds`` (up to a week), from the hour ring."""
+        self.ensure_fresh()
+        with self._lock:
+            return self.hours.totals(seconds)
+
+    def current_hour(self) -> Dict[str, float]:
+        """Totals since the start of the current UTC hour."""
+        self.ensure_fresh()
+        with self._lock:
+            return self.hours.slot_totals(timezone.now())
+
+    def same_hour_baseline(self, days=7) -> Optional[float]:
+        """Mean requests in this hour of the day over the previous ``days``, or None without any."""
+        self.ensure_fresh()
+        now = timezone.now()
+        with self._lock:
+            counts = [self.hours.slot_totals(now - timedelta(days=day))['requests'] for day in range(1, days + 1)]
+        return sum(counts) / days if any(counts) else None
+
+    def active_councils(self, seconds=ACTIVE_COUNCIL_SECONDS) -> int:
+        self.ensure_fresh()
+        since = timezone.now() - timedelta(seconds=seconds)
+        with self._lock:
+            return sum(1 for last in self._councils.values() if last >= since)
+
+
+def as_money(value) -> Decimal:
+    return Decimal(str(round(value, 6)))
+
+
+# Global metrics instance
+ai_usage_metrics = AIUsageMetrics()
@@ -17,6 +17,7 @@ from django.template.loader import render_to_string
 from event_viewer.models import SystemEvent
 from council_finance.models import UserProfile
 from council_finance.emails import send_email
+from council_finance.services.rate_limiter import SlidingWindowRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +34,56 @@ class AuthSecurityMonitor:
             'suspicious_registrations_per_hour': 5,
             'account_deletions_per_day': 3,
         }
+        
+        # Sliding one-hour counters behind the hourly thresholds, so
+        # checks read the cache and only threshold crossings are written
+        self.limiters = {
+            name: SlidingWindowRateLimiter(f'auth_security:{name}', self.alert_thresholds[name], 3600)
+            for name in (
+                'failed_logins_per_hour',
+                'password_resets_per_hour',
+                'failed_logins_per_ip_per_hour',
+            )
+        }
+        self.threshold_titles = {
+            'failed_logins_per_hour': 'Failed Login Threshold Crossed',
+            'password_resets_per_hour': 'Password Reset Threshold Crossed',
+            'failed_logins_per_ip_per_hour': 'Failed Login Threshold Crossed for IP',
+        }
+    
+    def record_login_failure(self, ip_address=None):
+        """Count a failed login, overall and for its IP address."""
+        self._count('failed_logins_per_hour', 'all')
+        if ip_address:
+            self._count('failed_logins_per_ip_per_hour', ip_address, {'ip_address': ip_address})
+    
+    def record_password_reset(self, ip_address=None):
+        """Count a password reset request."""
+        self._count('password_resets_per_hour', 'all', {'ip_address': ip_address})
+    
+    def current_count(self, threshold_name, identifier='all'):
+        """Events counted towards a threshold in the last hour."""
+        return round(self.limiters[threshold_name].count(identifier))
+    
+    def _count(self, threshold_name, identifier, details=None):
+        """Count one event; write a security event when this takes it over its threshold."""
+        result = self.limiters[threshold_name].hit(identifier)
+        if result.crossed:
+            SystemEvent.objects.create(
+                source='security',
+                level='warning',
+                category='security',
+                title=self.threshold_titles[threshold_name],
+                message=f'More than {result.limit} events in the last hour ({threshold_name})',
+                details={
+                    'threshold_name': threshold_name,
+                    'threshold': result.limit,
+                    'count': round(result.count),
+                    **(details or {}),
+                },
+                tags=['auth_security', 'threshold_crossed', threshold_name],
+            )
+        return result
     
     def check_auth_failures(self, hours_back=1):
         """Check for excessive authentication failures."""
@@ -40,13 +91,19 @@ class AuthSecurityMonitor:
         
         alerts = []
         
+        # The last hour is counted by the sliding-window counters
+        counted = hours_back == 1
+        
         # Failed login attempts
-        failed_logins = SystemEvent.objects.filter(
-            source='user_auth',
-            level='warning',
-            title__icontains='login failed',
-            timestamp__gte=cutoff
-        ).count()
+        if counted:
+            failed_logins = self.current_count('failed_logins_per_hour')
+        else:
+            failed_logins = SystemEvent.objects.filter(
+                source='user_auth',
+                level='warning',
+                title__icontains='login failed',
+                timestamp__gte=cutoff
+            ).count()
         
         if failed_logins > self.alert_thresholds['failed_logins_per_hour']:
             alerts.append({
@@ -63,11 +120,14 @@ class AuthSecurityMonitor:
             })
         
         # Password reset surge
-        password_resets = SystemEvent.objects.filter(
-            source='user_auth',
-            title='Password Reset Requested',
-            timestamp__gte=cutoff
-        ).count()
+        if counted:
+            password_resets = self.current_count('password_resets_per_hour')
+        else:
+            password_resets = SystemEvent.objects.filter(
+                source='user_auth',
+                title='Password Reset Requested',
+                timestamp__gte=cutoff
+            ).count()
         
         if password_resets > self.alert_thresholds['password_resets_per_hour']:
             alerts.append({
@@ -111,20 +171,18 @@ class AuthSecurityMonitor:
         cutoff = timezone.now() - timedelta(hours=hours_back)
         alerts = []
         
-        # Get failed logins by IP address
-        failed_login_events = SystemEvent.objects.filter(
-            source='user_auth',
-            level='warning',
-            title__icontains='login failed',
+        # IPs whose failed logins crossed the threshold, with their current counts
+        crossings = SystemEvent.objects.filter(
+            source='security',
+            title=self.threshold_titles['failed_logins_per_ip_per_hour'],
             timestamp__gte=cutoff,
-            details__ip_address__isnull=False
-        )
+        ).values_list('details', flat=True)
         
         ip_failures = {}
-        for event in failed_login_events:
-            ip = event.details.get('ip_address')
-            if ip:
-                ip_failures[ip] = ip_failures.get(ip, 0) + 1
+        for details in crossings:
+            ip = (details or {}).get('ip_address')
+            if ip and ip not in ip_failures:
+                ip_failures[ip] = max(self.current_count('failed_logins_per_ip_per_hour', ip), details.get('count', 0))
         
         # Alert on IPs with excessive failures
         for ip, count in ip_failures.items():
@@ -0,0 +1,249 @@
+"""
+Bulk Data Save Service - upsert many figures or characteristics at once.
+
+Saving fields one by one costs a ``get_or_create`` and ``save`` per field,
+and each save fires the feed, factoid, counter and data issue receivers and
+writes its own ``ActivityLog`` row. This service writes a whole council/year
+batch with a fixed number of queries:
+
+1. One SELECT of the existing rows (for old values)
+2. One ``bulk_create(update_conflicts=True)`` upsert of the changed rows
+3. One ``bulk_create`` each for history and ``ActivityLog`` rows
+
+Per-row signals are replaced by a single ``council_data_changed``
+notification listing the changed fields, sent after commit.
+"""
+
+import logging
+from dataclasses import dataclass, field as dataclass_field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+
+from council_finance.models import (
+    ActivityLog,
+    CouncilCharacteristic,
+    CouncilCharacteristicHistory,
+    FinancialFigure,
+    FinancialFigureHistory,
+)
+from council_finance.services.live_updates import live_updates
+from council_finance.signals.data_change_signals import FieldChange, send_council_data_changed
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_CONTENT_TYPES = ('monetary', 'integer', 'percentage')
+
+BATCH_SIZE = 500
+
+
+class BulkSaveError(ValueError):
+    """Raised when a submitted value cannot be stored in its field."""
+
+    def __init__(self, field, value, message):
+        self.field = field
+        self.value = value
+        super().__init__(message)
+
+
+@dataclass
+class BulkSaveResult:
+    """Outcome of a bulk save."""
+    changes: List[FieldChange] = dataclass_field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def created(self) -> int:
+        return sum(1 for change in self.changes if change.created)
+
+    @property
+    def updated(self) -> int:
+        return len(self.changes) - self.created
+
+
+def parse_figure_value(field, value: Any):
+    """
+    Split a submitted value into ``(value, text_value)`` for a figure field,
+    using the same rules as the single-field save.
+    """
+    if field.content_type in NUMERIC_CONTENT_TYPES:
+        if value in (None, ''):
+            return None, None
+        try:
+            return Decimal(str(value).replace(',', '')), None
+        except (InvalidOperation, ValueError, TypeError):
+            raise BulkSaveError(field, value, f'Invalid numeric value: {value}')
+    return None, str(value).strip() if value is not None else None
+
+
+def bulk_save_financial_figures(council, year, values: Dict[Any, Any], user=None,
+                                source: str = 'contribution', log_activity: bool = True) -> BulkSaveResult:
+    """
+    Upsert the financial figures of one council and year.
+
+    Args:
+        council: Council the figures belong to
+        year: FinancialYear of the figures
+        values: Mapping of ``DataField`` to submitted value
+        user: User making the change (history, activity log and feed author)
+        source: History source label
+        log_activity: Write one ``ActivityLog`` row per changed field
+
+    Returns:
+        BulkSaveResult listing the fields that changed
+
+    Raises:
+        BulkSaveError: A numeric field received a non-numeric value; nothing
+            is written
+    """
+    parsed = {field: parse_figure_value(field, value) for field, value in values.items()}
+    result = BulkSaveResult()
+
+    with transaction.atomic():
+        existing = {
+            figure.field_id: figure
+            for figure in FinancialFigure.objects.filter(
+                council=council, year=year, field__in=list(parsed)
+            )
+        }
+
+        figures = []
+        history = []
+        for field, (numeric_value, text_value) in parsed.items():
+            current = existing.get(field.id)
+            if current is not None and current.value == numeric_value and current.text_value == text_value:
+                result.unchanged += 1
+                continue
+
+            is_numeric = field.content_type in NUMERIC_CONTENT_TYPES
+            old_value = None
+            if current is not None:
+                old_value = current.value if is_numeric else current.text_value
+            new_value = numeric_value if is_numeric else text_value
+
+            figures.append(FinancialFigure(
+                council=council,
+                year=year,
+                field=field,
+                value=numeric_value,
+                text_value=text_value,
+                updated_by=user,
+            ))
+            if is_numeric:
+                history.append(FinancialFigureHistory(
+                    council=council,
+                    field=field,
+                    year=year,
+                    old_value=current.value if current is not None else None,
+                    new_value=numeric_value,
+                    changed_by=user,
+                    source=source,
+                ))
+            result.changes.append(FieldChange(field, old_value, new_value, current is None))
+
+        if figures:
+            FinancialFigure.objects.bulk_create(
+                figures,
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['council', 'field', 'year'],
+                update_fields=['value', 'text_value', 'updated', 'updated_by'],
+            )
+            FinancialFigureHistory.objects.bulk_create(history, batch_size=BATCH_SIZE)
+            if log_activity:
+                _log_activity(council, year, result.changes, user)
+
+        send_council_data_changed(council, year, result.changes, author=user, source=source)
+
+    logger.info(
+        f"Bulk saved {len(result.changes)} figures for {council.name} ({year.label}), "
+        f"{result.unchanged} unchanged"
+    )
+    return result
+
+
+def bulk_save_characteristics(council, values: Dict[Any, Any], user=None,
+                              source: str = 'contribution', log_activity: bool = True) -> BulkSaveResult:
+    """
+    Upsert the characteristics of one council; see
+    ``bulk_save_financial_figures`` for the arguments.
+    """
+    cleaned = {field: (str(value).strip() if value is not None else '') for field, value in values.items()}
+    result = BulkSaveResult()
+
+    with transaction.atomic():
+        existing = {
+            characteristic.field_id: characteristic.value
+            for characteristic in CouncilCharacteristic.objects.filter(council=council, field__in=list(cleaned))
+        }
+
+        characteristics = []
+        history = []
+        for field, value in cleaned.items():
+            created = field.id not in existing
+            old_value = existing.get(field.id)
+            if not created and old_value == value:
+                result.unchanged += 1
+                continue
+
+            characteristics.append(CouncilCharacteristic(
+                council=council, field=field, value=value, updated_by=user
+            ))
+            history.append(CouncilCharacteristicHistory(
+                council=council,
+                field=field,
+                old_value=old_value,
+                new_value=value,
+                changed_by=user,
+                source=source if source in ('import', 'contribution', 'admin', 'api') else 'contribution',
+            ))
+            result.changes.append(FieldChange(field, old_value, value, created))
+
+        if characteristics:
+            CouncilCharacteristic.objects.bulk_create(
+                characteristics,
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['council', 'field'],
+                update_fields=['value', 'updated', 'updated_by'],
+            )
+            CouncilCharacteristicHistory.objects.bulk_create(history, batch_size=BATCH_SIZE)
+            if log_activity:
+                _log_activity(council, None, result.changes, user)
+
+        send_council_data_changed(council, None, result.changes, author=user, source=source)
+
+    logger.info(
+        f"Bulk saved {len(result.changes)} characteristics for {council.name}, "
+        f"{result.unchanged} unchanged"
+    )
+    return result
+
+
+def _log_activity(council, year, changes: List[FieldChange], user: Optional[Any]) -> None:
+    """One ``ActivityLog`` row per changed field, in a single insert."""
+    suffix = f" ({year.label})" if year is not None else ""
+    rows = []
+    for change in changes:
+        details = {
+            'field_name': change.field.slug,  # Story generator expects the slug
+            'field_display_name': change.field.name,
+            'old_value': str(change.old_value) if change.old_value is not None else None,
+            'new_value': str(change.new_value) if change.new_value is not None else '',
+            'content_type': change.field.content_type,
+            'category': change.field.category,
+        }
+        if year is not None:
+            details['year'] = year.label
+        rows.append(ActivityLog(
+            user=user,
+            activity_type='update',
+            description=f"Updated {change.field.name} for {council.name}{suffix}",
+            related_council=council,
+            details=details,
+        ))
+    ActivityLog.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    # bulk_create skips post_save, so push the feed deltas here
+    for row in rows:
+        live_updates.publish_activity(row)
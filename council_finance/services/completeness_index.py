@@ -0,0 +1,431 @@
+"""
+Completeness Index - bitset-backed data completeness for councils.
+
+Holds one bitset per (council, year) over field ids: bit ``n`` is set when
+field ``n`` has a ``FinancialFigure`` for that council and year. Yearless
+``CouncilCharacteristic`` rows live in the bitset keyed by year ``None``.
+
+Completion for a council, council type, field, year or the whole site is a
+sum of popcounts of ``bits & field_mask`` over the relevant keys, so the
+homepage, the council completion API and the contribute statistics no longer
+recount characteristics and figures with ``.count()`` queries.
+
+Features:
+- Persisted per row in ``CompletenessBitset`` so it survives restarts
+- Kept in sync by save/delete signals (``signals.completeness_signals``)
+- A version stamp in the shared cache lets other processes pick up changed
+  rows without reloading the whole index
+- Built by ``manage.py rebuild_completeness_index`` (``--if-missing`` at
+  startup), never on a request; until the rows exist, queries are answered
+  with counts over the data tables
+"""
+
+import logging
+import threading
+from datetime import timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = "completeness_index_version"
+REBUILD_CACHE_KEY = "completeness_index_rebuilt"
+
+# Rows are stamped when saved but may commit later; re-read a little history
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+IndexKey = Tuple[int, Optional[int]]
+
+# Category groupings used by the completion views
+FINANCIAL_CATEGORIES = ("balance_sheet", "income", "spending")
+
+
+def field_mask(field_ids: Iterable[int]) -> int:
+    """Bitset with a bit set for each field id."""
+    mask = 0
+    for field_id in field_ids:
+        mask |= 1 << field_id
+    return mask
+
+
+def completion_stats(complete: int, total: int) -> Dict[str, int]:
+    """``total``/``complete``/``percentage`` dictionary used by the views."""
+    return {
+        "total": total,
+        "complete": complete,
+        "percentage": round(complete / total * 100) if total > 0 else 0,
+    }
+
+
+class CompletenessIndex:
+    """
+    In-memory completeness bitsets backed by ``CompletenessBitset`` rows.
+
+    Reads never query the data tables: they compare the cached version
+    stamp with the one this process loaded and, when another process has
+    changed something, fetch only the rows updated since the last load.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._bits: Dict[IndexKey, int] = {}
+        self._council_types: Dict[int, Optional[int]] = {}
+        self._field_categories: Dict[int, str] = {}
+        self._year_ids: list = []
+        self._loaded_at = None
+        self._version = None
+        self._rebuilt = None
+        self._built = False
+
+    # ------------------------------------------------------------------
+    # Loading and persistence
+    # ------------------------------------------------------------------
+
+    def load(self) -> None:
+        """
+        Load every persisted bitset. When none exist yet the index stays
+        unbuilt and queries count the data tables until it is rebuilt.
+        """
+        from council_finance.models import CompletenessBitset
+
+        with self._lock:
+            loaded_at = timezone.now()
+            rows = CompletenessBitset.objects.values_list("council_id", "year_id", "bits")
+            bits = {(council_id, year_id): CompletenessBitset.unpack(data) for council_id, year_id, data in rows}
+            if not bits and self._loaded_at is None:
+                logger.warning("Completeness index has not been built; run rebuild_completeness_index")
+            self._built = bool(bits)
+            self._bits = bits
+            self._load_dimensions()
+            self._loaded_at = loaded_at
+            self._version = cache.get(VERSION_CACHE_KEY)
+            self._rebuilt = cache.get(REBUILD_CACHE_KEY)
+
+    def rebuild(self) -> int:
+        """
+        Recompute every bitset from the figures and characteristics and
+        replace the persisted rows.
+
+        Returns:
+            Number of (council, year) bitsets stored
+        """
+        from council_finance.models import CompletenessBitset, CouncilCharacteristic, FinancialFigure
+
+        with self._lock:
+            loaded_at = timezone.now()
+            bits: Dict[IndexKey, int] = {}
+            for council_id, field_id, year_id in FinancialFigure.objects.values_list("council_id", "field_id", "year_id"):
+                bits[(council_id, year_id)] = bits.get((council_id, year_id), 0) | (1 << field_id)
+            for council_id, field_id in CouncilCharacteristic.objects.values_list("council_id", "field_id"):
+                bits[(council_id, None)] = bits.get((council_id, None), 0) | (1 << field_id)
+
+            with transaction.atomic():
+                CompletenessBitset.objects.all().delete()
+                CompletenessBitset.objects.bulk_create(
+                    [
+                        CompletenessBitset(council_id=council_id, year_id=year_id, bits=CompletenessBitset.pack(value))
+                        for (council_id, year_id), value in bits.items()
+                    ],
+                    batch_size=1000,
+                )
+
+            self._bits = bits
+            self._built = True
+            self._load_dimensions()
+            self._loaded_at = loaded_at
+            self._rebuilt = loaded_at.isoformat()
+            cache.set(REBUILD_CACHE_KEY, self._rebuilt, None)
+            self._version = self._bump_version()
+
+            logger.info(f"Rebuilt completeness index with {len(bits)} bitsets")
+            return len(bits)
+
+    def refresh(self) -> None:
+        """Pick up rows changed by other processes since the last load."""
+        from council_finance.models import CompletenessBitset
+
+        with self._lock:
+            if not self._built or cache.get(REBUILD_CACHE_KEY) != self._rebuilt:
+                self.load()
+                return
+
+            version = cache.get(VERSION_CACHE_KEY)
+            refreshed_at = timezone.now()
+            rows = CompletenessBitset.objects.filter(updated_at__gte=self._loaded_at - REFRESH_OVERLAP).values_list(
+                "council_id", "year_id", "bits"
+            )
+            for council_id, year_id, data in rows:
+                self._bits[(council_id, year_id)] = CompletenessBitset.unpack(data)
+            self._load_dimensions()
+            self._loaded_at = refreshed_at
+            self._version = version
+
+    def ensure_current(self) -> None:
+        from council_finance.models import CompletenessBitset
+
+        if self._loaded_at is None or cache.get(VERSION_CACHE_KEY) != self._version:
+            self.refresh()
+        elif not self._built and CompletenessBitset.objects.exists():
+            # Built since by the management command
+            self.load()
+
+    @property
+    def built(self) -> bool:
+        self.ensure_current()
+        return self._built
+
+    def invalidate(self) -> None:
+        """Signal that councils, fields or years changed in some process."""
+        self._bump_version()
+
+    def _load_dimensions(self) -> None:
+        from council_finance.models import Council, DataField, FinancialYear
+
+        self._council_types = dict(Council.objects.values_list("id", "council_type_id"))
+        self._field_categories = dict(DataField.objects.values_list("id", "category"))
+        self._year_ids = list(FinancialYear.objects.values_list("id", flat=True))
+
+    @staticmethod
+    def _bump_version():
+        try:
+            return cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, 1, None)
+            return 1
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def mark(self, council_id: int, field_id: int, year_id: Optional[int], present: bool) -> None:
+        """Set or clear one field bit and persist the changed bitset."""
+        if present:
+            self.mark_many(council_id, year_id, present=[field_id])
+        else:
+            self.mark_many(council_id, year_id, absent=[field_id])
+
+    def mark_many(self, council_id: int, year_id: Optional[int],
+                  present: Iterable[int] = (), absent: Iterable[int] = ()) -> None:
+        """Set and clear several field bits of one bitset in a single write."""
+        from council_finance.models import CompletenessBitset
+
+        set_mask = field_mask(present)
+        clear_mask = field_mask(absent)
+
+        with self._lock:
+            self.ensure_current()
+            if not self._built:
+                return  # The build reads the data tables
+            with transaction.atomic():
+                # Lock the row so concurrent writers never drop each other's bits
+                row, _ = CompletenessBitset.objects.select_for_update().get_or_create(
+                    council_id=council_id, year_id=year_id
+                )
+                bits = CompletenessBitset.unpack(row.bits)
+                updated = (bits | set_mask) & ~clear_mask
+                if updated != bits:
+                    row.bits = CompletenessBitset.pack(updated)
+                    row.save(update_fields=["bits", "updated_at"])
+            self._bits[(council_id, year_id)] = updated
+
+            if updated != bits:
+                self._catch_up(self._bump_version())
+
+    def merge(self, bits: Dict[IndexKey, int]) -> None:
+        """
+        Set the given bits on many bitsets at once, for bulk imports that
+        skip the per-row signals. Two queries per call plus the writes.
+        """
+        from council_finance.models import CompletenessBitset
+
+        bits = {key: value for key, value in bits.items() if value}
+        if not bits:
+            return
+
+        with self._lock:
+            self.ensure_current()
+            if not self._built:
+                return  # The build reads the data tables
+            with transaction.atomic():
+                rows = {
+                    (row.council_id, row.year_id): row
+                    for row in CompletenessBitset.objects.select_for_update().filter(
+                        council_id__in={council_id for council_id, _ in bits}
+                    )
+                }
+                to_update = []
+                to_create = []
+                for key, value in bits.items():
+                    row = rows.get(key)
+                    if row is None:
+                        to_create.append(CompletenessBitset(
+                            council_id=key[0], year_id=key[1], bits=CompletenessBitset.pack(value)
+                        ))
+                        self._bits[key] = value
+                        continue
+                    updated = CompletenessBitset.unpack(row.bits) | value
+                    row.bits = CompletenessBitset.pack(updated)
+                    to_update.append(row)
+                    self._bits[key] = updated
+                CompletenessBitset.objects.bulk_create(to_create, batch_size=1000)
+                # bulk_update skips auto_now, so stamp the rows for refresh()
+                now = timezone.now()
+                for row in to_update:
+                    row.updated_at = now
+                CompletenessBitset.objects.bulk_update(to_update, ["bits", "updated_at"], batch_size=1000)
+
+            self._catch_up(self._bump_version())
+
+    def _catch_up(self, version) -> None:
+        if self._version is not None and version == self._version + 1:
+            # Nothing else changed since this process last caught up
+            self._version = version
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def bits(self, council_id: int, year_id: Optional[int] = None) -> int:
+        self.ensure_current()
+        if not self._built:
+            rows = self._characteristics(None, [council_id]) if year_id is None else self._figures(None, [council_id], [year_id])
+            return field_mask(rows.values_list("field_id", flat=True))
+        return self._bits.get((council_id, year_id), 0)
+
+    def category_mask(self, categories: Iterable[str], exclude: bool = False) -> int:
+        """Mask of the fields in (or, with ``exclude``, outside) ``categories``."""
+        self.ensure_current()
+        categories = set(categories)
+        return field_mask(
+            field_id for field_id, category in self._field_categories.items()
+            if (category in categories) != exclude
+        )
+
+    def council_ids(self, council_type_id=None) -> list:
+        """All councils, or only those of ``council_type_id`` when given."""
+        self.ensure_current()
+        if council_type_id is None:
+            return list(self._council_types)
+        return [council_id for council_id, type_id in self._council_types.items() if type_id == council_type_id]
+
+    def year_ids(self) -> list:
+        self.ensure_current()
+        return list(self._year_ids)
+
+    def count(self, mask: int, council_ids: Optional[Iterable[int]] = None,
+              year_ids: Optional[Iterable[Optional[int]]] = None) -> int:
+        """
+        Number of populated cells under ``mask`` for the given councils and
+        years (every stored bitset when omitted).
+        """
+        self.ensure_current()
+        if not self._built:
+            return self._count_rows(mask, council_ids, year_ids)
+        if council_ids is not None and year_ids is not None:
+            return sum(
+                (self._bits.get((council_id, year_id), 0) & mask).bit_count()
+                for council_id in council_ids
+                for year_id in year_ids
+            )
+        council_filter = set(council_ids) if council_ids is not None else None
+        year_filter = set(year_ids) if year_ids is not None else None
+        return sum(
+            (bits & mask).bit_count()
+            for (council_id, year_id), bits in self._bits.items()
+            if (council_filter is None or council_id in council_filter)
+            and (year_filter is None or year_id in year_filter)
+        )
+
+    def completion(self, mask: int, council_ids: Iterable[int],
+                   year_ids: Iterable[Optional[int]]) -> Dict[str, int]:
+        """Completion of ``mask`` across every council × year combination."""
+        council_ids = list(council_ids)
+        year_ids = list(year_ids)
+        total = mask.bit_count() * len(council_ids) * len(year_ids)
+        return completion_stats(self.count(mask, council_ids, year_ids), total)
+
+    def council_completion(self, council_id: int, mask: int, year_id: Optional[int] = None) -> Dict[str, int]:
+        return self.completion(mask, [council_id], [year_id])
+
+    def council_type_completion(self, council_type_id: int, mask: int, year_id: Optional[int] = None) -> Dict[str, int]:
+        return self.completion(mask, self.council_ids(council_type_id), [year_id])
+
+    def field_completion(self, field_id: int, year_ids: Optional[Iterable[Optional[int]]] = None) -> Dict[str, int]:
+        if year_ids is None:
+            year_ids = self.year_ids()
+        return self.completion(field_mask([field_id]), self.council_ids(), year_ids)
+
+    def year_completion(self, year_id: int, mask: int) -> Dict[str, int]:
+        return self.completion(mask, self.council_ids(), [year_id])
+
+    def total_populated(self) -> int:
+        """Number of figures plus characteristics across the site."""
+        self.ensure_current()
+        if not self._built:
+            return self._count_rows(None)
+        return sum(bits.bit_count() for bits in self._bits.values())
+
+    def site_completion_percentage(self) -> float:
+        """
+        Populated data points as a percentage of councils × fields × years,
+        the measure shown on the homepage.
+        """
+        self.ensure_current()
+        expected = len(self._council_types) * len(self._field_categories) * len(self._year_ids)
+        return (self.total_populated() / expected * 100) if expected > 0 else 0
+
+    def years_with_data(self) -> Set[int]:
+        self.ensure_current()
+        if not self._built:
+            from council_finance.models import FinancialFigure
+
+            return set(FinancialFigure.objects.values_list("year_id", flat=True).distinct())
+        return {year_id for (_, year_id), bits in self._bits.items() if year_id is not None and bits}
+
+    # ------------------------------------------------------------------
+    # Counts over the data tables, while the index is unbuilt
+    # ------------------------------------------------------------------
+
+    def _figures(self, mask: Optional[int], council_ids: Optional[list], year_ids: Optional[Set[int]]):
+        from council_finance.models import FinancialFigure
+
+        figures = FinancialFigure.objects.all()
+        if year_ids is not None:
+            figures = figures.filter(year_id__in=year_ids)
+        return self._narrow(figures, mask, council_ids)
+
+    def _characteristics(self, mask: Optional[int], council_ids: Optional[list]):
+        from council_finance.models import CouncilCharacteristic
+
+        return self._narrow(CouncilCharacteristic.objects.all(), mask, council_ids)
+
+    @staticmethod
+    def _narrow(queryset, mask: Optional[int], council_ids: Optional[list]):
+        """Rows of the fields in ``mask`` (all when None) for ``council_ids`` (all when None)."""
+        if mask is not None:
+            queryset = queryset.filter(
+                field_id__in=[field_id for field_id in range(mask.bit_length()) if mask >> field_id & 1]
+            )
+        if council_ids is not None:
+            queryset = queryset.filter(council_id__in=council_ids)
+        return queryset
+
+    def _count_rows(self, mask: Optional[int], council_ids: Optional[Iterable[int]] = None,
+                    year_ids: Optional[Iterable[Optional[int]]] = None) -> int:
+        """What ``count`` would return, counted from the figures and characteristics."""
+        council_ids = None if council_ids is None else list(council_ids)
+        year_ids = None if year_ids is None else set(year_ids)
+        total = 0
+        if year_ids is None or year_ids - {None}:
+            figures = self._figures(mask, council_ids, None if year_ids is None else year_ids - {None})
+            total += figures.values("council_id", "field_id", "year_id").distinct().count()
+        if year_ids is None or None in year_ids:
+            characteristics = self._characteristics(mask, council_ids)
+            total += characteristics.values("council_id", "field_id").distinct().count()
+        return total
+
+
+completeness_index = CompletenessIndex()
@@ -0,0 +1,541 @@
+"""
+Council Import Engine - streaming bulk import of councils.
+
+Reads CSV/TXT, JSON and XLSX uploads one record at a time and imports them
+in chunks of ``CHUNK_SIZE`` rows:
+
+1. Rows are validated against lookups loaded once per import (existing
+   council names and slugs, council types, nations, characteristic fields)
+2. Each chunk is written in its own transaction with one ``bulk_create``
+   for the councils and one for their characteristics
+3. Completeness bits and contribution queue issues are updated per chunk
+   rather than through the per-row signals
+4. Progress is stored in the cache under the import id, where the import
+   page polls it
+
+Memory use is bounded by the chunk size rather than the size of the upload.
+"""
+
+import codecs
+import csv
+import io
+import json
+import logging
+import time
+from dataclasses import dataclass, field as dataclass_field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from council_finance.models import Council, CouncilCharacteristic, CouncilNation, CouncilType, DataField
+
+try:
+    import openpyxl
+    XLSX_AVAILABLE = True
+except ImportError:
+    XLSX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('csv', 'txt', 'json', 'xlsx')
+
+CHUNK_SIZE = 1000
+BATCH_SIZE = 500
+
+# Bytes sampled once for encoding and delimiter detection
+SAMPLE_SIZE = 64 * 1024
+JSON_READ_SIZE = 64 * 1024
+
+ENCODINGS = ('utf-8-sig', 'cp1252', 'latin-1')
+DELIMITERS = ('\t', ',', ';', '|')
+
+REQUIRED_COLUMNS = ('name',)
+RECOMMENDED_COLUMNS = ('website', 'council_type', 'nation')
+
+# Handled by the Council model rather than stored as characteristics
+COUNCIL_MODEL_FIELDS = ('council_type', 'council_nation', 'council_name')
+
+# Older import files use these column names for characteristic fields
+LEGACY_COLUMNS = {
+    'council_hq_post_code': 'postcode',
+    'population': 'population',
+    'council_website': 'website',
+}
+
+MAX_REPORTED_ERRORS = 100
+
+PROGRESS_CACHE_KEY = "council_import_progress:{}"
+PROGRESS_CACHE_TIMEOUT = 3600
+
+EMPTY_VALUES = ('', 'nan', 'none', 'null')
+
+
+class CouncilImportError(ValueError):
+    """Raised when an upload cannot be read as council records."""
+
+
+def clean_value(value: Any) -> Optional[str]:
+    """Stripped string form of a cell, or None for blanks and NaN markers."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if text.lower() in EMPTY_VALUES:
+        return None
+    return text
+
+
+def _detect_encoding(sample: bytes) -> str:
+    for encoding in ENCODINGS:
+        try:
+            # Incremental so a character cut off by the sample is not an error
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise CouncilImportError("File encoding error. Please ensure file is saved as UTF-8.")
+
+
+def _detect_delimiter(sample: str) -> str:
+    """The delimiter giving the most non-empty fields in the first data row."""
+    lines = sample.splitlines()[:5]
+    best_delimiter = ','
+    best_field_count = 0
+    for delimiter in DELIMITERS:
+        rows = list(csv.reader(lines, delimiter=delimiter))
+        if not rows:
+            continue
+        first_row = rows[1] if len(rows) > 1 else rows[0]
+        field_count = len([value for value in first_row if value.strip()])
+        if field_count > best_field_count:
+            best_field_count = field_count
+            best_delimiter = delimiter
+    return best_delimiter
+
+
+class RecordReader:
+    """
+    Iterates the records of an uploaded file as dictionaries without
+    loading the file into memory.
+
+    Args:
+        fileobj: Binary file object (an ``UploadedFile`` or an open file)
+        file_name: Original file name, used to pick the format
+    """
+
+    def __init__(self, fileobj, file_name: str):
+        self.file = getattr(fileobj, 'file', fileobj)
+        self.file_name = file_name
+        self.extension = file_name.lower().rsplit('.', 1)[-1] if '.' in file_name else ''
+        if self.extension not in SUPPORTED_EXTENSIONS:
+            raise CouncilImportError(
+                "Unsupported file format. Please use CSV, TXT (tab or comma delimited), Excel (.xlsx), or JSON."
+            )
+        if self.extension == 'xlsx' and not XLSX_AVAILABLE:
+            raise CouncilImportError("Excel files require the openpyxl library. Please use CSV format instead.")
+
+        self.file.seek(0, io.SEEK_END)
+        self.size = self.file.tell()
+        self.file.seek(0)
+
+        self.columns: List[str] = []
+        self.encoding: Optional[str] = None
+        self.delimiter: Optional[str] = None
+        self.total_rows: Optional[int] = None  # Known up front for XLSX only
+        self.rows_read = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.file.seek(0)
+        self.rows_read = 0
+        if self.extension == 'xlsx':
+            records = self._xlsx_records()
+        elif self.extension == 'json':
+            records = self._json_records()
+        else:
+            records = self._csv_records()
+        for record in records:
+            self.rows_read += 1
+            yield record
+
+    def fraction_read(self) -> float:
+        """Approximate share of the file consumed so far, from 0 to 1."""
+        if self.total_rows:
+            return min(self.rows_read / self.total_rows, 1.0)
+        if not self.size:
+            return 1.0
+        try:
+            return min(self.file.tell() / self.size, 1.0)
+        except (OSError, ValueError):
+            return 0.0
+
+    def _text_stream(self):
+        sample = self.file.read(SAMPLE_SIZE)
+        self.file.seek(0)
+        self.encoding = _detect_encoding(sample)
+        return io.TextIOWrapper(self.file, encoding=self.encoding, newline=''), sample
+
+    def _csv_records(self):
+        text, sample = self._text_stream()
+        try:
+            # Sniffed once from the sample rather than per read
+            if self.extension == 'txt':
+                self.delimiter = _detect_delimiter(sample.decode(self.encoding, errors='ignore'))
+            else:
+                self.delimiter = ','
+            reader = csv.reader(text, delimiter=self.delimiter)
+            header = next(reader, None)
+            if not header:
+                return
+            self.columns = [column.strip() for column in header]
+            for values in reader:
+                if any(value.strip() for value in values):
+                    yield dict(zip(self.columns, values))
+        finally:
+            text.detach()  # Leave the upload open for the caller
+
+    def _json_records(self):
+        """Decode the top-level array one object at a time."""
+        text, _ = self._text_stream()
+        decoder = json.JSONDecoder()
+        try:
+            buffer = text.read(JSON_READ_SIZE).lstrip()
+            if not buffer.startswith('['):
+                raise CouncilImportError("JSON file must contain an array of council objects.")
+            position = 1
+            exhausted = False
+            while True:
+                while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                    position += 1
+                if position < len(buffer) and buffer[position] == ']':
+                    return
+                try:
+                    if position >= len(buffer):
+                        raise json.JSONDecodeError("Unexpected end of data", buffer, position)
+                    record, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as e:
+                    if exhausted:
+                        raise CouncilImportError(f"JSON file parsing error: {e}")
+                    # The next object is split across reads; fetch more
+                    chunk = text.read(JSON_READ_SIZE)
+                    exhausted = not chunk
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+                if not isinstance(record, dict):
+                    raise CouncilImportError("JSON file must contain an array of council objects.")
+                if not self.columns:
+                    self.columns = list(record)
+                yield record
+        finally:
+            text.detach()
+
+    def _xlsx_records(self):
+        workbook = openpyxl.load_workbook(self.file, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            self.columns = [str(column).strip() if column is not None else '' for column in header]
+            if sheet.max_row:
+                self.total_rows = max(sheet.max_row - 1, 0)
+            for values in rows:
+                if any(clean_value(value) is not None for value in values):
+                    yield dict(zip(self.columns, values))
+        finally:
+            workbook.close()
+
+
+def preview_records(reader: RecordReader, limit: int = 20):
+    """
+    First ``limit`` records and the total record count of an upload, read
+    in a single streaming pass.
+    """
+    preview = []
+    total = 0
+    for record in reader:
+        if total < limit:
+            preview.append(record)
+        total += 1
+    return preview, total
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a council import."""
+    import_id: str
+    total_rows: int = 0
+    created: int = 0
+    skipped: int = 0
+    error_count: int = 0
+    errors: List[str] = dataclass_field(default_factory=list)
+    council_ids: List[int] = dataclass_field(default_factory=list)
+    characteristics_created: int = 0
+    issues_created: int = 0
+    chunks: int = 0
+    columns: List[str] = dataclass_field(default_factory=list)
+    missing_recommended: List[str] = dataclass_field(default_factory=list)
+    unknown_types: set = dataclass_field(default_factory=set)
+    unknown_nations: set = dataclass_field(default_factory=set)
+    duration: float = 0.0
+
+    def add_error(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+
+class _NamedLookup:
+    """Slug, exact name and unique partial name matching for types and nations."""
+
+    def __init__(self, objects: Iterable):
+        self.objects = list(objects)
+        self.by_slug = {obj.slug: obj for obj in self.objects}
+        self.by_name = {obj.name.lower(): obj for obj in self.objects}
+
+    def get(self, value: str):
+        key = value.lower()
+        match = self.by_slug.get(key) or self.by_name.get(key)
+        if match is not None:
+            return match
+        partial = [obj for obj in self.objects if key in obj.name.lower()]
+        return partial[0] if len(partial) == 1 else None
+
+
+class CouncilImporter:
+    """
+    Import councils from a ``RecordReader`` in chunked transactions.
+
+    Existing councils (matched by name or slug) are skipped, as are repeats
+    within the file. New councils need a website; type and nation are
+    looked up by slug, then name, then a unique partial name match.
+    """
+
+    def __init__(self, import_id: str, chunk_size: int = CHUNK_SIZE, generate_issues: bool = True):
+        self.import_id = import_id
+        self.chunk_size = chunk_size
+        self.generate_issues = generate_issues
+
+    def _load_lookups(self) -> None:
+        self.names = set()
+        self.slugs = set()
+        for name, slug in Council.objects.values_list('name', 'slug'):
+            self.names.add(name)
+            self.slugs.add(slug)
+        self.types = _NamedLookup(CouncilType.objects.all())
+        self.nations = _NamedLookup(CouncilNation.objects.all())
+
+        self.characteristic_columns = []
+        for data_field in DataField.objects.filter(category='characteristic').exclude(slug__in=COUNCIL_MODEL_FIELDS):
+            columns = [data_field.slug, data_field.slug.replace('-', '_'), data_field.name.lower()]
+            if data_field.slug in LEGACY_COLUMNS:
+                columns.append(LEGACY_COLUMNS[data_field.slug])
+            self.characteristic_columns.append((data_field, list(dict.fromkeys(columns))))
+
+    def run(self, reader: RecordReader) -> ImportResult:
+        """
+        Import every record of ``reader``.
+
+        Raises:
+            CouncilImportError: The file cannot be read or lacks the
+                required columns; nothing is written
+        """
+        start_time = time.monotonic()
+        result = ImportResult(import_id=self.import_id)
+        self._load_lookups()
+        self._report(result, reader, 'running')
+
+        chunk = []
+        try:
+            for record in reader:
+                if result.total_rows == 0:
+                    self._check_columns(result, reader, record)
+                result.total_rows += 1
+                chunk.append((result.total_rows, record))
+                if len(chunk) >= self.chunk_size:
+                    self._import_chunk(chunk, result)
+                    chunk = []
+                    self._report(result, reader, 'running')
+            if chunk:
+                self._import_chunk(chunk, result)
+        except CouncilImportError as e:
+            self._report(result, reader, 'failed', str(e))
+            raise
+
+        if result.total_rows == 0:
+            self._report(result, reader, 'failed', "No data found in the uploaded file.")
+            raise CouncilImportError("No data found in the uploaded file.")
+
+        result.duration = time.monotonic() - start_time
+        self._report(result, reader, 'complete')
+        logger.info(
+            f"Council import {self.import_id}: {result.created} created, {result.skipped} skipped, "
+            f"{result.error_count} errors from {result.total_rows} rows in {result.duration:.2f}s"
+        )
+        return result
+
+    def _check_columns(self, result: ImportResult, reader: RecordReader, record: Dict[str, Any]) -> None:
+        result.columns = reader.columns or list(record)
+        missing = [column for column in REQUIRED_COLUMNS if column not in result.columns]
+        if missing:
+            raise CouncilImportError(f"Missing required columns: {', '.join(missing)}")
+        result.missing_recommended = [column for column in RECOMMENDED_COLUMNS if column not in result.columns]
+
+    def _build(self, row_number: int, record: Dict[str, Any], result: ImportResult):
+        """Validate one record, returning ``(council, characteristics)`` or None."""
+        name = clean_value(record.get('name'))
+        if name is None:
+            return None
+        slug = slugify(clean_value(record.get('slug')) or name)
+        if name in self.names or slug in self.slugs:
+            result.skipped += 1
+            return None
+
+        website = clean_value(record.get('website'))
+        if website is None:
+            result.add_error(f"Row {row_number} ({name}): Website is required")
+            return None
+
+        council_type = None
+        type_name = clean_value(record.get('council_type'))
+        if type_name is not None:
+            council_type = self.types.get(type_name)
+            if council_type is None:
+                result.unknown_types.add(type_name)
+
+        council_nation = None
+        nation_name = clean_value(record.get('nation'))
+        if nation_name is not None:
+            council_nation = self.nations.get(nation_name)
+            if council_nation is None:
+                result.unknown_nations.add(nation_name)
+
+        population = None
+        population_text = clean_value(record.get('population'))
+        if population_text is not None:
+            population_text = population_text.replace('.0', '')
+            if population_text.isdigit():
+                population = int(population_text)
+
+        characteristics = {}
+        for data_field, columns in self.characteristic_columns:
+            for column in columns:
+                value = clean_value(record.get(column))
+                if value is not None:
+                    characteristics[data_field] = value
+                    break
+
+        # Later rows with the same name or slug are repeats
+        self.names.add(name)
+        self.slugs.add(slug)
+
+        council = Council(
+            name=name,
+            slug=slug,
+            council_type=council_type,
+            council_nation=council_nation,
+            website=website,
+            latest_population=population,
+            status='active',
+        )
+        return council, characteristics
+
+    def _import_chunk(self, chunk, result: ImportResult) -> None:
+        built = []
+        for row_number, record in chunk:
+            try:
+                entry = self._build(row_number, record, result)
+            except Exception as e:
+                result.add_error(f"Row {row_number}: {e}")
+                continue
+            if entry is not None:
+                built.append(entry)
+        result.chunks += 1
+        if not built:
+            return
+
+        try:
+            councils = self._write_chunk(built)
+        except IntegrityError:
+            # Another process created some of these slugs since the lookups
+            # were loaded; skip those councils and write the rest
+            taken = set(Council.objects.filter(
+                slug__in=[council.slug for council, _ in built]
+            ).values_list('slug', flat=True))
+            result.skipped += sum(1 for council, _ in built if council.slug in taken)
+            built = [(council, values) for council, values in built if council.slug not in taken]
+            councils = self._write_chunk(built)
+
+        result.created += len(councils)
+        result.council_ids.extend(council.id for council in councils)
+        result.characteristics_created += sum(len(values) for _, values in built)
+        self._after_chunk(built, result)
+
+    def _write_chunk(self, built) -> List[Council]:
+        with transaction.atomic():
+            councils = Council.objects.bulk_create([council for council, _ in built], batch_size=BATCH_SIZE)
+            CouncilCharacteristic.objects.bulk_create(
+                [
+                    CouncilCharacteristic(council=council, field=data_field, value=value)
+                    for council, values in built
+                    for data_field, value in values.items()
+                ],
+                batch_size=BATCH_SIZE,
+            )
+        return councils
+
+    def _after_chunk(self, built, result: ImportResult) -> None:
+        """
+        Stand-in for the per-row signals that ``bulk_create`` skips: the
+        councils are new, so only completeness bits and contribution queue
+        issues need updating.
+        """
+        from council_finance.incremental_data_quality import incremental_assess_data_issues
+        from council_finance.services.completeness_index import completeness_index, field_mask
+
+        try:
+            completeness_index.merge({
+                (council.id, None): field_mask(data_field.id for data_field in values)
+                for council, values in built
+            })
+            completeness_index.invalidate()  # New councils
+        except Exception as e:
+            logger.error(f"Error updating completeness index during council import {self.import_id}: {e}")
+
+        if self.generate_issues:
+            try:
+                result.issues_created += incremental_assess_data_issues(
+                    [council.id for council, _ in built]
+                )['created']
+            except Exception as e:
+                logger.error(f"Error generating data issues during council import {self.import_id}: {e}")
+
+    def _report(self, result: ImportResult, reader: RecordReader, status: str, message: str = '') -> None:
+        # Capped below 100 until the last chunk has been written
+        percentage = 100 if status == 'complete' else min(round(reader.fraction_read() * 100), 99)
+        cache.set(
+            progress_cache_key(self.import_id),
+            {
+                'status': status,
+                'message': message,
+                'processed': result.total_rows,
+                'total': reader.total_rows,
+                'created': result.created,
+                'skipped': result.skipped,
+                'errors': result.error_count,
+                'issues_created': result.issues_created,
+                'percentage': percentage,
+            },
+            PROGRESS_CACHE_TIMEOUT,
+        )
+
+
+def progress_cache_key(import_id: str) -> str:
+    return PROGRESS_CACHE_KEY.format(import_id)
+
+
+def get_import_progress(import_id: str) -> Optional[Dict[str, Any]]:
+    """Progress stored by a running or finished import, if any."""
+    return cache.get(progress_cache_key(import_id))
@@ -47,7 +47,7 @@ except ImportError:
 
 # Event Viewer integration
 try:
-    from event_viewer.models import SystemEvent
+    from event_viewer.services.event_sink import record_event
     EVENT_VIEWER_AVAILABLE = True
 except ImportError:
     EVENT_VIEWER_AVAILABLE = False
@@ -67,7 +67,7 @@ def log_cache_event(level, category, title, message, details=None):
         if details:
             event_details.update(details)
         
-        SystemEvent.objects.create(
+        record_event(
             source='counter_cache_service',
             level=level,
             category=category,
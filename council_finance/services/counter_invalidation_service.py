@@ -28,10 +28,13 @@ from council_finance.models import (
     FinancialYear,
     CounterDefinition
 )
+from council_finance.signals.data_change_signals import council_data_changed, is_coalescing
+from council_finance.services.fragment_cache import fragment_cache
 
 # Event Viewer integration
 try:
     from event_viewer.models import SystemEvent
+    from event_viewer.services.event_sink import record_event
     EVENT_VIEWER_AVAILABLE = True
 except ImportError:
     EVENT_VIEWER_AVAILABLE = False
@@ -51,7 +54,7 @@ def log_invalidation_event(level, category, title, message, details=None):
         if details:
             event_details.update(details)
         
-        SystemEvent.objects.create(
+        record_event(
             source='counter_invalidation_service',
             level=level,
             category=category,
@@ -118,6 +121,9 @@ class CounterInvalidationService:
             'session_batched': False
         }
         
+        # Council page fragments are cheap to purge, so never rate limited
+        fragment_cache.purge_council_data(council.slug, year.label if year else None)
+        
         # Session-aware batching for user edit sessions
         if user_session_key and not force:
             session_changes = self._session_changes.get(user_session_key, 0) + 1
@@ -447,6 +453,8 @@ counter_invalidation_service = CounterInvalidationService()
 @receiver(post_save, sender=FinancialFigure)
 def invalidate_on_financial_figure_change(sender, instance, created, **kwargs):
     """Invalidate counter caches when financial figures change"""
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
     # Get user session if available (Django request context)
     session_key = None
     try:
@@ -470,6 +478,8 @@ def invalidate_on_financial_figure_change(sender, instance, created, **kwargs):
 @receiver(post_save, sender=CouncilCharacteristic)
 def invalidate_on_characteristic_change(sender, instance, created, **kwargs):
     """Invalidate counter caches when council characteristics change"""
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
     # Get user session if available
     session_key = None
     try:
@@ -492,6 +502,8 @@ def invalidate_on_characteristic_change(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=FinancialFigure)
 def invalidate_on_financial_figure_delete(sender, instance, **kwargs):
     """Invalidate counter caches when financial figures are deleted"""
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
     counter_invalidation_service.invalidate_counter_results(
         council=instance.council,
         year=instance.year,
@@ -503,9 +515,22 @@ def invalidate_on_financial_figure_delete(sender, instance, **kwargs):
 @receiver(post_delete, sender=CouncilCharacteristic)
 def invalidate_on_characteristic_delete(sender, instance, **kwargs):
     """Invalidate counter caches when council characteristics are deleted"""
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
     counter_invalidation_service.invalidate_counter_results(
         council=instance.council,
         year=None,
         reason="characteristic_deleted",
         force=True  # Deletions should always invalidate
-    )
\ No newline at end of file
+    )
+
+
+@receiver(council_data_changed)
+def invalidate_on_council_data_batch_change(sender, council, year, changes, **kwargs):
+    """Invalidate counter caches once for a coalesced batch of field changes"""
+    counter_invalidation_service.invalidate_counter_results(
+        council=council,
+        year=year,  # None for characteristics, which apply to all years
+        reason=f"bulk_data_changed:{len(changes)}_fields",
+        force=any(change.deleted for change in changes)
+    )
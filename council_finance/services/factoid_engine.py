@@ -11,6 +11,7 @@ from django.db.models import Q, F
 from decimal import Decimal
 import logging
 import asyncio
+import re
 from typing import List, Dict, Any, Optional
 
 from ..models.factoid import (
@@ -25,6 +26,24 @@ from ..models.new_data_model import CouncilCharacteristic, FinancialFigure
 
 logger = logging.getLogger(__name__)
 
+FIELD_PATTERN = re.compile(r'\{([^}]+)\}')
+
+NUMERIC_FORMATS = {
+    'currency': '£{:,.0f}',
+    'percentage': '{:.1f}%',
+    'number': '{:,.0f}',
+    'decimal': '{:.2f}',
+}
+
+# Compiled render plans by template id: (template_text, segments).
+# Dropped by the FactoidTemplate signals when a template changes.
+_render_plans: Dict[int, tuple] = {}
+
+
+def invalidate_render_plan(template_id: int) -> None:
+    """Forget the compiled render plan of a template"""
+    _render_plans.pop(template_id, None)
+
 
 class FactoidEngine:
     """
@@ -48,7 +67,7 @@ class FactoidEngine:
                 return self._get_calculated_value(field_name, council, year, counter)
             
             # Try to get the field definition for database fields
-            data_field = DataField.from_variable_name(field_name)
+            data_field = self._data_field(field_name)
             
             # Handle different field categories
             if data_field.category == 'characteristic':
@@ -69,10 +88,25 @@ class FactoidEngine:
             logger.error(f"Error getting field value for {field_name}: {e}")
             return None
     
+    def _data_field(self, field_name: str) -> DataField:
+        """Field definition for a template variable name"""
+        return DataField.from_variable_name(field_name)
+    
+    def _data_fields(self):
+        """Every field definition, for building context data"""
+        return DataField.objects.all()
+    
+    def _previous_year(self, year: FinancialYear) -> Optional[FinancialYear]:
+        from ..year_utils import previous_year_label
+        previous_year_str = previous_year_label(year.label)
+        if previous_year_str:
+            return FinancialYear.objects.filter(label=previous_year_str).first()
+        return None
+    
     def _get_characteristic_value(self, field_name: str, council: Council, year: FinancialYear) -> Any:
         """Get value from council characteristics"""
         try:
-            slug = DataField.from_variable_name(field_name).slug
+            slug = self._data_field(field_name).slug
             characteristic = CouncilCharacteristic.objects.filter(
                 council=council,
                 field__slug=slug
@@ -93,7 +127,7 @@ class FactoidEngine:
     def _get_financial_value(self, field_name: str, council: Council, year: FinancialYear) -> Any:
         """Get value from financial figures"""
         try:
-            slug = DataField.from_variable_name(field_name).slug
+            slug = self._data_field(field_name).slug
             figure = FinancialFigure.objects.filter(
                 council=council,
                 field__slug=slug,
@@ -151,7 +185,7 @@ class FactoidEngine:
     def _get_population(self, council: Council, year: FinancialYear) -> Optional[int]:
         """Get council population for per capita calculations"""
         try:
-            slug = DataField.from_variable_name('population').slug
+            slug = self._data_field('population').slug
             pop_characteristic = CouncilCharacteristic.objects.filter(
                 council=council,
                 field__slug=slug
@@ -170,11 +204,7 @@ class FactoidEngine:
             current_value = self.get_field_value(base_field, council, year)
             
             # Get previous year
-            from ..year_utils import previous_year_label
-            previous_year_str = previous_year_label(year.label)
-            previous_year = None
-            if previous_year_str:
-                previous_year = FinancialYear.objects.filter(label=previous_year_str).first()
+            previous_year = self._previous_year(year)
             
             if not previous_year:
                 return None
@@ -207,27 +237,26 @@ class FactoidEngine:
         """
         Format values according to specified format type
         """
-        if value is None:
-            return "N/A"
+        return self._formatter(format_type)(value)
+    
+    def _formatter(self, format_type: str):
+        """
+        Formatter callable for a format type, bound once per compiled template
+        """
+        pattern = NUMERIC_FORMATS.get(format_type)
         
-        try:
-            if format_type == 'currency':
-                if isinstance(value, (int, float, Decimal)):
-                    return f"£{value:,.0f}"
-            elif format_type == 'percentage':
-                if isinstance(value, (int, float, Decimal)):
-                    return f"{value:.1f}%"
-            elif format_type == 'number':
-                if isinstance(value, (int, float, Decimal)):
-                    return f"{value:,.0f}"
-            elif format_type == 'decimal':
-                if isinstance(value, (int, float, Decimal)):
-                    return f"{value:.2f}"
-            
-            return str(value)
-        except Exception as e:
-            logger.error(f"Error formatting value {value} as {format_type}: {e}")
-            return str(value)
+        def format_field(value):
+            if value is None:
+                return "N/A"
+            try:
+                if pattern is not None and isinstance(value, (int, float, Decimal)):
+                    return pattern.format(value)
+                return str(value)
+            except Exception as e:
+                logger.error(f"Error formatting value {value} as {format_type}: {e}")
+                return str(value)
+        
+        return format_field
     
     def build_context_data(self, council: Council, year: FinancialYear, counter: CounterDefinition = None) -> Dict[str, Any]:
         """
@@ -241,7 +270,7 @@ class FactoidEngine:
         }
         
         # Add all available fields
-        for field in DataField.objects.all():
+        for field in self._data_fields():
             value = self.get_field_value(field.variable_name, council, year, counter)
             if value is not None:
                 context[field.variable_name] = value
@@ -252,17 +281,43 @@ class FactoidEngine:
         """
         Render a factoid template with context data and formatting
         """
-        import re
-        
+        parts = []
+        for segment in self.render_plan(template):
+            if segment.__class__ is str:
+                parts.append(segment)
+            else:
+                field_variable_name, formatter = segment
+                parts.append(formatter(context_data.get(field_variable_name)))
+        return ''.join(parts)
+    
+    def render_plan(self, template: FactoidTemplate) -> tuple:
+        """
+        Compiled plan for a template, cached by template id until the
+        template's text changes
+        """
         template_text = template.template_text
+        cached = _render_plans.get(template.pk)
+        if cached is not None and cached[0] == template_text:
+            return cached[1]
         
-        # Find all {field:format} patterns
-        pattern = r'\{([^}]+)\}'
-        
-        def replace_field(match):
-            field_spec = match.group(1)
+        plan = self.compile_template(template_text)
+        if template.pk is not None:
+            _render_plans[template.pk] = (template_text, plan)
+        return plan
+    
+    def compile_template(self, template_text: str) -> tuple:
+        """
+        Compile template text into literal strings and
+        (context key, formatter) pairs for each {field:format} reference
+        """
+        segments = []
+        position = 0
+        for match in FIELD_PATTERN.finditer(template_text):
+            if match.start() > position:
+                segments.append(template_text[position:match.start()])
             
             # Parse field name and format
+            field_spec = match.group(1)
             if ':' in field_spec:
                 field_name, format_type = field_spec.split(':', 1)
             else:
@@ -270,26 +325,21 @@ class FactoidEngine:
                 format_type = 'default'
             
             # Convert slug format to variable name format for context lookup
-            field_variable_name = field_name.replace('-', '_')
-            
-            # Get value from context
-            value = context_data.get(field_variable_name)
-            
-            # Format and return
-            return self.format_value(value, format_type)
-        
-        # Replace all field references
-        rendered = re.sub(pattern, replace_field, template_text)
-        
-        return rendered
+            segments.append((field_name.replace('-', '_'), self._formatter(format_type)))
+            position = match.end()
+        if position < len(template_text):
+            segments.append(template_text[position:])
+        return tuple(segments)
     
-    def compute_factoid_instance(self, template: FactoidTemplate, council: Council, year: FinancialYear, counter: CounterDefinition = None) -> FactoidInstance:
+    def compute_factoid_instance(self, template: FactoidTemplate, council: Council, year: FinancialYear, counter: CounterDefinition = None, context_data: Dict[str, Any] = None) -> FactoidInstance:
         """
-        Compute a single factoid instance
+        Compute a single factoid instance, reusing ``context_data`` when the
+        caller has already built it for this council and year
         """
         try:
             # Build context data
-            context_data = self.build_context_data(council, year, counter)
+            if context_data is None:
+                context_data = self.build_context_data(council, year, counter)
             
             # Render template
             rendered_text = self.render_template(template, context_data)
@@ -357,16 +407,12 @@ class FactoidEngine:
         """
         Invalidate factoid instances when a field changes
         """
+        from .factoid_invalidation import factoid_invalidator
+        
         try:
-            # Find all templates that depend on this field
-            dependencies = FactoidFieldDependency.objects.filter(field=field)
-            
-            template_ids = [dep.template_id for dep in dependencies]
-            
-            # Mark instances as expired
-            FactoidInstance.objects.filter(
-                template_id__in=template_ids
-            ).update(expires_at=timezone.now())
+            # Expire instances of dependent templates, for every council,
+            # once the transaction commits
+            factoid_invalidator.invalidate(None, None, [field.pk])
             
             logger.info(f"Invalidated factoid instances for field {field.name}")
             
@@ -381,23 +427,44 @@ class FactoidEngine:
             # Clear existing dependencies
             FactoidFieldDependency.objects.filter(template=template).delete()
             
-            # Create new dependencies
+            # Create new dependencies, on the stored fields that calculated
+            # references read as well as on the referenced fields themselves
+            fields = {}
             for field_name in template.referenced_fields:
-                try:
-                    field = DataField.from_variable_name(field_name)
-                    FactoidFieldDependency.objects.create(
-                        template=template,
-                        field=field,
-                        is_critical=True
-                    )
-                except DataField.DoesNotExist:
-                    logger.warning(f"Field {field_name} referenced in template {template.name} does not exist")
+                for source_name in [field_name] + self._source_field_names(field_name):
+                    try:
+                        field = DataField.from_variable_name(source_name)
+                        fields[field.pk] = field
+                    except DataField.DoesNotExist:
+                        if source_name == field_name:
+                            logger.warning(f"Field {field_name} referenced in template {template.name} does not exist")
+            
+            FactoidFieldDependency.objects.bulk_create([
+                FactoidFieldDependency(template=template, field=field, is_critical=True)
+                for field in fields.values()
+            ])
             
             logger.info(f"Updated dependencies for template {template.name}")
             
         except Exception as e:
             logger.error(f"Error updating dependencies for template {template.name}: {e}")
     
+    def _source_field_names(self, field_name: str) -> List[str]:
+        """
+        Stored fields that a calculated reference reads, mirroring
+        ``_get_calculated_value``
+        """
+        if field_name.endswith('_per_capita'):
+            base_field = field_name.replace('_per_capita', '')
+            field_mappings = {
+                'interest_payments': 'interest_paid',
+                'government_grants': 'government_grants_non_strings',
+            }
+            return [field_mappings.get(base_field, base_field), 'population']
+        if field_name.endswith('_change_percent'):
+            return [field_name.replace('_change_percent', '')]
+        return []
+    
     def get_factoids_for_counter(self, counter: CounterDefinition, council: Council, year: FinancialYear) -> List[FactoidInstance]:
         """
         Get all relevant factoids for a specific counter context
@@ -421,20 +488,28 @@ class FactoidEngine:
             # Ensure unique templates (in case a template matches both generic and counter-specific criteria)
             templates = templates.distinct()
             
+            existing = {
+                instance.template_id: instance
+                for instance in FactoidInstance.objects.filter(
+                    template__in=templates,
+                    council=council,
+                    financial_year=year,
+                    counter=counter
+                )
+            }
+            
             instances = []
+            context_data = None
             for template in templates:
                 try:
-                    # Check if instance exists and is valid
-                    instance = FactoidInstance.objects.filter(
-                        template=template,
-                        council=council,
-                        financial_year=year,
-                        counter=counter
-                    ).first()
+                    instance = existing.get(template.id)
                     
                     if not instance or instance.is_expired():
-                        # Compute new instance
-                        instance = self.compute_factoid_instance(template, council, year, counter)
+                        # Missing or invalidated: recompute just this one,
+                        # sharing the context with the council's others
+                        if context_data is None:
+                            context_data = self.build_context_data(council, year, counter)
+                        instance = self.compute_factoid_instance(template, council, year, counter, context_data)
                     
                     if instance and instance.is_significant:
                         instances.append(instance)
@@ -0,0 +1,140 @@
+"""
+Factoid Invalidation - dependency-indexed, per-transaction expiry of factoid instances.
+
+A changed figure only affects instances of templates that depend on its
+field (see ``FactoidFieldDependency``), for the figure's council and year.
+Templates showing a year-on-year change also depend on the previous
+year's figures, so the following year's instances go stale too. A changed
+characteristic has no year, so it affects every year for its council.
+
+Changes are queued and applied once when the surrounding transaction
+commits (immediately outside one). A save of 200 figures in one
+transaction becomes a dependency lookup and one ``UPDATE`` per group of
+councils with the same templates and year, rather than an update per
+figure. Instances are only marked expired; they are recomputed when
+they are next requested (``FactoidEngine.get_factoids_for_counter``).
+
+Usage:
+    factoid_invalidator.invalidate(council, year, [field.pk])
+    factoid_invalidator.invalidate(council, None, [field.pk])  # Characteristics
+    factoid_invalidator.invalidate(None, None, [field.pk])     # Every council
+"""
+
+import logging
+import threading
+from functools import partial
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models.council import Council, FinancialYear
+from ..models.factoid import FactoidFieldDependency, FactoidInstance
+from ..year_utils import previous_year_label
+
+logger = logging.getLogger(__name__)
+
+
+class FactoidInvalidator:
+    """Queues and applies factoid instance expiry; see the module docstring."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def invalidate(self, council: Optional[Council], year: Optional[FinancialYear], field_ids: Iterable[int]) -> None:
+        """
+        Expire instances for ``council`` (None: every council) and ``year``
+        (None: every year) of templates depending on ``field_ids``, once
+        the current transaction commits.
+        """
+        field_ids = {field_id for field_id in field_ids if field_id is not None}
+        if not field_ids:
+            return
+        key = (council.pk if council else None, year.pk if year else None)
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            self._apply({key: field_ids})  # Autocommit: nothing to wait for
+            return
+        # Commit, rollback and savepoint rollback all replace the connection's
+        # callback list. A different list means the queued flush has run or
+        # may have been discarded, so queue a fresh one; a surviving callback
+        # still applies what it holds.
+        if getattr(self._local, 'queue', None) is not connection.run_on_commit:
+            self._local.pending = pending = {}
+            transaction.on_commit(partial(self._apply, pending))
+            self._local.queue = connection.run_on_commit
+        self._local.pending.setdefault(key, set()).update(field_ids)
+
+    def flush(self) -> int:
+        """Apply queued invalidations now. Returns the number of instances expired."""
+        return self._apply(getattr(self._local, 'pending', None) or {})
+
+    def _apply(self, pending: Dict[Tuple[Optional[int], Optional[int]], Set[int]]) -> int:
+        if pending is getattr(self._local, 'pending', None):
+            self._local.pending = self._local.queue = None
+        pending, queued = dict(pending), pending
+        queued.clear()  # A queued callback sharing it has nothing left to do
+        if not pending:
+            return 0
+
+        field_ids = set().union(*pending.values())
+        templates_by_field: Dict[int, Set[int]] = {}
+        spanning = set()  # Templates that also read the previous year
+        for field_id, template_id, referenced_fields in FactoidFieldDependency.objects.filter(
+            field_id__in=field_ids
+        ).values_list('field_id', 'template_id', 'template__referenced_fields'):
+            templates_by_field.setdefault(field_id, set()).add(template_id)
+            if any(name.endswith('_change_percent') for name in referenced_fields or ()):
+                spanning.add(template_id)
+
+        # (year_id, template ids) -> council ids, so councils changed in the
+        # same way share one condition
+        targets: Dict[Tuple[Optional[int], frozenset], Set[Optional[int]]] = {}
+        following = self._following_years({year_id for _, year_id in pending}) if spanning else {}
+        for (council_id, year_id), fields in pending.items():
+            template_ids = set().union(*(templates_by_field.get(field_id, ()) for field_id in fields))
+            if not template_ids:
+                continue
+            targets.setdefault((year_id, frozenset(template_ids)), set()).add(council_id)
+            next_year_id = following.get(year_id)
+            if next_year_id and template_ids & spanning:
+                targets.setdefault((next_year_id, frozenset(template_ids & spanning)), set()).add(council_id)
+
+        if not targets:
+            return 0
+
+        condition = Q()
+        for (year_id, template_ids), council_ids in targets.items():
+            scope = Q(template_id__in=template_ids)
+            if year_id is not None:
+                scope &= Q(financial_year_id=year_id)
+            if None not in council_ids:
+                scope &= Q(council_id__in=council_ids)
+            condition |= scope
+
+        now = timezone.now()
+        count = FactoidInstance.objects.filter(condition).filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+        ).update(expires_at=now)
+        if count:
+            logger.info(f"Invalidated {count} factoid instances for {len(field_ids)} changed fields")
+        return count
+
+    def _following_years(self, year_ids) -> Dict[int, int]:
+        """Map each year id to the id of the year after it, where there is one."""
+        year_ids = {year_id for year_id in year_ids if year_id is not None}
+        if not year_ids:
+            return {}
+        labels = dict(FinancialYear.objects.values_list('id', 'label'))
+        ids_by_label = {label: year_id for year_id, label in labels.items()}
+        following = {}
+        for year_id, label in labels.items():
+            previous_id = ids_by_label.get(previous_year_label(label))
+            if previous_id in year_ids:
+                following[previous_id] = year_id
+        return following
+
+
+# Global invalidator instance
+factoid_invalidator = FactoidInvalidator()
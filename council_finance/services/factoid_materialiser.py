@@ -0,0 +1,257 @@
+"""
+Factoid Materialiser - batch computation of factoid instances.
+
+``FactoidEngine.compute_factoid_instance`` builds the context for one
+council with a query per field and writes one instance at a time, which
+is fine for a single page view but not for filling the table. The
+materialiser computes instances for every active template (and each
+counter it is assigned to) across councils for a year:
+
+- characteristics and the year's and previous year's figures are loaded
+  for a chunk of councils in two queries
+- each council's context is built once, in memory, and shared by all of
+  its templates
+- instances are written per chunk: known rows with ``bulk_update``, new
+  ones with an upsert on the unique key, so a row the lazy path created
+  meanwhile is updated instead of failing the chunk
+
+With ``expired_only`` it recomputes only missing and expired instances
+(``materialise_factoids --expired``). Instances invalidated by data
+changes are otherwise recomputed lazily when they are next requested, so
+bulk runs are for filling the table after imports and template changes.
+
+Usage:
+    stats = factoid_materialiser.materialise(year)
+    stats = factoid_materialiser.materialise(year, councils=[council], expired_only=True)
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from ..models.council import Council, FinancialYear
+from ..models.factoid import FactoidInstance, FactoidTemplate
+from ..models.field import DataField
+from ..models.new_data_model import CouncilCharacteristic, FinancialFigure
+from ..year_utils import previous_year_label
+from .factoid_engine import FactoidEngine
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class PreloadedFactoidEngine(FactoidEngine):
+    """``FactoidEngine`` reading field values from data loaded up front."""
+
+    def __init__(self, fields, characteristics, figures, previous_years):
+        super().__init__()
+        self.fields = list(fields)
+        self.fields_by_slug = {field.slug: field for field in self.fields}
+        self.characteristics = characteristics  # {council_id: {slug: value}}
+        self.figures = figures  # {(council_id, year_id): {slug: value}}
+        self.previous_years = previous_years  # {year_id: FinancialYear or None}
+
+    def _data_field(self, field_name):
+        slug = field_name.split('.')[-1].replace('_', '-')
+        try:
+            return self.fields_by_slug[slug]
+        except KeyError:
+            raise DataField.DoesNotExist(f"DataField with variable name '{field_name}' does not exist.")
+
+    def _data_fields(self):
+        return self.fields
+
+    def _previous_year(self, year):
+        return self.previous_years.get(year.id)
+
+    def _get_characteristic_value(self, field_name, council, year):
+        try:
+            value = self.characteristics.get(council.id, {}).get(self._data_field(field_name).slug, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            # Fallback to council direct attributes
+            if hasattr(council, field_name):
+                return getattr(council, field_name)
+
+            return None
+        except Exception as e:
+            logger.error(f"Error getting characteristic {field_name}: {e}")
+            return None
+
+    def _get_financial_value(self, field_name, council, year):
+        try:
+            return self.figures.get((council.id, year.id), {}).get(self._data_field(field_name).slug)
+        except Exception as e:
+            logger.error(f"Error getting financial figure {field_name}: {e}")
+            return None
+
+    def _get_population(self, council, year):
+        try:
+            value = self.characteristics.get(council.id, {}).get(self._data_field('population').slug)
+            return int(value) if value else None
+        except (ValueError, TypeError):
+            return None
+
+
+class FactoidMaterialiser:
+    """Computes factoid instances in bulk; see the module docstring."""
+
+    UPDATE_FIELDS = ['rendered_text', 'computed_data', 'relevance_score', 'is_significant',
+                     'computed_at', 'expires_at']
+    UNIQUE_FIELDS = ['template', 'council', 'financial_year', 'counter']
+
+    def __init__(self, council_batch_size=100, write_batch_size=500, lifetime=timedelta(hours=24)):
+        self.council_batch_size = council_batch_size
+        self.write_batch_size = write_batch_size
+        self.lifetime = lifetime
+
+    def materialise(self, year: FinancialYear, councils: Optional[Iterable[Council]] = None,
+                    templates: Optional[Iterable[FactoidTemplate]] = None,
+                    expired_only: bool = False) -> Dict[str, int]:
+        """
+        Compute instances of ``templates`` (default: every active template)
+        for ``councils`` (default: all) in ``year``. Returns counts of
+        councils processed and instances created, updated and skipped.
+        """
+        now = timezone.now()
+        if templates is None:
+            templates = FactoidTemplate.objects.filter(is_active=True)
+        templates = list(templates)
+        prefetch_related_objects(templates, 'counters', 'council_types')
+        targets = [
+            (template, list(template.counters.all()) or [None],
+             {council_type.id for council_type in template.council_types.all()})
+            for template in templates
+        ]
+
+        if councils is None:
+            councils = Council.objects.select_related('council_type').order_by('pk')
+        councils = list(councils)
+
+        fields = list(DataField.objects.all())
+        previous_label = previous_year_label(year.label)
+        previous_year = FinancialYear.objects.filter(label=previous_label).first() if previous_label else None
+        year_ids = [year.id] + ([previous_year.id] if previous_year else [])
+
+        stats = {'councils': 0, 'created': 0, 'updated': 0, 'skipped': 0}
+        for start in range(0, len(councils), self.council_batch_size):
+            chunk = councils[start:start + self.council_batch_size]
+            engine = PreloadedFactoidEngine(
+                fields,
+                self._load_characteristics(chunk),
+                self._load_figures(chunk, year_ids),
+                {year.id: previous_year},
+            )
+            self._materialise_chunk(engine, chunk, year, targets, expired_only, now, stats)
+            stats['councils'] += len(chunk)
+
+        logger.info(
+            f"Materialised factoids for {year.label}: {stats['created']} created, "
+            f"{stats['updated']} updated, {stats['skipped']} fresh across {stats['councils']} councils"
+        )
+        return stats
+
+    def refresh_expired(self) -> Dict[str, int]:
+        """Recompute expired instances for every year and council that has any."""
+        pending = {}
+        for year_id, council_id in FactoidInstance.objects.filter(
+            expires_at__lt=timezone.now()
+        ).values_list('financial_year_id', 'council_id').distinct():
+            pending.setdefault(year_id, set()).add(council_id)
+
+        stats = {'councils': 0, 'created': 0, 'updated': 0, 'skipped': 0}
+        for year in FinancialYear.objects.filter(id__in=pending):
+            councils = Council.objects.filter(id__in=pending[year.id]).select_related('council_type').order_by('pk')
+            for key, count in self.materialise(year, councils=councils, expired_only=True).items():
+                stats[key] += count
+        return stats
+
+    def _load_characteristics(self, councils):
+        characteristics = {}
+        rows = CouncilCharacteristic.objects.filter(council__in=councils).values_list(
+            'council_id', 'field__slug', 'value'
+        )
+        for council_id, slug, value in rows:
+            characteristics.setdefault(council_id, {})[slug] = value
+        return characteristics
+
+    def _load_figures(self, councils, year_ids):
+        figures = {}
+        rows = FinancialFigure.objects.filter(council__in=councils, year_id__in=year_ids).values_list(
+            'council_id', 'year_id', 'field__slug', 'value'
+        )
+        for council_id, year_id, slug, value in rows:
+            figures.setdefault((council_id, year_id), {})[slug] = value
+        return figures
+
+    def _materialise_chunk(self, engine, councils, year, targets, expired_only, now, stats):
+        existing = {
+            (template_id, council_id, counter_id): (pk, expires_at)
+            for pk, template_id, council_id, counter_id, expires_at in FactoidInstance.objects.filter(
+                council__in=councils, financial_year=year
+            ).values_list('pk', 'template_id', 'council_id', 'counter_id', 'expires_at')
+        }
+        expires_at = now + self.lifetime
+
+        to_create, to_update = [], []
+        for council in councils:
+            context = json_safe_context = None
+            for template, counters, council_type_ids in targets:
+                if council_type_ids and council.council_type_id not in council_type_ids:
+                    continue
+                for counter in counters:
+                    key = (template.id, council.id, counter.id if counter else None)
+                    current = existing.get(key)
+                    if expired_only and current and not (current[1] and current[1] < now):
+                        stats['skipped'] += 1
+                        continue
+
+                    if context is None:
+                        # Counters don't change the context, so one per council
+                        context = engine.build_context_data(council, year)
+                        json_safe_context = engine._make_json_safe(context)
+                    relevance_score = engine._calculate_relevance_score(template, context)
+                    instance = FactoidInstance(
+                        pk=current[0] if current else None,
+                        template=template,
+                        council=council,
+                        financial_year=year,
+                        counter=counter,
+                        rendered_text=engine.render_template(template, context),
+                        computed_data=json_safe_context,
+                        relevance_score=relevance_score,
+                        is_significant=relevance_score > 0.5,
+                        computed_at=now,
+                        expires_at=expires_at,
+                    )
+                    (to_update if current else to_create).append(instance)
+
+        # Rows without a counter never conflict (NULLs are distinct in the
+        # unique key), so only those with one are upserted
+        upserts = [instance for instance in to_create if instance.counter is not None]
+        inserts = [instance for instance in to_create if instance.counter is None]
+        with transaction.atomic():
+            if to_update:
+                FactoidInstance.objects.bulk_update(to_update, self.UPDATE_FIELDS, batch_size=self.write_batch_size)
+            if upserts:
+                FactoidInstance.objects.bulk_create(
+                    upserts,
+                    batch_size=self.write_batch_size,
+                    update_conflicts=True,
+                    unique_fields=self.UNIQUE_FIELDS,
+                    update_fields=self.UPDATE_FIELDS,
+                )
+            if inserts:
+                FactoidInstance.objects.bulk_create(inserts, batch_size=self.write_batch_size)
+        stats['created'] += len(to_create)
+        stats['updated'] += len(to_update)
+
+
+# Global materialiser instance
+factoid_materialiser = FactoidMaterialiser()
@@ -0,0 +1,387 @@
+"""
+Financial Text Scanner
+
+Builds a match index over extracted PDF text in a single sweep: every
+financial term with its offsets and the page-number markers, plus candidate
+figures parsed on first use. The PDF pipeline previously lowercased the whole document once per
+term, lowercased and tested every line against each keyword, and ran dozens
+of independent regexes over the full text; those consumers now share one
+index.
+
+Terms are matched in one pass with an Aho-Corasick automaton
+(``pyahocorasick``, listed in requirements). Installs without it locate each
+term with ``str.find`` over a single lowercased copy of the text.
+
+Classes:
+    FigureMatch: A candidate monetary figure and its position
+    FinancialTextIndex: Term, figure and page-marker offsets for a text
+    FinancialTermScanner: Builds FinancialTextIndex objects for a term set
+"""
+
+import re
+import logging
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Match, Optional, Pattern, Tuple
+
+# Third-party imports
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Terms used to judge extraction quality
+EXTRACTION_TERMS = [
+    '£', 'income', 'expenditure', 'assets', 'liabilities', 'debt',
+    'revenue', 'borrowing', 'reserves', 'balance', 'surplus', 'deficit',
+]
+
+# Keywords marking lines worth sending to AI analysis
+CONTENT_KEYWORDS = [
+    'income', 'expenditure', 'assets', 'liabilities', 'debt', 'revenue',
+    'borrowing', 'reserves', 'balance', 'surplus', 'deficit', 'statement',
+    'accounts', 'financial', '£', 'thousand', 'million',
+]
+
+# Literals the fallback regexes need in order to match, or begin with
+FIGURE_ANCHOR_TERMS = [
+    'income', 'revenue', 'expenditure', 'cost', 'assets', 'liabilities',
+    'debt', 'borrowing', 'interest', 'financing', 'reserves',
+    'total', 'gross', 'net', 'current', 'long', 'entity', 'usable',
+]
+
+# Headings and line items of the primary statements
+STATEMENT_PHRASES = [
+    'balance sheet', 'comprehensive income and expenditure', 'movement in reserves',
+    'cash flow statement', 'net cost of services', 'total reserves', 'usable reserves',
+    'current liabilities', 'current assets', 'long-term liabilities',
+    'long term liabilities', 'total income', 'total expenditure',
+    'interest payable', '£000', '£m',
+]
+
+PAGE_MARKER_TERM = 'page'
+
+DEFAULT_SCAN_TERMS = tuple(sorted(set(
+    EXTRACTION_TERMS + CONTENT_KEYWORDS + FIGURE_ANCHOR_TERMS + STATEMENT_PHRASES + [PAGE_MARKER_TERM]
+)))
+
+# Candidate figures are numbers with thousands separators or decimals; bare
+# integers are too ambiguous (years, note references) to count as figures
+FIGURE_PATTERN = re.compile(r'\d[\d,]*\.\d+|\d+(?:,\d+)+')
+# Units a reported figure may be stated in
+FIGURE_SCALES = (1, 1000, 1000000)
+
+# Page markers, as the per-match page detection recognised them:
+# "Page 42", "p. 42" / "p 42", a number ending a line (a common footer) and
+# a number alone on its line
+STANDALONE_NUMBER_PATTERN = re.compile(r'^[ \t]*(\d{1,3})[ \t\r]*$', re.MULTILINE)
+PAGE_NUMBER_AFTER_TERM = re.compile(r'\s+(\d+)')
+PAGE_ABBREVIATION_PATTERN = re.compile(r'p\.?\s*(\d+)')
+LINE_END_NUMBER_PATTERN = re.compile(r'(\d+)\s*(?:\r?\n|\r)')
+
+# Above this many candidate offsets an anchored search is not worth it
+MAX_ANCHORED_ATTEMPTS = 5000
+
+# Reasonable page numbers for a statement of accounts
+MIN_PAGE_NUMBER = 1
+MAX_PAGE_NUMBER = 200
+
+
+@dataclass
+class FigureMatch:
+    """A candidate monetary figure found in the text."""
+    start: int
+    end: int
+    raw: str
+    value: float
+    negative: bool = False
+
+
+class FinancialTextIndex:
+    """
+    Offsets of financial terms, candidate figures and page markers in a text.
+
+    All offsets refer to the original text. Lookups by position use bisect,
+    so questions like "which terms occur on this line" or "which page marker
+    is nearest this figure" cost O(log n) rather than a rescan.
+    """
+
+    def __init__(self, text: str, text_lower: str, term_offsets: Dict[str, List[int]],
+                 page_markers: List[Tuple[int, int]]):
+        self.text = text
+        self.text_lower = text_lower
+        self.term_offsets = term_offsets
+        self.page_markers = page_markers
+        self.page_marker_offsets = [offset for offset, _ in page_markers]
+        self._line_starts = None
+        self._figures = None
+        self._figure_starts = None
+        self._figures_by_value = None
+
+    # -- Terms -----------------------------------------------------------
+
+    def has_term(self, term: str) -> bool:
+        term = term.lower()
+        if term not in self.term_offsets:
+            return term in self.text_lower
+        return bool(self.term_offsets[term])
+
+    def terms_found(self, terms: Iterable[str]) -> List[str]:
+        """Return the given terms that occur in the text, in the given order."""
+        return [term for term in terms if self.has_term(term)]
+
+    def first_offset(self, terms: Iterable[str]) -> Optional[int]:
+        """Offset of the earliest occurrence of any of the terms."""
+        firsts = []
+        for term in terms:
+            term = term.lower()
+            offsets = self.term_offsets.get(term)
+            if offsets is None:
+                # Not part of the scanned term set; look it up directly
+                position = self.text_lower.find(term)
+                if position != -1:
+                    firsts.append(position)
+            elif offsets:
+                firsts.append(offsets[0])
+        return min(firsts) if firsts else None
+
+    def search_from_terms(self, pattern: Pattern, terms: Iterable[str],
+                          max_attempts: int = MAX_ANCHORED_ATTEMPTS) -> Optional[Match]:
+        """
+        Leftmost match of ``pattern`` in the lowercased text, for a pattern
+        that always begins with one of ``terms``.
+
+        The pattern is only tried at the indexed offsets of those terms, so a
+        pattern that never matches costs a handful of anchored attempts
+        rather than a scan of the whole document. Very common terms fall back
+        to a single search starting at their first occurrence.
+        """
+        offsets = sorted(
+            offset for term in terms for offset in self.term_offsets.get(term.lower(), [])
+        )
+        if not offsets:
+            return None
+        if len(offsets) > max_attempts:
+            return pattern.search(self.text_lower, offsets[0])
+        for offset in offsets:
+            match = pattern.match(self.text_lower, offset)
+            if match:
+                return match
+        return None
+
+    def count_term_in_range(self, term: str, start: int, end: int) -> int:
+        """Number of occurrences of ``term`` starting in ``[start, end)``."""
+        term = term.lower()
+        offsets = self.term_offsets.get(term)
+        if offsets is None:
+            return self.text_lower.count(term, start, max(start, end + len(term) - 1))
+        return bisect_left(offsets, end) - bisect_left(offsets, start)
+
+    # -- Figures ---------------------------------------------------------
+
+    @property
+    def figures(self) -> List[FigureMatch]:
+        """Candidate figures, parsed on first use."""
+        if self._figures is None:
+            self._figures = find_figures(self.text)
+        return self._figures
+
+    @property
+    def figure_starts(self) -> List[int]:
+        if self._figure_starts is None:
+            self._figure_starts = [figure.start for figure in self.figures]
+        return self._figure_starts
+
+    def count_figures_in_range(self, start: int, end: int) -> int:
+        return bisect_left(self.figure_starts, end) - bisect_left(self.figure_starts, start)
+
+    def figure_values(self) -> List[float]:
+        return [figure.value for figure in self.figures]
+
+    def find_figure_for_value(self, value: float) -> Optional[FigureMatch]:
+        """
+        First figure that equals ``value`` when read as pounds, thousands or
+        millions (statements usually report in £000 or £m).
+        """
+        if self._figures_by_value is None:
+            figures_by_value: Dict[int, FigureMatch] = {}
+            for figure in self.figures:
+                for scale in FIGURE_SCALES:
+                    figures_by_value.setdefault(round(figure.value * scale), figure)
+            self._figures_by_value = figures_by_value
+        return self._figures_by_value.get(round(value))
+
+    # -- Lines -----------------------------------------------------------
+
+    @property
+    def line_starts(self) -> List[int]:
+        if self._line_starts is None:
+            self._line_starts = [0] + [match.end() for match in re.finditer('\n', self.text)]
+        return self._line_starts
+
+    def line_number_at(self, offset: int) -> int:
+        """Zero-based number of the line containing ``offset``."""
+        return bisect_right(self.line_starts, offset) - 1
+
+    def line_start(self, line_number: int) -> int:
+        return self.line_starts[max(0, line_number)]
+
+    def line_text(self, line_number: int) -> str:
+        starts = self.line_starts
+        end = starts[line_number + 1] - 1 if line_number + 1 < len(starts) else len(self.text)
+        return self.text[starts[line_number]:end]
+
+    def lines_containing(self, terms: Iterable[str]) -> List[int]:
+        """Sorted numbers of the lines containing any of the terms."""
+        offsets = sorted(
+            offset for term in terms for offset in self.term_offsets.get(term.lower(), [])
+        )
+        starts = self.line_starts
+        line_numbers = []
+        position = 0
+        while position < len(offsets):
+            line_number = self.line_number_at(offsets[position])
+            line_numbers.append(line_number)
+            if line_number + 1 >= len(starts):
+                break
+            # Skip the remaining matches on this line
+            position = bisect_left(offsets, starts[line_number + 1], position)
+        return line_numbers
+
+    # -- Pages -----------------------------------------------------------
+
+    def nearest_page_marker(self, offset: int, window: int = 1000) -> Optional[int]:
+        """Page number of the marker closest to ``offset`` within ``window`` characters."""
+        if not self.page_markers:
+            return None
+
+        index = bisect_left(self.page_marker_offsets, offset)
+        best_page = None
+        best_distance = window + 1
+        for candidate in (index - 1, index):
+            if 0 <= candidate < len(self.page_markers):
+                marker_offset, page_number = self.page_markers[candidate]
+                distance = abs(marker_offset - offset)
+                if distance < best_distance:
+                    best_distance = distance
+                    best_page = page_number
+        return best_page
+
+
+class FinancialTermScanner:
+    """
+    Builds a FinancialTextIndex for a fixed set of terms.
+
+    Usage:
+        index = get_scanner().scan(text)
+        index.terms_found(['income', 'debt'])
+    """
+
+    def __init__(self, terms: Iterable[str] = DEFAULT_SCAN_TERMS):
+        self.terms = tuple(sorted({term.lower() for term in terms if term}))
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for term in self.terms:
+                automaton.add_word(term, term)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def scan(self, text: str) -> FinancialTextIndex:
+        """Index every term, figure and page marker in ``text``."""
+        text = text or ''
+        text_lower = text.lower()
+        # Lowercasing can change the length of some non-ASCII text; offsets
+        # must line up with the original so fall back to a casefold-free scan
+        if len(text_lower) != len(text):
+            text_lower = ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+        term_offsets = self._find_terms(text_lower)
+        page_markers = self._find_page_footers(text)
+        page_markers.extend(self._find_page_headings(text_lower, term_offsets.get(PAGE_MARKER_TERM, [])))
+        page_markers.extend(self._find_pattern_markers(PAGE_ABBREVIATION_PATTERN, text_lower))
+        page_markers.extend(self._find_pattern_markers(LINE_END_NUMBER_PATTERN, text))
+        page_markers = sorted(set(page_markers))
+
+        return FinancialTextIndex(text, text_lower, term_offsets, page_markers)
+
+    def _find_terms(self, text_lower: str) -> Dict[str, List[int]]:
+        term_offsets: Dict[str, List[int]] = {term: [] for term in self.terms}
+
+        if self._automaton is not None:
+            for end_index, term in self._automaton.iter(text_lower):
+                term_offsets[term].append(end_index - len(term) + 1)
+            return term_offsets
+
+        for term in self.terms:
+            offsets = term_offsets[term]
+            find = text_lower.find
+            position = find(term)
+            while position != -1:
+                offsets.append(position)
+                position = find(term, position + 1)
+        return term_offsets
+
+    @staticmethod
+    def _find_page_footers(text: str) -> List[Tuple[int, int]]:
+        """Page markers written as a number alone on its line."""
+        markers = []
+        for match in STANDALONE_NUMBER_PATTERN.finditer(text):
+            page_number = int(match.group(1))
+            if MIN_PAGE_NUMBER <= page_number <= MAX_PAGE_NUMBER:
+                markers.append((match.start(1), page_number))
+        return markers
+
+    @staticmethod
+    def _find_pattern_markers(pattern: Pattern, text: str) -> List[Tuple[int, int]]:
+        """Page markers for the looser "p 42" and end-of-line number forms."""
+        markers = []
+        for match in pattern.finditer(text):
+            page_number = int(match.group(1))
+            if MIN_PAGE_NUMBER <= page_number <= MAX_PAGE_NUMBER:
+                markers.append((match.start(), page_number))
+        return markers
+
+    @staticmethod
+    def _find_page_headings(text_lower: str, page_offsets: List[int]) -> List[Tuple[int, int]]:
+        """Page markers written out as "Page 42"."""
+        markers = []
+        for offset in page_offsets:
+            match = PAGE_NUMBER_AFTER_TERM.match(text_lower, offset + len(PAGE_MARKER_TERM))
+            if match:
+                page_number = int(match.group(1))
+                if MIN_PAGE_NUMBER <= page_number <= MAX_PAGE_NUMBER:
+                    markers.append((offset, page_number))
+        return markers
+
+
+def find_figures(text: str) -> List[FigureMatch]:
+    """Every grouped or decimal number in ``text``, in order."""
+    figures = []
+    text_length = len(text)
+    for match in FIGURE_PATTERN.finditer(text):
+        start, end = match.span()
+        raw = match.group(0)
+        try:
+            value = float(raw.replace(',', ''))
+        except ValueError:
+            continue
+        negative = start > 0 and text[start - 1] == '(' and end < text_length and text[end] == ')'
+        figures.append(FigureMatch(start=start, end=end, raw=raw, value=value, negative=negative))
+    return figures
+
+
+@lru_cache(maxsize=8)
+def get_scanner(terms: Tuple[str, ...] = DEFAULT_SCAN_TERMS) -> FinancialTermScanner:
+    """Return a shared scanner for a term set (automata are built once)."""
+    return FinancialTermScanner(terms)
+
+
+def scan_financial_text(text: str) -> FinancialTextIndex:
+    """Index ``text`` with the default financial term set."""
+    return get_scanner().scan(text)
@@ -15,11 +15,20 @@ from ..models import (
     Flag, FlaggedContent, UserModerationRecord, FlagComment,
     Contribution, Council, DataField
 )
+from .rate_limiter import SlidingWindowRateLimiter
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Flags per user per day; see FlaggingService.daily_flag_limit
+flag_rate_limiter = SlidingWindowRateLimiter(
+    'flags', limit=10, window_seconds=86400,
+    fallback_count=lambda user_id, since: Flag.objects.filter(
+        flagged_by_id=user_id, created_at__gte=since
+    ).count(),
+)
+
 
 class FlaggingService:
     """Service for managing the flagging system."""
@@ -57,8 +66,10 @@ class FlaggingService:
                     'flag': existing_flag
                 }
             
-            # Check if user is not rate-limited
-            if FlaggingService.is_user_rate_limited(user):
+            # Check if user is not rate-limited, counting this flag
+            if FlaggingService.has_flag_restriction(user) or not flag_rate_limiter.hit(
+                user.pk, limit=FlaggingService.daily_flag_limit(user)
+            ).allowed:
                 return {
                     'success': False,
                     'error': 'You have reached your flag submission limit. Please try again later.',
@@ -108,31 +119,29 @@ class FlaggingService:
     @staticmethod
     def is_user_rate_limited(user) -> bool:
         """Check if user has hit rate limits for flagging."""
-        # Check for active moderation records that limit flagging
-        active_limits = UserModerationRecord.objects.filter(
+        if FlaggingService.has_flag_restriction(user):
+            return True
+        
+        # Check flag rate over the last day, without counting anything
+        return not flag_rate_limiter.peek(user.pk, limit=FlaggingService.daily_flag_limit(user)).allowed
+    
+    @staticmethod
+    def has_flag_restriction(user) -> bool:
+        """Check for active moderation records that limit flagging."""
+        return UserModerationRecord.objects.filter(
             user=user,
             action__in=['flag_limit', 'temp_ban', 'perm_ban']
         ).filter(
             Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-        )
-        
-        if active_limits.exists():
-            return True
-        
-        # Check flag rate (max 10 flags per day for regular users)
-        yesterday = timezone.now() - timedelta(days=1)
-        recent_flags = Flag.objects.filter(
-            flagged_by=user,
-            created_at__gte=yesterday
-        ).count()
-        
+        ).exists()
+    
+    @staticmethod
+    def daily_flag_limit(user) -> int:
+        """Flags a user may submit per day."""
         # Higher limits for trusted users
         if hasattr(user, 'profile') and user.profile.tier and user.profile.tier.level >= 3:
-            limit = 25  # Higher limit for moderators
-        else:
-            limit = 10  # Regular user limit
-        
-        return recent_flags >= limit
+            return 25  # Higher limit for moderators
+        return 10  # Regular user limit
     
     @staticmethod
     def get_flagged_content(status: str = None, priority: str = None, 
@@ -0,0 +1,138 @@
+"""
+Fragment Cache - tag-based caching of page sections.
+
+Expensive page sections (a council's counters, figures, header meta
+fields, history) are cached as fragments, each carrying the tags of the
+data it was built from. Purging a tag drops every fragment carrying it:
+
+- every tag has a version number in the cache, and a fragment's key
+  includes the versions of its tags when it was built
+- ``purge`` bumps the versions with the cache's atomic ``incr``, so later
+  reads look for new keys and the old fragments simply age out; inside a
+  transaction it bumps again on commit
+- a missing version (never set, or evicted) starts from the current time
+  in nanoseconds, so it never matches a version used before
+
+A read is two cache round trips (the tag versions, then the fragment)
+however many tags the fragment carries.
+
+Tags used for council pages:
+    council:<slug>                  anything about the council, all years
+    council-year:<slug>:<year>      the council's figures for one year
+    council-activity:<slug>         the council's activity log
+    fields                          data field definitions
+    counters                        counter definitions
+
+Usage:
+    section = fragment_cache.get_or_set(
+        'council-meta', [council.slug], [council_tag(council.slug), 'fields'], build_meta,
+    )
+    fragment_cache.purge(council_year_tag(council.slug, year.label))
+"""
+
+import hashlib
+import logging
+import time
+from typing import Any, Callable, Iterable, List, Optional
+
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def council_tag(council_slug: str) -> str:
+    return f"council:{council_slug}"
+
+
+def council_year_tag(council_slug: str, year_label: str) -> str:
+    return f"council-year:{council_slug}:{year_label}"
+
+
+def council_activity_tag(council_slug: str) -> str:
+    return f"council-activity:{council_slug}"
+
+
+class FragmentCache:
+    """Tag-versioned fragment cache; see the module docstring."""
+
+    def __init__(self, prefix: str = 'fragment', timeout: int = 3600, cache_alias: str = 'default'):
+        self.prefix = prefix
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _tag_key(self, tag: str) -> str:
+        digest = hashlib.sha1(tag.encode('utf-8')).hexdigest()[:20]
+        return f"{self.prefix}:tag:{digest}"
+
+    def _versions(self, tags: List[str]) -> List[int]:
+        keys = [self._tag_key(tag) for tag in tags]
+        found = self.cache.get_many(keys)
+        versions = []
+        for key in keys:
+            version = found.get(key)
+            if version is None:
+                # add so concurrent readers agree on one starting version
+                self.cache.add(key, time.time_ns(), None)
+                version = self.cache.get(key)
+            versions.append(version)
+        return versions
+
+    def _key(self, name: str, key_parts: Iterable[Any], tags: List[str]) -> str:
+        parts = [str(part) for part in key_parts]
+        versions = self._versions(tags)
+        raw = '|'.join(parts + [f"{tag}={version}" for tag, version in zip(tags, versions)])
+        return f"{self.prefix}:{name}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    def get_or_set(self, name: str, key_parts: Iterable[Any], tags: Iterable[str],
+                   builder: Callable[[], Any], timeout: Optional[int] = None) -> Any:
+        """
+        The fragment ``name`` for ``key_parts``, built with ``builder`` and
+        stored under the current versions of ``tags`` when missing.
+        """
+        tags = sorted(set(tags))
+        key = self._key(name, key_parts, tags)
+        value = self.cache.get(key)
+        if value is None:
+            value = builder()
+            self.cache.set(key, value, self.timeout if timeout is None else timeout)
+        return value
+
+    def purge(self, *tags: str) -> None:
+        """
+        Drop every fragment carrying any of ``tags``: now, so this
+        transaction reads its own changes, and again when it commits,
+        dropping fragments other requests rebuilt from the old data.
+        """
+        tags = [tag for tag in tags if tag]
+        if not tags:
+            return
+        self._bump(tags)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self._bump(tags))
+
+    def _bump(self, tags: List[str]) -> None:
+        for tag in tags:
+            try:
+                self.cache.incr(self._tag_key(tag))
+            except ValueError:
+                pass  # No version yet: the next read starts a new one
+        logger.debug(f"Purged fragments tagged {', '.join(tags)}")
+
+    def purge_council_data(self, council_slug: str, year_label: Optional[str] = None) -> None:
+        """
+        Purge a council's fragments for one year's figures, or for
+        everything about the council when ``year_label`` is None.
+        """
+        if year_label is None:
+            self.purge(council_tag(council_slug))
+        else:
+            self.purge(council_year_tag(council_slug, year_label))
+
+
+# Global fragment cache instance
+fragment_cache = FragmentCache()
@@ -0,0 +1,307 @@
+"""
+Home Snapshot - the whole home page context, precomputed.
+
+The home page used to count councils several times, count contributions
+and data issues, pick featured councils and read every promoted counter
+on each request. The snapshot service builds that context once and
+stores it in a single ``HomeSnapshot`` row, which every process reads:
+
+- ``rebuild`` computes the context and replaces the stored snapshot in
+  one write, so readers see either the old or the new snapshot
+- each process keeps the row it read for ``reload_after`` seconds
+  (``HOME_SNAPSHOT_RELOAD_SECONDS``), so the view costs at most one small
+  query per process in that interval
+- changes that affect the page (councils, contributions, data issues,
+  promoted counters, site-wide counter results, figure batches) only
+  mark the snapshot dirty
+- the scheduled ``build_home_snapshot`` job rebuilds it when it is dirty,
+  missing, older than ``max_age`` or from a previous day (the council of
+  the day changes daily)
+
+The row lives in the database rather than the cache because the default
+cache is per process: the job's snapshot would never reach the web
+workers. Until the first build the first request builds the snapshot
+itself, so the page never shows empty values. Everything stored is plain
+data (dicts, numbers, strings, datetimes), so no model instances or user
+records are persisted.
+
+Usage:
+    context = home_snapshot.context()
+    home_snapshot.mark_dirty()
+    home_snapshot.refresh()  # Rebuild if needed; from the scheduled job
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import (
+    Contribution, Council, DataIssue, FinancialYear, GroupCounter, HomeSnapshot, SiteCounter,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of the stored context changes
+SNAPSHOT_VERSION = 1
+
+# The single row holding the snapshot
+SNAPSHOT_PK = 1
+
+
+class HomeSnapshotService:
+    """Builds, stores and serves the home page snapshot; see the module docstring."""
+
+    def __init__(self, max_age=timedelta(minutes=10), featured_count=5, reload_after=None):
+        self.max_age = max_age
+        self.featured_count = featured_count
+        if reload_after is None:
+            reload_after = getattr(settings, 'HOME_SNAPSHOT_RELOAD_SECONDS', 30)
+        self.reload_after = reload_after
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._read_at = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        """The current snapshot: ``{'version', 'built_at', 'context'}``, or None."""
+        if self._read_at is None or time.monotonic() - self._read_at > self.reload_after:
+            self._remember(self._read())
+        return self._snapshot
+
+    def context(self) -> Dict[str, Any]:
+        """Template context for the home page, built on the spot before the first build."""
+        snapshot = self.get()
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._read()  # Another request may just have built it
+                if snapshot is None:
+                    logger.info("Home page snapshot missing; building it for this request")
+                    snapshot = self.rebuild()
+                self._remember(snapshot)
+        return snapshot['context']
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        row = HomeSnapshot.objects.filter(pk=SNAPSHOT_PK, version=SNAPSHOT_VERSION).first()
+        if row is None:
+            return None
+        context = dict(row.context)
+        # Stored as ISO strings by the JSON encoder
+        context['snapshot_built_at'] = parse_datetime(context['snapshot_built_at'] or '')
+        context['recent_contributions'] = [
+            dict(contribution, created=parse_datetime(contribution['created'] or ''))
+            for contribution in context['recent_contributions']
+        ]
+        return {'version': row.version, 'built_at': row.built_at, 'context': context, 'dirty': row.dirty}
+
+    def _remember(self, snapshot: Optional[Dict[str, Any]]) -> None:
+        self._snapshot, self._read_at = snapshot, time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Invalidation and rebuilding
+    # ------------------------------------------------------------------
+
+    def mark_dirty(self) -> None:
+        """Have the next scheduled run rebuild the snapshot, once committed."""
+        transaction.on_commit(
+            lambda: HomeSnapshot.objects.filter(pk=SNAPSHOT_PK, dirty=False).update(dirty=True)
+        )
+
+    def needs_rebuild(self, snapshot=None) -> bool:
+        snapshot = self._read() if snapshot is None else snapshot
+        if snapshot is None or snapshot.get('dirty'):
+            return True
+        now = timezone.now()
+        built_at = snapshot['built_at']
+        return now - built_at > self.max_age or timezone.localdate(built_at) != timezone.localdate(now)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the snapshot if it needs it (always with ``force``). Returns whether it did."""
+        if not force and not self.needs_rebuild():
+            return False
+        self.rebuild()
+        return True
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Build the context and swap it in as the current snapshot."""
+        # Cleared first, so changes made while building mark it dirty again
+        HomeSnapshot.objects.filter(pk=SNAPSHOT_PK).update(dirty=False)
+        started = timezone.now()
+        context = self.build()
+        fields = {'version': SNAPSHOT_VERSION, 'built_at': started, 'context': context}
+        if not HomeSnapshot.objects.filter(pk=SNAPSHOT_PK).update(**fields):
+            HomeSnapshot.objects.create(pk=SNAPSHOT_PK, **fields)
+        snapshot = dict(fields, dirty=False)
+        self._remember(snapshot)
+        logger.info(f"Built home page snapshot in {(timezone.now() - started).total_seconds():.2f}s")
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self) -> Dict[str, Any]:
+        """Compute the home page context."""
+        from .completeness_index import completeness_index
+        from .counter_cache_service import counter_cache_service
+
+        latest_year = FinancialYear.objects.order_by("-label").first()
+        total_councils = Council.objects.count()
+
+        # Site-wide total debt from the counter cache; never calculated here
+        total_debt = 0
+        councils_with_debt_count = 0
+        if latest_year:
+            try:
+                cached_total = counter_cache_service.get_counter_value(
+                    counter_slug='total-debt',
+                    year_label=latest_year.label,
+                    allow_expensive_calculation=False,
+                )
+                if cached_total and cached_total > 0:
+                    total_debt = float(cached_total)
+                    # Estimate councils with debt (rough approximation to avoid expensive query)
+                    councils_with_debt_count = int(total_councils * 0.85)  # ~85% of councils have debt
+            except Exception as e:
+                logger.error(f"Error retrieving cached total debt: {e}")
+
+        council_of_the_day, featured_councils = self._featured_councils(total_councils)
+
+        recent_contributions = [
+            {
+                'user': {'username': contribution.user.username if contribution.user else ''},
+                'field': {'name': contribution.field.name if contribution.field else ''},
+                'council': {'name': contribution.council.name, 'slug': contribution.council.slug},
+                'created': contribution.created,
+            }
+            for contribution in Contribution.objects.filter(
+                status='approved'
+            ).select_related('user', 'council', 'field').order_by('-created')[:5]
+        ]
+
+        top_contributors = list(
+            Contribution.objects.filter(
+                status='approved',
+                created__gte=timezone.now() - timedelta(days=30),
+            ).values('user__username').annotate(
+                contribution_count=Count('id')
+            ).order_by('-contribution_count')[:5]
+        )
+
+        try:
+            missing_data_count = DataIssue.objects.filter(
+                issue_type__in=['missing_characteristic', 'missing_financial']
+            ).count()
+        except Exception as e:
+            logger.warning(f"Error calculating missing data count: {e}")
+            missing_data_count = 0
+
+        return {
+            "total_debt": total_debt,
+            "total_debt_billions": total_debt / 1_000_000_000 if total_debt else 0,
+            "total_councils": total_councils,
+            "councils_with_debt_count": councils_with_debt_count,
+            "completion_percentage": completeness_index.site_completion_percentage(),
+            "council_of_the_day": council_of_the_day,
+            "featured_councils": featured_councils,
+            "recent_contributions": recent_contributions,
+            "top_contributors": top_contributors,
+            "missing_data_count": missing_data_count,
+            "pending_contributions_count": Contribution.objects.filter(status='pending').count(),
+            "promoted_counters": self._promoted_counters(counter_cache_service),
+            "latest_year": {'id': latest_year.id, 'label': latest_year.label} if latest_year else None,
+            "current_year": latest_year.label if latest_year else "",
+            "snapshot_built_at": timezone.now(),
+        }
+
+    def _council_data(self, council) -> Dict[str, Any]:
+        return {
+            'name': council.name,
+            'slug': council.slug,
+            'council_type': {'name': council.council_type.name} if council.council_type else None,
+            'council_nation': {'name': council.council_nation.name} if council.council_nation else None,
+        }
+
+    def _featured_councils(self, total_councils):
+        """
+        Council of the day (chosen from today's date) and a few more picked
+        the same way, as plain dicts.
+        """
+        if not total_councils:
+            return None, []
+
+        today = timezone.localdate()
+        councils = Council.objects.select_related('council_type', 'council_nation').order_by('pk')
+        index = int(hashlib.md5(str(today).encode()).hexdigest()[:8], 16) % total_councils
+        council_of_the_day = councils[index:index + 1].first() or councils.first()
+
+        # Distinct indexes among the other councils, stable for the day
+        remaining = total_councils - 1
+        offsets = []
+        seed = hashlib.md5(f"{today}_featured".encode()).hexdigest()
+        for i in range(min(self.featured_count, remaining)):
+            offset = int(hashlib.md5(f"{seed}_{i}".encode()).hexdigest()[:8], 16) % remaining
+            while offset in offsets:
+                offset = (offset + 1) % remaining
+            offsets.append(offset)
+        others = councils.exclude(pk=council_of_the_day.pk)
+        featured = [council_of_the_day] + [others[offset] for offset in offsets]
+
+        council_of_the_day = self._council_data(council_of_the_day)
+        return council_of_the_day, [
+            {'council': self._council_data(council), 'financial_years': []} for council in featured
+        ]
+
+    def _promoted_counters(self, counter_cache_service):
+        promoted = []
+        site_counters = SiteCounter.objects.filter(promote_homepage=True).select_related('counter', 'year')
+        group_counters = GroupCounter.objects.filter(promote_homepage=True).select_related('counter', 'year')
+        for counter in list(site_counters) + list(group_counters):
+            value = counter_cache_service.get_counter_value(
+                counter_slug=counter.counter.slug,
+                year_label=counter.year.label if counter.year else None,
+                use_stale_if_needed=False,  # Show the calculating state instead of stale data
+                allow_expensive_calculation=False,
+            )
+            # -1 is the sentinel for a counter still being calculated
+            is_calculating = value is None or value == -1
+            item = {
+                "slug": counter.slug,
+                "name": counter.name,
+                "formatted": "Calculating..." if is_calculating else counter.counter.format_value(float(value)),
+                "raw": 0 if is_calculating else float(value),
+                "duration": counter.duration,
+                "precision": counter.precision,
+                "show_currency": counter.show_currency,
+                "friendly_format": counter.friendly_format,
+                "is_calculating": is_calculating,
+            }
+            if isinstance(counter, SiteCounter):
+                item.update({
+                    "counter_slug": counter.counter.slug,
+                    "year": counter.year.label if counter.year else None,
+                    "explanation": counter.explanation,
+                    "columns": counter.columns,
+                })
+            else:
+                item.update({
+                    "explanation": "",  # groups currently lack custom explanations
+                    "columns": 3,  # groups default to full width for now
+                })
+            promoted.append(item)
+        return promoted
+
+
+# Global snapshot service instance
+home_snapshot = HomeSnapshotService()
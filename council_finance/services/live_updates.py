@@ -0,0 +1,116 @@
+"""
+Live Updates - counter and feed deltas pushed to council pages over WebSockets.
+
+Changes are sent to channel layer groups as compact deltas:
+
+- ``council.<slug>``: the council's counter results and feed entries
+- ``counter.<slug>``: site-wide totals of one counter
+
+Each delta is a short-keyed dict, for example
+``{"t": "counter", "c": "total-debt", "y": "2024/25", "v": "1200.00", "f": "£1,200"}``
+or ``{"t": "feed", "id": 12, "a": "contribution", "d": "...", "at": "..."}``.
+
+Deltas are queued once their transaction commits and sent after a short
+delay, so a recalculation burst becomes one message per group, and a
+newer delta for the same counter replaces an older one. Messages carry the
+JSON text the browser receives, so consumers send it without re-encoding
+it once per socket.
+"""
+
+import json
+import logging
+import threading
+from functools import partial
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def council_group(council_slug: str) -> str:
+    return f"council.{council_slug}"
+
+
+def counter_group(counter_slug: str) -> str:
+    return f"counter.{counter_slug}"
+
+
+class LiveUpdatePublisher:
+    """Coalesces deltas per group and sends them through the channel layer."""
+
+    def __init__(self, delay=0.05, layer=None):
+        self.delay = delay
+        self.layer = layer  # Defaults to the default channel layer
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def publish(self, group: str, key, delta: dict) -> None:
+        """
+        Queue ``delta`` for ``group`` when the current transaction commits.
+        A later delta with the same ``key`` replaces it if both are pending.
+        """
+        transaction.on_commit(partial(self._queue, group, key, delta))
+
+    def _queue(self, group, key, delta):
+        with self._lock:
+            self._pending.setdefault(group, {})[key] = delta
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> int:
+        """Send pending deltas now. Returns the number of messages sent."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        layer = self.layer or get_channel_layer()
+        if layer is None or not pending:
+            return 0
+
+        sent = 0
+        for group, deltas in pending.items():
+            text = json.dumps({'d': list(deltas.values())}, separators=(',', ':'), cls=DjangoJSONEncoder)
+            try:
+                async_to_sync(layer.group_send)(group, {'type': 'live.update', 'text': text})
+                sent += 1
+            except Exception as e:
+                logger.error(f"Error sending live update to {group}: {e}")
+        return sent
+
+    def publish_counter_result(self, result) -> None:
+        counter = result.counter
+        year_label = result.year.label if result.year_id else None
+        delta = {
+            't': 'counter',
+            'c': counter.slug,
+            'y': year_label,
+            'v': str(result.value),
+            'f': counter.format_value(result.value),
+        }
+        if result.council_id:
+            group = council_group(result.council.slug)
+        else:
+            group = counter_group(counter.slug)
+        self.publish(group, ('counter', counter.slug, year_label), delta)
+
+    def publish_activity(self, activity_log) -> None:
+        delta = {
+            't': 'feed',
+            'id': activity_log.pk,
+            'a': activity_log.activity_type,
+            'd': activity_log.description,
+            'at': activity_log.created,
+        }
+        self.publish(council_group(activity_log.related_council.slug), ('feed', activity_log.pk), delta)
+
+
+# Global publisher instance
+live_updates = LiveUpdatePublisher()
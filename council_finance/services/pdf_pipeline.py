@@ -0,0 +1,507 @@
+"""
+Page-parallel PDF Processing Pipeline
+
+Statements of accounts are often 200+ pages long, most of which is narrative
+that never contributes a figure. This pipeline:
+
+1. Splits large PDFs into page ranges and extracts them concurrently through
+   a bounded worker pool (requires the optional ``pypdf`` package; smaller
+   documents, or installs without it, use a single Tika request).
+2. Scores every page for financial relevance.
+3. Sends only the highest-scoring pages to AI analysis, in parallel chunks,
+   and merges the per-chunk results.
+
+Classes:
+    PageText: Text and relevance score for a single page
+    PDFPagePipeline: Splits, extracts, scores and analyses PDFs by page
+"""
+
+import io
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any
+
+import requests
+from django.conf import settings
+
+from council_finance.services.financial_text_scanner import (
+    FinancialTextIndex,
+    scan_financial_text,
+)
+from council_finance.services.pdf_processing import (
+    FINANCIAL_FIELDS,
+    AIAnalysisResult,
+    ExtractionResult,
+    PageOffsetIndex,
+    TikaFinancialExtractor,
+    compute_file_sha256,
+    compute_page_offsets,
+)
+
+# Third-party imports
+try:
+    from pypdf import PdfReader, PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Phrases that mark the primary statements and notes carrying the headline
+# figures, weighted by how reliably they indicate a useful page
+RELEVANCE_PHRASES = {
+    'balance sheet': 6.0,
+    'comprehensive income and expenditure': 6.0,
+    'movement in reserves': 5.0,
+    'cash flow statement': 4.0,
+    'net cost of services': 4.0,
+    'total reserves': 4.0,
+    'usable reserves': 3.0,
+    'current liabilities': 3.0,
+    'current assets': 3.0,
+    'long-term liabilities': 3.0,
+    'long term liabilities': 3.0,
+    'borrowing': 2.0,
+    'total income': 2.0,
+    'total expenditure': 2.0,
+    'interest payable': 2.0,
+    'financing': 1.0,
+    'debt': 1.0,
+    '£000': 2.0,
+    '£m': 1.0,
+}
+
+# Selected pages are joined with a blank line when sent to the AI
+PAGE_CHUNK_SEPARATOR = '\n\n'
+
+# Figures are capped so a page of dense appendix tables cannot outrank the
+# primary statements on volume alone
+MAX_SCORED_FIGURES = 60
+FIGURE_WEIGHT = 0.15
+
+
+@dataclass
+class PageText:
+    """Text content of a single PDF page with its relevance score."""
+    page_number: int
+    text: str
+    score: float = 0.0
+    start: int = 0  # Offset of the page in the full extraction
+
+
+def score_page_relevance(text: str, text_index: Optional[FinancialTextIndex] = None,
+                         start: int = 0) -> float:
+    """
+    Score how likely a page is to carry headline financial figures.
+
+    Args:
+        text: Text content of a single page
+        text_index: Scanner index of the whole document the page belongs to;
+            when given, phrase and figure counts are read from it instead of
+            rescanning the page
+        start: Offset of the page within the indexed document
+
+    Returns:
+        Non-negative relevance score (0.0 for pages with no signals)
+    """
+    if not text or not text.strip():
+        return 0.0
+
+    if text_index is None:
+        text_index, start = scan_financial_text(text), 0
+    end = start + len(text)
+
+    score = sum(
+        weight for phrase, weight in RELEVANCE_PHRASES.items()
+        if text_index.count_term_in_range(phrase, start, end - len(phrase) + 1)
+    )
+
+    figure_count = text_index.count_figures_in_range(start, end)
+    score += min(figure_count, MAX_SCORED_FIGURES) * FIGURE_WEIGHT
+
+    return round(score, 2)
+
+
+class PDFPagePipeline:
+    """
+    Page-aware extraction and analysis for large PDF statements.
+
+    Usage:
+        pipeline = PDFPagePipeline()
+        extraction = pipeline.extract(pdf_path)
+        analysis = pipeline.analyze(extraction, council_name, year)
+
+    Configuration (Django settings):
+        PDF_PIPELINE_MIN_PAGES: Page count at which documents are split (40)
+        PDF_PIPELINE_PAGES_PER_RANGE: Pages per Tika request (20)
+        PDF_PIPELINE_MAX_WORKERS: Concurrent Tika/AI requests (4)
+        PDF_PIPELINE_AI_CHUNK_CHARS: Characters of page text sent to the AI
+            per document (8000), the budget of the former single call
+        PDF_PIPELINE_MAX_AI_CHUNKS: Parallel AI calls the budget is split
+            across (4)
+    """
+
+    def __init__(self, extractor: Optional[TikaFinancialExtractor] = None,
+                 tika_url: Optional[str] = None, ai_chunk_chars: Optional[int] = None,
+                 max_ai_chunks: Optional[int] = None):
+        self.extractor = extractor or TikaFinancialExtractor()
+        # process_pdf_api PUTs to the configured endpoint directly while the
+        # extractor uses its /text sub-resource; let callers choose
+        self.tika_url = tika_url or f'{self.extractor.tika_endpoint}/text'
+        self.min_pages = getattr(settings, 'PDF_PIPELINE_MIN_PAGES', 40)
+        self.pages_per_range = max(1, getattr(settings, 'PDF_PIPELINE_PAGES_PER_RANGE', 20))
+        self.max_workers = max(1, getattr(settings, 'PDF_PIPELINE_MAX_WORKERS', 4))
+        self.ai_chunk_chars = ai_chunk_chars or getattr(settings, 'PDF_PIPELINE_AI_CHUNK_CHARS', 8000)
+        self.max_ai_chunks = max(1, max_ai_chunks or getattr(settings, 'PDF_PIPELINE_MAX_AI_CHUNKS', 4))
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+
+    def count_pages(self, pdf_path: str) -> Optional[int]:
+        """Return the page count, or None if it cannot be determined."""
+        if not PYPDF_AVAILABLE:
+            return None
+        try:
+            return len(PdfReader(pdf_path).pages)
+        except Exception as e:
+            logger.warning(f"Could not read page count for {pdf_path}: {e}")
+            return None
+
+    def should_split(self, pdf_path: str) -> bool:
+        """Whether a PDF is large enough to be extracted in parallel ranges."""
+        page_count = self.count_pages(pdf_path)
+        return page_count is not None and page_count >= self.min_pages
+
+    def page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """Split a page count into inclusive, 1-based (first, last) ranges."""
+        return [
+            (start, min(start + self.pages_per_range - 1, page_count))
+            for start in range(1, page_count + 1, self.pages_per_range)
+        ]
+
+    def extract(self, pdf_path: str) -> ExtractionResult:
+        """
+        Extract a PDF, splitting it into concurrently processed page ranges
+        when it is large enough.
+
+        The combined text separates pages with form feeds so it has the same
+        shape as a single Tika extraction, and is stored in the extractor's
+        content-addressed cache under the whole file's digest.
+        """
+        start_time = time.time()
+        if not os.path.exists(pdf_path):
+            return self.extractor.extract_text_from_pdf(pdf_path)
+
+        sha256 = compute_file_sha256(pdf_path)
+        cached = self.extractor.cache.get(sha256)
+        if cached is not None:
+            return self.extractor.cached_extraction_result(sha256, cached, start_time)
+
+        page_count = self.count_pages(pdf_path)
+        if page_count is None or page_count < self.min_pages:
+            return self.extractor.extract_text_from_pdf(pdf_path, sha256=sha256)
+
+        ranges = self.page_ranges(page_count)
+        logger.info(f"Extracting {page_count} pages in {len(ranges)} ranges "
+                    f"with {min(self.max_workers, len(ranges))} workers")
+
+        try:
+            range_texts = self._extract_ranges(pdf_path, ranges)
+        except Exception as e:
+            logger.warning(f"Parallel range extraction failed ({e}); "
+                           f"falling back to single-request extraction")
+            return self.extractor.extract_text_from_pdf(pdf_path, sha256=sha256)
+
+        page_texts: List[str] = []
+        for (first, last), text in zip(ranges, range_texts):
+            page_texts.extend(self._pages_from_range_text(text, last - first + 1))
+
+        text_content = '\f'.join(page_texts)
+        text_index = scan_financial_text(text_content)
+        found_terms = text_index.terms_found(self.extractor.financial_terms)
+        page_offsets = compute_page_offsets(text_content)
+        self.extractor.cache.set(sha256, text_content, page_offsets, found_terms)
+
+        processing_time = time.time() - start_time
+        logger.info(f"Parallel extraction complete: {len(text_content):,} characters "
+                    f"from {page_count} pages in {processing_time:.2f}s")
+
+        return ExtractionResult(
+            success=True,
+            text_content=text_content,
+            character_count=len(text_content),
+            processing_time=processing_time,
+            financial_terms_found=found_terms,
+            page_offsets=page_offsets,
+            sha256=sha256,
+            _text_index=text_index
+        )
+
+    def _extract_ranges(self, pdf_path: str, ranges: List[Tuple[int, int]]) -> List[str]:
+        """
+        Extract each page range through a bounded worker pool.
+
+        Range PDFs are built on the calling thread (PdfReader is not thread
+        safe) and at most ``max_workers * 2`` are held in memory at once.
+        """
+        reader = PdfReader(pdf_path)
+        results: List[Optional[str]] = [None] * len(ranges)
+        max_in_flight = self.max_workers * 2
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(ranges))) as pool:
+            in_flight = {}
+            for index, (first, last) in enumerate(ranges):
+                if len(in_flight) >= max_in_flight:
+                    oldest = min(in_flight)
+                    results[oldest] = in_flight.pop(oldest).result()
+                in_flight[index] = pool.submit(
+                    self._extract_range_bytes, self._build_range_pdf(reader, first, last)
+                )
+            for index, future in in_flight.items():
+                results[index] = future.result()
+
+        return results
+
+    def _build_range_pdf(self, reader, first: int, last: int) -> bytes:
+        """Write pages first..last (1-based, inclusive) to a new PDF."""
+        writer = PdfWriter()
+        for page_index in range(first - 1, last):
+            writer.add_page(reader.pages[page_index])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    def _extract_range_bytes(self, pdf_bytes: bytes) -> str:
+        """Send one range PDF to Tika and return its text."""
+        response = requests.put(
+            self.tika_url,
+            data=pdf_bytes,
+            headers={'Accept': 'text/plain', 'Content-Type': 'application/pdf'},
+            timeout=120
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Tika returned HTTP {response.status_code} for page range")
+        return response.text or ''
+
+    @staticmethod
+    def _pages_from_range_text(text: str, expected_pages: int) -> List[str]:
+        """
+        Split a range's text into exactly ``expected_pages`` page texts.
+
+        Tika ends pages with form feeds; surplus segments are folded into the
+        last page and missing ones padded so page numbers stay aligned with
+        the original document.
+        """
+        segments = text.split('\f')
+        if len(segments) > expected_pages and not segments[-1].strip():
+            segments = segments[:-1]
+        if len(segments) > expected_pages:
+            segments = segments[:expected_pages - 1] + ['\n'.join(segments[expected_pages - 1:])]
+        segments.extend([''] * (expected_pages - len(segments)))
+        return segments
+
+    # ------------------------------------------------------------------
+    # Page scoring
+    # ------------------------------------------------------------------
+
+    def split_pages(self, text_content: str, page_offsets: Optional[List[int]] = None,
+                    text_index: Optional[FinancialTextIndex] = None) -> List[PageText]:
+        """
+        Split extracted text into scored pages using the page offsets.
+
+        The document is scanned once and each page is scored from the
+        shared index rather than searched phrase by phrase.
+        """
+        if not page_offsets:
+            page_offsets = compute_page_offsets(text_content)
+        if text_index is None:
+            text_index = scan_financial_text(text_content)
+
+        pages = []
+        for index, start in enumerate(page_offsets):
+            end = page_offsets[index + 1] - 1 if index + 1 < len(page_offsets) else len(text_content)
+            text = text_content[start:end]
+            score = score_page_relevance(text, text_index, start)
+            pages.append(PageText(page_number=index + 1, text=text, score=score, start=start))
+        return pages
+
+    def select_relevant_pages(self, pages: List[PageText], max_chars: int) -> List[PageText]:
+        """
+        Pick the highest-scoring pages that fit within a character budget.
+
+        Returns the selection in document order so statements that span
+        consecutive pages are read in sequence.
+        """
+        selected = []
+        used_chars = 0
+        for page in sorted(pages, key=lambda p: (-p.score, p.page_number)):
+            if page.score <= 0:
+                break
+            page_chars = len(page.text)
+            if used_chars + page_chars > max_chars:
+                continue
+            selected.append(page)
+            used_chars += page_chars
+        return sorted(selected, key=lambda p: p.page_number)
+
+    @property
+    def chunk_chars(self) -> int:
+        """Characters per AI call, so all calls together stay within ``ai_chunk_chars``."""
+        return max(1, self.ai_chunk_chars // self.max_ai_chunks)
+
+    def build_ai_chunks(self, pages: List[PageText]) -> List[str]:
+        """Group pages into chunks no larger than ``chunk_chars``."""
+        return [chunk_text for chunk_text, _ in self.build_page_chunks(pages)]
+
+    def build_page_chunks(self, pages: List[PageText]) -> List[Tuple[str, PageOffsetIndex]]:
+        """
+        Group pages into chunks no larger than ``chunk_chars``, each with a
+        page index mapping chunk offsets back to page numbers and offsets in
+        the full extraction.
+        """
+        chunk_chars = self.chunk_chars
+        chunks = []
+        current: List[PageText] = []
+        current_texts: List[str] = []
+        current_chars = 0
+        for page in pages:
+            page_text = page.text.strip()
+            if not page_text:
+                continue
+            page_text = page_text[:chunk_chars]
+            if current and current_chars + len(PAGE_CHUNK_SEPARATOR) + len(page_text) > chunk_chars:
+                chunks.append(self._page_chunk(current, current_texts))
+                current, current_texts, current_chars = [], [], 0
+            if current:
+                current_chars += len(PAGE_CHUNK_SEPARATOR)
+            current.append(page)
+            current_texts.append(page_text)
+            current_chars += len(page_text)
+        if current:
+            chunks.append(self._page_chunk(current, current_texts))
+        return chunks
+
+    @staticmethod
+    def _page_chunk(pages: List[PageText], texts: List[str]) -> Tuple[str, PageOffsetIndex]:
+        """Join stripped page texts and record where each one starts."""
+        chunk_offsets = []
+        source_offsets = []
+        position = 0
+        for page, text in zip(pages, texts):
+            chunk_offsets.append(position)
+            leading_whitespace = len(page.text) - len(page.text.lstrip())
+            source_offsets.append(page.start + leading_whitespace)
+            position += len(text) + len(PAGE_CHUNK_SEPARATOR)
+        page_index = PageOffsetIndex(
+            chunk_offsets,
+            page_numbers=[page.page_number for page in pages],
+            source_offsets=source_offsets,
+        )
+        return PAGE_CHUNK_SEPARATOR.join(texts), page_index
+
+    def relevant_chunks(self, text_content: str, page_offsets: Optional[List[int]] = None,
+                        text_index: Optional[FinancialTextIndex] = None) -> List[str]:
+        """
+        Return the AI-ready chunks for a document: the whole text when it
+        fits in ``ai_chunk_chars``, otherwise its most relevant pages.
+        """
+        return [
+            chunk_text for chunk_text, _ in
+            self.relevant_page_chunks(text_content, page_offsets, text_index)
+        ]
+
+    def relevant_page_chunks(self, text_content: str, page_offsets: Optional[List[int]] = None,
+                             text_index: Optional[FinancialTextIndex] = None
+                             ) -> List[Tuple[str, PageOffsetIndex]]:
+        """As ``relevant_chunks``, with the page index of each chunk."""
+        if not page_offsets:
+            page_offsets = compute_page_offsets(text_content)
+        document_index = PageOffsetIndex(page_offsets)
+
+        if len(text_content) <= self.ai_chunk_chars:
+            return [(text_content, document_index)]
+
+        # The relevant pages share the budget of one full-size call, split
+        # into at most max_ai_chunks calls of chunk_chars each
+        pages = self.split_pages(text_content, page_offsets, text_index)
+        chunks = self.build_page_chunks(self.select_relevant_pages(pages, self.ai_chunk_chars))
+        return chunks[:self.max_ai_chunks] or [(text_content[:self.ai_chunk_chars], document_index)]
+
+    # ------------------------------------------------------------------
+    # AI analysis
+    # ------------------------------------------------------------------
+
+    def analyze(self, extraction: ExtractionResult, council_name: str = "", year: str = "") -> AIAnalysisResult:
+        """
+        Analyse the most relevant pages of an extraction, one AI call per
+        chunk running in parallel, and merge the results.
+        """
+        chunks = self.relevant_page_chunks(
+            extraction.text_content, extraction.page_offsets, extraction.text_index
+        )
+        if len(chunks) == 1:
+            chunk_text, page_index = chunks[0]
+            return self.extractor.analyze_with_ai(chunk_text, council_name, year, page_index)
+
+        logger.info(f"Analysing {len(chunks)} relevant page chunks in parallel")
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+            results = list(pool.map(
+                lambda chunk: self.extractor.analyze_with_ai(chunk[0], council_name, year, chunk[1]),
+                chunks
+            ))
+
+        merged = self.merge_analysis_results(results)
+        merged.processing_time = time.time() - start_time
+        return merged
+
+    @staticmethod
+    def merge_analysis_results(results: List[AIAnalysisResult]) -> AIAnalysisResult:
+        """
+        Combine per-chunk analyses, taking each field from the most confident
+        chunk that found a value for it.
+        """
+        successful = [result for result in results if result.success]
+        if not successful:
+            errors = '; '.join(result.error_message for result in results if result.error_message)
+            return AIAnalysisResult(success=False, error_message=errors or "All AI analysis chunks failed")
+
+        ranked = sorted(successful, key=lambda result: result.confidence_score, reverse=True)
+        merged_data: Dict[str, Any] = {field: None for field in FINANCIAL_FIELDS}
+        merged_metadata: Dict[str, Any] = {}
+        contributing = []
+
+        for result in ranked:
+            data = result.extracted_data or {}
+            used = False
+            for field in FINANCIAL_FIELDS:
+                value = data.get(field)
+                if merged_data[field] is None and isinstance(value, (int, float)) and value > 0:
+                    merged_data[field] = value
+                    field_metadata = (data.get('_metadata') or {}).get(field)
+                    if field_metadata:
+                        merged_metadata[field] = field_metadata
+                    used = True
+            if used:
+                contributing.append(result)
+
+        best = contributing[0] if contributing else ranked[0]
+        merged_data['confidence'] = best.extracted_data.get('confidence', 'medium')
+        merged_data['notes'] = ' | '.join(
+            str(result.extracted_data.get('notes')) for result in contributing
+            if result.extracted_data.get('notes')
+        )
+        if merged_metadata:
+            merged_data['_metadata'] = merged_metadata
+
+        return AIAnalysisResult(
+            success=True,
+            extracted_data=merged_data,
+            confidence_score=best.confidence_score,
+            raw_response='\n---\n'.join(result.raw_response for result in successful if result.raw_response)
+        )
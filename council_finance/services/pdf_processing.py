@@ -7,22 +7,36 @@ from PDF documents using Apache Tika and OpenAI analysis.
 Classes:
     TikaFinancialExtractor: Main class for PDF extraction and AI analysis
     FinancialDataMapper: Maps extracted data to database fields
+    PDFExtractionCache: Content-addressed on-disk cache of extraction results
+    PageOffsetIndex: Maps character offsets in extracted text to page numbers
 """
 
 import os
+import re
+import gzip
 import json
 import time
+import hashlib
 import logging
+import tempfile
 import requests
+from bisect import bisect_right
+from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from django.conf import settings
 from django.utils import timezone
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from council_finance.services.financial_text_scanner import (
+    CONTENT_KEYWORDS,
+    FinancialTextIndex,
+    scan_financial_text,
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -38,10 +52,219 @@ class ExtractionResult:
     processing_time: float = 0.0
     financial_terms_found: List[str] = None
     error_message: str = ""
+    page_offsets: List[int] = None
+    sha256: str = ""
+    from_cache: bool = False
+    _text_index: Optional[FinancialTextIndex] = field(default=None, repr=False, compare=False)
     
     def __post_init__(self):
         if self.financial_terms_found is None:
             self.financial_terms_found = []
+        if self.page_offsets is None:
+            self.page_offsets = [0]
+
+    @property
+    def text_index(self) -> FinancialTextIndex:
+        """Term, figure and page-marker index of the text, built on first use."""
+        if self._text_index is None:
+            self._text_index = scan_financial_text(self.text_content)
+        return self._text_index
+
+    @property
+    def page_index(self) -> 'PageOffsetIndex':
+        """Page lookup built from ``page_offsets``."""
+        return PageOffsetIndex(self.page_offsets)
+
+
+# Size of the blocks used when hashing and streaming PDFs
+PDF_CHUNK_SIZE = 64 * 1024
+
+
+def compute_file_sha256(pdf_path: str, chunk_size: int = PDF_CHUNK_SIZE) -> str:
+    """
+    Hash a file in fixed-size blocks so large PDFs never sit in memory.
+    
+    Args:
+        pdf_path: Path to the file to hash
+        chunk_size: Number of bytes read per block
+        
+    Returns:
+        Hex encoded SHA-256 digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as pdf_file:
+        for chunk in iter(lambda: pdf_file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_page_offsets(text_content: str) -> List[int]:
+    """
+    Work out the character offset at which each page starts.
+    
+    Tika separates pages with form feed characters, so page N starts one
+    character after the (N-1)th form feed. A document without form feeds is
+    treated as a single page starting at offset 0.
+    """
+    offsets = [0]
+    position = text_content.find('\f')
+    while position != -1:
+        offsets.append(position + 1)
+        position = text_content.find('\f', position + 1)
+    return offsets
+
+
+class PageOffsetIndex:
+    """
+    Maps character offsets in extracted text to PDF page numbers.
+    
+    Built once per extraction from the page start offsets and queried with
+    bisect, so locating the page of a matched figure costs O(log pages)
+    instead of a rescan of the surrounding text.
+    
+    The text may also be a selection of pages stitched together (as sent to
+    the AI in chunks); ``page_numbers`` then gives the real page number of
+    each segment and ``source_offsets`` where each segment starts in the
+    original extraction, so spans can still be reported against the full
+    document.
+    """
+    
+    def __init__(self, page_offsets: List[int], page_numbers: Optional[List[int]] = None,
+                 source_offsets: Optional[List[int]] = None):
+        self.page_offsets = list(page_offsets) or [0]
+        self.page_numbers = list(page_numbers) if page_numbers else list(range(1, len(self.page_offsets) + 1))
+        self.source_offsets = list(source_offsets) if source_offsets else list(self.page_offsets)
+    
+    @classmethod
+    def from_text(cls, text_content: str) -> 'PageOffsetIndex':
+        return cls(compute_page_offsets(text_content))
+    
+    @property
+    def has_page_breaks(self) -> bool:
+        """Whether the offsets identify real pages rather than one block of text."""
+        return len(self.page_offsets) > 1 or self.page_numbers != [1]
+    
+    def _segment_at(self, offset: int) -> int:
+        return max(0, bisect_right(self.page_offsets, offset) - 1)
+    
+    def page_at(self, offset: int) -> int:
+        """Page number containing the character at ``offset``."""
+        return self.page_numbers[self._segment_at(offset)]
+    
+    def source_offset(self, offset: int) -> int:
+        """Translate ``offset`` into an offset in the original extraction."""
+        segment = self._segment_at(offset)
+        return self.source_offsets[segment] + (offset - self.page_offsets[segment])
+
+
+class PDFExtractionCache:
+    """
+    Content-addressed cache of Tika extraction results.
+    
+    Entries are keyed by the SHA-256 of the PDF bytes, so the same statement
+    of accounts uploaded twice (even under a different filename or from a
+    different URL) is only sent to Tika once. Each entry is a gzip-compressed
+    JSON document holding the extracted text, the per-page character offsets
+    and, once available, the AI analyses of that text. The analysis prompt
+    names the council and year, so analyses are stored per council and year.
+    
+    Configuration (Django settings):
+        PDF_EXTRACTION_CACHE_ENABLED: Turn the cache on/off (default True)
+        PDF_EXTRACTION_CACHE_DIR: Directory for cache files
+            (default <BASE_DIR>/cache/pdf_extractions)
+    """
+    
+    CACHE_VERSION = 1
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        if cache_dir is None:
+            cache_dir = getattr(settings, 'PDF_EXTRACTION_CACHE_DIR', None)
+        if cache_dir is None:
+            cache_dir = Path(settings.BASE_DIR) / 'cache' / 'pdf_extractions'
+        self.cache_dir = Path(cache_dir)
+        self.enabled = getattr(settings, 'PDF_EXTRACTION_CACHE_ENABLED', True)
+    
+    def _path_for(self, sha256: str) -> Path:
+        # Fan out into sub-directories to keep directory listings small
+        return self.cache_dir / sha256[:2] / f"{sha256}.json.gz"
+    
+    def get(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a digest, or None on a miss."""
+        if not self.enabled or not sha256:
+            return None
+        
+        path = self._path_for(sha256)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as cache_file:
+                entry = json.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable PDF extraction cache entry {path}: {e}")
+            return None
+        
+        if entry.get('version') != self.CACHE_VERSION or entry.get('sha256') != sha256:
+            return None
+        return entry
+    
+    def set(self, sha256: str, text_content: str, page_offsets: List[int],
+            financial_terms_found: List[str]) -> None:
+        """Store the extraction result for a digest."""
+        self._write(sha256, {
+            'version': self.CACHE_VERSION,
+            'sha256': sha256,
+            'text_content': text_content,
+            'page_offsets': page_offsets,
+            'financial_terms_found': financial_terms_found,
+            'analyses': {},
+            'created_at': timezone.now().isoformat(),
+        })
+    
+    @staticmethod
+    def analysis_key(council_name: str, year: str) -> str:
+        return f"{council_name.strip().lower()}|{year.strip()}"
+
+    def get_analysis(self, sha256: str, council_name: str = "", year: str = "") -> Optional[Dict[str, Any]]:
+        """Return the stored AI analysis of a digest for a council and year, or None."""
+        entry = self.get(sha256)
+        if entry is None:
+            return None
+        return (entry.get('analyses') or {}).get(self.analysis_key(council_name, year))
+
+    def store_analysis(self, sha256: str, analysis: 'AIAnalysisResult',
+                       council_name: str = "", year: str = "") -> None:
+        """Attach a successful AI analysis for a council and year to an existing entry."""
+        entry = self.get(sha256)
+        if entry is None:
+            return
+        entry.setdefault('analyses', {})[self.analysis_key(council_name, year)] = {
+            'extracted_data': analysis.extracted_data,
+            'confidence_score': analysis.confidence_score,
+            'raw_response': analysis.raw_response,
+        }
+        self._write(sha256, entry)
+    
+    def _write(self, sha256: str, entry: Dict[str, Any]) -> None:
+        if not self.enabled or not sha256:
+            return
+        
+        path = self._path_for(sha256)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename so readers never see a
+            # partially written entry
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as raw_file:
+                    with gzip.GzipFile(fileobj=raw_file, mode='wb') as gz_file:
+                        gz_file.write(json.dumps(entry).encode('utf-8'))
+                os.replace(temp_path, path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write PDF extraction cache entry {path}: {e}")
 
 
 @dataclass
@@ -59,6 +282,89 @@ class AIAnalysisResult:
             self.extracted_data = {}
 
 
+FINANCIAL_FIELDS = [
+    'revenue_income', 'total_expenditure', 'current_assets', 'current_liabilities',
+    'long_term_liabilities', 'total_debt', 'interest_payments', 'reserves',
+    'borrowing', 'net_worth',
+]
+
+# Regex patterns used by the fallback extractor when OpenAI fails.
+# Handle various formats: £123,456, £6.2m, 123.4 million, etc.
+# Capture both the number and the scale indicator in separate groups.
+# PRIORITY ORDER: Group Balance Sheet > Main Balance Sheet > Other sections
+#
+# Each entry is (pattern, required_terms, leading_terms). A pattern is skipped
+# when none of its required terms occur in the text; when it always begins
+# with one of its leading terms it is only tried where those terms occur.
+_FALLBACK_PATTERN_SPECS = {
+    'revenue_income': [
+        (r'total\s*income[:\s]*\(([0-9,.]+)\)', ('income',), ('total',)),  # Format: "total income (4,357.2)"
+        (r'\([0-9,.]+\)\s*total\s*income\s*\(([0-9,.]+)\)', ('income',), ()),  # Balance sheet format
+        (r'(?:total|gross)?\s*(?:revenue|income)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('revenue', 'income'), ()),
+        (r'(?:revenue|income)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('revenue', 'income'), ('revenue', 'income')),
+        (r'gross\s*income[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('income',), ('gross',)),
+    ],
+    'total_expenditure': [
+        (r'total\s*expenditure\s*([0-9,.]+)', ('expenditure',), ('total',)),  # Match: "total expenditure 1,325.8"
+        (r'([0-9,.]+)\s*total\s*expenditure', ('expenditure',), ()),  # Match: "1,325.8 total expenditure"
+        (r'(?:total|net)?\s*expenditure[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('expenditure',), ()),
+        (r'net\s*cost\s*of\s*services[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('cost',), ('net',)),
+    ],
+    'current_assets': [
+        (r'current\s*assets[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('assets',), ('current',)),
+        (r'total\s*current\s*assets[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('assets',), ('total',)),
+    ],
+    'current_liabilities': [
+        # PRIORITY 1: Group Balance Sheet patterns (Entity Group Entity Group format)
+        (r'entity\s+group\s+entity\s+group.*?current\s*liabilities.*?\([0-9,.]+\)\s*\([0-9,.]+\)\s*\([0-9,.]+\)\s*\(([0-9,.]+)\)', ('liabilities',), ('entity',)),
+        (r'current\s*liabilities.*?\([0-9,.]+\)\s*\([0-9,.]+\)\s*\([0-9,.]+\)\s*\(([0-9,.]+)\)', ('liabilities',), ('current',)),  # 4-column format, take 4th
+        # PRIORITY 2: Group Balance Sheet with "total current liabilities"
+        (r'total\s*current\s*liabilities[:\s]*\(([0-9,.]+)\)(?=.*group)', ('liabilities',), ('total',)),  # Only if "group" context nearby
+        # PRIORITY 3: Main Balance Sheet patterns  
+        (r'\([0-9,.]+\)\s*current\s*liabilities\s*\(([0-9,.]+)\)', ('liabilities',), ()),  # Format: (268.9) Current liabilities (247.3)
+        (r'total\s*current\s*liabilities[:\s]*\(([0-9,.]+)\)', ('liabilities',), ('total',)),  # Format: "total current liabilities (1,187.5)"
+        (r'current\s*liabilities[:\s]*\(([0-9,.]+)\)(?!\s*non-current)', ('liabilities',), ('current',)),  # Avoid matching subsidiary data
+        (r'current\s*liabilities[:\s]*£?\(([0-9,.]+)\)', ('liabilities',), ('current',)),  # Format: Current liabilities £(247.3) or (247.3)
+        (r'current\s*liabilities[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('liabilities',), ('current',)),
+        (r'total\s*current\s*liabilities[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('liabilities',), ('total',)),
+    ],
+    'long_term_liabilities': [
+        (r'\([0-9,.]+\)\s*long.{0,10}term\s*liabilities\s*\(([0-9,.]+)\)', ('liabilities',), ()),  # Match: "(577.8) Long-term liabilities (665.8)"
+        (r'long.{0,10}term\s*liabilities[:\s]*£?\(([0-9,.]+)\)', ('liabilities',), ('long',)),  # Match: "Long-term liabilities £(665.8)" or "(665.8)"
+        (r'(?:long.{0,10}term)\s*(?:debt|liabilities|borrowing)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('debt', 'liabilities', 'borrowing'), ('long',)),
+        (r'long\s*term\s*borrowing[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('borrowing',), ('long',)),
+    ],
+    'interest_payments': [
+        (r'interest\s*(?:payments?|paid|costs?)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('interest',), ('interest',)),
+        (r'financing\s*costs[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('financing',), ('financing',)),
+    ],
+    'total_debt': [
+        (r'total\s*(?:debt|borrowing)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('debt', 'borrowing'), ('total',)),
+        (r'gross\s*debt[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('debt',), ('gross',)),
+    ],
+    'reserves': [
+        # PRIORITY 1: Group Balance Sheet patterns (Entity Group Entity Group format)
+        (r'entity\s+group\s+entity\s+group.*?total\s*reserves.*?([0-9,.]+)\s+([0-9,.]+)\s+([0-9,.]+)\s+([0-9,.]+)', ('reserves',), ('entity',)),  # Capture all 4, use 4th
+        (r'total\s*reserves.*?([0-9,.]+)\s+([0-9,.]+)\s+([0-9,.]+)\s+([0-9,.]+)(?=.*group)', ('reserves',), ('total',)),  # 4-column format with group context
+        # PRIORITY 2: Current year patterns (avoid 3,158.3 from prior year)
+        (r'total\s*reserves[:\s]*([0-9,.]+)(?!\s*3,158)', ('reserves',), ('total',)),  # Match current year, avoid prior year 3,158.3
+        (r'([0-9,.]+)\s*total\s*reserves(?!\s*3,158)', ('reserves',), ()),  # Match: "3,059.6 total reserves" but not prior year
+        (r'\([0-9,.]+\)\s*total\s*reserves\s*\(([0-9,.]+)\)', ('reserves',), ()),  # Balance sheet format
+        (r'(?:total)?\s*reserves[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('reserves',), ()),
+        (r'usable\s*reserves[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)', ('reserves',), ('usable',)),
+    ],
+}
+
+# Compiled once at import rather than on every fallback extraction
+FALLBACK_PATTERNS = {
+    field_name: [
+        (re.compile(pattern, re.IGNORECASE), required_terms, leading_terms)
+        for pattern, required_terms, leading_terms in specs
+    ]
+    for field_name, specs in _FALLBACK_PATTERN_SPECS.items()
+}
+
+
 class TikaFinancialExtractor:
     """
     Main class for extracting financial data from PDF documents.
@@ -77,9 +383,10 @@ class TikaFinancialExtractor:
             # Process extracted data...
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[PDFExtractionCache] = None):
         """Initialize the extractor with configured endpoints."""
         self.tika_endpoint = os.getenv('TIKA_ENDPOINT', 'https://cfc-tika.onrender.com/tika')
+        self.cache = cache if cache is not None else PDFExtractionCache()
         
         # Initialize OpenAI client
         openai_key = os.getenv('OPENAI_API_KEY')
@@ -95,12 +402,14 @@ class TikaFinancialExtractor:
             'revenue', 'borrowing', 'reserves', 'balance', 'surplus', 'deficit'
         ]
 
-    def extract_text_from_pdf(self, pdf_path: str) -> ExtractionResult:
+    def extract_text_from_pdf(self, pdf_path: str, sha256: Optional[str] = None) -> ExtractionResult:
         """
         Extract text content from PDF using Apache Tika.
         
         Args:
             pdf_path: Path to the PDF file to process
+            sha256: Digest of the file when the caller has already computed
+                it (and checked the cache), so the file is not hashed twice
             
         Returns:
             ExtractionResult containing extraction details and content
@@ -119,11 +428,19 @@ class TikaFinancialExtractor:
             file_size = os.path.getsize(pdf_path) / 1024  # KB
             logger.info(f"Processing PDF file ({file_size:.1f} KB)")
             
-            # Extract text using Tika
+            # Identical PDFs share a cache entry regardless of filename
+            if sha256 is None:
+                sha256 = compute_file_sha256(pdf_path)
+                cached = self.cache.get(sha256)
+                if cached is not None:
+                    return self.cached_extraction_result(sha256, cached, start_time)
+            
+            # Extract text using Tika. Passing the open file handle lets
+            # requests stream it in blocks instead of loading it into memory.
             with open(pdf_path, 'rb') as pdf_file:
                 response = requests.put(
                     f'{self.tika_endpoint}/text',
-                    data=pdf_file.read(),
+                    data=pdf_file,
                     headers={'Content-Type': 'application/pdf'},
                     timeout=120  # 2 minutes timeout
                 )
@@ -134,21 +451,25 @@ class TikaFinancialExtractor:
                 text_content = response.text
                 character_count = len(text_content)
                 
-                # Validate extraction quality
-                found_terms = [
-                    term for term in self.financial_terms 
-                    if term.lower() in text_content.lower()
-                ]
+                # Validate extraction quality from a single scan of the text
+                text_index = scan_financial_text(text_content)
+                found_terms = text_index.terms_found(self.financial_terms)
+                page_offsets = compute_page_offsets(text_content)
                 
                 logger.info(f"Text extraction successful: {character_count:,} characters, "
                            f"{len(found_terms)} financial terms found")
                 
+                self.cache.set(sha256, text_content, page_offsets, found_terms)
+                
                 return ExtractionResult(
                     success=True,
                     text_content=text_content,
                     character_count=character_count,
                     processing_time=processing_time,
-                    financial_terms_found=found_terms
+                    financial_terms_found=found_terms,
+                    page_offsets=page_offsets,
+                    sha256=sha256,
+                    _text_index=text_index
                 )
             else:
                 error_msg = f"Tika extraction failed with status {response.status_code}: {response.text}"
@@ -178,7 +499,25 @@ class TikaFinancialExtractor:
                 error_message=error_msg
             )
 
-    def analyze_with_ai(self, text_content: str, council_name: str = "", year: str = "") -> AIAnalysisResult:
+    def cached_extraction_result(self, sha256: str, cached: Dict[str, Any],
+                                 start_time: float) -> ExtractionResult:
+        """Build an ExtractionResult from a PDFExtractionCache entry."""
+        text_content = cached['text_content']
+        logger.info(f"PDF extraction cache hit ({sha256[:12]}): "
+                   f"{len(text_content):,} characters")
+        return ExtractionResult(
+            success=True,
+            text_content=text_content,
+            character_count=len(text_content),
+            processing_time=time.time() - start_time,
+            financial_terms_found=cached.get('financial_terms_found', []),
+            page_offsets=cached.get('page_offsets') or [0],
+            sha256=sha256,
+            from_cache=True
+        )
+
+    def analyze_with_ai(self, text_content: str, council_name: str = "", year: str = "",
+                        page_index: Optional[PageOffsetIndex] = None) -> AIAnalysisResult:
         """
         Analyze extracted text using OpenAI to identify financial data.
         
@@ -186,6 +525,8 @@ class TikaFinancialExtractor:
             text_content: Raw text extracted from PDF
             council_name: Name of the council (for context)
             year: Financial year (for context)
+            page_index: Page lookup for ``text_content``; built from its
+                form feeds when omitted
             
         Returns:
             AIAnalysisResult containing extracted financial data
@@ -200,8 +541,14 @@ class TikaFinancialExtractor:
         start_time = time.time()
         
         try:
+            # One scan of the text serves content cleaning, fallback
+            # extraction, page detection and confidence scoring
+            text_index = scan_financial_text(text_content)
+            if page_index is None:
+                page_index = PageOffsetIndex.from_text(text_content)
+            
             # Pre-process content to avoid content filter issues
-            cleaned_content = self._clean_content_for_ai(text_content)
+            cleaned_content = self._clean_content_for_ai(text_content, text_index)
             
             # Prepare context-aware prompt
             context = f"Council: {council_name}, Year: {year}" if council_name or year else "Council financial statement"
@@ -258,7 +605,7 @@ class TikaFinancialExtractor:
                 print("DEBUG - Content filter triggered, attempting fallback extraction")
                 
                 # Use fallback extraction method
-                fallback_data = self._extract_financial_data_fallback(text_content)
+                fallback_data = self._extract_financial_data_fallback(text_content, text_index, page_index)
                 
                 return AIAnalysisResult(
                     success=True,
@@ -278,21 +625,17 @@ class TikaFinancialExtractor:
                     extracted_data = json.loads(raw_response)
                     
                     # Check if all financial fields are null/empty (AI found no data)
-                    financial_fields = ['revenue_income', 'total_expenditure', 'current_assets', 
-                                       'current_liabilities', 'long_term_liabilities', 'total_debt', 
-                                       'interest_payments', 'reserves', 'borrowing', 'net_worth']
-                    
                     has_financial_data = any(extracted_data.get(field) is not None and 
                                            isinstance(extracted_data.get(field), (int, float)) and 
                                            extracted_data.get(field) > 0 
-                                           for field in financial_fields)
+                                           for field in FINANCIAL_FIELDS)
                     
                     if not has_financial_data:
                         logger.warning("AI returned no financial data - using fallback extraction")
                         print("DEBUG - AI found no data, attempting fallback extraction")
                         
                         # Use fallback extraction method
-                        fallback_data = self._extract_financial_data_fallback(text_content)
+                        fallback_data = self._extract_financial_data_fallback(text_content, text_index, page_index)
                         
                         return AIAnalysisResult(
                             success=True,
@@ -304,6 +647,7 @@ class TikaFinancialExtractor:
                     
                     # Determine confidence score
                     confidence_score = self._calculate_confidence_score(extracted_data)
+                    self._attach_figure_sources(extracted_data, text_index, page_index)
                     
                     logger.info(f"Successfully extracted {len(extracted_data)} financial fields "
                               f"with confidence score {confidence_score:.2f}")
@@ -324,6 +668,7 @@ class TikaFinancialExtractor:
                     if extracted_json:
                         extracted_data = extracted_json
                         confidence_score = self._calculate_confidence_score(extracted_data)
+                        self._attach_figure_sources(extracted_data, text_index, page_index)
                         
                         logger.info(f"Successfully extracted JSON from response text")
                         return AIAnalysisResult(
@@ -358,39 +703,32 @@ class TikaFinancialExtractor:
                 error_message=error_msg
             )
 
-    def _clean_content_for_ai(self, text_content: str) -> str:
+    def _clean_content_for_ai(self, text_content: str,
+                              text_index: Optional[FinancialTextIndex] = None) -> str:
         """
         Clean content to avoid OpenAI content filter issues.
         
         Args:
             text_content: Raw PDF text content
+            text_index: Scanner index of ``text_content`` (built if omitted)
             
         Returns:
             Cleaned content safe for OpenAI processing
         """
-        # Remove metadata and problematic characters that might trigger filter
-        import re
-        
         # Remove PDF metadata
         cleaned = re.sub(r'\{"pdf:[^"]*":[^}]*\}', '', text_content)
         
-        # Keep only standard characters and financial content
-        # Focus on sections likely to contain financial data
-        financial_keywords = [
-            'income', 'expenditure', 'assets', 'liabilities', 'debt', 'revenue',
-            'borrowing', 'reserves', 'balance', 'surplus', 'deficit', 'statement',
-            'accounts', 'financial', '£', 'thousand', 'million'
-        ]
-        
-        # Split into lines and prioritize lines with financial keywords
-        lines = cleaned.split('\n')
-        financial_lines = []
+        # Index offsets only hold if nothing was removed
+        if text_index is None or len(cleaned) != len(text_content):
+            text_index = scan_financial_text(cleaned)
         
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in financial_keywords):
-                # Keep lines that contain financial terms
-                financial_lines.append(line.strip())
+        # Keep only lines that contain financial keywords. The lines are
+        # located from the keyword offsets already in the index rather than
+        # by testing every line against every keyword.
+        financial_lines = [
+            text_index.line_text(line_number).strip()
+            for line_number in text_index.lines_containing(CONTENT_KEYWORDS)
+        ]
                 
         # Join back and return first portion
         result = '\n'.join(financial_lines)
@@ -401,18 +739,23 @@ class TikaFinancialExtractor:
             
         return result
 
-    def _extract_financial_data_fallback(self, text_content: str) -> Dict[str, Any]:
+    def _extract_financial_data_fallback(self, text_content: str,
+                                         text_index: Optional[FinancialTextIndex] = None,
+                                         page_index: Optional[PageOffsetIndex] = None) -> Dict[str, Any]:
         """
         Fallback extraction method using regex patterns when OpenAI fails.
         
+        Each extracted field's metadata records the matched text, its page
+        number and its character span in the original extraction.
+        
         Args:
             text_content: Raw PDF text content
+            text_index: Scanner index of ``text_content`` (built if omitted)
+            page_index: Page lookup for ``text_content`` (built if omitted)
             
         Returns:
             Dictionary of extracted financial data
         """
-        import re
-        
         extracted_data = {
             'revenue_income': None,
             'total_expenditure': None,
@@ -431,74 +774,21 @@ class TikaFinancialExtractor:
         # Track metadata for each extraction
         extraction_metadata = {}
         
-        # Define regex patterns for financial figures
-        # Handle various formats: £123,456, £6.2m, 123.4 million, etc.
-        # Capture both the number and the scale indicator in separate groups
-        # PRIORITY ORDER: Group Balance Sheet > Main Balance Sheet > Other sections
-        patterns = {
-            'revenue_income': [
-                r'total\s*income[:\s]*\(([0-9,.]+)\)',  # Format: "total income (4,357.2)"
-                r'\([0-9,.]+\)\s*total\s*income\s*\(([0-9,.]+)\)',  # Balance sheet format
-                r'(?:total|gross)?\s*(?:revenue|income)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-                r'(?:revenue|income)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-                r'gross\s*income[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-            ],
-            'total_expenditure': [
-                r'total\s*expenditure\s*([0-9,.]+)',  # Match: "total expenditure 1,325.8"
-                r'([0-9,.]+)\s*total\s*expenditure',  # Match: "1,325.8 total expenditure"
-                r'(?:total|net)?\s*expenditure[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-                r'net\s*cost\s*of\s*services[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-            ],
-            'current_assets': [
-                r'current\s*assets[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-                r'total\s*current\s*assets[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-            ],
-            'current_liabilities': [
-                # PRIORITY 1: Group Balance Sheet patterns (Entity Group Entity Group format)
-                r'entity\s+group\s+entity\s+group.*?current\s*liabilities.*?\([0-9,.]+\)\s*\([0-9,.]+\)\s*\([0-9,.]+\)\s*\(([0-9,.]+)\)',
-                r'current\s*liabilities.*?\([0-9,.]+\)\s*\([0-9,.]+\)\s*\([0-9,.]+\)\s*\(([0-9,.]+)\)',  # 4-column format, take 4th
-                # PRIORITY 2: Group Balance Sheet with "total current liabilities"
-                r'total\s*current\s*liabilities[:\s]*\(([0-9,.]+)\)(?=.*group)',  # Only if "group" context nearby
-                # PRIORITY 3: Main Balance Sheet patterns  
-                r'\([0-9,.]+\)\s*current\s*liabilities\s*\(([0-9,.]+)\)',  # Format: (268.9) Current liabilities (247.3)
-                r'total\s*current\s*liabilities[:\s]*\(([0-9,.]+)\)',  # Format: "total current liabilities (1,187.5)"
-                r'current\s*liabilities[:\s]*\(([0-9,.]+)\)(?!\s*non-current)',  # Avoid matching subsidiary data
-                r'current\s*liabilities[:\s]*£?\(([0-9,.]+)\)',  # Format: Current liabilities £(247.3) or (247.3)
-                r'current\s*liabilities[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-                r'total\s*current\s*liabilities[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-            ],
-            'long_term_liabilities': [
-                r'\([0-9,.]+\)\s*long.{0,10}term\s*liabilities\s*\(([0-9,.]+)\)',  # Match: "(577.8) Long-term liabilities (665.8)"
-                r'long.{0,10}term\s*liabilities[:\s]*£?\(([0-9,.]+)\)',  # Match: "Long-term liabilities £(665.8)" or "(665.8)"
-                r'(?:long.{0,10}term)\s*(?:debt|liabilities|borrowing)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-                r'long\s*term\s*borrowing[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-            ],
-            'interest_payments': [
-                r'interest\s*(?:payments?|paid|costs?)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-                r'financing\s*costs[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-            ],
-            'total_debt': [
-                r'total\s*(?:debt|borrowing)[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-                r'gross\s*debt[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-            ],
-            'reserves': [
-                # PRIORITY 1: Group Balance Sheet patterns (Entity Group Entity Group format)
-                r'entity\s+group\s+entity\s+group.*?total\s*reserves.*?([0-9,.]+)\s+([0-9,.]+)\s+([0-9,.]+)\s+([0-9,.]+)',  # Capture all 4, use 4th
-                r'total\s*reserves.*?([0-9,.]+)\s+([0-9,.]+)\s+([0-9,.]+)\s+([0-9,.]+)(?=.*group)',  # 4-column format with group context
-                # PRIORITY 2: Current year patterns (avoid 3,158.3 from prior year)
-                r'total\s*reserves[:\s]*([0-9,.]+)(?!\s*3,158)',  # Match current year, avoid prior year 3,158.3
-                r'([0-9,.]+)\s*total\s*reserves(?!\s*3,158)',  # Match: "3,059.6 total reserves" but not prior year
-                r'\([0-9,.]+\)\s*total\s*reserves\s*\(([0-9,.]+)\)',  # Balance sheet format
-                r'(?:total)?\s*reserves[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-                r'usable\s*reserves[:\s]*£?([0-9,.]+)\s*(million|m|thousand|k|\s|$)',
-            ],
-        }
-        
-        text_lower = text_content.lower()
+        if text_index is None:
+            text_index = scan_financial_text(text_content)
+        if page_index is None:
+            page_index = PageOffsetIndex.from_text(text_content)
+        text_lower = text_index.text_lower
         
-        for field, field_patterns in patterns.items():
-            for pattern in field_patterns:
-                match = re.search(pattern, text_lower, re.IGNORECASE)
+        for field, field_patterns in FALLBACK_PATTERNS.items():
+            for pattern, required_terms, leading_terms in field_patterns:
+                if text_index.first_offset(required_terms) is None:
+                    continue  # Pattern cannot match without one of these terms
+                
+                if leading_terms:
+                    match = text_index.search_from_terms(pattern, leading_terms)
+                else:
+                    match = pattern.search(text_lower)
                 if match:
                     try:
                         # Handle different capture group patterns
@@ -544,11 +834,15 @@ class TikaFinancialExtractor:
                         
                         # Store metadata for this extraction
                         source_text = match.group(0)  # Full matched text
-                        page_number = self._detect_page_number_for_match(text_content, source_text)
+                        page_number = self._detect_page_number_for_match(
+                            text_content, source_text, match.start(), text_index, page_index
+                        )
                         
                         extraction_metadata[field] = {
                             'source_text': source_text,
                             'page_number': page_number,
+                            'char_start': page_index.source_offset(match.start()),
+                            'char_end': page_index.source_offset(match.start()) + len(source_text),
                             'raw_value': raw_value_str,
                             'has_comma_thousands': has_comma_thousands,
                             'scale_indicator': scale_indicator
@@ -563,55 +857,77 @@ class TikaFinancialExtractor:
         extracted_data['_metadata'] = extraction_metadata
         return extracted_data
 
-    def _detect_page_number_for_match(self, text_content: str, match_text: str) -> Optional[int]:
+    def _detect_page_number_for_match(self, text_content: str, match_text: str,
+                                      match_pos: Optional[int] = None,
+                                      text_index: Optional[FinancialTextIndex] = None,
+                                      page_index: Optional[PageOffsetIndex] = None) -> Optional[int]:
         """
         Try to detect page number based on text patterns around a matched financial figure.
         
+        When the text carries page breaks the page comes straight from the
+        page offset index. Otherwise the nearest page marker ("Page 42",
+        "p. 42", a number ending a line or standing alone on one) within 1000
+        characters is used, as collected by the text scanner.
+        
         Args:
             text_content: Full PDF text content
             match_text: The specific text that was matched
+            match_pos: Offset of the match in ``text_content``, if known
+            text_index: Scanner index of ``text_content`` (built if omitted)
+            page_index: Page lookup for ``text_content``
             
         Returns:
             Page number if detected, None otherwise
         """
-        import re
-        
         # Find the position of the match in the text
-        match_pos = text_content.lower().find(match_text.lower())
-        if match_pos == -1:
-            return None
+        if match_pos is None:
+            match_pos = text_content.lower().find(match_text.lower())
+            if match_pos == -1:
+                return None
         
-        # Look for page indicators in text around the match (within 2000 characters)
-        context_start = max(0, match_pos - 1000)
-        context_end = min(len(text_content), match_pos + 1000)
-        context = text_content[context_start:context_end]
-        
-        # Common page number patterns in UK financial statements
-        page_patterns = [
-            r'page\s+(\d+)',  # "Page 42"
-            r'p\.?\s*(\d+)',  # "p. 42" or "p 42"
-            r'(\d+)\s*(?:\r?\n|\r)',  # Number at end of line (common page footer)
-            r'^\s*(\d+)\s*$',  # Standalone number on its own line
-        ]
+        if page_index is not None and page_index.has_page_breaks:
+            return page_index.page_at(match_pos)
         
-        # Look for page numbers, preferring those closer to the match
-        best_page = None
-        best_distance = float('inf')
-        
-        for pattern in page_patterns:
-            for match_obj in re.finditer(pattern, context, re.IGNORECASE | re.MULTILINE):
-                page_num = int(match_obj.group(1))
-                # Only consider reasonable page numbers (1-200)
-                if 1 <= page_num <= 200:
-                    # Calculate distance from the financial data match
-                    page_pos = context_start + match_obj.start()
-                    distance = abs(page_pos - match_pos)
-                    
-                    if distance < best_distance:
-                        best_distance = distance
-                        best_page = page_num
+        if text_index is None:
+            text_index = scan_financial_text(text_content)
+        
+        return text_index.nearest_page_marker(match_pos, window=1000)
+
+    def _attach_figure_sources(self, extracted_data: Dict[str, Any], text_index: FinancialTextIndex,
+                               page_index: PageOffsetIndex) -> None:
+        """
+        Record where each AI-extracted value appears in the document.
+        
+        Values are matched against the document's figures (as pounds,
+        thousands or millions); matches are added to ``_metadata`` with the
+        same keys as the regex fallback.
+        """
+        if not isinstance(extracted_data, dict):
+            return
+        
+        extraction_metadata = extracted_data.get('_metadata')
+        if not isinstance(extraction_metadata, dict):
+            extraction_metadata = {}
+        
+        for field_name in FINANCIAL_FIELDS:
+            value = extracted_data.get(field_name)
+            if field_name in extraction_metadata or not isinstance(value, (int, float)) or value <= 0:
+                continue
+            figure = text_index.find_figure_for_value(value)
+            if figure is None:
+                continue
+            extraction_metadata[field_name] = {
+                'source_text': figure.raw,
+                'page_number': self._detect_page_number_for_match(
+                    text_index.text, figure.raw, figure.start, text_index, page_index
+                ),
+                'char_start': page_index.source_offset(figure.start),
+                'char_end': page_index.source_offset(figure.start) + len(figure.raw),
+                'raw_value': figure.raw,
+            }
         
-        return best_page
+        if extraction_metadata:
+            extracted_data['_metadata'] = extraction_metadata
 
     def _extract_json_from_text(self, text: str) -> Optional[Dict[str, Any]]:
         """
@@ -688,14 +1004,24 @@ class TikaFinancialExtractor:
                 'extraction': ExtractionResult,
                 'analysis': AIAnalysisResult,
                 'total_time': float,
-                'summary': str
+                'summary': str,
+                'cache_hit': bool
             }
+            
+        When the same PDF has already been extracted and analysed for this
+        council and year the cached analysis is returned without calling
+        Tika or OpenAI, so callers can go straight to mapping the extracted
+        data.
         """
+        from council_finance.services.pdf_pipeline import PDFPagePipeline
+        
         logger.info(f"Starting complete PDF processing: {pdf_path}")
         overall_start = time.time()
+        pipeline = PDFPagePipeline(self)
         
-        # Step 1: Extract text from PDF
-        extraction_result = self.extract_text_from_pdf(pdf_path)
+        # Step 1: Extract text from PDF (large documents are split into page
+        # ranges and extracted in parallel)
+        extraction_result = pipeline.extract(pdf_path)
         
         if not extraction_result.success:
             return {
@@ -703,15 +1029,24 @@ class TikaFinancialExtractor:
                 'extraction': extraction_result,
                 'analysis': None,
                 'total_time': time.time() - overall_start,
-                'summary': f"PDF extraction failed: {extraction_result.error_message}"
+                'summary': f"PDF extraction failed: {extraction_result.error_message}",
+                'cache_hit': False
             }
         
-        # Step 2: AI analysis of extracted content
-        analysis_result = self.analyze_with_ai(
-            extraction_result.text_content, 
-            council_name, 
-            year
-        )
+        # Step 2: AI analysis of extracted content (reused from the cache
+        # when this exact PDF has been analysed for this council and year)
+        analysis_result = self._get_cached_analysis(extraction_result, council_name, year)
+        cache_hit = analysis_result is not None
+        
+        if not cache_hit:
+            # Only the most relevant pages are analysed, in parallel chunks
+            analysis_result = pipeline.analyze(
+                extraction_result, 
+                council_name, 
+                year
+            )
+            if analysis_result.success and extraction_result.sha256:
+                self.cache.store_analysis(extraction_result.sha256, analysis_result, council_name, year)
         
         total_time = time.time() - overall_start
         
@@ -730,9 +1065,28 @@ class TikaFinancialExtractor:
             'extraction': extraction_result,
             'analysis': analysis_result,
             'total_time': total_time,
-            'summary': summary
+            'summary': summary,
+            'cache_hit': cache_hit
         }
 
+    def _get_cached_analysis(self, extraction_result: ExtractionResult, council_name: str = "",
+                             year: str = "") -> Optional[AIAnalysisResult]:
+        """Rebuild a previously stored AI analysis of a cached extraction for a council and year."""
+        if not extraction_result.from_cache:
+            return None
+        
+        cached_analysis = self.cache.get_analysis(extraction_result.sha256, council_name, year)
+        if not cached_analysis:
+            return None
+        
+        logger.info(f"Reusing cached AI analysis for PDF {extraction_result.sha256[:12]}")
+        return AIAnalysisResult(
+            success=True,
+            extracted_data=cached_analysis.get('extracted_data') or {},
+            confidence_score=cached_analysis.get('confidence_score', 0.0),
+            raw_response=cached_analysis.get('raw_response', '')
+        )
+
 
 class FinancialDataMapper:
     """
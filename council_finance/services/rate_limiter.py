@@ -0,0 +1,196 @@
+"""
+Sliding Window Rate Limiter - shared cache-backed rate limiting primitive.
+
+Counts events per identifier (user id, IP address...) over a sliding
+window using two fixed-window counters in the cache: the current window's
+count plus the previous window's, weighted by how much of it is still
+inside the sliding window. Counters are only ever changed with the
+cache's atomic ``add`` and ``incr``, so concurrent requests and processes
+never lose counts, and each check is one or two cache round trips with no
+database access.
+
+Usage:
+    flag_limiter = SlidingWindowRateLimiter('flags', limit=10, window_seconds=86400)
+
+    result = flag_limiter.hit(user.pk)
+    if not result.allowed:
+        ...  # Reject; retry after result.retry_after seconds
+    if result.crossed:
+        ...  # First hit over the limit in this burst: log it once
+
+Counts live only in the cache, so clearing it resets every limit.
+
+The counters are only global when the cache is shared between worker
+processes. Limiters given a ``fallback_count`` count their events from
+the database instead while the cache is process-local (the default
+``LocMemCache``), so several workers can't multiply the limit:
+
+    flag_limiter = SlidingWindowRateLimiter(
+        'flags', limit=10, window_seconds=86400,
+        fallback_count=lambda user_id, since: Flag.objects.filter(
+            flagged_by_id=user_id, created_at__gte=since).count(),
+    )
+
+Database counts only see events once they are saved, so rejected events
+don't count there, and ``retry_after`` is the whole window.
+"""
+
+import hashlib
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Cache backends whose contents are private to one process
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    count: float  # Estimated events in the window, including this one
+    limit: int
+    retry_after: int  # Seconds until the estimate drops back under the limit
+    crossed: bool = False  # This hit took the count over the limit
+
+    @property
+    def remaining(self) -> int:
+        return max(0, math.floor(self.limit - self.count))
+
+
+class SlidingWindowRateLimiter:
+    """
+    At most ``limit`` events per identifier in any ``window_seconds``;
+    see the module docstring.
+    """
+
+    def __init__(self, name: str, limit: int, window_seconds: int, cache_alias: str = 'default',
+                 fallback_count: Optional[Callable[[object, datetime], int]] = None):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.cache_alias = cache_alias
+        self.fallback_count = fallback_count
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def shared(self) -> bool:
+        """Whether every worker process sees the same cache counters."""
+        return settings.CACHES[self.cache_alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+    def _counted(self, identifier, now: Optional[float]) -> Optional[int]:
+        """Events saved in the last window, or None when the cache counters apply."""
+        if self.fallback_count is None or self.shared:
+            return None
+        now = time.time() if now is None else now
+        since = datetime.fromtimestamp(now - self.window_seconds, tz=timezone.utc)
+        return self.fallback_count(identifier, since)
+
+    def _key(self, identifier, window: int) -> str:
+        # Hashed so any identifier makes a valid cache key
+        digest = hashlib.sha1(str(identifier).encode('utf-8')).hexdigest()[:20]
+        return f"ratelimit:{self.name}:{digest}:{window}"
+
+    def _position(self, now: Optional[float]):
+        now = time.time() if now is None else now
+        window, offset = divmod(now, self.window_seconds)
+        return int(window), offset / self.window_seconds
+
+    def _estimate(self, previous: int, current: int, elapsed: float) -> float:
+        return previous * (1 - elapsed) + current
+
+    def _retry_after(self, previous: int, current: int, elapsed: float, limit: int) -> int:
+        if self._estimate(previous, current, elapsed) < limit:
+            return 0
+        if previous and current < limit:
+            # The previous window's weight decays linearly through this one
+            fraction = 1 - (limit - current) / previous
+            if fraction > elapsed:
+                return max(1, math.ceil((fraction - elapsed) * self.window_seconds))
+        return max(1, math.ceil((1 - elapsed) * self.window_seconds))
+
+    def hit(self, identifier, amount: int = 1, limit: Optional[int] = None, now: Optional[float] = None) -> RateLimitResult:
+        """
+        Count ``amount`` events for ``identifier`` and say whether they are
+        within ``limit`` (default: the limiter's). Rejected events count
+        too, so a client that keeps retrying stays limited.
+        """
+        limit = self.limit if limit is None else limit
+        saved = self._counted(identifier, now)
+        if saved is not None:
+            count = saved + amount
+            return RateLimitResult(
+                allowed=count <= limit,
+                count=count,
+                limit=limit,
+                retry_after=self.window_seconds if count > limit else 0,
+                crossed=saved <= limit < count,
+            )
+
+        window, elapsed = self._position(now)
+        key = self._key(identifier, window)
+        timeout = self.window_seconds * 2
+
+        self.cache.add(key, 0, timeout)
+        try:
+            current = self.cache.incr(key, amount)
+        except ValueError:
+            # Expired or evicted between add and incr
+            self.cache.add(key, 0, timeout)
+            current = self.cache.incr(key, amount)
+        previous = self.cache.get(self._key(identifier, window - 1), 0)
+
+        count = self._estimate(previous, current, elapsed)
+        before = self._estimate(previous, current - amount, elapsed)
+        return RateLimitResult(
+            allowed=count <= limit,
+            count=count,
+            limit=limit,
+            retry_after=self._retry_after(previous, current, elapsed, limit) if count > limit else 0,
+            crossed=before <= limit < count,
+        )
+
+    def peek(self, identifier, limit: Optional[int] = None, now: Optional[float] = None) -> RateLimitResult:
+        """Like ``hit`` without counting anything: would one more event be allowed?"""
+        limit = self.limit if limit is None else limit
+        saved = self._counted(identifier, now)
+        if saved is not None:
+            return RateLimitResult(
+                allowed=saved + 1 <= limit,
+                count=saved,
+                limit=limit,
+                retry_after=self.window_seconds if saved + 1 > limit else 0,
+            )
+
+        window, elapsed = self._position(now)
+        counts = self.cache.get_many([self._key(identifier, window - 1), self._key(identifier, window)])
+        previous = counts.get(self._key(identifier, window - 1), 0)
+        current = counts.get(self._key(identifier, window), 0)
+
+        count = self._estimate(previous, current, elapsed)
+        return RateLimitResult(
+            allowed=count + 1 <= limit,
+            count=count,
+            limit=limit,
+            retry_after=self._retry_after(previous, current + 1, elapsed, limit) if count + 1 > limit else 0,
+        )
+
+    def count(self, identifier, now: Optional[float] = None) -> float:
+        """Estimated events for ``identifier`` in the last window."""
+        return self.peek(identifier, now=now).count
+
+    def reset(self, identifier, now: Optional[float] = None) -> None:
+        window, _ = self._position(now)
+        self.cache.delete_many([self._key(identifier, window - 1), self._key(identifier, window)])
@@ -15,14 +15,17 @@ from council_finance.models import (
     AIUsageLog, AIUsageTrend, PerformanceAnomaly,
     CostForecast, LoadBalancerConfig, DailyCostSummary
 )
+from council_finance.services.ai_usage_metrics import ai_usage_metrics, as_money
 
 
 class RealtimeMonitoringService:
     """Provides real-time monitoring and analytics for the AI system."""
     
-    def __init__(self):
+    def __init__(self, metrics=None):
         self.cache_prefix = "realtime_monitor"
         self.update_interval = 60  # seconds
+        # Rolling request, error, latency and cost totals
+        self.metrics = metrics if metrics is not None else ai_usage_metrics
         
     def get_live_metrics(self):
         """Get current system metrics with caching."""
@@ -33,28 +36,18 @@ class RealtimeMonitoringService:
             return cached
         
         now = timezone.now()
-        last_hour = now - timedelta(hours=1)
-        last_5_minutes = now - timedelta(minutes=5)
         
         # Real-time request metrics
-        recent_requests = AIUsageLog.objects.filter(
-            created_at__gte=last_5_minutes
-        )
+        recent = self.metrics.recent(5 * 60)
         
         metrics = {
             'timestamp': now.isoformat(),
-            'requests_per_minute': recent_requests.count() / 5,
-            'active_councils': recent_requests.values('council').distinct().count(),
-            'current_hour_requests': AIUsageLog.objects.filter(
-                created_at__gte=last_hour
-            ).count(),
-            'success_rate_5min': self._calculate_success_rate(recent_requests),
-            'avg_response_time_5min': recent_requests.aggregate(
-                avg=Avg('processing_time_seconds')
-            )['avg'] or 0,
-            'error_rate_5min': recent_requests.filter(
-                success=False
-            ).count() / max(recent_requests.count(), 1) * 100,
+            'requests_per_minute': round(recent['requests'] / 5, 1),
+            'active_councils': self.metrics.active_councils(5 * 60),
+            'current_hour_requests': round(self.metrics.recent(60 * 60)['requests']),
+            'success_rate_5min': 100 - self._error_rate(recent),
+            'avg_response_time_5min': self._avg_response_time(recent) or 0,
+            'error_rate_5min': self._error_rate(recent),
             'cache_hit_rate': self._calculate_cache_hit_rate(),
             'system_health': self._calculate_system_health(),
         }
@@ -179,14 +172,17 @@ class RealtimeMonitoringService:
                 'message': str(e)
             }
     
-    def _calculate_success_rate(self, queryset):
-        """Calculate success rate from a queryset."""
-        total = queryset.count()
-        if total == 0:
-            return 100.0
-        
-        successful = queryset.filter(success=True).count()
-        return (successful / total) * 100
+    def _error_rate(self, totals):
+        """Error rate percentage from rolling totals."""
+        if totals['requests'] < 0.5:
+            return 0
+        return totals['errors'] / totals['requests'] * 100
+    
+    def _avg_response_time(self, totals):
+        """Average response time in seconds from rolling totals, or None without requests."""
+        if totals['requests'] < 0.5:
+            return None
+        return totals['latency'] / totals['requests']
     
     def _calculate_cache_hit_rate(self):
         """Calculate cache hit rate from recent requests."""
@@ -220,46 +216,23 @@ class RealtimeMonitoringService:
     
     def _get_current_requests_per_minute(self):
         """Get current requests per minute."""
-        last_minute = timezone.now() - timedelta(minutes=1)
-        return AIUsageLog.objects.filter(
-            created_at__gte=last_minute
-        ).count()
+        return round(self.metrics.recent(60)['requests'], 1)
     
     def _get_expected_requests_per_minute(self):
         """Get expected requests per minute based on historical data."""
-        current_hour = timezone.now().hour
-        
-        # Get average for this hour from past week
-        past_week = timezone.now().date() - timedelta(days=7)
-        
-        hourly_trends = AIUsageTrend.objects.filter(
-            date__gte=past_week,
-            hour=current_hour
-        ).aggregate(avg=Avg('request_count'))
+        # Average for this hour of the day over the past week
+        hourly_average = self.metrics.same_hour_baseline(days=7)
         
         # Convert hourly to per minute
-        return (hourly_trends['avg'] or 10) / 60
+        return (hourly_average or 10) / 60
     
     def _get_current_avg_response_time(self):
         """Get current average response time."""
-        last_5_min = timezone.now() - timedelta(minutes=5)
-        avg_time = AIUsageLog.objects.filter(
-            created_at__gte=last_5_min
-        ).aggregate(avg=Avg('processing_time_seconds'))
-        
-        return avg_time['avg'] or 2.5
+        return self._avg_response_time(self.metrics.recent(5 * 60)) or 2.5
     
     def _get_current_error_rate(self):
         """Get current error rate percentage."""
-        last_5_min = timezone.now() - timedelta(minutes=5)
-        recent = AIUsageLog.objects.filter(created_at__gte=last_5_min)
-        
-        total = recent.count()
-        if total == 0:
-            return 0
-        
-        errors = recent.filter(success=False).count()
-        return (errors / total) * 100
+        return self._error_rate(self.metrics.recent(5 * 60))
     
     def _get_current_success_rate(self):
         """Get current success rate percentage."""
@@ -267,24 +240,14 @@ class RealtimeMonitoringService:
     
     def _get_current_hour_cost(self):
         """Get cost for current hour."""
-        current_hour_start = timezone.now().replace(minute=0, second=0, microsecond=0)
-        
-        cost = AIUsageLog.objects.filter(
-            created_at__gte=current_hour_start
-        ).aggregate(total=Sum('estimated_cost'))
-        
-        return cost['total'] or Decimal('0')
+        return as_money(self.metrics.current_hour()['cost'])
     
     def _get_average_hour_cost(self):
         """Get average hourly cost from past week."""
-        past_week = timezone.now() - timedelta(days=7)
-        
-        daily_costs = DailyCostSummary.objects.filter(
-            date__gte=past_week.date()
-        ).aggregate(avg=Avg('total_estimated_cost'))
+        weekly_cost = self.metrics.history(7 * 24 * 3600)['cost']
         
-        # Convert daily to hourly
-        return (daily_costs['avg'] or Decimal('1')) / 24
+        # Convert weekly to hourly
+        return (as_money(weekly_cost / 7) if weekly_cost else Decimal('1')) / 24
     
     def _create_anomaly(self, anomaly_type, metric_name, expected, actual, severity=1):
         """Create and save a performance anomaly."""
@@ -348,39 +311,19 @@ class RealtimeMonitoringService:
     
     def _analyze_weekly_trend(self):
         """Analyze weekly usage trends."""
-        past_week = timezone.now() - timedelta(days=7)
-        
-        weekly_data = AIUsageLog.objects.filter(
-            created_at__gte=past_week
-        ).aggregate(
-            total_requests=Count('id'),
-            total_cost=Sum('estimated_cost'),
-            avg_response_time=Avg('processing_time_seconds'),
-            successful_requests=Count('id', filter=Q(success=True))
-        )
-        
-        # Calculate success rate manually
-        total_count = weekly_data['total_requests'] or 0
-        success_count = weekly_data['successful_requests'] or 0
-        calculated_success_rate = (success_count / total_count * 100) if total_count > 0 else 100.0
+        weekly = self.metrics.history(7 * 24 * 3600)
         
         return {
-            'total_requests': total_count,
-            'total_cost': float(weekly_data['total_cost'] or 0),
-            'avg_response_time': round(weekly_data['avg_response_time'] or 0, 2),
-            'success_rate': round(calculated_success_rate, 1),
+            'total_requests': round(weekly['requests']),
+            'total_cost': round(weekly['cost'], 6),
+            'avg_response_time': round(self._avg_response_time(weekly) or 0, 2),
+            'success_rate': round(100 - self._error_rate(weekly), 1),
         }
     
     def _project_monthly_cost(self):
         """Project monthly cost based on current trends."""
         # Get average daily cost from past week
-        past_week = timezone.now() - timedelta(days=7)
-        
-        daily_avg = DailyCostSummary.objects.filter(
-            date__gte=past_week.date()
-        ).aggregate(avg=Avg('total_estimated_cost'))
-        
-        daily_cost = daily_avg['avg'] or Decimal('0')
+        daily_cost = as_money(self.metrics.history(7 * 24 * 3600)['cost'] / 7)
         days_in_month = 30  # Simplified
         
         return {
@@ -392,24 +335,14 @@ class RealtimeMonitoringService:
     def _calculate_daily_forecast_cost(self):
         """Calculate forecasted daily cost."""
         # Simple average of past 7 days
-        past_week = timezone.now() - timedelta(days=7)
-        
-        avg_cost = DailyCostSummary.objects.filter(
-            date__gte=past_week.date()
-        ).aggregate(avg=Avg('total_estimated_cost'))
+        weekly_cost = self.metrics.history(7 * 24 * 3600)['cost']
         
-        return avg_cost['avg'] or Decimal('5.00')
+        return as_money(weekly_cost / 7) if weekly_cost else Decimal('5.00')
     
     def _calculate_daily_forecast_requests(self):
         """Calculate forecasted daily requests."""
         # Simple average of past 7 days
-        past_week = timezone.now() - timedelta(days=7)
-        
-        daily_requests = AIUsageLog.objects.filter(
-            created_at__gte=past_week
-        ).count() / 7
-        
-        return int(daily_requests)
+        return int(self.metrics.history(7 * 24 * 3600)['requests'] / 7)
     
     def _generate_recommendations(self):
         """Generate optimization recommendations based on current metrics."""
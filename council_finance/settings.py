@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import dj_database_url
@@ -11,6 +12,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv('SECRET_KEY', "django-insecure-change-me")
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
 
+# Running under pytest or "manage.py test"
+TESTING = 'pytest' in sys.modules or sys.argv[1:2] == ['test']
+
 # Read ALLOWED_HOSTS from environment variable
 allowed_hosts_env = os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1')
 ALLOWED_HOSTS = [host.strip() for host in allowed_hosts_env.split(',') if host.strip()]
@@ -49,6 +53,7 @@ for plugin in os.listdir(PLUGINS_DIR):
         INSTALLED_APPS.append(f"council_finance.plugins.{plugin}")
 
 MIDDLEWARE = [
+    "council_finance.middleware.request_profiling.RequestProfilingMiddleware",  # Per-route latency histograms
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Add WhiteNoise for static files
     "corsheaders.middleware.CorsMiddleware",  # CORS middleware for React
@@ -113,9 +118,36 @@ OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
 DEFAULT_FACTOID_COUNT = int(os.getenv('DEFAULT_FACTOID_COUNT', '3'))
 SITEWIDE_FACTOID_CACHE_DURATION = int(os.getenv('SITEWIDE_FACTOID_CACHE_DURATION', '86400'))
 
+# PDF statement processing: extracted text is cached on disk keyed by the
+# SHA-256 of the PDF so re-uploads skip Tika and AI analysis
+PDF_EXTRACTION_CACHE_ENABLED = os.getenv('PDF_EXTRACTION_CACHE_ENABLED', 'True').lower() == 'true'
+PDF_EXTRACTION_CACHE_DIR = os.getenv('PDF_EXTRACTION_CACHE_DIR', str(BASE_DIR / 'cache' / 'pdf_extractions'))
+
+# Large PDFs (PDF_PIPELINE_MIN_PAGES+ pages, requires pypdf) are split into
+# page ranges extracted concurrently; only the most relevant pages are sent
+# to AI analysis in parallel chunks
+PDF_PIPELINE_MIN_PAGES = int(os.getenv('PDF_PIPELINE_MIN_PAGES', '40'))
+PDF_PIPELINE_PAGES_PER_RANGE = int(os.getenv('PDF_PIPELINE_PAGES_PER_RANGE', '20'))
+PDF_PIPELINE_MAX_WORKERS = int(os.getenv('PDF_PIPELINE_MAX_WORKERS', '4'))
+PDF_PIPELINE_AI_CHUNK_CHARS = int(os.getenv('PDF_PIPELINE_AI_CHUNK_CHARS', '8000'))
+PDF_PIPELINE_MAX_AI_CHUNKS = int(os.getenv('PDF_PIPELINE_MAX_AI_CHUNKS', '4'))
+
 # App Logic Configuration
 CURRENT_FOCUS_YEAR = os.getenv('CURRENT_FOCUS_YEAR', '2024/25')
 
+# Incrementally reassess a council's data issues when its figures or
+# characteristics change
+DATA_ISSUE_REASSESS_ON_CHANGE = os.getenv('DATA_ISSUE_REASSESS_ON_CHANGE', 'True').lower() == 'true'
+
+# Seconds each process reuses the home page snapshot it read; tests read it
+# every time, since each test rolls the stored row back
+HOME_SNAPSHOT_RELOAD_SECONDS = 0 if TESTING else int(os.getenv('HOME_SNAPSHOT_RELOAD_SECONDS', '30'))
+
+# Worker processes for sharded data issue assessment (0 = one per CPU, up to 4)
+DATA_QUALITY_WORKERS = int(os.getenv('DATA_QUALITY_WORKERS', '0'))
+# How those workers are started; 'fork' is unsafe while background threads run
+DATA_QUALITY_START_METHOD = os.getenv('DATA_QUALITY_START_METHOD', 'spawn')
+
 # SQLite configuration (for rollback if needed)
 # DATABASES = {
 #     "default": {
@@ -226,11 +258,24 @@ DEFAULT_FINANCIAL_YEAR = "2024/25"
 # repeatedly generate spurious migration files.
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-# Channels configuration for WebSocket support
+# Channels configuration for WebSocket support. The SQLite layer fans
+# group messages out between worker processes on this host through a
+# shared file; CHANNEL_LAYER=memory keeps them within each process.
 ASGI_APPLICATION = "council_finance.asgi.application"
-CHANNEL_LAYERS = {
-    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
-}
+if os.getenv("CHANNEL_LAYER", "sqlite").lower() == "memory":
+    CHANNEL_LAYERS = {
+        "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "council_finance.channel_layers.SQLiteChannelLayer",
+            "CONFIG": {
+                "path": os.getenv("CHANNEL_LAYER_PATH") or None,
+                "poll_interval": float(os.getenv("CHANNEL_LAYER_POLL_INTERVAL", "0.05")),
+            },
+        }
+    }
 
 # Auto-approval defaults used when creating new user accounts. These values
 # can be overridden via the ``SiteSetting`` admin by storing integer values
@@ -353,6 +398,20 @@ FEEDBACK_EMAIL_ENABLED = os.getenv('FEEDBACK_EMAIL_ENABLED', 'True').lower() ==
 # View active jobs: 'python manage.py crontab show'
 # Remove jobs: 'python manage.py crontab remove'
 
+# ============================================================================
+# EVENT VIEWER CONFIGURATION
+# ============================================================================
+
+# Overrides of event_viewer.settings.DEFAULT_EVENT_VIEWER_SETTINGS
+EVENT_VIEWER_SETTINGS = {}
+
+if TESTING:
+    # Background threads write on their own connections, outside each
+    # test's transaction, so tests write events on the calling thread
+    EVENT_VIEWER_SETTINGS['EVENT_SINK'] = {'buffered': False, 'background_flush': False}
+    # Tests that profile requests build their own RequestProfiler
+    EVENT_VIEWER_SETTINGS['REQUEST_PROFILING'] = {'enabled': False, 'background_flush': False}
+
 # ============================================================================
 # CRON JOB CONFIGURATION
 # ============================================================================
@@ -370,6 +429,9 @@ CRONJOBS = [
     # Full counter cache warming at 2 AM daily (all counters)
     ('0 2 * * *', 'django.core.management.call_command', ['warmup_counter_cache', '--all']),
     
+    # Rebuild the home page snapshot when stale (most runs do nothing)
+    ('* * * * *', 'django.core.management.call_command', ['build_home_snapshot']),
+    
     # Event Viewer health report at 6 AM daily
     ('0 6 * * *', 'django.core.management.call_command', ['check_alerts', '--health-report']),
     
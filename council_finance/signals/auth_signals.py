@@ -0,0 +1,17 @@
+"""
+Authentication Signals
+
+Counts failed logins in the auth security monitor's sliding-window
+counters. Nothing is written to the database unless a count crosses its
+alert threshold.
+"""
+from django.contrib.auth.signals import user_login_failed
+from django.dispatch import receiver
+
+from ..services.auth_security_monitor import auth_security_monitor
+
+
+@receiver(user_login_failed)
+def count_login_failure(sender, credentials, request=None, **kwargs):
+    ip_address = request.META.get('REMOTE_ADDR') if request is not None else None
+    auth_security_monitor.record_login_failure(ip_address)
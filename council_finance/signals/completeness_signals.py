@@ -0,0 +1,70 @@
+"""
+Completeness Index Signals
+
+Keeps ``services.completeness_index`` in step with the data: a saved figure
+or characteristic sets its field bit and a deleted one clears it, once the
+surrounding transaction commits. Changes to councils, fields or years only
+bump the index version so every process reloads those dimensions.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models import Council, CouncilCharacteristic, DataField, FinancialFigure, FinancialYear
+from ..services.completeness_index import completeness_index
+from .data_change_signals import council_data_changed, is_coalescing
+
+logger = logging.getLogger(__name__)
+
+
+def _mark(council_id, field_id, year_id, present):
+    def apply():
+        try:
+            completeness_index.mark(council_id, field_id, year_id, present)
+        except Exception as e:
+            logger.error(f"Error updating completeness index for council {council_id}: {e}")
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=FinancialFigure)
+@receiver(post_save, sender=CouncilCharacteristic)
+def handle_data_saved(sender, instance, **kwargs):
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
+    if kwargs.get('raw'):
+        return  # Fixture loading
+    _mark(instance.council_id, instance.field_id, getattr(instance, 'year_id', None), True)
+
+
+@receiver(post_delete, sender=FinancialFigure)
+@receiver(post_delete, sender=CouncilCharacteristic)
+def handle_data_deleted(sender, instance, **kwargs):
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
+    _mark(instance.council_id, instance.field_id, getattr(instance, 'year_id', None), False)
+
+
+@receiver(council_data_changed)
+def handle_data_batch_changed(sender, council, year, changes, **kwargs):
+    # Sent after commit, so the index is updated directly
+    try:
+        completeness_index.mark_many(
+            council.id,
+            year.id if year is not None else None,
+            present=[change.field.id for change in changes if not change.deleted],
+            absent=[change.field.id for change in changes if change.deleted],
+        )
+    except Exception as e:
+        logger.error(f"Error updating completeness index for council {council.id}: {e}")
+
+
+@receiver([post_save, post_delete], sender=Council)
+@receiver([post_save, post_delete], sender=DataField)
+@receiver([post_save, post_delete], sender=FinancialYear)
+def handle_dimension_change(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    transaction.on_commit(completeness_index.invalidate)
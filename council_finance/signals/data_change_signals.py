@@ -0,0 +1,227 @@
+"""
+Coalesced Data Change Signal
+
+Bulk writes (``bulk_create`` upserts) skip the per-row ``post_save``
+receivers for figures and characteristics. They send ``council_data_changed``
+instead, once per council and year after the transaction commits, listing
+every field that changed. The feed, factoid, counter, data issue and
+completeness receivers each handle the whole batch in a few queries.
+
+Code that saves rows one by one (imports, merges, approvals) can get the
+same effect with ``coalesce_data_changes``::
+
+    with coalesce_data_changes(author=request.user, source='import'):
+        for row in rows:
+            FinancialFigure.objects.update_or_create(...)
+
+Inside the block the per-row receivers return early (see
+``is_coalescing``); saves and deletes are buffered and dispatched on exit
+as one deduplicated ``council_data_changed`` per (council, year). The
+stored values of a council and year are read in one query the first time
+the block saves one of its rows, and rows saved with their existing value
+are left out of the batch.
+
+Signal arguments:
+    council: The ``Council`` whose data changed
+    year: The ``FinancialYear`` of the figures, or None for characteristics
+    changes: List of ``FieldChange`` tuples
+    author: User who made the change, if known
+    source: Where the change came from (``contribution``, ``import`` ...)
+"""
+import logging
+import threading
+from contextlib import ContextDecorator
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from ..models import Council, CouncilCharacteristic, DataField, FinancialFigure, FinancialYear
+
+logger = logging.getLogger(__name__)
+
+council_data_changed = Signal()
+
+_state = threading.local()
+
+
+class FieldChange(NamedTuple):
+    """One changed field in a coalesced batch."""
+    field: Any
+    old_value: Any
+    new_value: Any
+    created: bool
+    deleted: bool = False
+
+    @property
+    def changed(self) -> bool:
+        """Whether the row was created, deleted or given a different value."""
+        return self.created or self.deleted or not same_value(self.old_value, self.new_value)
+
+
+def same_value(old_value, new_value) -> bool:
+    """Compare stored and submitted values, numerically when both are numbers (``1.50`` == ``1.5``)."""
+    if old_value is None or new_value is None:
+        return old_value is None and new_value is None
+    try:
+        return Decimal(str(old_value)) == Decimal(str(new_value))
+    except (InvalidOperation, ValueError):
+        return str(old_value) == str(new_value)
+
+
+def send_council_data_changed(council, year, changes, author=None, source='contribution'):
+    """
+    Send ``council_data_changed`` once the surrounding transaction commits
+    (immediately outside a transaction). Receiver errors are logged rather
+    than raised so one subsystem cannot block the others.
+    """
+    if not changes:
+        return
+
+    def send():
+        for handler, response in council_data_changed.send_robust(
+            sender=council.__class__,
+            council=council,
+            year=year,
+            changes=list(changes),
+            author=author,
+            source=source,
+        ):
+            if isinstance(response, Exception):
+                logger.error(f"Error in council_data_changed receiver {handler}: {response}")
+
+    transaction.on_commit(send)
+
+
+def is_coalescing() -> bool:
+    """Whether per-row data change receivers should defer to a batch."""
+    return getattr(_state, 'depth', 0) > 0
+
+
+class coalesce_data_changes(ContextDecorator):
+    """
+    Buffer figure and characteristic changes and dispatch them as one
+    ``council_data_changed`` per (council, year) when the outermost block
+    exits. Usable as a context manager or a decorator, and re-entrant.
+
+    Args:
+        author: User credited in feed updates
+        source: Change source passed to receivers
+    """
+
+    def __init__(self, author=None, source: str = 'import'):
+        self.author = author
+        self.source = source
+
+    def __enter__(self):
+        if not is_coalescing():
+            _state.pending = {}
+            _state.stored = {}
+            _state.author = self.author
+            _state.source = self.source
+        _state.depth = getattr(_state, 'depth', 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _state.depth -= 1
+        if _state.depth == 0:
+            pending, _state.pending = _state.pending, {}
+            _state.stored = {}
+            # Sent on commit, so batches from a rolled back block are dropped
+            _dispatch_batches(pending, _state.author, _state.source)
+        return False
+
+
+def _record_change(instance, created: bool, deleted: bool) -> None:
+    key = (instance.council_id, getattr(instance, 'year_id', None))
+    fields = _state.pending.setdefault(key, {})
+    previous = fields.get(instance.field_id)
+    new_value = None if deleted else _current_value(instance)
+    fields[instance.field_id] = (
+        getattr(instance, '_old_value', None) if previous is None else previous[0],
+        new_value,
+        created or (previous is not None and previous[2]),
+        deleted,
+    )
+
+
+def _current_value(instance):
+    if isinstance(instance, FinancialFigure) and instance.value is None:
+        return instance.text_value
+    return instance.value
+
+
+def _dispatch_batches(pending: Dict[Tuple[int, Optional[int]], Dict[int, tuple]], author, source) -> None:
+    if not pending:
+        return
+
+    # Three lookups for every batch instead of one per row
+    councils = Council.objects.in_bulk({council_id for council_id, _ in pending})
+    years = FinancialYear.objects.in_bulk({year_id for _, year_id in pending if year_id is not None})
+    fields = DataField.objects.in_bulk({field_id for changes in pending.values() for field_id in changes})
+
+    for (council_id, year_id), changes in pending.items():
+        council = councils.get(council_id)
+        if council is None:
+            continue  # Deleted along with its data
+        batch = [
+            FieldChange(fields[field_id], old_value, new_value, created, deleted)
+            for field_id, (old_value, new_value, created, deleted) in changes.items()
+            if field_id in fields
+        ]
+        send_council_data_changed(
+            council,
+            years.get(year_id) if year_id is not None else None,
+            [change for change in batch if change.changed],
+            author=author,
+            source=source,
+        )
+
+
+def _stored_values(sender, council_id: int, year_id: Optional[int]) -> Dict[int, Any]:
+    """
+    Stored values by field for a council (and year), read in one query the
+    first time the block touches it and kept until the block exits.
+    """
+    key = (sender, council_id, year_id)
+    values = _state.stored.get(key)
+    if values is None:
+        rows = sender.objects.filter(council_id=council_id)
+        if sender is FinancialFigure:
+            rows = rows.filter(year_id=year_id)
+            values = {
+                field_id: text_value if value is None else value
+                for field_id, value, text_value in rows.values_list('field_id', 'value', 'text_value')
+            }
+        else:
+            values = dict(rows.values_list('field_id', 'value'))
+        _state.stored[key] = values
+    return values
+
+
+@receiver(pre_save, sender=FinancialFigure)
+@receiver(pre_save, sender=CouncilCharacteristic)
+def capture_buffered_old_value(sender, instance, raw=False, **kwargs):
+    """Look up the stored value before a row's first buffered change."""
+    if not is_coalescing() or raw:
+        return
+    year_id = getattr(instance, 'year_id', None)
+    if instance.field_id in _state.pending.get((instance.council_id, year_id), {}):
+        return  # The batch already holds the value from before its first change
+    instance._old_value = _stored_values(sender, instance.council_id, year_id).get(instance.field_id)
+
+
+@receiver(post_save, sender=FinancialFigure)
+@receiver(post_save, sender=CouncilCharacteristic)
+def buffer_data_saved(sender, instance, created=False, **kwargs):
+    if is_coalescing() and not kwargs.get('raw'):
+        _record_change(instance, created, deleted=False)
+
+
+@receiver(post_delete, sender=FinancialFigure)
+@receiver(post_delete, sender=CouncilCharacteristic)
+def buffer_data_deleted(sender, instance, **kwargs):
+    if is_coalescing():
+        _record_change(instance, created=False, deleted=True)
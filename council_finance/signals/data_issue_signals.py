@@ -0,0 +1,92 @@
+"""
+Data Issue Signals
+
+Keeps the contribute queues current by incrementally reassessing a council's
+``DataIssue`` rows whenever one of its financial figures or characteristics
+is saved or deleted. Only the changed fields are reassessed, once per
+council after the surrounding transaction commits (immediately outside
+one), however many rows the transaction touched.
+
+Disable with ``DATA_ISSUE_REASSESS_ON_CHANGE = False`` (e.g. during bulk
+imports, followed by a full ``smart_assess`` run).
+"""
+import threading
+import logging
+from functools import partial
+from typing import Dict, Iterable, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models import CouncilCharacteristic, FinancialFigure
+from .data_change_signals import council_data_changed, is_coalescing
+
+logger = logging.getLogger(__name__)
+
+_pending = threading.local()
+
+
+def schedule_council_reassessment(council_id: int, field_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Queue a council for incremental reassessment on transaction commit,
+    limited to ``field_ids`` when given (every field otherwise).
+    """
+    if not getattr(settings, 'DATA_ISSUE_REASSESS_ON_CHANGE', True):
+        return
+
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _reassess({council_id: None if field_ids is None else set(field_ids)})  # Autocommit
+        return
+
+    # Commit, rollback and savepoint rollback all replace the connection's
+    # callback list, so a different list means the queued callback has run
+    # or may have been discarded; queue a fresh one with its own councils
+    if getattr(_pending, 'queue', None) is not connection.run_on_commit:
+        _pending.councils = councils = {}
+        transaction.on_commit(partial(_reassess, councils))
+        _pending.queue = connection.run_on_commit
+
+    councils = _pending.councils
+    if council_id in councils and councils[council_id] is None:
+        return  # Already queued for every field
+    if field_ids is None:
+        councils[council_id] = None
+    else:
+        councils.setdefault(council_id, set()).update(field_ids)
+
+
+def _reassess(councils: Dict[int, Optional[Set[int]]]) -> None:
+    from ..incremental_data_quality import reassess_council_data_issues
+
+    if councils is getattr(_pending, 'councils', None):
+        _pending.councils = _pending.queue = None
+
+    for council_id, field_ids in sorted(councils.items()):
+        if field_ids is not None and not field_ids:
+            continue
+        try:
+            reassess_council_data_issues(council_id, field_ids)
+        except Exception as e:
+            logger.error(f"Error reassessing data issues for council {council_id}: {e}")
+
+
+@receiver([post_save, post_delete], sender=FinancialFigure)
+@receiver([post_save, post_delete], sender=CouncilCharacteristic)
+def handle_council_data_change(sender, instance, **kwargs):
+    """
+    Reassess the changed field's data issues after a figure or characteristic changes
+    """
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
+    if kwargs.get('raw'):
+        return  # Fixture loading
+    schedule_council_reassessment(instance.council_id, [instance.field_id])
+
+
+@receiver(council_data_changed)
+def handle_council_data_batch_change(sender, council, changes=(), **kwargs):
+    """Reassess once for a coalesced batch of field changes"""
+    schedule_council_reassessment(council.id, {change.field.pk for change in changes})
@@ -4,7 +4,7 @@ Real-time Factoid Signals
 This module sets up Django signals to automatically maintain factoid dependencies
 and invalidate instances when data changes, ensuring real-time responsiveness.
 """
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_init, post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.core.cache import cache
@@ -18,7 +18,9 @@ from ..models import (
     CouncilCharacteristic,
     FinancialFigure,
 )
-from ..services.factoid_engine import FactoidEngine
+from ..services.factoid_engine import FactoidEngine, invalidate_render_plan
+from ..services.factoid_invalidation import factoid_invalidator
+from .data_change_signals import council_data_changed, is_coalescing
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,9 @@ def update_factoid_template_dependencies(sender, instance, created, **kwargs):
     """
     Update field dependencies when a factoid template is saved
     """
+    # Recompile the template on its next render
+    invalidate_render_plan(instance.pk)
+    
     try:
         engine = FactoidEngine()
         engine.update_field_dependencies(instance)
@@ -41,17 +46,35 @@ def update_factoid_template_dependencies(sender, instance, created, **kwargs):
         logger.error(f"Error updating template dependencies for {instance.name}: {e}")
 
 
+@receiver(post_delete, sender=FactoidTemplate)
+def drop_factoid_template_render_plan(sender, instance, **kwargs):
+    """
+    Forget the compiled render plan of a deleted template
+    """
+    invalidate_render_plan(instance.pk)
+
+
+@receiver(post_init, sender=DataField)
+def remember_data_field_lookup(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not loaded
+    instance._factoid_lookup = (instance.__dict__.get('slug'), instance.__dict__.get('category'))
+
+
 @receiver(post_save, sender=DataField)
 def handle_data_field_change(sender, instance, created, **kwargs):
     """
-    Handle changes to data fields - invalidate dependent factoids
+    Handle changes to data fields - invalidate dependent factoids when the
+    field's slug or category (how its values are looked up) changes
     """
+    previous = getattr(instance, '_factoid_lookup', None)
+    instance._factoid_lookup = (instance.slug, instance.category)
+    if created or previous == instance._factoid_lookup:
+        return  # Labels, descriptions etc. don't change rendered factoids
     try:
-        if not created:  # Only for updates, not new fields
-            engine = FactoidEngine()
-            engine.invalidate_instances_for_field(instance)
-            logger.info(f"Invalidated factoids dependent on field: {instance.name}")
-            
+        engine = FactoidEngine()
+        engine.invalidate_instances_for_field(instance)
+        logger.info(f"Invalidated factoids dependent on field: {instance.name}")
+        
     except Exception as e:
         logger.error(f"Error handling field change for {instance.name}: {e}")
 
@@ -86,23 +109,13 @@ def handle_council_characteristic_change(sender, instance, created, **kwargs):
     """
     Invalidate factoids when council characteristics change
     """
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
     try:
-        # Find factoids that might be affected
-        field_name = instance.field.variable_name if instance.field else None
-        
-        if field_name:
-            # Invalidate instances for this council and field
-            affected_instances = FactoidInstance.objects.filter(
-                council=instance.council,
-                financial_year=instance.year,
-                template__referenced_fields__contains=[field_name]
-            )
-            
-            affected_instances.update(expires_at=timezone.now())
-            
-            count = affected_instances.count()
-            if count > 0:
-                logger.info(f"Invalidated {count} factoid instances due to characteristic change: {field_name}")
+        if instance.field_id:
+            # Characteristics have no year: every year's instances of
+            # dependent templates for this council, once committed
+            factoid_invalidator.invalidate(instance.council, None, [instance.field_id])
             
             # Also invalidate AI factoid cache for this council
             ai_cache_key = f"ai_factoids:{instance.council.slug}"
@@ -118,23 +131,13 @@ def handle_financial_figure_change(sender, instance, created, **kwargs):
     """
     Invalidate factoids when financial figures change
     """
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
     try:
-        # Find factoids that might be affected
-        field_name = instance.field.variable_name if instance.field else None
-        
-        if field_name:
-            # Invalidate instances for this council and field
-            affected_instances = FactoidInstance.objects.filter(
-                council=instance.council,
-                financial_year=instance.year,
-                template__referenced_fields__contains=[field_name]
-            )
-            
-            affected_instances.update(expires_at=timezone.now())
-            
-            count = affected_instances.count()
-            if count > 0:
-                logger.info(f"Invalidated {count} factoid instances due to financial figure change: {field_name}")
+        if instance.field_id:
+            # Dependent templates' instances for this council and year,
+            # once committed
+            factoid_invalidator.invalidate(instance.council, instance.year, [instance.field_id])
             
             # Also invalidate AI factoid cache for this council
             ai_cache_key = f"ai_factoids:{instance.council.slug}"
@@ -145,6 +148,24 @@ def handle_financial_figure_change(sender, instance, created, **kwargs):
         logger.error(f"Error handling financial figure change: {e}")
 
 
+@receiver(council_data_changed)
+def handle_council_data_batch_change(sender, council, year, changes, **kwargs):
+    """
+    Invalidate factoids once for a coalesced batch of field changes
+    """
+    try:
+        field_ids = [change.field.pk for change in changes]
+        
+        if field_ids:
+            factoid_invalidator.invalidate(council, year, field_ids)
+            
+            cache.delete(f"ai_factoids:{council.slug}")
+            logger.info(f"Invalidated AI factoid cache for {council.slug} due to batch data change")
+                
+    except Exception as e:
+        logger.error(f"Error handling batch data change: {e}")
+
+
 @receiver(pre_save, sender=FactoidTemplate)
 def validate_factoid_template_before_save(sender, instance, **kwargs):
     """
@@ -16,6 +16,7 @@ from ..models import (
     FeedUpdate, FollowableItem
 )
 from ..services.following_services import FeedService
+from .data_change_signals import council_data_changed, is_coalescing
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -31,6 +32,7 @@ class FeedUpdateHooks:
     
     _hooks = {
         'financial_data_changed': [],
+        'financial_data_batch_changed': [],
         'contribution_created': [],
         'council_updated': [],
         'list_updated': [],
@@ -239,8 +241,64 @@ def create_list_change_feed_update(instance, event_data, **kwargs):
         return None
 
 
+def create_financial_data_batch_feed_update(instance, event_data, **kwargs):
+    """
+    Default hook for coalesced financial data changes.
+    Creates a single feed update listing every field changed for a council/year.
+    """
+    try:
+        council = instance
+        year = event_data.get('year')
+        changes = event_data.get('changes', [])
+        
+        if len(changes) == 1:
+            change = changes[0]
+            event = {'old_value': change.old_value, 'author': event_data.get('author')}
+            figure = FinancialFigure(council=council, field=change.field, year=year, value=change.new_value)
+            return create_financial_data_feed_update(figure, event)
+        
+        field_names = [change.field.name for change in changes]
+        year_label = year.label if year else None
+        title = f"{council.name}: {len(changes)} figures updated" + (f" for {year_label}" if year_label else "")
+        message = ", ".join(field_names[:5]) + (f" and {len(field_names) - 5} more" if len(field_names) > 5 else "")
+        
+        rich_content = {
+            'change_type': 'batch',
+            'council_slug': council.slug,
+            'council_name': council.name,
+            'year': year_label,
+            'fields': [
+                {
+                    'field_name': change.field.name,
+                    'field_slug': change.field.slug,
+                    'old_value': str(change.old_value) if change.old_value is not None else None,
+                    'new_value': str(change.new_value) if change.new_value is not None else None,
+                    'change_type': 'new' if change.created else 'updated',
+                }
+                for change in changes
+            ],
+        }
+        
+        feed_update = FeedService.create_update(
+            source_object=council,
+            update_type='financial',
+            title=title,
+            message=message,
+            author=event_data.get('author'),
+            rich_content=rich_content
+        )
+        
+        logger.info(f"Created batch financial feed update {feed_update.id} for {council.name} ({len(changes)} fields)")
+        return feed_update
+        
+    except Exception as e:
+        logger.error(f"Failed to create batch financial data feed update: {e}")
+        return None
+
+
 # Register default hooks
 FeedUpdateHooks.register_hook('financial_data_changed', create_financial_data_feed_update)
+FeedUpdateHooks.register_hook('financial_data_batch_changed', create_financial_data_batch_feed_update)
 FeedUpdateHooks.register_hook('contribution_created', create_contribution_feed_update)
 FeedUpdateHooks.register_hook('list_updated', create_list_change_feed_update)
 
@@ -248,6 +306,8 @@ FeedUpdateHooks.register_hook('list_updated', create_list_change_feed_update)
 @receiver(pre_save, sender=FinancialFigure)
 def capture_financial_figure_old_value(sender, instance, **kwargs):
     """Capture the old value before saving to track changes."""
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
     if instance.pk:
         try:
             old_instance = FinancialFigure.objects.get(pk=instance.pk)
@@ -264,6 +324,8 @@ def financial_figure_updated(sender, instance, created, **kwargs):
     Signal handler for FinancialFigure changes.
     Triggers feed updates when financial data is added or updated.
     """
+    if is_coalescing():
+        return  # Dispatched as a batch by coalesce_data_changes
     try:
         # Skip if this is a bulk operation or migration
         if kwargs.get('raw', False):
@@ -291,6 +353,29 @@ def financial_figure_updated(sender, instance, created, **kwargs):
         logger.error(f"Error in financial_figure_updated signal: {e}")
 
 
+@receiver(council_data_changed)
+def council_financial_data_batch_changed(sender, council, year, changes, **kwargs):
+    """
+    Signal handler for coalesced data changes.
+    Triggers one feed update per council/year for financial figure batches.
+    """
+    try:
+        if year is None:
+            return  # Characteristics have no feed updates
+        
+        # Only values that are new or actually changed
+        changes = [change for change in changes if not change.deleted and change.changed]
+        if changes:
+            FeedUpdateHooks.trigger_hooks(
+                'financial_data_batch_changed',
+                council,
+                {'year': year, 'changes': changes, 'author': kwargs.get('author')}
+            )
+    
+    except Exception as e:
+        logger.error(f"Error in council_financial_data_batch_changed signal: {e}")
+
+
 @receiver(post_save, sender=Contribution)
 def contribution_created(sender, instance, created, **kwargs):
     """
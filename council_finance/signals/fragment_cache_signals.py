@@ -0,0 +1,47 @@
+"""
+Fragment Cache Signals
+
+Purges council page fragments (see ``services.fragment_cache``) by tag
+when the definitions and records they were built from change. Figure and
+characteristic changes are purged by ``counter_invalidation_service``.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ..models import ActivityLog, Council, CouncilCounter, CounterDefinition, DataField
+from ..services.fragment_cache import council_activity_tag, council_tag, fragment_cache
+
+
+@receiver(post_save, sender=Council)
+@receiver(post_delete, sender=Council)
+def purge_council_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fragment_cache.purge(council_tag(instance.slug))
+
+
+@receiver(post_save, sender=CouncilCounter)
+@receiver(post_delete, sender=CouncilCounter)
+def purge_council_counter_fragments(sender, instance, raw=False, **kwargs):
+    # Per-council counter overrides
+    if not raw:
+        fragment_cache.purge(council_tag(instance.council.slug))
+
+
+@receiver(post_save, sender=CounterDefinition)
+@receiver(post_delete, sender=CounterDefinition)
+def purge_counter_fragments(sender, raw=False, **kwargs):
+    if not raw:
+        fragment_cache.purge('counters')
+
+
+@receiver(post_save, sender=DataField)
+@receiver(post_delete, sender=DataField)
+def purge_field_fragments(sender, raw=False, **kwargs):
+    if not raw:
+        fragment_cache.purge('fields')
+
+
+@receiver(post_save, sender=ActivityLog)
+def purge_activity_fragments(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw and instance.related_council_id:
+        fragment_cache.purge(council_activity_tag(instance.related_council.slug))
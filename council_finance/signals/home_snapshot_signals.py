@@ -0,0 +1,40 @@
+"""
+Home Snapshot Signals
+
+Marks the home page snapshot dirty when something it shows changes, so
+the scheduled ``build_home_snapshot`` job rebuilds it.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ..models import Contribution, Council, CounterResult, DataIssue, GroupCounter, SiteCounter
+from ..services.home_snapshot import home_snapshot
+from .data_change_signals import council_data_changed
+
+
+@receiver(post_save, sender=Council)
+@receiver(post_delete, sender=Council)
+@receiver(post_save, sender=Contribution)
+@receiver(post_delete, sender=Contribution)
+@receiver(post_save, sender=DataIssue)
+@receiver(post_delete, sender=DataIssue)
+@receiver(post_save, sender=SiteCounter)
+@receiver(post_delete, sender=SiteCounter)
+@receiver(post_save, sender=GroupCounter)
+@receiver(post_delete, sender=GroupCounter)
+def mark_home_snapshot_dirty(sender, raw=False, **kwargs):
+    if not raw:
+        home_snapshot.mark_dirty()
+
+
+@receiver(post_save, sender=CounterResult)
+def mark_home_snapshot_dirty_for_totals(sender, instance, raw=False, **kwargs):
+    # Only site-wide totals appear on the home page
+    if not raw and instance.council_id is None:
+        home_snapshot.mark_dirty()
+
+
+@receiver(council_data_changed)
+def mark_home_snapshot_dirty_for_data(sender, **kwargs):
+    # Completion percentage
+    home_snapshot.mark_dirty()
@@ -0,0 +1,47 @@
+"""
+Live Update Signals
+
+Pushes counter result changes and new feed entries to the council and
+counter groups in ``services.live_updates``. Counter results are only
+pushed when their value actually changes. Activity rows written with
+``bulk_create`` skip these receivers; ``services.bulk_data_save`` pushes
+its own.
+"""
+import logging
+
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from ..models import ActivityLog, CounterResult
+from ..services.live_updates import live_updates
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_init, sender=CounterResult)
+def remember_counter_value(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred value is not loaded
+    instance._live_value = instance.__dict__.get('value')
+
+
+@receiver(post_save, sender=CounterResult)
+def push_counter_result(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous, instance._live_value = getattr(instance, '_live_value', None), instance.value
+    if not created and previous == instance.value:
+        return
+    try:
+        live_updates.publish_counter_result(instance)
+    except Exception as e:
+        logger.error(f"Error publishing counter result {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=ActivityLog)
+def push_activity(sender, instance, created=False, raw=False, **kwargs):
+    if not created or raw or not instance.related_council_id:
+        return
+    try:
+        live_updates.publish_activity(instance)
+    except Exception as e:
+        logger.error(f"Error publishing activity {instance.pk}: {e}")
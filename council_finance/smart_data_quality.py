@@ -101,6 +101,12 @@ def smart_assess_data_issues() -> int:
         Contribution.objects.values_list('council_id', 'field_id', 'year_id')
     )
     
+    # Stored characteristic values, fetched once instead of per council and field
+    characteristic_keys = set(
+        CouncilCharacteristic.objects.exclude(value__in=['', None])
+        .values_list('council_id', 'field_id')
+    )
+    
     issues_to_create = []
     count = 0
     
@@ -125,13 +131,8 @@ def smart_assess_data_issues() -> int:
             if field.slug in COUNCIL_ATTRS:
                 has_data = COUNCIL_ATTRS[field.slug](council)
             else:
-                # For other characteristics, check if a CouncilCharacteristic exists
-                has_data = CouncilCharacteristic.objects.filter(
-                    council=council,
-                    field=field
-                ).exclude(
-                    value__in=['', None]
-                ).exists()
+                # For other characteristics, check the prefetched characteristics
+                has_data = (council.id, field.id) in characteristic_keys
             
             if not has_data:
                 # Add priority flag to the issue for smart sorting later
@@ -290,6 +291,11 @@ def generate_missing_data_issues_for_council(council) -> int:
     
     # === ASSESS CHARACTERISTIC DATA (yearless) ===
     char_fields = list(DataField.objects.filter(category='characteristic').exclude(slug='council_name'))
+    characteristic_field_ids = set(
+        CouncilCharacteristic.objects.filter(council=council)
+        .exclude(value__in=['', None])
+        .values_list('field_id', flat=True)
+    )
     
     # Map characteristic slugs to council attribute checks
     COUNCIL_ATTRS = {
@@ -308,13 +314,8 @@ def generate_missing_data_issues_for_council(council) -> int:
         if field.slug in COUNCIL_ATTRS:
             has_data = COUNCIL_ATTRS[field.slug](council)
         else:
-            # For other characteristics, check if a CouncilCharacteristic exists
-            has_data = CouncilCharacteristic.objects.filter(
-                council=council,
-                field=field
-            ).exclude(
-                value__in=['', None]
-            ).exists()
+            # For other characteristics, check the prefetched characteristics
+            has_data = field.id in characteristic_field_ids
         
         if not has_data:
             # Create missing data issue for characteristic
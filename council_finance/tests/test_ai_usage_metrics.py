@@ -0,0 +1,91 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from council_finance.models import AIUsageLog, Council
+from council_finance.services.ai_usage_metrics import AIUsageMetrics, RollingWindow
+from council_finance.services.realtime_monitoring import RealtimeMonitoringService
+
+
+class RollingWindowTest(TestCase):
+    def test_oldest_slot_is_prorated_and_slots_are_reused(self):
+        window = RollingWindow(60, 3)
+        start = timezone.now().replace(second=0, microsecond=0)
+        window.add(start, errors=1, latency=2.0, cost=0.5)
+        window.add(start + timedelta(seconds=60))
+        window.add(start + timedelta(seconds=120), latency=4.0)
+
+        totals = window.totals(120, now=start + timedelta(seconds=150))
+        self.assertEqual(totals['requests'], 2.5)  # Half of the first minute
+        self.assertEqual(totals['errors'], 0.5)
+        self.assertEqual(totals['latency'], 5.0)
+
+        # A fourth minute takes the first minute's slot
+        window.add(start + timedelta(seconds=180))
+        totals = window.totals(600, now=start + timedelta(seconds=190))
+        self.assertEqual(totals['requests'], 3)
+        self.assertEqual(totals['cost'], 0)
+
+
+class AIUsageMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.council = Council.objects.create(name="Metricton", slug="metricton")
+        self.metrics = AIUsageMetrics(cache_prefix='test_ai_usage_metrics')
+        self.service = RealtimeMonitoringService(metrics=self.metrics)
+
+    def log(self, success=True, seconds=2.0, cost='0.001', ago=None):
+        usage_log = AIUsageLog.objects.create(
+            council=self.council,
+            processing_time_seconds=seconds,
+            estimated_cost=Decimal(cost),
+            success=success,
+        )
+        if ago is not None:
+            AIUsageLog.objects.filter(pk=usage_log.pk).update(created_at=timezone.now() - ago)
+        return usage_log
+
+    def test_windows_are_loaded_from_logs_once(self):
+        self.log()
+        self.log(success=False, seconds=4.0)
+        self.log(ago=timedelta(minutes=30))
+
+        self.assertEqual(self.metrics.recent(5 * 60)['requests'], 2)
+        with self.assertNumQueries(0):
+            live = self.service.get_live_metrics()
+            self.assertEqual(self.service._get_current_error_rate(), 50)
+
+        self.assertEqual(live['requests_per_minute'], 0.4)
+        self.assertEqual(live['active_councils'], 1)
+        self.assertEqual(live['current_hour_requests'], 3)
+        self.assertEqual(live['avg_response_time_5min'], 3.0)
+        self.assertEqual(live['error_rate_5min'], 50)
+
+    def test_recorded_logs_are_counted_once_across_resyncs(self):
+        self.log()
+        self.metrics.ensure_fresh()
+
+        usage_log = self.log()
+        self.metrics.record(processing_time=2.0, cost=Decimal('0.001'), council_id=self.council.id,
+                            at=usage_log.created_at)
+        self.assertEqual(self.metrics.recent(60)['requests'], 2)
+
+        self.metrics.resync()  # Reuses the cached snapshot, replays the new log
+        self.assertEqual(self.metrics.recent(60)['requests'], 2)
+
+        cache.clear()
+        self.metrics.resync()  # Fresh snapshot already includes it
+        self.assertEqual(self.metrics.recent(60)['requests'], 2)
+        self.assertEqual(self.service._get_current_hour_cost(), Decimal('0.002'))
+
+    def test_baselines_and_forecasts_come_from_the_hour_window(self):
+        self.log(cost='0.7', ago=timedelta(days=1))
+        self.log(cost='0.7', ago=timedelta(days=3, hours=2))
+
+        self.assertEqual(self.metrics.same_hour_baseline(days=7), 1 / 7)
+        self.assertEqual(self.service._get_expected_requests_per_minute(), 1 / 7 / 60)
+        self.assertEqual(self.service._calculate_daily_forecast_cost(), Decimal('0.2'))
+        self.assertEqual(self.service._analyze_weekly_trend()['total_requests'], 2)
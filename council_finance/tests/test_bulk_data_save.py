@@ -0,0 +1,178 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from council_finance.models import (
+    ActivityLog,
+    Council,
+    CouncilCharacteristic,
+    DataField,
+    FeedUpdate,
+    FinancialFigure,
+    FinancialFigureHistory,
+    FinancialYear,
+)
+from council_finance.services.bulk_data_save import (
+    BulkSaveError,
+    bulk_save_characteristics,
+    bulk_save_financial_figures,
+)
+from council_finance.signals.data_change_signals import coalesce_data_changes, council_data_changed
+
+
+@override_settings(DATA_ISSUE_REASSESS_ON_CHANGE=False)
+class BulkDataSaveTests(TestCase):
+    def setUp(self):
+        self.council = Council.objects.create(name="Upsertford", slug="upsertford")
+        self.year = FinancialYear.objects.create(label="2024/25")
+        self.fields = [
+            DataField.objects.create(name=f"Line {n}", slug=f"line-{n}", category="income", content_type="monetary")
+            for n in range(60)
+        ]
+        self.link = DataField.objects.create(name="Statement", slug="statement", category="general", content_type="url")
+        self.batches = []
+        council_data_changed.connect(self.record_batch)
+
+    def tearDown(self):
+        council_data_changed.disconnect(self.record_batch)
+
+    def record_batch(self, sender, council, year, changes, **kwargs):
+        self.batches.append((council, year, changes))
+
+    def test_sixty_fields_in_a_handful_of_queries(self):
+        values = {field: str(n * 1000) for n, field in enumerate(self.fields)}
+        values[self.link] = "https://upsertford.gov.uk/accounts.pdf"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            # Savepoint, select, one insert each for figures, history and activity
+            # log rows (split in two by SQLite's variable limit), release
+            with self.assertNumQueries(7):
+                result = bulk_save_financial_figures(self.council, self.year, values)
+
+        self.assertEqual(result.created, 61)
+        self.assertEqual(FinancialFigure.objects.filter(council=self.council).count(), 61)
+        self.assertEqual(FinancialFigureHistory.objects.count(), 60)
+        self.assertEqual(ActivityLog.objects.filter(related_council=self.council).count(), 61)
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0][2]), 61)
+
+    def test_upsert_updates_only_changed_values(self):
+        bulk_save_financial_figures(self.council, self.year, {self.fields[0]: "10", self.fields[1]: "20"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = bulk_save_financial_figures(self.council, self.year, {self.fields[0]: "10", self.fields[1]: "25"})
+
+        self.assertEqual((result.created, result.updated, result.unchanged), (0, 1, 1))
+        self.assertEqual(FinancialFigure.objects.get(field=self.fields[1]).value, Decimal("25"))
+        change = self.batches[-1][2][0]
+        self.assertEqual((change.old_value, change.new_value), (Decimal("20"), Decimal("25")))
+
+    def test_invalid_number_writes_nothing(self):
+        with self.assertRaises(BulkSaveError):
+            bulk_save_financial_figures(self.council, self.year, {self.fields[0]: "1", self.fields[1]: "lots"})
+        self.assertFalse(FinancialFigure.objects.exists())
+
+    def test_characteristics_upsert(self):
+        website = DataField.objects.create(name="Website", slug="council-website", category="characteristic")
+        bulk_save_characteristics(self.council, {website: "https://old.example"})
+        result = bulk_save_characteristics(self.council, {website: "https://new.example"})
+
+        self.assertEqual(result.updated, 1)
+        self.assertEqual(CouncilCharacteristic.objects.get(council=self.council).value, "https://new.example")
+
+
+@override_settings(DATA_ISSUE_REASSESS_ON_CHANGE=False)
+class CoalesceDataChangesTests(TestCase):
+    def setUp(self):
+        self.council = Council.objects.create(name="Batchley", slug="batchley")
+        self.year = FinancialYear.objects.create(label="2024/25")
+        self.debt = DataField.objects.create(name="Debt", slug="debt", category="balance_sheet", content_type="monetary")
+        self.reserves = DataField.objects.create(name="Reserves", slug="reserves", category="balance_sheet", content_type="monetary")
+        self.website = DataField.objects.create(name="Website", slug="council-website", category="characteristic")
+        self.batches = []
+        self.changes = []
+        council_data_changed.connect(self.record_batch)
+
+    def tearDown(self):
+        council_data_changed.disconnect(self.record_batch)
+
+    def record_batch(self, sender, council, year, changes, **kwargs):
+        self.batches.append((year, sorted(change.field.slug for change in changes), kwargs["source"]))
+        self.changes.extend(changes)
+
+    def test_one_deduplicated_batch_per_council_year(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with coalesce_data_changes(source="import"):
+                debt = FinancialFigure.objects.create(council=self.council, field=self.debt, year=self.year, value=1)
+                with coalesce_data_changes():  # Nested blocks join the outer batch
+                    debt.value = 2
+                    debt.save()
+                FinancialFigure.objects.create(council=self.council, field=self.reserves, year=self.year, value=3)
+                CouncilCharacteristic.objects.create(council=self.council, field=self.website, value="https://b.gov.uk")
+                self.assertEqual(self.batches, [])
+
+        self.assertCountEqual(self.batches, [
+            (self.year, ["debt", "reserves"], "import"),
+            (None, ["council-website"], "import"),
+        ])
+
+    def test_decorator_form(self):
+        @coalesce_data_changes()
+        def import_rows():
+            FinancialFigure.objects.create(council=self.council, field=self.debt, year=self.year, value=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_rows()
+
+        self.assertEqual(len(self.batches), 1)
+
+    def test_batch_carries_stored_old_values(self):
+        debt = FinancialFigure.objects.create(council=self.council, field=self.debt, year=self.year, value=100)
+        website = CouncilCharacteristic.objects.create(council=self.council, field=self.website, value="https://a.gov.uk")
+        feed_updates = FeedUpdate.objects.count()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with coalesce_data_changes():
+                debt.value = 250
+                debt.save()
+                debt.value = 300
+                debt.save()
+                website.value = "https://b.gov.uk"
+                website.save()
+
+        changes = {change.field.slug: change for change in self.changes}
+        self.assertEqual((changes["debt"].old_value, changes["debt"].new_value), (Decimal("100"), 300))
+        self.assertFalse(changes["debt"].created)
+        self.assertEqual(FeedUpdate.objects.count(), feed_updates + 1)
+
+    def test_old_values_are_read_once_per_council_year(self):
+        figures = [
+            FinancialFigure.objects.create(council=self.council, field=field, year=self.year, value=1)
+            for field in (self.debt, self.reserves)
+        ]
+        table = FinancialFigure._meta.db_table
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with coalesce_data_changes():
+                with CaptureQueriesContext(connection) as queries:
+                    for figure in figures:
+                        figure.value = 2
+                        figure.save()
+
+        reads = [query for query in queries if query['sql'].startswith('SELECT') and table in query['sql']]
+        self.assertEqual(len(reads), 1)
+        self.assertEqual([change.old_value for change in self.changes], [Decimal("1"), Decimal("1")])
+
+    def test_unchanged_resave_emits_nothing(self):
+        debt = FinancialFigure.objects.create(council=self.council, field=self.debt, year=self.year, value=Decimal("100.00"))
+        feed_updates = FeedUpdate.objects.count()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with coalesce_data_changes():
+                debt.value = 100.0  # As submitted by the council page editor
+                debt.save()
+
+        self.assertEqual(self.batches, [])
+        self.assertEqual(FeedUpdate.objects.count(), feed_updates)
@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from council_finance.models import (
+    CompletenessBitset,
+    Council,
+    CouncilCharacteristic,
+    DataField,
+    FinancialFigure,
+    FinancialYear,
+)
+from council_finance.services.completeness_index import CompletenessIndex, field_mask
+
+
+class CompletenessIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.year = FinancialYear.objects.create(label="2024/25")
+        self.debt = DataField.objects.create(name="Total Debt", slug="total_debt", category="balance_sheet")
+        self.reserves = DataField.objects.create(name="Reserves", slug="usable_reserves", category="balance_sheet")
+        self.website = DataField.objects.create(name="Website", slug="council_website", category="characteristic")
+        self.council = Council.objects.create(name="Bitton", slug="bitton")
+        self.other = Council.objects.create(name="Maskley", slug="maskley")
+        # bulk_create skips post_save (other receivers need PostgreSQL)
+        FinancialFigure.objects.bulk_create([
+            FinancialFigure(council=self.council, field=self.debt, year=self.year, value=100),
+        ])
+        CouncilCharacteristic.objects.bulk_create([
+            CouncilCharacteristic(council=self.council, field=self.website, value="https://bitton.gov.uk"),
+        ])
+
+    def test_popcount_completion(self):
+        index = CompletenessIndex()
+        index.rebuild()
+        financial = index.category_mask(["balance_sheet"])
+
+        self.assertEqual(index.council_completion(self.council.id, financial, self.year.id)["percentage"], 50)
+        self.assertEqual(index.year_completion(self.year.id, financial)["complete"], 1)
+        self.assertEqual(index.field_completion(self.debt.id)["total"], 2)
+        self.assertEqual(index.total_populated(), 2)
+        self.assertEqual(index.years_with_data(), {self.year.id})
+
+    def test_mark_persists_and_loads_in_new_process(self):
+        index = CompletenessIndex()
+        index.rebuild()
+        index.mark(self.other.id, self.reserves.id, self.year.id, True)
+        index.mark(self.council.id, self.debt.id, self.year.id, False)
+
+        row = CompletenessBitset.objects.get(council=self.other, year=self.year)
+        self.assertEqual(CompletenessBitset.unpack(row.bits), field_mask([self.reserves.id]))
+
+        cache.clear()  # A restarted process starts with no version stamp
+        restarted = CompletenessIndex()
+        self.assertEqual(restarted.bits(self.other.id, self.year.id), field_mask([self.reserves.id]))
+        self.assertEqual(restarted.bits(self.council.id, self.year.id), 0)
+        self.assertEqual(restarted.bits(self.council.id), field_mask([self.website.id]))
+
+    def test_unbuilt_index_counts_the_data_without_building(self):
+        index = CompletenessIndex()
+        financial = index.category_mask(["balance_sheet"])
+        index.mark(self.other.id, self.reserves.id, self.year.id, True)
+
+        self.assertFalse(CompletenessBitset.objects.exists())
+        self.assertEqual(index.council_completion(self.council.id, financial, self.year.id)["percentage"], 50)
+        self.assertEqual(index.field_completion(self.debt.id)["complete"], 1)
+        self.assertEqual(index.total_populated(), 2)
+        self.assertEqual(index.years_with_data(), {self.year.id})
+        self.assertEqual(index.bits(self.council.id), field_mask([self.website.id]))
+        self.assertFalse(CompletenessBitset.objects.exists())
+
+        # Built by the command in another process
+        call_command("rebuild_completeness_index", "--if-missing", stdout=StringIO())
+        self.assertTrue(index.built)
+        self.assertEqual(index.bits(self.council.id, self.year.id), field_mask([self.debt.id]))
+
+        output = StringIO()
+        call_command("rebuild_completeness_index", "--if-missing", stdout=output)
+        self.assertIn("already built", output.getvalue())
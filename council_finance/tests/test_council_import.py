@@ -0,0 +1,85 @@
+import io
+import json
+
+from django.test import SimpleTestCase, TestCase
+
+from council_finance.models import Council, CouncilCharacteristic, CouncilType, DataField, DataIssue
+from council_finance.services.completeness_index import completeness_index
+from council_finance.services.council_import import (
+    CouncilImporter,
+    CouncilImportError,
+    RecordReader,
+    get_import_progress,
+    preview_records,
+)
+
+
+class RecordReaderTests(SimpleTestCase):
+    def test_txt_delimiter_and_bom(self):
+        data = "﻿name\twebsite\nAlpha\thttps://alpha.gov.uk\nBeta\thttps://beta.gov.uk\n".encode("utf-8")
+        reader = RecordReader(io.BytesIO(data), "councils.txt")
+
+        records = list(reader)
+
+        self.assertEqual(reader.delimiter, "\t")
+        self.assertEqual(reader.columns, ["name", "website"])
+        self.assertEqual(records[1], {"name": "Beta", "website": "https://beta.gov.uk"})
+
+    def test_json_objects_split_across_reads(self):
+        rows = [{"name": f"Council {n}", "website": f"https://c{n}.gov.uk"} for n in range(3000)]
+        reader = RecordReader(io.BytesIO(json.dumps(rows, indent=2).encode()), "councils.json")
+
+        preview, total = preview_records(reader, limit=5)
+
+        self.assertEqual(total, 3000)
+        self.assertEqual(preview[4]["name"], "Council 4")
+
+    def test_rejects_non_array_json(self):
+        reader = RecordReader(io.BytesIO(b'{"name": "Alpha"}'), "councils.json")
+        with self.assertRaises(CouncilImportError):
+            list(reader)
+
+
+class CouncilImporterTests(TestCase):
+    def setUp(self):
+        self.unitary = CouncilType.objects.create(name="Unitary Authority")
+        self.postcode = DataField.objects.create(
+            name="Council HQ Post Code", slug="council_hq_post_code", category="characteristic", content_type="text"
+        )
+        Council.objects.create(name="Existing", slug="existing", website="https://existing.gov.uk")
+
+    def run_import(self, text, chunk_size=2):
+        reader = RecordReader(io.BytesIO(text.encode()), "councils.csv")
+        with self.captureOnCommitCallbacks(execute=True):
+            return CouncilImporter("test1234", chunk_size=chunk_size).run(reader)
+
+    def test_imports_in_chunks_and_skips_existing_and_repeats(self):
+        result = self.run_import(
+            "name,website,council_type,postcode\n"
+            "Alpha,https://alpha.gov.uk,unitary authority,AL1 1AA\n"
+            "Existing,https://existing.gov.uk,,\n"
+            "Beta,https://beta.gov.uk,Unitary,\n"
+            "Alpha,https://alpha.gov.uk,,\n"
+            "Gamma,,,\n"
+        )
+
+        self.assertEqual((result.created, result.skipped, result.error_count), (2, 2, 1))
+        self.assertEqual(result.chunks, 3)
+        alpha = Council.objects.get(slug="alpha")
+        self.assertEqual(alpha.council_type, self.unitary)
+        self.assertEqual(Council.objects.get(slug="beta").council_type, self.unitary)
+        self.assertEqual(CouncilCharacteristic.objects.get(council=alpha, field=self.postcode).value, "AL1 1AA")
+        self.assertEqual(completeness_index.bits(alpha.id), 1 << self.postcode.id)
+        self.assertTrue(DataIssue.objects.filter(council__slug="beta", field=self.postcode).exists())
+        self.assertFalse(DataIssue.objects.filter(council=alpha, field=self.postcode).exists())
+
+        progress = get_import_progress("test1234")
+        self.assertEqual(progress["status"], "complete")
+        self.assertEqual(progress["percentage"], 100)
+        self.assertEqual(progress["created"], 2)
+
+    def test_missing_name_column_writes_nothing(self):
+        with self.assertRaises(CouncilImportError):
+            self.run_import("title,website\nAlpha,https://alpha.gov.uk\n")
+        self.assertEqual(Council.objects.count(), 1)
+        self.assertEqual(get_import_progress("test1234")["status"], "failed")
@@ -0,0 +1,143 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from council_finance.models import (
+    Council, CouncilCharacteristic, CounterDefinition, DataField, FactoidFieldDependency,
+    FactoidInstance, FactoidTemplate, FinancialFigure, FinancialYear,
+)
+from council_finance.services.factoid_engine import FactoidEngine
+from council_finance.services.factoid_invalidation import factoid_invalidator
+from council_finance.services.factoid_materialiser import FactoidMaterialiser
+
+
+class InvalidationFixture:
+    def setUp(self):
+        self.previous = FinancialYear.objects.create(label="2023/24")
+        self.year = FinancialYear.objects.create(label="2024/25")
+        self.debt = DataField.objects.create(name="Total Debt", slug="total-debt", category="financial")
+        self.population = DataField.objects.create(name="Population", slug="population", category="characteristic")
+        DataField.objects.create(name="Debt Per Head", slug="total-debt-per-capita", category="calculated")
+        self.counter = CounterDefinition.objects.create(name="Debt", slug="debt", formula="total_debt", precision=0)
+
+        self.change = FactoidTemplate.objects.create(
+            name="Debt change", template_text="{council_name} debt changed {total_debt_change_percent:percentage}"
+        )
+        self.per_head = FactoidTemplate.objects.create(
+            name="Debt per head", template_text="{council_name} owes {total_debt_per_capita:currency} per head"
+        )
+        self.per_head.counters.add(self.counter)
+
+        self.councils = []
+        for i in range(2):
+            council = Council.objects.create(name=f"Council {i}", slug=f"council-{i}")
+            CouncilCharacteristic.objects.bulk_create([
+                CouncilCharacteristic(council=council, field=self.population, value="1000"),
+            ])
+            FinancialFigure.objects.bulk_create([
+                FinancialFigure(council=council, field=self.debt, year=year, value=Decimal('100000'))
+                for year in (self.previous, self.year)
+            ])
+            self.councils.append(council)
+
+        for year in (self.previous, self.year):
+            FactoidMaterialiser().materialise(year)
+
+    def expired(self):
+        return {
+            (instance.template_id, instance.council_id, instance.financial_year_id)
+            for instance in FactoidInstance.objects.all() if instance.is_expired()
+        }
+
+
+class FactoidInvalidationTest(InvalidationFixture, TestCase):
+    def test_dependencies_include_fields_read_by_calculated_references(self):
+        fields = set(FactoidFieldDependency.objects.filter(template=self.per_head).values_list('field__slug', flat=True))
+        self.assertEqual(fields, {'total-debt-per-capita', 'total-debt', 'population'})
+
+    def test_figure_change_expires_dependent_instances_for_council_and_following_year(self):
+        council = self.councils[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            figure = FinancialFigure.objects.get(council=council, field=self.debt, year=self.previous)
+            figure.value = Decimal('50000')
+            figure.save()
+            self.assertEqual(self.expired(), set())  # Deferred until commit
+
+        self.assertEqual(self.expired(), {
+            (self.change.pk, council.pk, self.previous.pk),
+            (self.per_head.pk, council.pk, self.previous.pk),
+            (self.change.pk, council.pk, self.year.pk),  # Reads the previous year
+        })
+
+    def test_characteristic_change_expires_every_year_for_council(self):
+        council = self.councils[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            characteristic = CouncilCharacteristic.objects.get(council=council, field=self.population)
+            characteristic.value = "2000"
+            characteristic.save()
+
+        self.assertEqual(self.expired(), {
+            (self.per_head.pk, council.pk, self.previous.pk),
+            (self.per_head.pk, council.pk, self.year.pk),
+        })
+
+    def test_changes_in_a_transaction_are_applied_in_one_update(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                for council in self.councils:
+                    factoid_invalidator.invalidate(council, self.year, [self.debt.pk])
+                    factoid_invalidator.invalidate(council, self.year, [self.population.pk])
+        self.assertEqual(len(callbacks), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            callbacks[0]()
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE')]), 1)
+        self.assertEqual(len(self.expired()), 4)
+
+    def test_rolled_back_changes_are_dropped(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                factoid_invalidator.invalidate(self.councils[0], self.year, [self.debt.pk])
+                raise RuntimeError
+
+        with self.captureOnCommitCallbacks(execute=True):
+            factoid_invalidator.invalidate(self.councils[1], self.year, [self.population.pk])
+
+        self.assertEqual(self.expired(), {(self.per_head.pk, self.councils[1].pk, self.year.pk)})
+
+    def test_field_label_change_keeps_instances(self):
+        self.debt.name = "Debt"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.debt.save()
+        self.assertEqual(self.expired(), set())
+
+    def test_requested_instances_are_recomputed_lazily(self):
+        council = self.councils[0]
+        FinancialFigure.objects.filter(council=council, year=self.year).update(value=Decimal('500000'))
+        with self.captureOnCommitCallbacks(execute=True):
+            factoid_invalidator.invalidate(council, self.year, [self.debt.pk])
+
+        FactoidEngine().get_factoids_for_counter(self.counter, council, self.year)
+        refreshed = FactoidInstance.objects.get(template=self.per_head, council=council, financial_year=self.year)
+        self.assertEqual(refreshed.rendered_text, "Council 0 owes £500 per head")
+        # Not requested, so still stale
+        self.assertEqual(self.expired(), {(self.change.pk, council.pk, self.year.pk)})
+
+
+class AutocommitInvalidationTest(InvalidationFixture, TransactionTestCase):
+    def test_saves_outside_a_transaction_expire_immediately(self):
+        council = self.councils[0]
+        figure = FinancialFigure.objects.get(council=council, field=self.debt, year=self.year)
+        figure.value = Decimal('50000')
+        figure.save()
+        self.assertEqual(self.expired(), {
+            (self.change.pk, council.pk, self.year.pk),
+            (self.per_head.pk, council.pk, self.year.pk),
+        })
+
+    def test_field_changes_outside_a_transaction_expire_immediately(self):
+        factoid_invalidator.invalidate(None, None, [self.population.pk])
+        self.assertEqual(len(self.expired()), 4)
+        self.assertEqual(factoid_invalidator.flush(), 0)  # Nothing left queued
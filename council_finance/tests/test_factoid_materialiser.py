@@ -0,0 +1,146 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from council_finance.models import (
+    Council, CouncilCharacteristic, CounterDefinition, DataField, FactoidInstance,
+    FactoidTemplate, FinancialFigure, FinancialYear,
+)
+from council_finance.services.factoid_engine import FactoidEngine
+from council_finance.services.factoid_materialiser import FactoidMaterialiser, PreloadedFactoidEngine
+
+
+class FactoidMaterialiserTest(TestCase):
+    def setUp(self):
+        self.previous = FinancialYear.objects.create(label="2023/24")
+        self.year = FinancialYear.objects.create(label="2024/25")
+        self.debt = DataField.objects.create(name="Total Debt", slug="total-debt", category="financial")
+        self.population = DataField.objects.create(name="Population", slug="population", category="characteristic")
+        DataField.objects.create(name="Debt Change", slug="total-debt-change-percent", category="calculated")
+        self.counter = CounterDefinition.objects.create(name="Debt", slug="debt", formula="total_debt", precision=0)
+
+        self.template = FactoidTemplate.objects.create(
+            name="Debt change",
+            template_text="{council_name} owes {total_debt:currency}, {total_debt_change_percent:percentage} on last year",
+        )
+        self.template.counters.add(self.counter)
+        self.general = FactoidTemplate.objects.create(
+            name="Population", template_text="{council_name} serves {population} people"
+        )
+
+        self.councils = [self.add_council(i) for i in range(3)]
+        self.materialiser = FactoidMaterialiser(council_batch_size=2)
+
+    def add_council(self, i):
+        council = Council.objects.create(name=f"Council {i}", slug=f"council-{i}")
+        CouncilCharacteristic.objects.bulk_create([
+            CouncilCharacteristic(council=council, field=self.population, value=str(1000 * (i + 1))),
+        ])
+        FinancialFigure.objects.bulk_create([
+            FinancialFigure(council=council, field=self.debt, year=self.previous, value=Decimal('1000')),
+            FinancialFigure(council=council, field=self.debt, year=self.year, value=Decimal(1100 + i * 100)),
+        ])
+        return council
+
+    def test_matches_single_instance_computation(self):
+        stats = self.materialiser.materialise(self.year)
+        self.assertEqual(stats, {'councils': 3, 'created': 6, 'updated': 0, 'skipped': 0})
+
+        engine = FactoidEngine()
+        council = self.councils[1]
+        expected = engine.render_template(self.template, engine.build_context_data(council, self.year))
+        instance = FactoidInstance.objects.get(template=self.template, council=council, counter=self.counter)
+        self.assertEqual(instance.rendered_text, expected)
+        self.assertEqual(instance.rendered_text, "Council 1 owes £1,200, 20.0% on last year")
+        self.assertEqual(
+            FactoidInstance.objects.get(template=self.general, council=council, counter=None).rendered_text,
+            "Council 1 serves 2000 people",
+        )
+
+    def test_queries_do_not_grow_with_councils(self):
+        two_councils = Council.objects.filter(pk__in=[council.pk for council in self.councils[:2]])
+        with CaptureQueriesContext(connection) as small:
+            self.materialiser.materialise(self.year, councils=two_councils)
+        FactoidInstance.objects.all().delete()
+        self.councils += [self.add_council(i) for i in range(3, 5)]
+
+        with CaptureQueriesContext(connection) as large:
+            FactoidMaterialiser(council_batch_size=10).materialise(self.year)
+        self.assertLessEqual(len(large), len(small))
+
+    def test_instances_created_meanwhile_are_updated(self):
+        council = self.councils[0]
+        build_context_data = PreloadedFactoidEngine.build_context_data
+
+        def create_lazily_then_build(engine, *args):
+            # The lazy path in get_factoids_for_counter writes the row after
+            # the chunk has read the existing instances
+            if not FactoidInstance.objects.filter(council=council, counter=self.counter).exists():
+                FactoidInstance.objects.create(
+                    template=self.template, council=council, financial_year=self.year,
+                    counter=self.counter, rendered_text="lazy",
+                )
+            return build_context_data(engine, *args)
+
+        with mock.patch.object(PreloadedFactoidEngine, 'build_context_data', autospec=True,
+                               side_effect=create_lazily_then_build):
+            self.materialiser.materialise(self.year)
+
+        instance = FactoidInstance.objects.get(template=self.template, council=council)
+        self.assertEqual(instance.rendered_text, "Council 0 owes £1,100, 10.0% on last year")
+        self.assertEqual(FactoidInstance.objects.count(), 6)
+
+    def test_expired_refresh_only_recomputes_expired_instances(self):
+        self.materialiser.materialise(self.year)
+        FinancialFigure.objects.filter(council=self.councils[0], year=self.year).update(value=Decimal('5000'))
+        FactoidInstance.objects.filter(council=self.councils[0], template=self.template).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        stats = self.materialiser.refresh_expired()
+        self.assertEqual((stats['updated'], stats['created'], stats['skipped']), (1, 0, 1))
+        refreshed = FactoidInstance.objects.get(council=self.councils[0], template=self.template)
+        self.assertIn("£5,000", refreshed.rendered_text)
+        self.assertFalse(refreshed.is_expired())
+
+    def test_command_materialises_a_year(self):
+        call_command('materialise_factoids', '--year', '2024/25', '--council', 'council-2', verbosity=0)
+        self.assertEqual(FactoidInstance.objects.filter(council=self.councils[2]).count(), 2)
+        self.assertFalse(FactoidInstance.objects.exclude(council=self.councils[2]).exists())
+
+    def test_api_materialises_in_the_background(self):
+        from council_finance.api.factoid_views import MATERIALISE_PROGRESS_KEY
+        from council_finance.services.factoid_materialiser import factoid_materialiser
+
+        staff = get_user_model().objects.create_user(username="staff", password="pass", is_staff=True)
+        self.client.force_login(staff)
+        cache.delete(MATERIALISE_PROGRESS_KEY)
+        stats = {'councils': 3, 'created': 6, 'updated': 0, 'skipped': 0}
+        url = reverse('factoid_api:materialise')
+
+        with mock.patch.object(factoid_materialiser, 'materialise', return_value=stats) as materialise:
+            cache.set(MATERIALISE_PROGRESS_KEY, {'status': 'running'})
+            response = self.client.post(url, '{}', content_type='application/json')
+            self.assertEqual(response.json()['status'], 'already_running')
+
+            cache.delete(MATERIALISE_PROGRESS_KEY)
+            response = self.client.post(url, '{"year": "2024/25"}', content_type='application/json')
+            self.assertEqual(response.json()['status'], 'started')
+            for thread in threading.enumerate():
+                if thread.name == 'factoid-materialiser':
+                    thread.join()
+
+        materialise.assert_called_once_with(self.year, councils=None, expired_only=False)
+        progress = cache.get(MATERIALISE_PROGRESS_KEY)
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual(progress['created'], 6)
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from council_finance.services import financial_text_scanner
+from council_finance.services.financial_text_scanner import FinancialTermScanner, scan_financial_text
+from council_finance.services.pdf_processing import TikaFinancialExtractor
+
+
+STATEMENT = (
+    "Narrative report\n"
+    "12\n"
+    "Balance Sheet\n"
+    "(268.9) Current liabilities (247.3)\n"
+    "Total reserves 3,059.6\n"
+    "Page 13\n"
+    "Usable reserves: £45.2m\n"
+)
+
+
+class FinancialTextScannerTests(SimpleTestCase):
+    def test_terms_are_found_once_with_offsets(self):
+        index = scan_financial_text(STATEMENT)
+        self.assertEqual(index.terms_found(["reserves", "debt", "£"]), ["reserves", "£"])
+        self.assertEqual(index.term_offsets["reserves"][0], STATEMENT.lower().find("reserves"))
+        self.assertEqual(index.first_offset(["usable", "total"]), STATEMENT.lower().find("total"))
+
+    def test_figures_and_page_markers(self):
+        index = scan_financial_text(STATEMENT)
+        self.assertEqual(index.figure_values(), [268.9, 247.3, 3059.6, 45.2])
+        self.assertTrue(index.figures[0].negative)
+        self.assertEqual(index.nearest_page_marker(STATEMENT.find("Balance")), 12)
+        self.assertEqual(index.nearest_page_marker(STATEMENT.find("Usable")), 13)
+
+    def test_lines_containing_keywords(self):
+        index = scan_financial_text(STATEMENT)
+        lines = [index.line_text(number) for number in index.lines_containing(["reserves"])]
+        self.assertEqual(lines, ["Total reserves 3,059.6", "Usable reserves: £45.2m"])
+
+    def test_anchored_search_matches_full_search(self):
+        import re
+
+        index = FinancialTermScanner(["total", "current"]).scan(STATEMENT)
+        pattern = re.compile(r"total\s*reserves[:\s]*([0-9,.]+)")
+        self.assertEqual(
+            index.search_from_terms(pattern, ["total"]).group(1),
+            pattern.search(index.text_lower).group(1),
+        )
+        self.assertIsNone(index.search_from_terms(re.compile(r"current\s*assets"), ["current"]))
+
+    def test_fallback_extraction_records_page_numbers(self):
+        extractor = TikaFinancialExtractor.__new__(TikaFinancialExtractor)
+        data = extractor._extract_financial_data_fallback(STATEMENT)
+        self.assertEqual(data["current_liabilities"], 247300000)
+        self.assertEqual(data["_metadata"]["current_liabilities"]["page_number"], 12)
+
+    def test_abbreviated_and_line_end_page_numbers(self):
+        text = "Notes to the accounts, see p. 42\n" + "x" * 300 + "\nBorrowing 1,200 continued on 57\n"
+        index = scan_financial_text(text)
+        self.assertEqual(index.nearest_page_marker(text.find("Notes")), 42)
+        self.assertEqual(index.nearest_page_marker(text.find("Borrowing")), 57)
+
+    def test_scan_without_automaton_finds_the_same_terms(self):
+        scanner = FinancialTermScanner()
+        self.assertIsNotNone(scanner._automaton)
+        with mock.patch.object(financial_text_scanner, "AHOCORASICK_AVAILABLE", False):
+            plain = FinancialTermScanner()
+        self.assertIsNone(plain._automaton)
+        self.assertEqual(plain.scan(STATEMENT).term_offsets, scanner.scan(STATEMENT).term_offsets)
+
+    def test_confidence_depends_on_ai_confidence_and_field_count(self):
+        extractor = TikaFinancialExtractor.__new__(TikaFinancialExtractor)
+        score = extractor._calculate_confidence_score({"confidence": "medium", "reserves": 3059600000, "total_debt": 5})
+        self.assertEqual(score, 0.74)
@@ -0,0 +1,110 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from council_finance.models import (
+    ActivityLog, Council, CounterDefinition, DataField, FinancialFigure, FinancialYear,
+)
+from council_finance.services.fragment_cache import (
+    FragmentCache, council_activity_tag, council_tag, council_year_tag,
+)
+
+
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fragments = FragmentCache(prefix='test-fragment')
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {'build': self.builds}
+
+    def get(self, tags):
+        return self.fragments.get_or_set('section', ['worthing'], tags, self.build)
+
+    def test_fragment_is_built_once(self):
+        tags = [council_tag('worthing'), council_year_tag('worthing', '2024/25')]
+        self.assertEqual(self.get(tags), {'build': 1})
+        self.assertEqual(self.get(tags), {'build': 1})
+
+    def test_purging_any_tag_drops_fragment(self):
+        tags = [council_tag('worthing'), council_year_tag('worthing', '2024/25')]
+        self.get(tags)
+        self.fragments.purge(council_year_tag('worthing', '2023/24'), council_tag('adur'))
+        self.assertEqual(self.get(tags), {'build': 1})
+
+        self.fragments.purge(council_year_tag('worthing', '2024/25'))
+        self.assertEqual(self.get(tags), {'build': 2})
+
+    def test_activity_purge_leaves_year_fragments(self):
+        history = [council_tag('worthing'), council_activity_tag('worthing')]
+        counters = [council_tag('worthing'), council_year_tag('worthing', '2024/25')]
+        self.fragments.get_or_set('history', ['worthing'], history, self.build)
+        self.get(counters)
+
+        self.fragments.purge(council_activity_tag('worthing'))
+        self.assertEqual(self.get(counters), {'build': 2})
+        self.assertEqual(self.fragments.get_or_set('history', ['worthing'], history, self.build), {'build': 3})
+
+    def test_purge_inside_transaction_repeats_on_commit(self):
+        tags = [council_tag('worthing')]
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.fragments.purge(council_tag('worthing'))
+        self.assertEqual(self.get(tags), {'build': 1})
+        callbacks[0]()
+        self.assertEqual(self.get(tags), {'build': 2})
+
+    def test_evicted_tag_version_does_not_revive_old_fragments(self):
+        tags = [council_tag('worthing')]
+        self.get(tags)
+        cache.delete(self.fragments._tag_key(council_tag('worthing')))
+        self.assertEqual(self.get(tags), {'build': 2})
+
+
+class CouncilDetailFragmentTest(TestCase):
+    def setUp(self):
+        self.council = Council.objects.create(name="Worthing", slug="worthing")
+        self.year = FinancialYear.objects.create(label="2024/25")
+        self.field = DataField.objects.create(name="Total Debt", slug="total_debt", category="financial")
+        FinancialFigure.objects.bulk_create([
+            FinancialFigure(council=self.council, field=self.field, year=self.year, value=100),
+        ])
+        CounterDefinition.objects.create(
+            name="Debt", slug="debt", formula="total_debt", precision=0, show_by_default=True,
+        )
+        self.url = reverse("council_detail", args=["worthing"])
+
+    def counter_runs(self):
+        from council_finance.agents.counter_agent import CounterAgent
+        return mock.patch.object(CounterAgent, 'run', autospec=True, side_effect=CounterAgent.run)
+
+    def test_sections_are_served_from_cache(self):
+        with self.counter_runs() as run:
+            first = self.client.get(self.url)
+            second = self.client.get(self.url)
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(
+            [item['counter'].slug for item in second.context['counters']],
+            [item['counter'].slug for item in first.context['counters']],
+        )
+        self.assertEqual(second.context['counters'][0]['formatted'], first.context['counters'][0]['formatted'])
+
+    def test_figure_change_purges_counters_for_that_year(self):
+        with self.counter_runs() as run:
+            self.client.get(self.url)
+            figure = FinancialFigure.objects.get(council=self.council)
+            figure.value = 200
+            figure.save()
+            self.client.get(self.url)
+        self.assertEqual(run.call_count, 2)
+
+    def test_activity_purges_history(self):
+        self.assertEqual(list(self.client.get(self.url).context['administrative_messages']), [])
+        ActivityLog.objects.create(
+            activity_type='moderation', description="Figures corrected", related_council=self.council,
+        )
+        messages = self.client.get(self.url).context['administrative_messages']
+        self.assertEqual([message['type'] for message in messages], ['flag'])
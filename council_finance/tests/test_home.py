@@ -4,6 +4,7 @@ from django.urls import reverse
 
 
 from council_finance.models import Council, FinancialYear, DataField, FigureSubmission
+from council_finance.services.home_snapshot import home_snapshot
 
 
 class HomeViewTest(TestCase):
@@ -12,6 +13,7 @@ class HomeViewTest(TestCase):
         year = FinancialYear.objects.create(label="2024")
         self.council = Council.objects.create(name="Worthing Borough Council", slug="worthing")
         FigureSubmission.objects.create(council=self.council, year=year, field=field, value="1")
+        home_snapshot.rebuild()
 
     def test_home_page_renders(self):
         response = self.client.get(reverse('home'))
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from council_finance.models import Council, FinancialYear, HomeSnapshot
+from council_finance.services.home_snapshot import HomeSnapshotService, home_snapshot
+
+
+class HomeSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        FinancialYear.objects.create(label="2024/25")
+        for i in range(8):
+            Council.objects.create(name=f"Council {i}", slug=f"council-{i}")
+
+    def test_home_page_reads_snapshot_without_data_queries(self):
+        home_snapshot.rebuild()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_councils'], 8)
+        # Only the site-wide context processors still query
+        tables = ('"council_finance_council"', 'contribution', 'dataissue', 'sitecounter', 'groupcounter')
+        self.assertFalse([query for query in queries if any(table in query['sql'] for table in tables)])
+
+    def test_missing_snapshot_is_built_on_first_request(self):
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_councils'], 8)
+        self.assertEqual(len(response.context['featured_councils']), 6)
+        self.assertFalse(home_snapshot.needs_rebuild())
+
+    def test_snapshot_is_shared_through_the_database(self):
+        home_snapshot.rebuild()
+        other_process = HomeSnapshotService()
+        self.assertEqual(other_process.context()['total_councils'], 8)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Council.objects.create(name="New Council", slug="new-council")
+        self.assertTrue(HomeSnapshot.objects.get().dirty)
+        self.assertTrue(other_process.needs_rebuild())
+
+    def test_featured_councils_are_distinct_and_stable(self):
+        context = home_snapshot.build()
+        slugs = [item['council']['slug'] for item in context['featured_councils']]
+        self.assertEqual(len(slugs), 6)
+        self.assertEqual(len(set(slugs)), 6)
+        self.assertEqual(slugs[0], context['council_of_the_day']['slug'])
+        self.assertEqual(slugs, [item['council']['slug'] for item in home_snapshot.build()['featured_councils']])
+
+    def test_changes_mark_snapshot_dirty(self):
+        home_snapshot.rebuild()
+        self.assertFalse(home_snapshot.needs_rebuild())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Council.objects.create(name="New Council", slug="new-council")
+        self.assertTrue(home_snapshot.needs_rebuild())
+
+        call_command('build_home_snapshot', verbosity=0)
+        self.assertFalse(home_snapshot.needs_rebuild())
+        self.assertEqual(home_snapshot.context()['total_councils'], 9)
+
+    def test_old_snapshot_is_rebuilt(self):
+        snapshot = home_snapshot.rebuild()
+        self.assertFalse(home_snapshot.refresh())
+        HomeSnapshot.objects.update(built_at=snapshot['built_at'] - timedelta(hours=1))
+        self.assertTrue(home_snapshot.refresh())
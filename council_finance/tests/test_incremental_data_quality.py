@@ -0,0 +1,158 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from council_finance.incremental_data_quality import (
+    MAX_DEFAULT_WORKERS,
+    compute_desired_issues,
+    incremental_assess_data_issues,
+    parallel_assess_data_issues,
+    reassess_council_data_issues,
+)
+from council_finance.models import Council, DataField, DataIssue, FinancialFigure, FinancialYear
+from council_finance.signals.data_issue_signals import handle_council_data_change
+from council_finance.smart_data_quality import smart_assess_data_issues
+
+
+def issue_keys():
+    return set(
+        DataIssue.objects.values_list("council_id", "field_id", "year_id", "issue_type", "value")
+    )
+
+
+class IncrementalAssessmentTests(TestCase):
+    def setUp(self):
+        self.years = [FinancialYear.objects.create(label=label) for label in ("2023/24", "2024/25")]
+        self.field = DataField.objects.create(name="Total Debt", slug="total_debt", content_type="monetary")
+        DataField.objects.create(name="Website", slug="council_website")
+        self.council = Council.objects.create(name="Gapton", slug="gapton", website="")
+        self.other = Council.objects.create(name="Fullton", slug="fullton", website="https://fullton.gov.uk")
+
+    @override_settings(DATA_ISSUE_REASSESS_ON_CHANGE=False)
+    def test_matches_full_rebuild(self):
+        FinancialFigure.objects.bulk_create([
+            FinancialFigure(council=self.other, field=self.field, year=self.years[0], value=Decimal("0"))
+        ])
+
+        smart_assess_data_issues()
+        rebuilt = issue_keys()
+
+        self.assertEqual(compute_desired_issues(), rebuilt)
+
+    @override_settings(DATA_ISSUE_REASSESS_ON_CHANGE=False)
+    def test_second_run_leaves_issues_untouched(self):
+        first = incremental_assess_data_issues()
+        issue_ids = set(DataIssue.objects.values_list("id", flat=True))
+
+        second = incremental_assess_data_issues()
+
+        self.assertGreater(first["created"], 0)
+        self.assertEqual((second["created"], second["deleted"]), (0, 0))
+        self.assertEqual(set(DataIssue.objects.values_list("id", flat=True)), issue_ids)
+
+    def test_figure_change_reassesses_council(self):
+        incremental_assess_data_issues()
+        missing = DataIssue.objects.filter(council=self.council, field=self.field, year=self.years[1])
+        self.assertTrue(missing.filter(issue_type="missing").exists())
+
+        # Created without post_save (other receivers need PostgreSQL); the
+        # data issue receiver is invoked directly instead
+        figure = FinancialFigure(council=self.council, field=self.field, year=self.years[1], value=Decimal("1250000"))
+        with self.captureOnCommitCallbacks(execute=True):
+            FinancialFigure.objects.bulk_create([figure])
+            handle_council_data_change(FinancialFigure, figure, created=True)
+
+        self.assertFalse(missing.exists())
+        self.assertTrue(
+            DataIssue.objects.filter(council=self.council, field=self.field, year=self.years[0]).exists()
+        )
+
+
+    def test_reassessment_is_limited_to_changed_fields(self):
+        incremental_assess_data_issues()
+        website = DataIssue.objects.filter(council=self.council, field__slug="council_website")
+        website.delete()  # Stale, but not part of this change
+        FinancialFigure.objects.bulk_create([
+            FinancialFigure(council=self.council, field=self.field, year=self.years[1], value=Decimal("1"))
+        ])
+
+        result = reassess_council_data_issues(self.council.id, [self.field.id])
+
+        self.assertEqual((result["created"], result["deleted"], result["unchanged"]), (0, 1, 1))
+        self.assertFalse(website.exists())
+
+    def test_one_callback_per_transaction_and_none_after_rollback(self):
+        figure = FinancialFigure(council=self.council, field=self.field, year=self.years[1])
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                handle_council_data_change(FinancialFigure, figure, created=True)
+                raise RuntimeError
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                handle_council_data_change(FinancialFigure, figure, created=True)
+                handle_council_data_change(FinancialFigure, figure, created=True)
+        self.assertEqual(len(callbacks), 1)
+
+
+class ParallelAssessmentTests(TestCase):
+    @override_settings(DATA_ISSUE_REASSESS_ON_CHANGE=False)
+    def test_sharded_assessment_matches_full_rebuild(self):
+        year = FinancialYear.objects.create(label="2024/25")
+        field = DataField.objects.create(name="Total Debt", slug="total_debt", content_type="monetary")
+        councils = [Council.objects.create(name=f"Council {n}", slug=f"council-{n}") for n in range(5)]
+        FinancialFigure.objects.bulk_create([
+            FinancialFigure(council=councils[0], field=field, year=year, value=Decimal("0")),
+            FinancialFigure(council=councils[1], field=field, year=year, value=Decimal("500")),
+        ])
+
+        smart_assess_data_issues()
+        rebuilt = issue_keys()
+        DataIssue.objects.all().delete()
+
+        # Workers run in-process so the test database is visible
+        result = parallel_assess_data_issues(workers=1, shard_size=2)
+
+        self.assertEqual(result["shards"], 3)
+        self.assertEqual(issue_keys(), rebuilt)
+
+
+class ProcessPoolAssessmentTests(TransactionTestCase):
+    """Runs the shards through the process pool, so the data must be committed."""
+
+    def assess_in_pool(self, start_method):
+        year = FinancialYear.objects.create(label="2024/25")
+        field = DataField.objects.create(name="Total Debt", slug="total_debt", content_type="monetary")
+        councils = [Council.objects.create(name=f"Council {n}", slug=f"council-{n}") for n in range(5)]
+        FinancialFigure.objects.bulk_create([
+            FinancialFigure(council=councils[0], field=field, year=year, value=Decimal("0")),
+            FinancialFigure(council=councils[1], field=field, year=year, value=Decimal("500")),
+        ])
+
+        smart_assess_data_issues()
+        rebuilt = issue_keys()
+        DataIssue.objects.all().delete()
+
+        result = parallel_assess_data_issues(workers=2, shard_size=2, start_method=start_method)
+
+        self.assertEqual((result["workers"], result["shards"]), (2, 3))
+        self.assertEqual(result["created"], len(rebuilt))
+        self.assertEqual(issue_keys(), rebuilt)
+
+    @override_settings(DATA_ISSUE_REASSESS_ON_CHANGE=False)
+    def test_forked_workers_match_full_rebuild(self):
+        # Safe here: test runs start no background threads
+        self.assess_in_pool("fork")
+
+    @override_settings(DATA_ISSUE_REASSESS_ON_CHANGE=False)
+    def test_spawned_workers_match_full_rebuild(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("spawned workers cannot see an in-memory test database")
+        self.assess_in_pool(None)
+
+    def test_default_worker_count_is_capped(self):
+        with mock.patch("council_finance.incremental_data_quality.os.cpu_count", return_value=64):
+            result = parallel_assess_data_issues(workers=0)
+        self.assertEqual(result["workers"], MAX_DEFAULT_WORKERS)
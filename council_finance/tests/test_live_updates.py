@@ -0,0 +1,128 @@
+import asyncio
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+from django.test import TestCase
+
+from council_finance.channel_layers import SQLiteChannelLayer
+from council_finance.models import ActivityLog, Council, CounterDefinition, CounterResult, DataField, FinancialYear
+from council_finance.services.bulk_data_save import bulk_save_financial_figures
+from council_finance.services.live_updates import council_group, counter_group, live_updates
+
+
+class SQLiteChannelLayerTest(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_messages_fan_out_between_layers(self):
+        # Two layers on one file stand in for two worker processes
+        sender = SQLiteChannelLayer(path=self.path, poll_interval=0.01)
+        holder = SQLiteChannelLayer(path=self.path, poll_interval=0.01)
+
+        async def exchange():
+            channel = await holder.new_channel()
+            other = await holder.new_channel()
+            await holder.group_add('council.alpha', channel)
+            await holder.group_add('council.alpha', other)
+            await asyncio.sleep(0.05)  # Let the poller find the end of the log
+
+            await sender.group_send('council.alpha', {'type': 'live.update', 'text': 'one'})
+            await sender.group_send('council.beta', {'type': 'live.update', 'text': 'ignored'})
+            await sender.send(channel, {'type': 'live.update', 'text': 'direct'})
+
+            received = [
+                await asyncio.wait_for(holder.receive(channel), 2),
+                await asyncio.wait_for(holder.receive(channel), 2),
+                await asyncio.wait_for(holder.receive(other), 2),
+            ]
+            await holder.close()
+            return received
+
+        received = async_to_sync(exchange)()
+        self.assertEqual([m['text'] for m in received], ['one', 'direct', 'one'])
+
+    def test_local_channels_stay_in_memory(self):
+        layer = SQLiteChannelLayer(path=self.path)
+
+        async def exchange():
+            channel = await layer.new_channel()
+            await layer.send(channel, {'type': 'test'})
+            return await layer.receive(channel)
+
+        self.assertEqual(async_to_sync(exchange)(), {'type': 'test'})
+        self.assertEqual(layer._read(0)[1], [])
+
+
+class LiveUpdatesTest(TestCase):
+    def setUp(self):
+        self.layer = InMemoryChannelLayer()
+        live_updates.flush()
+        live_updates.layer = self.layer
+        self.addCleanup(setattr, live_updates, 'layer', None)
+
+        self.council = Council.objects.create(name="Liveton", slug="liveton")
+        self.year = FinancialYear.objects.create(label="2024/25")
+        self.counter = CounterDefinition.objects.create(name="Debt", slug="debt", formula="total_debt", precision=0)
+        self.channel = async_to_sync(self.layer.new_channel)()
+        for group in (council_group('liveton'), counter_group('debt')):
+            async_to_sync(self.layer.group_add)(group, self.channel)
+
+    def receive(self):
+        message = async_to_sync(self.layer.receive)(self.channel)
+        self.assertEqual(message['type'], 'live.update')
+        return json.loads(message['text'])['d']
+
+    def test_counter_changes_are_coalesced_into_one_delta(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = CounterResult.objects.create(
+                counter=self.counter, council=self.council, year=self.year, value=Decimal('100'), data_hash='a'
+            )
+            result.value = Decimal('250')
+            result.save()
+            result.save()  # Unchanged value is not pushed
+        self.assertEqual(live_updates.flush(), 1)
+
+        [delta] = self.receive()
+        self.assertEqual(delta['t'], 'counter')
+        self.assertEqual((delta['c'], delta['y'], delta['v']), ('debt', '2024/25', '250'))
+        self.assertEqual(delta['f'], self.counter.format_value(Decimal('250')))
+
+        # Reloaded results only push real changes too
+        with self.captureOnCommitCallbacks(execute=True):
+            CounterResult.objects.get(pk=result.pk).save()
+        self.assertEqual(live_updates.flush(), 0)
+
+    def test_site_totals_and_feed_entries_reach_their_groups(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            CounterResult.objects.create(counter=self.counter, value=Decimal('5'), data_hash='a')
+            ActivityLog.objects.create(
+                activity_type='contribution', description='Debt figure added', related_council=self.council
+            )
+        self.assertEqual(live_updates.flush(), 2)
+
+        deltas = self.receive() + self.receive()
+        self.assertEqual(sorted(d['t'] for d in deltas), ['counter', 'feed'])
+        self.assertEqual(next(d for d in deltas if d['t'] == 'counter')['y'], None)
+
+    def test_bulk_saves_push_feed_entries(self):
+        fields = [
+            DataField.objects.create(name=f"Line {n}", slug=f"line-{n}", category="income", content_type="monetary")
+            for n in range(2)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_save_financial_figures(self.council, self.year, {fields[0]: "10", fields[1]: "20"})
+        live_updates.flush()
+
+        deltas = []
+        while len(deltas) < 2:
+            deltas += [delta for delta in self.receive() if delta['t'] == 'feed']
+        self.assertCountEqual([delta['d'] for delta in deltas], [
+            "Updated Line 0 for Liveton (2024/25)", "Updated Line 1 for Liveton (2024/25)",
+        ])
+        self.assertTrue(all(delta['id'] for delta in deltas))
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.test import SimpleTestCase
+
+from council_finance.services.pdf_processing import (
+    AIAnalysisResult,
+    PDFExtractionCache,
+    TikaFinancialExtractor,
+    compute_page_offsets,
+)
+
+
+STUB_TEXT = "Statement of Accounts\nTotal income 1,200\fBalance sheet\nTotal reserves 300\f"
+
+
+class _TikaStubHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Tika server's text endpoint."""
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        self.server.requests.append(body)
+        payload = STUB_TEXT.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class PDFExtractionCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), _TikaStubHandler)
+        self.server.requests = []
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.pdf_path = f"{self.tmpdir}/statement.pdf"
+        with open(self.pdf_path, "wb") as fh:
+            fh.write(b"%PDF-1.4 fake statement" * 100)
+
+        self.extractor = TikaFinancialExtractor(cache=PDFExtractionCache(f"{self.tmpdir}/cache"))
+        self.extractor.tika_endpoint = f"http://127.0.0.1:{self.server.server_port}/tika"
+        self.extractor.openai_client = None
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_page_offsets_follow_form_feeds(self):
+        self.assertEqual(compute_page_offsets("a\fbc\fd"), [0, 2, 5])
+        self.assertEqual(compute_page_offsets("no breaks"), [0])
+
+    def test_second_extraction_is_served_from_cache(self):
+        first = self.extractor.extract_text_from_pdf(self.pdf_path)
+        second = self.extractor.extract_text_from_pdf(self.pdf_path)
+
+        self.assertTrue(first.success)
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.text_content, STUB_TEXT)
+        self.assertEqual(second.page_offsets, compute_page_offsets(STUB_TEXT))
+        self.assertEqual(len(second.page_offsets), 3)
+        self.assertEqual(first.sha256, second.sha256)
+        # Tika is only contacted once and receives the whole file
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(self.server.requests[0]), 2300)
+
+    def test_process_pdf_reuses_cached_analysis(self):
+        extraction = self.extractor.extract_text_from_pdf(self.pdf_path)
+        self.extractor.cache.store_analysis(
+            extraction.sha256,
+            AIAnalysisResult(success=True, extracted_data={"reserves": 300000000}, confidence_score=0.8),
+            "Worthing", "2024/25",
+        )
+
+        result = self.extractor.process_pdf(self.pdf_path, "Worthing", "2024/25")
+
+        self.assertTrue(result["success"])
+        self.assertTrue(result["cache_hit"])
+        self.assertEqual(result["analysis"].extracted_data, {"reserves": 300000000})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_cached_analysis_is_not_reused_for_another_council_or_year(self):
+        extraction = self.extractor.extract_text_from_pdf(self.pdf_path)
+        self.extractor.cache.store_analysis(
+            extraction.sha256,
+            AIAnalysisResult(success=True, extracted_data={"reserves": 300000000}, confidence_score=0.8),
+            "Worthing", "2024/25",
+        )
+
+        for council_name, year in (("Adur", "2024/25"), ("Worthing", "2023/24")):
+            result = self.extractor.process_pdf(self.pdf_path, council_name, year)
+            self.assertFalse(result["cache_hit"])
+            self.assertIsNone(self.extractor.cache.get_analysis(extraction.sha256, council_name, year))
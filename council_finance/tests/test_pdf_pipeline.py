@@ -0,0 +1,200 @@
+import io
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+from pypdf import PdfReader, PdfWriter
+
+from council_finance.services.pdf_pipeline import PDFPagePipeline, score_page_relevance
+from council_finance.services.pdf_processing import (
+    AIAnalysisResult,
+    ExtractionResult,
+    PageOffsetIndex,
+    PDFExtractionCache,
+    TikaFinancialExtractor,
+    compute_file_sha256,
+    compute_page_offsets,
+)
+
+
+NARRATIVE = "The council continued to deliver services to residents across the county. " * 20
+BALANCE_SHEET = "Balance Sheet £000\nCurrent liabilities (1,187.5)\nTotal reserves 3,059.6\n" * 5
+
+
+class _FakeExtractor:
+    """Records analyze_with_ai calls instead of contacting OpenAI."""
+
+    tika_endpoint = "http://tika.invalid/tika"
+
+    def __init__(self):
+        self.chunks = []
+        self.page_indexes = []
+        self.threads = set()
+
+    def analyze_with_ai(self, text_content, council_name="", year="", page_index=None):
+        self.chunks.append(text_content)
+        self.page_indexes.append(page_index)
+        self.threads.add(threading.get_ident())
+        reserves = 3059600000 if "reserves" in text_content.lower() else None
+        return AIAnalysisResult(
+            success=True,
+            extracted_data={"reserves": reserves, "confidence": "high", "notes": "ok"},
+            confidence_score=0.9 if reserves else 0.4,
+        )
+
+
+class PDFPagePipelineTests(SimpleTestCase):
+    def setUp(self):
+        self.extractor = _FakeExtractor()
+        self.pipeline = PDFPagePipeline(extractor=self.extractor, ai_chunk_chars=1000)
+        self.pipeline.max_ai_chunks = 2
+
+    def test_statement_pages_outscore_narrative(self):
+        self.assertGreater(score_page_relevance(BALANCE_SHEET), score_page_relevance(NARRATIVE))
+        self.assertEqual(score_page_relevance("   "), 0.0)
+
+    def test_page_ranges_cover_document(self):
+        self.pipeline.pages_per_range = 20
+        self.assertEqual(self.pipeline.page_ranges(45), [(1, 20), (21, 40), (41, 45)])
+
+    def test_range_text_is_aligned_to_page_count(self):
+        split = PDFPagePipeline._pages_from_range_text
+        self.assertEqual(split("a\fb\fc\f", 3), ["a", "b", "c"])
+        self.assertEqual(split("a\fb", 3), ["a", "b", ""])
+        self.assertEqual(split("a\fb\fc\fd", 3), ["a", "b", "c\nd"])
+
+    def test_only_relevant_pages_are_analysed(self):
+        pages = [NARRATIVE, BALANCE_SHEET[:400], NARRATIVE, BALANCE_SHEET[:400], NARRATIVE]
+        text = "\f".join(pages)
+        extraction = ExtractionResult(success=True, text_content=text, page_offsets=compute_page_offsets(text))
+
+        result = self.pipeline.analyze(extraction)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.extracted_data["reserves"], 3059600000)
+        self.assertTrue(self.extractor.chunks)
+        for chunk in self.extractor.chunks:
+            self.assertNotIn("deliver services", chunk)
+
+    def test_text_sent_stays_within_single_call_budget(self):
+        pages = [BALANCE_SHEET[:400]] * 12
+        text = "\f".join(pages)
+        extraction = ExtractionResult(success=True, text_content=text, page_offsets=compute_page_offsets(text))
+
+        self.pipeline.analyze(extraction)
+
+        self.assertEqual(len(self.extractor.chunks), 2)
+        self.assertLessEqual(sum(len(chunk) for chunk in self.extractor.chunks), 1000)
+
+        single = PDFPagePipeline(extractor=self.extractor, ai_chunk_chars=1000, max_ai_chunks=1)
+        self.assertEqual(len(single.relevant_chunks(text)), 1)
+
+    def test_chunk_offsets_map_back_to_source_pages(self):
+        pages = [NARRATIVE, "  " + BALANCE_SHEET[:400], NARRATIVE]
+        text = "\f".join(pages)
+        extraction = ExtractionResult(success=True, text_content=text, page_offsets=compute_page_offsets(text))
+
+        self.pipeline.analyze(extraction)
+
+        chunk, page_index = self.extractor.chunks[0], self.extractor.page_indexes[0]
+        position = chunk.find("Total reserves")
+        self.assertEqual(page_index.page_at(position), 2)
+        source_position = page_index.source_offset(position)
+        self.assertEqual(text[source_position:source_position + 14], "Total reserves")
+
+    def test_fallback_figures_carry_page_and_span(self):
+        text = "Narrative\fBalance Sheet\nTotal reserves 3,059.6\n"
+        extractor = TikaFinancialExtractor.__new__(TikaFinancialExtractor)
+
+        metadata = extractor._extract_financial_data_fallback(text)["_metadata"]["reserves"]
+
+        self.assertEqual(metadata["page_number"], 2)
+        self.assertEqual(text[metadata["char_start"]:metadata["char_end"]].lower(), metadata["source_text"])
+        self.assertEqual(PageOffsetIndex([0, 10, 50]).page_at(49), 2)
+
+    def test_merge_prefers_most_confident_value(self):
+        results = [
+            AIAnalysisResult(success=True, extracted_data={"reserves": 1, "notes": "low"}, confidence_score=0.4),
+            AIAnalysisResult(success=True, extracted_data={"reserves": 2, "total_debt": 5}, confidence_score=0.9),
+            AIAnalysisResult(success=False, error_message="boom"),
+        ]
+
+        merged = PDFPagePipeline.merge_analysis_results(results)
+
+        self.assertEqual(merged.extracted_data["reserves"], 2)
+        self.assertEqual(merged.extracted_data["total_debt"], 5)
+        self.assertEqual(merged.confidence_score, 0.9)
+
+
+def _range_text(pdf_bytes):
+    """Stand-in for Tika: one form-feed terminated line per page, naming the page by its width."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return "".join(f"Page {int(page.mediabox.width)} total reserves 1,000\f" for page in reader.pages)
+
+
+class PDFRangeExtractionTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pdf_path = f"{self.tmpdir}/statement.pdf"
+        writer = PdfWriter()
+        for page_number in range(1, 8):
+            # Page widths identify the source page once split into ranges
+            writer.add_blank_page(width=page_number * 10, height=100)
+        with open(self.pdf_path, "wb") as fh:
+            writer.write(fh)
+
+        extractor = TikaFinancialExtractor(cache=PDFExtractionCache(f"{self.tmpdir}/cache"))
+        self.pipeline = PDFPagePipeline(extractor=extractor)
+        self.pipeline.min_pages = 5
+        self.pipeline.pages_per_range = 3
+        self.pipeline.max_workers = 2
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_range_pdf_holds_requested_pages(self):
+        reader = PdfReader(self.pdf_path)
+        range_reader = PdfReader(io.BytesIO(self.pipeline._build_range_pdf(reader, 3, 5)))
+        self.assertEqual([int(page.mediabox.width) for page in range_reader.pages], [30, 40, 50])
+
+    def test_ranges_are_extracted_in_document_order(self):
+        ranges = self.pipeline.page_ranges(7)
+        self.assertEqual(ranges, [(1, 3), (4, 6), (7, 7)])
+        with mock.patch.object(self.pipeline, "_extract_range_bytes", side_effect=_range_text):
+            texts = self.pipeline._extract_ranges(self.pdf_path, ranges)
+        self.assertEqual(texts[1], "Page 40 total reserves 1,000\fPage 50 total reserves 1,000\f"
+                                   "Page 60 total reserves 1,000\f")
+        self.assertEqual(texts[2], "Page 70 total reserves 1,000\f")
+
+    def test_large_pdf_is_extracted_by_range_and_cached(self):
+        self.assertTrue(self.pipeline.should_split(self.pdf_path))
+        with mock.patch.object(self.pipeline, "_extract_range_bytes", side_effect=_range_text) as extract_range:
+            result = self.pipeline.extract(self.pdf_path)
+            cached = self.pipeline.extract(self.pdf_path)
+
+        self.assertEqual(extract_range.call_count, 3)
+        self.assertTrue(result.success)
+        pages = result.text_content.split("\f")
+        self.assertEqual(len(pages), 7)
+        self.assertEqual(pages[6], "Page 70 total reserves 1,000")
+        self.assertEqual(result.page_offsets, compute_page_offsets(result.text_content))
+        self.assertTrue(cached.from_cache)
+        self.assertEqual(cached.text_content, result.text_content)
+
+    def test_small_pdf_falls_back_without_rehashing(self):
+        self.pipeline.min_pages = 10
+        digest = compute_file_sha256(self.pdf_path)
+        with mock.patch("council_finance.services.pdf_pipeline.compute_file_sha256",
+                        wraps=compute_file_sha256) as pipeline_hash, \
+                mock.patch("council_finance.services.pdf_processing.compute_file_sha256") as extractor_hash, \
+                mock.patch("council_finance.services.pdf_processing.requests.put") as put:
+            put.return_value.status_code = 200
+            put.return_value.text = "Balance sheet\ftotal reserves 300"
+            result = self.pipeline.extract(self.pdf_path)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.sha256, digest)
+        self.assertEqual(pipeline_hash.call_count, 1)
+        extractor_hash.assert_not_called()
@@ -0,0 +1,129 @@
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from council_finance.models import Council, Flag
+from council_finance.services.auth_security_monitor import AuthSecurityMonitor
+from council_finance.services.flagging_services import FlaggingService, flag_rate_limiter
+from council_finance.services.rate_limiter import SlidingWindowRateLimiter
+from event_viewer.models import SystemEvent
+
+
+class SlidingWindowRateLimiterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.limiter = SlidingWindowRateLimiter('test', limit=3, window_seconds=100)
+
+    def test_limit_is_crossed_once(self):
+        start = 1000.0
+        results = [self.limiter.hit('a', now=start + i) for i in range(5)]
+
+        self.assertEqual([r.allowed for r in results], [True, True, True, False, False])
+        self.assertEqual([r.crossed for r in results], [False, False, False, True, False])
+        self.assertEqual(results[2].remaining, 0)
+        self.assertEqual(results[3].retry_after, 97)  # Until the window rolls over
+        self.assertTrue(self.limiter.hit('b', now=start).allowed)
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        for _ in range(3):
+            self.limiter.hit('a', now=1010.0)
+
+        # Halfway into the next window, half of the old count remains
+        self.assertEqual(self.limiter.count('a', now=1150.0), 1.5)
+        result = self.limiter.hit('a', now=1150.0)
+        self.assertTrue(result.allowed)
+        self.assertEqual(result.count, 2.5)
+
+        blocked = self.limiter.peek('a', now=1150.0)
+        self.assertFalse(blocked.allowed)
+        # The old window's share has to fall from 1.5 to 1
+        self.assertEqual(blocked.retry_after, 17)
+
+    def test_peek_and_reset_do_not_count(self):
+        self.limiter.peek('a', now=1000.0)
+        self.assertEqual(self.limiter.count('a', now=1000.0), 0)
+
+        self.limiter.hit('a', amount=3, now=1000.0)
+        self.assertFalse(self.limiter.peek('a', now=1000.0).allowed)
+        self.limiter.reset('a', now=1000.0)
+        self.assertTrue(self.limiter.peek('a', now=1000.0).allowed)
+
+
+class RateLimitedEndpointsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('flagger', 'flagger@example.com', 'pw')
+
+    def test_flags_are_limited_per_day(self):
+        councils = [Council.objects.create(name=f"Flagton {i}", slug=f"flagton-{i}") for i in range(11)]
+        for council in councils[:10]:
+            result = FlaggingService.flag_content(self.user, council, 'inappropriate', 'Looks wrong')
+            self.assertTrue(result['success'], result.get('error'))
+
+        self.assertTrue(FlaggingService.is_user_rate_limited(self.user))
+        result = FlaggingService.flag_content(self.user, councils[10], 'inappropriate', 'Looks wrong')
+        self.assertFalse(result['success'])
+        self.assertIn('limit', result['error'])
+
+    def test_process_local_cache_counts_flags_in_the_database(self):
+        # Flags saved by other workers count even though this process's
+        # cache has never seen them
+        councils = [Council.objects.create(name=f"Flagton {i}", slug=f"flagton-{i}") for i in range(11)]
+        for council in councils[:10]:
+            Flag.objects.create(content_type=ContentType.objects.get_for_model(council), object_id=council.pk,
+                                flagged_by=self.user, flag_type='inappropriate', description='Looks wrong')
+
+        self.assertFalse(flag_rate_limiter.shared)
+        self.assertTrue(FlaggingService.is_user_rate_limited(self.user))
+        result = FlaggingService.flag_content(self.user, councils[10], 'inappropriate', 'Looks wrong')
+        self.assertFalse(result['success'])
+
+    def test_shared_cache_counts_flags_in_the_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches_setting = {'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }}
+            with override_settings(CACHES=caches_setting):
+                self.assertTrue(flag_rate_limiter.shared)
+                with mock.patch.object(flag_rate_limiter, 'fallback_count') as fallback_count:
+                    self.assertTrue(flag_rate_limiter.hit(self.user.pk).allowed)
+                    self.assertEqual(flag_rate_limiter.count(self.user.pk), 1)
+                fallback_count.assert_not_called()
+
+    def test_feedback_is_limited_per_ip(self):
+        data = {'title': 'Hello', 'description': 'A long enough description'}
+        headers = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest', 'REMOTE_ADDR': '10.0.0.9'}
+        for _ in range(10):
+            self.assertEqual(self.client.post(reverse('feedback_form'), data, **headers).status_code, 200)
+
+        response = self.client.post(reverse('feedback_form'), data, **headers)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+
+class AuthSecurityMonitorCountingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.monitor = AuthSecurityMonitor()
+
+    def test_only_threshold_crossings_are_written(self):
+        for _ in range(6):
+            self.monitor.record_login_failure('192.0.2.1')
+
+        events = SystemEvent.objects.filter(source='security')
+        self.assertEqual(events.count(), 1)
+        self.assertEqual(events.get().details['ip_address'], '192.0.2.1')
+
+        self.assertEqual(self.monitor.current_count('failed_logins_per_hour'), 6)
+        ip_alerts = self.monitor.check_ip_based_attacks()
+        self.assertEqual(ip_alerts[0]['count'], 6)
+
+    def test_failed_login_signal_is_counted(self):
+        self.client.login(username='nobody', password='wrong')
+        self.assertEqual(self.monitor.current_count('failed_logins_per_hour'), 1)
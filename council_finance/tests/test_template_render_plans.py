@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from council_finance.expression_renderer import ExpressionRenderer
+from council_finance.models import FactoidTemplate
+from council_finance.services import factoid_engine
+from council_finance.services.factoid_engine import FactoidEngine
+
+
+class ExpressionRenderPlanTest(SimpleTestCase):
+    def setUp(self):
+        self.renderer = ExpressionRenderer()
+        self.context = {
+            'council_name': 'Worcester',
+            'calculated': {'total_debt': Decimal('1234567.891')},
+            'characteristic': {},
+        }
+
+    def test_plan_is_compiled_once_per_text(self):
+        text = "{council_name} owes {calculated.total_debt:currency:2}"
+        plan = self.renderer.compile(text)
+        self.assertIs(ExpressionRenderer().compile(text), plan)
+        self.assertEqual(len(plan.segments), 3)
+
+    def test_render_matches_expression_evaluation(self):
+        text = "{council_name} owes {calculated.total_debt:currency} ({calculated.missing:number}, {characteristic.population})"
+        rendered, errors = self.renderer.render_safe(text, self.context)
+        self.assertEqual(rendered, "Worcester owes £1,234,568 (0, [population])")
+        self.assertEqual(errors, [])
+
+    def test_errors_leave_expression_in_place(self):
+        text = "{unknown} and {council_name:text:x} and {council_name}"
+        rendered, errors = self.renderer.render_safe(text, self.context)
+        self.assertEqual(rendered, "{unknown} and {council_name:text:x} and Worcester")
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(errors[0].startswith("Error evaluating 'unknown'"))
+
+
+class FactoidRenderPlanTest(TestCase):
+    def setUp(self):
+        self.engine = FactoidEngine()
+        self.template = FactoidTemplate.objects.create(
+            name="Debt", template_text="{council_name} owes {total-debt:currency}, {change:percentage}"
+        )
+
+    def test_render_uses_cached_plan(self):
+        context = {'council_name': 'Worcester', 'total_debt': Decimal('1500.4'), 'change': None}
+        self.assertEqual(self.engine.render_template(self.template, context), "Worcester owes £1,500, N/A")
+        self.assertIs(self.engine.render_plan(self.template), self.engine.render_plan(self.template))
+
+    def test_plan_dropped_when_template_saved_or_deleted(self):
+        plan = self.engine.render_plan(self.template)
+        self.template.template_text = "{council_name}"
+        self.template.save()
+        self.assertNotIn(self.template.pk, factoid_engine._render_plans)
+        self.assertIsNot(self.engine.render_plan(self.template), plan)
+        self.assertEqual(self.engine.render_template(self.template, {'council_name': 'Worcester'}), "Worcester")
+
+        pk = self.template.pk
+        self.template.delete()
+        self.assertNotIn(pk, factoid_engine._render_plans)
+
+    def test_format_value_matches_bound_formatters(self):
+        for format_type, value, expected in [
+            ('currency', 1234.5, '£1,234'),
+            ('percentage', Decimal('12.345'), '12.3%'),
+            ('number', 1000, '1,000'),
+            ('decimal', 1.005, '1.00'),
+            ('currency', 'n/a', 'n/a'),
+            ('default', None, 'N/A'),
+        ]:
+            self.assertEqual(self.engine.format_value(value, format_type), expected)
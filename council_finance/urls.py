@@ -480,6 +480,7 @@ urlpatterns = [
     path("god-mode/councils/import/", council_mgmt_views.import_page, name="import_councils"),
     path("god-mode/councils/bulk-import/", council_mgmt_views.bulk_import, name="bulk_import_councils"),
     path("god-mode/councils/cancel-import/", council_mgmt_views.cancel_import, name="cancel_import"),
+    path("god-mode/councils/import-progress/<str:import_id>/", council_mgmt_views.import_progress, name="council_import_progress"),
     
     # AI Management under God Mode
     path("god-mode/ai/", admin_views.ai_management_dashboard, name="ai_management_dashboard"),
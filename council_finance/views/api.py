@@ -665,7 +665,7 @@ def emergency_cache_warming(request):
                 })
         
         # Log to Event Viewer
-        from event_viewer.models import SystemEvent
+        from event_viewer.services.event_sink import record_event
         
         # Determine severity based on number of zero counters
         if len(zero_counters) > 5:
@@ -676,7 +676,7 @@ def emergency_cache_warming(request):
             level = 'info'
         
         # Create SystemEvent for monitoring
-        SystemEvent.objects.create(
+        record_event(
             source='api',
             level=level,
             category='data_quality',
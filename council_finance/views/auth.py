@@ -995,6 +995,9 @@ def password_reset_view(request):
         if form.is_valid():
             email = form.cleaned_data['email']
             
+            from council_finance.services.auth_security_monitor import auth_security_monitor
+            auth_security_monitor.record_password_reset(request.META.get('REMOTE_ADDR'))
+            
             # Check if user exists and log the attempt
             try:
                 user = User.objects.get(email=email)
@@ -159,18 +159,15 @@ def contribute_stats(request):
     if request.headers.get("X-Requested-With") != "XMLHttpRequest":
         return HttpResponseBadRequest("XHR required")
 
+    from council_finance.services.completeness_index import completeness_index
+
     missing_total = DataIssue.objects.filter(issue_type='missing', council__status='active').count()
     missing_characteristics = DataIssue.objects.filter(
         issue_type='missing',
         field__category='characteristic',
         council__status='active'
     ).count()
-    missing_financial = DataIssue.objects.filter(
-        issue_type='missing',
-        council__status='active'
-    ).exclude(
-        field__category='characteristic'
-    ).count()
+    missing_financial = missing_total - missing_characteristics
 
     try:
         from council_finance.smart_data_quality import get_data_collection_priorities
@@ -201,6 +198,7 @@ def contribute_stats(request):
         'missing_financial': missing_financial,
         'pending': Contribution.objects.filter(status='pending').count(),
         'suspicious': DataIssue.objects.filter(issue_type='suspicious').count(),
+        'completion_percentage': round(completeness_index.site_completion_percentage(), 1),
         'priority_stats': priority_stats,
     }
 
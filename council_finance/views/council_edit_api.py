@@ -29,7 +29,7 @@ from council_finance.models import (
 
 # Event Viewer integration
 try:
-    from event_viewer.models import SystemEvent
+    from event_viewer.services.event_sink import record_event
     EVENT_VIEWER_AVAILABLE = True
 except ImportError:
     EVENT_VIEWER_AVAILABLE = False
@@ -54,7 +54,7 @@ def log_council_edit_event(request, level, category, title, message, details=Non
         if details:
             event_details.update(details)
         
-        SystemEvent.objects.create(
+        record_event(
             source='council_edit_api',
             level=level,
             category=category,
@@ -85,7 +85,7 @@ def log_cache_operation(council_slug, operation_type, cache_keys, success=True,
         if details:
             event_details.update(details)
         
-        SystemEvent.objects.create(
+        record_event(
             source='cache_management',
             level='info' if success else 'warning',
             category='performance',
@@ -173,6 +173,11 @@ def save_council_characteristic_api(request, council_slug):
         
         # Parse request data
         data = json.loads(request.body)
+        
+        # Several characteristics at once: {"fields": [{"field": ..., "value": ...}, ...]}
+        if isinstance(data.get('fields'), list):
+            return _save_council_characteristics_bulk(request, council, data['fields'])
+        
         field_slug = data.get('field')
         value = data.get('value', '').strip()
         
@@ -581,6 +586,11 @@ def save_temporal_data_api(request, council_slug, year_id):
         
         # Parse request data
         data = json.loads(request.body)
+        
+        # Several fields at once: {"fields": [{"field": ..., "value": ..., "category": ...}, ...]}
+        if isinstance(data.get('fields'), list):
+            return _save_temporal_data_bulk(request, council, year, data['fields'], data.get('category'))
+        
         field_slug = data.get('field')
         value = data.get('value', '').strip()
         category = data.get('category')
@@ -965,6 +975,223 @@ def save_temporal_data_api(request, council_slug, year_id):
         }, status=500)
 
 
+# Database categories behind the frontend temporal categories
+TEMPORAL_CATEGORIES = {
+    'general': ['general'],
+    'financial': ['balance_sheet', 'income', 'spending', 'calculated'],
+}
+
+
+def _url_validation_error(value, field_slug):
+    """Return the URL validation message for an invalid URL, else None."""
+    from council_finance.views.api import validate_url_api
+    
+    mock_request = type('MockRequest', (), {
+        'body': json.dumps({'url': value, 'field_slug': field_slug}).encode(),
+        'method': 'POST'
+    })()
+    validation_data = json.loads(validate_url_api(mock_request).content)
+    if validation_data.get('valid', False):
+        return None
+    return validation_data.get('message', 'URL validation failed')
+
+
+def _save_temporal_data_bulk(request, council, year, entries, default_category=None):
+    """
+    Save many general/financial fields for one year in a single upsert.
+    
+    Body:
+    {
+        "category": "financial",
+        "fields": [
+            {"field": "total-debt", "value": "1250000"},
+            {"field": "link-to-financial-statement", "value": "https://...", "category": "general"}
+        ]
+    }
+    
+    Entries are validated up front; if any fails nothing is saved.
+    """
+    from council_finance.services.bulk_data_save import BulkSaveError, bulk_save_financial_figures
+    
+    start_time = timezone.now()
+    slugs = [entry.get('field') for entry in entries if isinstance(entry, dict)]
+    fields = {
+        field.slug: field
+        for field in DataField.objects.filter(
+            slug__in=slugs,
+            category__in=TEMPORAL_CATEGORIES['general'] + TEMPORAL_CATEGORIES['financial']
+        )
+    }
+    
+    values = {}
+    errors = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            errors.append({'field': None, 'error': 'Each entry must be an object'})
+            continue
+        
+        field_slug = entry.get('field')
+        category = entry.get('category', default_category)
+        field = fields.get(field_slug)
+        value = str(entry.get('value', '') or '').strip()
+        
+        if not field_slug or category not in TEMPORAL_CATEGORIES:
+            errors.append({'field': field_slug, 'error': 'Field slug and category (general or financial) are required'})
+        elif field is None or field.category not in TEMPORAL_CATEGORIES[category]:
+            errors.append({'field': field_slug, 'error': f'Field not found for category {category}'})
+        elif category == 'general' and field.content_type == 'url' and value and (
+            url_error := _url_validation_error(value, field_slug)
+        ):
+            errors.append({'field': field_slug, 'error': url_error})
+        else:
+            values[field] = value
+    
+    if not errors:
+        try:
+            result = bulk_save_financial_figures(council, year, values, user=request.user)
+        except BulkSaveError as e:
+            errors.append({'field': e.field.slug, 'error': str(e)})
+    
+    if errors:
+        log_council_edit_event(
+            request, 'warning', 'data_validation',
+            'Bulk Temporal Data Save Rejected',
+            f'Rejected bulk save of {len(entries)} fields for {council.name} ({year.label})',
+            details={
+                'council_slug': council.slug,
+                'year_label': year.label,
+                'submitted_fields': len(entries),
+                'errors': errors
+            }
+        )
+        return JsonResponse({
+            'success': False,
+            'error': 'Some fields could not be saved',
+            'errors': errors
+        }, status=400)
+    
+    from django.core.cache import cache
+    cache.delete(f"counter_values:{council.slug}:{year.label}")
+    
+    total_processing_time = (timezone.now() - start_time).total_seconds()
+    log_council_edit_event(
+        request, 'info', 'data_integrity',
+        'Temporal Data Bulk Saved',
+        f'Saved {len(result.changes)} fields for {council.name} ({year.label}), {result.unchanged} unchanged',
+        details={
+            'council_slug': council.slug,
+            'year_label': year.label,
+            'changed_fields': [change.field.slug for change in result.changes],
+            'created': result.created,
+            'updated': result.updated,
+            'unchanged': result.unchanged,
+            'total_processing_time_seconds': total_processing_time,
+            'operation_type': 'save_temporal_data_bulk'
+        }
+    )
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'{len(result.changes)} fields updated successfully',
+        'saved_fields': [change.field.slug for change in result.changes],
+        'created': result.created,
+        'updated': result.updated,
+        'unchanged': result.unchanged,
+        # Same points per field as the single-field save
+        'points': sum(4 if change.field.category == 'general' else 2 for change in result.changes)
+    })
+
+
+def _save_council_characteristics_bulk(request, council, entries):
+    """
+    Save many characteristics in a single upsert.
+    
+    Body:
+    {
+        "fields": [
+            {"field": "council-website", "value": "https://example.com"},
+            {"field": "population", "value": "1144900"}
+        ]
+    }
+    
+    Entries are validated up front; if any fails nothing is saved.
+    """
+    from council_finance.services.bulk_data_save import bulk_save_characteristics
+    
+    start_time = timezone.now()
+    slugs = [entry.get('field') for entry in entries if isinstance(entry, dict)]
+    fields = {
+        field.slug: field
+        for field in DataField.objects.filter(slug__in=slugs, category='characteristic')
+    }
+    
+    values = {}
+    errors = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            errors.append({'field': None, 'error': 'Each entry must be an object'})
+            continue
+        
+        field_slug = entry.get('field')
+        field = fields.get(field_slug)
+        value = str(entry.get('value', '') or '').strip()
+        
+        if field is None:
+            errors.append({'field': field_slug, 'error': 'Characteristic field not found'})
+        elif field.content_type == 'url' and value and (url_error := _url_validation_error(value, field_slug)):
+            errors.append({'field': field_slug, 'error': url_error})
+        else:
+            values[field] = value
+    
+    if errors:
+        log_council_edit_event(
+            request, 'warning', 'data_validation',
+            'Bulk Characteristic Save Rejected',
+            f'Rejected bulk save of {len(entries)} characteristics for {council.name}',
+            details={'council_slug': council.slug, 'submitted_fields': len(entries), 'errors': errors}
+        )
+        return JsonResponse({
+            'success': False,
+            'error': 'Some fields could not be saved',
+            'errors': errors
+        }, status=400)
+    
+    result = bulk_save_characteristics(council, values, user=request.user)
+    
+    # Characteristics can affect every year's counters
+    from django.core.cache import cache
+    cache.delete_many([
+        f"counter_values:{council.slug}:{label}"
+        for label in FinancialYear.objects.values_list('label', flat=True)
+    ])
+    
+    total_processing_time = (timezone.now() - start_time).total_seconds()
+    log_council_edit_event(
+        request, 'info', 'data_integrity',
+        'Council Characteristics Bulk Saved',
+        f'Saved {len(result.changes)} characteristics for {council.name}, {result.unchanged} unchanged',
+        details={
+            'council_slug': council.slug,
+            'changed_fields': [change.field.slug for change in result.changes],
+            'created': result.created,
+            'updated': result.updated,
+            'unchanged': result.unchanged,
+            'total_processing_time_seconds': total_processing_time,
+            'operation_type': 'save_council_characteristics_bulk'
+        }
+    )
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'{len(result.changes)} characteristics updated successfully',
+        'saved_fields': [change.field.slug for change in result.changes],
+        'created': result.created,
+        'updated': result.updated,
+        'unchanged': result.unchanged,
+        'points': 3 * len(result.changes)
+    })
+
+
 @login_required
 @require_http_methods(['GET'])
 def council_available_years_api(request, council_slug):
@@ -1132,39 +1359,21 @@ def council_completion_percentage_api(request, council_slug, year_id=None):
         
         completion_data = {}
         
-        # Calculate characteristics completion (non-temporal data)
-        characteristics_fields = DataField.objects.filter(category='characteristic')  # Fixed: singular 'characteristic'
-        characteristics_with_data = CouncilCharacteristic.objects.filter(
-            council=council,
-            field__in=characteristics_fields
-        ).values_list('field_id', flat=True)
-        
-        characteristics_stats = {
-            'total': characteristics_fields.count(),
-            'complete': len(set(characteristics_with_data)),
-        }
-        characteristics_stats['percentage'] = (
-            round((characteristics_stats['complete'] / characteristics_stats['total']) * 100)
-            if characteristics_stats['total'] > 0 else 0
+        # Completion comes from popcounts over the completeness index bitsets
+        from council_finance.services.completeness_index import (
+            FINANCIAL_CATEGORIES,
+            completeness_index,
         )
         
-        # Calculate financial data completion (temporal data) - FOCUS ON CURRENT YEAR ONLY
-        financial_fields = DataField.objects.filter(
-            category__in=['balance_sheet', 'income', 'spending']  # Exclude calculated fields
+        # Calculate characteristics completion (non-temporal data)
+        characteristics_stats = completeness_index.council_completion(
+            council.id, completeness_index.category_mask(['characteristic'])
         )
-        financial_with_data = FinancialFigure.objects.filter(
-            council=council,
-            year=year,
-            field__in=financial_fields
-        ).values_list('field_id', flat=True)
         
-        financial_stats = {
-            'total': financial_fields.count(),
-            'complete': len(set(financial_with_data)),
-        }
-        financial_stats['percentage'] = (
-            round((financial_stats['complete'] / financial_stats['total']) * 100)
-            if financial_stats['total'] > 0 else 0
+        # Calculate financial data completion (temporal data) - FOCUS ON CURRENT YEAR ONLY
+        # (calculated fields excluded)
+        financial_stats = completeness_index.council_completion(
+            council.id, completeness_index.category_mask(FINANCIAL_CATEGORIES), year.id
         )
         
         # Focus on current year financial data only
@@ -1172,20 +1381,8 @@ def council_completion_percentage_api(request, council_slug, year_id=None):
         focus_year_label = f"{financial_stats['percentage']}% complete for {year.label}"
         
         # Calculate general data completion (temporal data)
-        general_fields = DataField.objects.filter(category='general')
-        general_with_data = FinancialFigure.objects.filter(
-            council=council,
-            year=year,
-            field__in=general_fields
-        ).values_list('field_id', flat=True)
-        
-        general_stats = {
-            'total': general_fields.count(),
-            'complete': len(set(general_with_data)),
-        }
-        general_stats['percentage'] = (
-            round((general_stats['complete'] / general_stats['total']) * 100)
-            if general_stats['total'] > 0 else 0
+        general_stats = completeness_index.council_completion(
+            council.id, completeness_index.category_mask(['general']), year.id
         )
         
         # Calculate overall completion
@@ -1252,6 +1449,55 @@ def council_completion_percentage_api(request, council_slug, year_id=None):
 
 
 
+def _build_pdf_validation_prompt(council, year, field_definitions, regex_candidates, pdf_context):
+    """Build the OpenAI prompt that validates regex candidates against PDF text."""
+    return f"""
+You are a financial data validation specialist. You will be given potential financial figures found by regex patterns in {council.name} ({year.label}) financial statement, and you need to validate and refine them.
+
+TARGET FIELDS (amounts in £, return as integers):
+{json.dumps(field_definitions, indent=2)}
+
+REGEX-DETECTED CANDIDATES:
+{json.dumps(regex_candidates, indent=2)}
+
+PDF CONTENT (for context and validation):
+{pdf_context}
+
+Your task:
+1. Review each regex candidate
+2. Validate if the figure matches the intended field  
+3. Check the surrounding context for accuracy
+4. Provide confidence scores and reasoning
+5. Add any obvious fields that regex missed
+
+Return ONLY valid JSON in this exact format:
+{{
+  "extracted_data": {{
+    "field-slug": {{
+      "value": 1500000000,
+      "field_name": "Field Name", 
+      "source_text": "exact text containing the figure",
+      "page_number": null,
+      "ai_reasoning": "Validated: This figure appears in the Income Statement as Council Tax income. The context confirms it's the total annual amount."
+    }}
+  }},
+  "confidence_scores": {{
+    "field-slug": 0.95
+  }}
+}}
+
+VALIDATION RULES:
+- Start with regex candidates but validate each one carefully
+- Confidence 0.0-1.0 based on context clarity and field match accuracy
+- Include exact source text containing the figure
+- Explain WHY this figure matches this field (validation reasoning)
+- Convert amounts to integers (£1.5m = 1500000, £150.5m = 150500000)
+- Reject candidates that don't match the target field definition
+- Add any clear fields that regex missed
+- Leave page_number as null
+"""
+
+
 @login_required
 @require_http_methods(['POST'])
 def process_pdf_api(request):
@@ -1582,97 +1828,146 @@ def process_pdf_api(request):
                 
                 print(f"🔍 Extracting text using Tika endpoint: {tika_endpoint}")
                 
-                # Wake up Tika server (Render deployments often sleep)
-                try:
-                    print("🌅 Warming up Tika server...")
-                    warmup_response = requests.get(tika_endpoint.replace('/tika', '/version'), timeout=30)
-                    if warmup_response.status_code == 200:
-                        print("✅ Tika server is awake")
-                    else:
-                        print(f"⚠️ Tika warmup returned {warmup_response.status_code}")
-                except Exception as warmup_error:
-                    print(f"⚠️ Tika warmup failed (continuing anyway): {warmup_error}")
+                from council_finance.services.pdf_processing import (
+                    PDFExtractionCache, compute_file_sha256, compute_page_offsets
+                )
                 
-                # Send PDF file to Tika HTTP endpoint
-                with open(pdf_path, 'rb') as pdf_file_handle:
-                    pdf_content = pdf_file_handle.read()
-                    headers = {
-                        'Accept': 'text/plain',
-                        'Content-Type': 'application/pdf'
-                    }
+                # Identical PDFs (same SHA-256) reuse the earlier extraction
+                extraction_cache = PDFExtractionCache()
+                pdf_sha256 = compute_file_sha256(pdf_path)
+                cached_extraction = extraction_cache.get(pdf_sha256)
+                
+                if cached_extraction is not None:
+                    pdf_text = cached_extraction['text_content']
+                    print(f"✅ Reusing cached extraction for {pdf_sha256[:12]}: {len(pdf_text)} characters")
+                else:
+                    # Wake up Tika server (Render deployments often sleep)
+                    try:
+                        print("🌅 Warming up Tika server...")
+                        warmup_response = requests.get(tika_endpoint.replace('/tika', '/version'), timeout=30)
+                        if warmup_response.status_code == 200:
+                            print("✅ Tika server is awake")
+                        else:
+                            print(f"⚠️ Tika warmup returned {warmup_response.status_code}")
+                    except Exception as warmup_error:
+                        print(f"⚠️ Tika warmup failed (continuing anyway): {warmup_error}")
+                
+                    # Large statements are split into page ranges and
+                    # extracted concurrently; smaller ones use a single request
+                    from council_finance.services.pdf_pipeline import PDFPagePipeline
+                    
+                    range_pipeline = PDFPagePipeline(tika_url=tika_endpoint)
+                    if range_pipeline.should_split(pdf_path):
+                        print("📚 Large PDF - extracting page ranges in parallel")
+                        range_extraction = range_pipeline.extract(pdf_path)
+                        
+                        if not range_extraction.success:
+                            log_council_edit_event(
+                                request, 'error', 'integration',
+                                'PDF Text Extraction Failed',
+                                f'Parallel page-range extraction failed: {range_extraction.error_message}',
+                                details={
+                                    'council_slug': council_slug,
+                                    'year_label': year.label,
+                                    'error_message': range_extraction.error_message,
+                                    'file_size': os.path.getsize(pdf_path)
+                                }
+                            )
+                            return JsonResponse({
+                                'success': False,
+                                'error': 'Failed to extract text from PDF'
+                            }, status=500)
+                        
+                        pdf_text = range_extraction.text_content
+                        print(f"✅ Parallel extraction successful: {len(pdf_text)} characters")
+                    else:
+                        # Send PDF file to Tika HTTP endpoint
+                        with open(pdf_path, 'rb') as pdf_file_handle:
+                            pdf_size = os.path.getsize(pdf_path)
+                            headers = {
+                                'Accept': 'text/plain',
+                                'Content-Type': 'application/pdf'
+                            }
                     
-                    print(f"🌐 Sending PDF to Tika: {len(pdf_content)} bytes")
+                            print(f"🌐 Streaming PDF to Tika: {pdf_size} bytes")
                     
-                    # Add retry logic for connection issues
-                    max_retries = 3
-                    for attempt in range(max_retries):
-                        try:
-                            print(f"🔄 Tika attempt {attempt + 1}/{max_retries}")
+                            # Add retry logic for connection issues
+                            max_retries = 3
+                            for attempt in range(max_retries):
+                                try:
+                                    print(f"🔄 Tika attempt {attempt + 1}/{max_retries}")
                             
-                            tika_response = requests.put(
-                                tika_endpoint,
-                                data=pdf_content,
-                                headers=headers,
-                                timeout=120  # Increased timeout for large files
-                            )
-                            break  # Success, exit retry loop
+                                    # Stream the file handle rather than reading it
+                                    # into memory; rewind for each retry
+                                    pdf_file_handle.seek(0)
+                                    tika_response = requests.put(
+                                        tika_endpoint,
+                                        data=pdf_file_handle,
+                                        headers=headers,
+                                        timeout=120  # Increased timeout for large files
+                                    )
+                                    break  # Success, exit retry loop
                             
-                        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
-                            print(f"⚠️ Tika attempt {attempt + 1} failed: {str(e)}")
+                                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                                    print(f"⚠️ Tika attempt {attempt + 1} failed: {str(e)}")
                             
-                            if attempt == max_retries - 1:
-                                # Final attempt failed
+                                    if attempt == max_retries - 1:
+                                        # Final attempt failed
+                                        log_council_edit_event(
+                                            request, 'error', 'integration',
+                                            'PDF Text Extraction Failed',
+                                            f'Apache Tika failed to extract text after {max_retries} attempts: {str(e)}',
+                                            details={
+                                                'council_slug': council_slug,
+                                                'year_label': year.label,
+                                                'error_type': type(e).__name__,
+                                                'error_message': str(e),
+                                                'file_size': pdf_size,
+                                                'attempts': max_retries,
+                                                'timeout_seconds': 120
+                                            }
+                                        )
+                                
+                                        return JsonResponse({
+                                            'success': False,
+                                            'error': 'Failed to extract text from PDF'
+                                        }, status=500)
+                                    else:
+                                        # Wait before retry (exponential backoff)
+                                        import time
+                                        wait_time = 2 ** attempt  # 1s, 2s, 4s
+                                        print(f"⏱️ Waiting {wait_time}s before retry...")
+                                        time.sleep(wait_time)
+                    
+                            if tika_response.status_code == 200:
+                                pdf_text = tika_response.text or ''
+                                print(f"✅ Tika extraction successful: {len(pdf_text)} characters")
+                                if pdf_text.strip():
+                                    extraction_cache.set(
+                                        pdf_sha256, pdf_text, compute_page_offsets(pdf_text), []
+                                    )
+                            else:
+                                print(f"❌ Tika HTTP error: {tika_response.status_code}")
+                        
                                 log_council_edit_event(
                                     request, 'error', 'integration',
-                                    'PDF Text Extraction Failed',
-                                    f'Apache Tika failed to extract text after {max_retries} attempts: {str(e)}',
+                                    'Tika HTTP Endpoint Failed',
+                                    f'Tika HTTP endpoint returned error {tika_response.status_code}',
                                     details={
                                         'council_slug': council_slug,
                                         'year_label': year.label,
-                                        'error_type': type(e).__name__,
-                                        'error_message': str(e),
-                                        'file_size': len(pdf_content),
-                                        'attempts': max_retries,
-                                        'timeout_seconds': 120
+                                        'tika_endpoint': tika_endpoint,
+                                        'http_status': tika_response.status_code,
+                                        'response_text': tika_response.text[:500] if tika_response.text else None,
+                                        'file_size_bytes': os.path.getsize(pdf_path)
                                     }
                                 )
-                                
+                        
                                 return JsonResponse({
                                     'success': False,
-                                    'error': 'Failed to extract text from PDF'
+                                    'error': f'Tika extraction failed: HTTP {tika_response.status_code}'
                                 }, status=500)
-                            else:
-                                # Wait before retry (exponential backoff)
-                                import time
-                                wait_time = 2 ** attempt  # 1s, 2s, 4s
-                                print(f"⏱️ Waiting {wait_time}s before retry...")
-                                time.sleep(wait_time)
-                    
-                    if tika_response.status_code == 200:
-                        pdf_text = tika_response.text or ''
-                        print(f"✅ Tika extraction successful: {len(pdf_text)} characters")
-                    else:
-                        print(f"❌ Tika HTTP error: {tika_response.status_code}")
-                        
-                        log_council_edit_event(
-                            request, 'error', 'integration',
-                            'Tika HTTP Endpoint Failed',
-                            f'Tika HTTP endpoint returned error {tika_response.status_code}',
-                            details={
-                                'council_slug': council_slug,
-                                'year_label': year.label,
-                                'tika_endpoint': tika_endpoint,
-                                'http_status': tika_response.status_code,
-                                'response_text': tika_response.text[:500] if tika_response.text else None,
-                                'file_size_bytes': os.path.getsize(pdf_path)
-                            }
-                        )
-                        
-                        return JsonResponse({
-                            'success': False,
-                            'error': f'Tika extraction failed: HTTP {tika_response.status_code}'
-                        }, status=500)
-                
+
                 tika_time = (timezone.now() - tika_start).total_seconds()
                 print(f"✅ Text extraction complete in {tika_time:.2f}s: {len(pdf_text)} characters")
                 
@@ -1712,7 +2007,8 @@ def process_pdf_api(request):
                         'word_count': word_count,
                         'page_count': page_count,
                         'extraction_time_seconds': tika_time,
-                        'file_size': os.path.getsize(pdf_path)
+                        'file_size': os.path.getsize(pdf_path),
+                        'extraction_cache_hit': cached_extraction is not None
                     }
                 )
                     
@@ -1837,10 +2133,13 @@ def process_pdf_api(request):
                 
                 # First, use existing regex to identify potential financial figures
                 print("🔍 Phase 1: Regex-based candidate detection")
+                from council_finance.services.financial_text_scanner import scan_financial_text
                 from council_finance.services.pdf_processing import TikaFinancialExtractor
                 
                 extractor = TikaFinancialExtractor()
-                regex_results = extractor._extract_financial_data_fallback(pdf_text)
+                # Scanned once for both the regex pass and page selection
+                pdf_text_index = scan_financial_text(pdf_text)
+                regex_results = extractor._extract_financial_data_fallback(pdf_text, pdf_text_index)
                 
                 # Convert regex results to field candidates format
                 regex_candidates = {}
@@ -1892,55 +2191,24 @@ def process_pdf_api(request):
                     }
                 )
                 
-                # Construct AI validation prompt  
-                prompt = f"""
-You are a financial data validation specialist. You will be given potential financial figures found by regex patterns in {council.name} ({year.label}) financial statement, and you need to validate and refine them.
-
-TARGET FIELDS (amounts in £, return as integers):
-{json.dumps(field_definitions, indent=2)}
-
-REGEX-DETECTED CANDIDATES:
-{json.dumps(regex_candidates, indent=2)}
-
-PDF CONTENT (for context and validation):
-{pdf_text[:15000]}
-
-Your task:
-1. Review each regex candidate
-2. Validate if the figure matches the intended field  
-3. Check the surrounding context for accuracy
-4. Provide confidence scores and reasoning
-5. Add any obvious fields that regex missed
-
-Return ONLY valid JSON in this exact format:
-{{
-  "extracted_data": {{
-    "field-slug": {{
-      "value": 1500000000,
-      "field_name": "Field Name", 
-      "source_text": "exact text containing the figure",
-      "page_number": null,
-      "ai_reasoning": "Validated: This figure appears in the Income Statement as Council Tax income. The context confirms it's the total annual amount."
-    }}
-  }},
-  "confidence_scores": {{
-    "field-slug": 0.95
-  }}
-}}
-
-VALIDATION RULES:
-- Start with regex candidates but validate each one carefully
-- Confidence 0.0-1.0 based on context clarity and field match accuracy
-- Include exact source text containing the figure
-- Explain WHY this figure matches this field (validation reasoning)
-- Convert amounts to integers (£1.5m = 1500000, £150.5m = 150500000)
-- Reject candidates that don't match the target field definition
-- Add any clear fields that regex missed
-- Leave page_number as null
-"""
+                # Only the most financially relevant pages are sent to the AI,
+                # in a single prompt (each prompt repeats the field
+                # definitions and candidates) of the former 15,000 characters
+                from concurrent.futures import ThreadPoolExecutor
+                from council_finance.services.pdf_pipeline import PDFPagePipeline
+                from council_finance.services.pdf_processing import compute_page_offsets
+                
+                page_pipeline = PDFPagePipeline(extractor=extractor, ai_chunk_chars=15000, max_ai_chunks=1)
+                context_chunks = page_pipeline.relevant_chunks(
+                    pdf_text, compute_page_offsets(pdf_text), pdf_text_index
+                )
+                prompts = [
+                    _build_pdf_validation_prompt(council, year, field_definitions, regex_candidates, chunk)
+                    for chunk in context_chunks
+                ]
                 
                 # Log AI API call
-                print("🌐 Making OpenAI API call...")
+                print(f"🌐 Making {len(prompts)} OpenAI API call(s)...")
                 log_council_edit_event(
                     request, 'info', 'integration',
                     'OpenAI API Call Started',
@@ -1949,43 +2217,82 @@ VALIDATION RULES:
                         'council_slug': council_slug,
                         'year_label': year.label,
                         'model': 'gpt-4',
-                        'prompt_length': len(prompt),
-                        'text_length_sent': len(pdf_text[:20000]),
+                        'prompt_length': sum(len(prompt) for prompt in prompts),
+                        'text_length_sent': sum(len(chunk) for chunk in context_chunks),
+                        'chunk_count': len(prompts),
                         'temperature': 0.1,
                         'max_tokens': 2000
                     }
                 )
                 
+                def run_validation_prompt(prompt):
+                    response = openai_client.chat.completions.create(
+                        model=settings.OPENAI_MODEL or "gpt-4o-mini",
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.1,
+                        max_tokens=2000
+                    )
+                    return response.choices[0].message.content.strip()
+                
                 api_call_start = timezone.now()
-                response = openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL or "gpt-4o-mini",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.1,
-                    max_tokens=2000
-                )
+                with ThreadPoolExecutor(max_workers=min(page_pipeline.max_workers, len(prompts))) as pool:
+                    ai_responses = list(pool.map(run_validation_prompt, prompts))
                 api_call_time = (timezone.now() - api_call_start).total_seconds()
                 ai_time = (timezone.now() - ai_start).total_seconds()
                 
-                print(f"✅ OpenAI API call complete in {api_call_time:.2f}s (total AI time: {ai_time:.2f}s)")
+                print(f"✅ OpenAI API calls complete in {api_call_time:.2f}s (total AI time: {ai_time:.2f}s)")
                 
-                # Parse AI response
-                ai_content = response.choices[0].message.content.strip()
-                print(f"📄 AI Response length: {len(ai_content)} characters")
+                # Merge chunk results, keeping the most confident value per field
+                extracted_data = {}
+                confidence_scores = {}
+                parse_failures = []
                 
-                # Extract JSON from response (handle cases where AI adds explanatory text)
-                import re
-                json_match = re.search(r'\{.*\}', ai_content, re.DOTALL)
-                if json_match:
-                    ai_content = json_match.group(0)
-                    print("✅ Extracted JSON from AI response")
-                else:
-                    print("⚠️ No JSON found in AI response")
+                for ai_content in ai_responses:
+                    print(f"📄 AI Response length: {len(ai_content)} characters")
+                    
+                    # Extract JSON from response (handle cases where AI adds explanatory text)
+                    json_match = re.search(r'\{.*\}', ai_content, re.DOTALL)
+                    if json_match:
+                        ai_content = json_match.group(0)
+                    else:
+                        print("⚠️ No JSON found in AI response")
+                    
+                    try:
+                        ai_result = json.loads(ai_content)
+                    except json.JSONDecodeError as json_error:
+                        parse_failures.append((json_error, ai_content))
+                        continue
+                    
+                    chunk_scores = ai_result.get('confidence_scores', {}) or {}
+                    for field_slug, field_data in (ai_result.get('extracted_data', {}) or {}).items():
+                        score = chunk_scores.get(field_slug, 0)
+                        score = score if isinstance(score, (int, float)) else 0
+                        if field_slug not in extracted_data or score > confidence_scores.get(field_slug, 0):
+                            extracted_data[field_slug] = field_data
+                            confidence_scores[field_slug] = score
                 
-                try:
-                    ai_result = json.loads(ai_content)
-                    extracted_data = ai_result.get('extracted_data', {})
-                    confidence_scores = ai_result.get('confidence_scores', {})
+                if parse_failures:
+                    json_error, ai_content = parse_failures[0]
+                    print(f"❌ Failed to parse {len(parse_failures)} AI response(s) as JSON: {json_error}")
+                    print(f"📄 Raw AI response: {ai_content[:500]}...")
                     
+                    log_council_edit_event(
+                        request, 'error', 'integration',
+                        'AI Response JSON Parse Failed',
+                        f'OpenAI returned invalid JSON: {str(json_error)}',
+                        details={
+                            'council_slug': council_slug,
+                            'year_label': year.label,
+                            'json_error': str(json_error),
+                            'response_preview': ai_content[:500],
+                            'response_length': len(ai_content),
+                            'failed_chunks': len(parse_failures),
+                            'total_chunks': len(ai_responses),
+                            'api_call_time_seconds': api_call_time
+                        }
+                    )
+                
+                if len(parse_failures) < len(ai_responses):
                     print(f"📊 AI extracted {len(extracted_data)} fields with {len(confidence_scores)} confidence scores")
                     
                     # Log successful AI analysis
@@ -2002,32 +2309,11 @@ VALIDATION RULES:
                             'average_confidence': round(avg_confidence, 3),
                             'api_call_time_seconds': api_call_time,
                             'total_ai_time_seconds': ai_time,
-                            'response_length': len(ai_content),
+                            'response_length': sum(len(content) for content in ai_responses),
+                            'chunk_count': len(ai_responses),
                             'model_used': 'gpt-4'
                         }
                     )
-                    
-                except json.JSONDecodeError as json_error:
-                    print(f"❌ Failed to parse AI response as JSON: {json_error}")
-                    print(f"📄 Raw AI response: {ai_content[:500]}...")
-                    
-                    log_council_edit_event(
-                        request, 'error', 'integration',
-                        'AI Response JSON Parse Failed',
-                        f'OpenAI returned invalid JSON: {str(json_error)}',
-                        details={
-                            'council_slug': council_slug,
-                            'year_label': year.label,
-                            'json_error': str(json_error),
-                            'response_preview': ai_content[:500],
-                            'response_length': len(ai_content),
-                            'api_call_time_seconds': api_call_time
-                        }
-                    )
-                    
-                    # Return empty data rather than failing completely
-                    extracted_data = {}
-                    confidence_scores = {}
                 
             except Exception as ai_error:
                 ai_time = (timezone.now() - ai_start).total_seconds()
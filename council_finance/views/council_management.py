@@ -22,6 +22,10 @@ from django.utils import timezone
 from django.utils.text import slugify
 import json
 import logging
+import os
+import re
+import tempfile
+import uuid
 
 from ..models import (
     Council, CouncilType, CouncilNation, DataField,
@@ -30,16 +34,31 @@ from ..models import (
 )
 from ..smart_data_quality import generate_missing_data_issues_for_council
 from ..activity_logging import log_activity
+from ..services.council_import import (
+    CHUNK_SIZE as IMPORT_CHUNK_SIZE,
+    CouncilImporter,
+    CouncilImportError,
+    RECOMMENDED_COLUMNS,
+    REQUIRED_COLUMNS,
+    RecordReader,
+    get_import_progress,
+    preview_records,
+)
 
 # Import Event Viewer for comprehensive error reporting and analytics
 try:
-    from event_viewer.models import SystemEvent
+    from event_viewer.services.event_sink import record_event
     EVENT_VIEWER_AVAILABLE = True
 except ImportError:
     EVENT_VIEWER_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Client-chosen id the import page polls progress with
+IMPORT_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+# Previewed uploads wait in the temp directory until confirmed or cancelled
+IMPORT_FILE_PREFIX = 'council_import_'
+
 
 def log_council_management_event(request, level, category, title, message, details=None, council=None):
     """
@@ -78,7 +97,7 @@ def log_council_management_event(request, level, category, title, message, detai
         if details:
             event_details.update(details)
             
-        SystemEvent.objects.create(
+        record_event(
             source='council_management',
             level=level,
             category=category,
@@ -688,8 +707,11 @@ def delete_council(request, council_id):
 @user_passes_test(is_tier_5_user)
 def bulk_import(request):
     """
-    Bulk import councils from CSV/Excel/JSON with progress tracking.
-    Enhanced with comprehensive error reporting and analytics logging.
+    Bulk import councils from CSV/TXT/Excel/JSON with progress tracking.
+
+    The upload is streamed through ``services.council_import`` in chunked
+    transactions; progress is published under the ``import_id`` posted by
+    the import page, which polls ``import_progress`` while this runs.
     """
     import time
     start_time = time.time()
@@ -698,6 +720,9 @@ def bulk_import(request):
         import_file = request.FILES.get('council_import_file')
         preview_import = request.POST.get('preview_import') == '1'
         confirm_import = request.POST.get('confirm_import') == '1'
+        import_id = request.POST.get('import_id', '')
+        if not IMPORT_ID_PATTERN.fullmatch(import_id):
+            import_id = uuid.uuid4().hex[:8]
         
         # Log import attempt
         log_council_management_event(
@@ -711,7 +736,8 @@ def bulk_import(request):
                 'file_name': import_file.name if import_file else None,
                 'file_size': import_file.size if import_file else None,
                 'preview_mode': preview_import,
-                'is_confirmation': confirm_import
+                'is_confirmation': confirm_import,
+                'import_id': import_id,
             }
         )
         
@@ -727,820 +753,123 @@ def bulk_import(request):
             messages.error(request, "Please select a file to import")
             return redirect('bulk_import_councils')
         
+        stored_path = None
         try:
-            import csv
-            import json
-            import io
-            
-            # Try to import pandas for Excel support, but fall back to CSV-only if not available
-            pandas_available = False
-            try:
-                import pandas as pd
-                pandas_available = True
-                log_council_management_event(
-                    request,
-                    'info',
-                    'configuration',
-                    'Council Import: Pandas Available',
-                    'Excel file support enabled via pandas library'
-                )
-            except ImportError:
-                pd = None
-                log_council_management_event(
-                    request,
-                    'warning',
-                    'configuration',
-                    'Council Import: Pandas Not Available',
-                    'Excel file support disabled - pandas library not installed',
-                    {'limitation': 'csv_json_only'}
-                )
-            
-            # Track file parsing performance
-            parse_start = time.time()
-            
-            if confirm_import and request.session.get('import_preview'):
-                # Confirmed import from session data
-                preview_data = request.session['import_preview']
-                data_records = preview_data['data']
-                file_name = preview_data.get('file_name', 'unknown_file')
-                
-                log_council_management_event(
-                    request,
-                    'info',
-                    'user_activity',
-                    'Council Import Confirmed from Preview',
-                    f'User confirmed import of {len(data_records)} records from preview',
-                    {
-                        'record_count': len(data_records),
-                        'source': 'session_preview_data'
-                    }
-                )
-            elif confirm_import and not request.session.get('import_preview'):
-                # Confirmation attempted but no session data available
-                log_council_management_event(
-                    request,
-                    'error',
-                    'user_activity',
-                    'Council Import: Confirmation Failed - No Session Data',
-                    'User attempted to confirm import but no preview data found in session',
-                    {
-                        'has_file': bool(import_file),
-                        'session_keys': list(request.session.keys()),
-                        'is_confirmation': confirm_import
-                    }
-                )
-                messages.error(request, "Import session expired. Please upload your file again.")
-                return redirect('bulk_import_councils')
-            else:
-                # New file upload - parse based on file type
-                file_extension = import_file.name.lower().split('.')[-1] if import_file else 'unknown'
-                
-                try:
-                    if import_file.name.endswith('.csv') or import_file.name.endswith('.txt'):
-                        # Use native CSV parsing for both CSV and TXT files
-                        file_type = 'CSV' if import_file.name.endswith('.csv') else 'TXT'
-                        import_file.seek(0)  # Reset file pointer
-                        
-                        # Enhanced encoding detection
-                        content = None
-                        encodings_to_try = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'iso-8859-1']
-                        used_encoding = None
-                        
-                        for encoding in encodings_to_try:
-                            try:
-                                import_file.seek(0)
-                                content = import_file.read().decode(encoding)
-                                used_encoding = encoding
-                                break
-                            except UnicodeDecodeError:
-                                continue
-                        
-                        if content is None:
-                            log_council_management_event(
-                                request,
-                                'error',
-                                'data_quality',
-                                f'Council Import: {file_type} Encoding Error',
-                                f'Failed to decode {file_type} file with any supported encoding',
-                                {
-                                    'file_name': import_file.name,
-                                    'file_size': import_file.size,
-                                    'attempted_encodings': encodings_to_try,
-                                    'file_type': file_type.lower()
-                                }
-                            )
-                            messages.error(request, f"{file_type} file encoding error. Please ensure file is saved as UTF-8.")
-                            return redirect('bulk_import_councils')
-                        
-                        # Auto-detect delimiter for TXT files
-                        delimiter = ','
-                        if import_file.name.endswith('.txt'):
-                            # Sample first few lines to detect delimiter
-                            first_lines = content.split('\n')[:5]  # Use more lines for better detection
-                            sample_text = '\n'.join(first_lines)
-                            
-                            # Test different delimiters
-                            delimiters = ['\t', ',', ';', '|']  # Tab, comma, semicolon, pipe
-                            best_delimiter = ','
-                            best_field_count = 0
-                            
-                            for test_delim in delimiters:
-                                try:
-                                    test_reader = csv.DictReader(io.StringIO(sample_text), delimiter=test_delim)
-                                    first_row = next(test_reader, None)
-                                    if first_row:
-                                        # Count non-empty fields
-                                        field_count = len([v for v in first_row.values() if v and v.strip()])
-                                        if field_count > best_field_count:
-                                            best_field_count = field_count
-                                            best_delimiter = test_delim
-                                except:
-                                    continue
-                            
-                            delimiter = best_delimiter
-                            
-                            log_council_management_event(
-                                request,
-                                'info',
-                                'data_processing',
-                                'Council Import: TXT Delimiter Detection',
-                                f'Auto-detected delimiter for TXT file: "{repr(delimiter)}" with {best_field_count} fields',
-                                {
-                                    'file_name': import_file.name,
-                                    'detected_delimiter': repr(delimiter),
-                                    'field_count': best_field_count,
-                                    'tested_delimiters': [repr(d) for d in delimiters]
-                                }
-                            )
-                        
-                        # Parse the file
-                        csv_reader = csv.DictReader(io.StringIO(content), delimiter=delimiter)
-                        data_records = list(csv_reader)
-                        
-                        log_council_management_event(
-                            request,
-                            'info',
-                            'data_processing',
-                            f'Council Import: {file_type} Parsed Successfully',
-                            f'Successfully parsed {file_type} file with {len(data_records)} records using {used_encoding} encoding',
-                            {
-                                'file_name': import_file.name,
-                                'file_size': import_file.size,
-                                'record_count': len(data_records),
-                                'encoding_used': used_encoding,
-                                'delimiter_used': repr(delimiter) if import_file.name.endswith('.txt') else 'comma',
-                                'columns': list(data_records[0].keys()) if data_records else [],
-                                'file_type': file_type.lower()
-                            }
-                        )
-                        
-                    elif import_file.name.endswith('.xlsx'):
-                        # Excel requires pandas
-                        if not pandas_available:
-                            log_council_management_event(
-                                request,
-                                'error',
-                                'configuration',
-                                'Council Import: Excel Not Supported',
-                                'User attempted Excel import but pandas not available',
-                                {
-                                    'file_name': import_file.name,
-                                    'file_size': import_file.size,
-                                    'required_library': 'pandas'
-                                }
-                            )
-                            messages.error(request, "Excel files require pandas library. Please install pandas or use CSV format instead.")
-                            return redirect('bulk_import_councils')
-                            
-                        data_records = pd.read_excel(import_file).to_dict('records')
-                        
-                        log_council_management_event(
-                            request,
-                            'info',
-                            'data_processing',
-                            'Council Import: Excel Parsed Successfully',
-                            f'Successfully parsed Excel file with {len(data_records)} records',
-                            {
-                                'file_name': import_file.name,
-                                'file_size': import_file.size,
-                                'record_count': len(data_records),
-                                'columns': list(data_records[0].keys()) if data_records else []
-                            }
-                        )
-                        
-                    elif import_file.name.endswith('.json'):
-                        # JSON parsing - always available
-                        import_file.seek(0)  # Reset file pointer
-                        try:
-                            data = json.load(import_file)
-                        except json.JSONDecodeError as e:
-                            log_council_management_event(
-                                request,
-                                'error',
-                                'data_quality',
-                                'Council Import: JSON Parse Error',
-                                f'Failed to parse JSON file: {str(e)}',
-                                {
-                                    'file_name': import_file.name,
-                                    'file_size': import_file.size,
-                                    'json_error': str(e),
-                                    'error_line': getattr(e, 'lineno', None),
-                                    'error_column': getattr(e, 'colno', None)
-                                }
-                            )
-                            messages.error(request, f"JSON file parsing error: {str(e)}")
-                            return redirect('bulk_import_councils')
-                            
-                        if isinstance(data, list):
-                            data_records = data
-                            
-                            log_council_management_event(
-                                request,
-                                'info',
-                                'data_processing',
-                                'Council Import: JSON Parsed Successfully',
-                                f'Successfully parsed JSON file with {len(data_records)} records',
-                                {
-                                    'file_name': import_file.name,
-                                    'file_size': import_file.size,
-                                    'record_count': len(data_records)
-                                }
-                            )
-                        else:
-                            log_council_management_event(
-                                request,
-                                'error',
-                                'data_quality',
-                                'Council Import: Invalid JSON Structure',
-                                'JSON file does not contain an array of objects',
-                                {
-                                    'file_name': import_file.name,
-                                    'file_size': import_file.size,
-                                    'actual_type': type(data).__name__
-                                }
-                            )
-                            messages.error(request, "JSON file must contain an array of council objects.")
-                            return redirect('bulk_import_councils')
-                    else:
-                        log_council_management_event(
-                            request,
-                            'error',
-                            'user_activity',
-                            'Council Import: Unsupported File Format',
-                            f'User attempted to import unsupported file format: {file_extension}',
-                            {
-                                'file_name': import_file.name,
-                                'file_extension': file_extension,
-                                'supported_formats': ['csv', 'txt', 'xlsx', 'json']
-                            }
-                        )
-                        messages.error(request, "Unsupported file format. Please use CSV, TXT (tab or comma delimited), Excel (.xlsx), or JSON.")
-                        return redirect('bulk_import_councils')
-                        
-                except Exception as e:
+            if confirm_import:
+                preview = request.session.get('import_preview') or {}
+                stored_path = _stored_import_path(preview.get('path'))
+                if stored_path is None:
                     log_council_management_event(
                         request,
                         'error',
-                        'exception',
-                        'Council Import: File Parsing Critical Error',
-                        f'Unexpected error parsing file: {str(e)}',
+                        'user_activity',
+                        'Council Import: Confirmation Failed - No Session Data',
+                        'User attempted to confirm import but no preview file found in session',
                         {
-                            'file_name': import_file.name,
-                            'file_size': import_file.size,
-                            'file_extension': file_extension,
-                            'error_type': type(e).__name__,
-                            'error_message': str(e)
+                            'has_file': bool(import_file),
+                            'session_keys': list(request.session.keys()),
+                            'is_confirmation': confirm_import
                         }
                     )
-                    messages.error(request, f"Error parsing file: {str(e)}")
+                    messages.error(request, "Import session expired. Please upload your file again.")
                     return redirect('bulk_import_councils')
-                    
-                # Ensure we have data
-                if not data_records:
-                    log_council_management_event(
-                        request,
-                        'warning',
-                        'data_quality',
-                        'Council Import: Empty File',
-                        'No data records found in uploaded file',
-                        {
-                            'file_name': import_file.name,
-                            'file_size': import_file.size,
-                            'file_extension': file_extension
-                        }
-                    )
-                    messages.error(request, "No data found in the uploaded file.")
-                    return redirect('bulk_import_councils')
-                    
-            # Track file parsing performance
-            parse_duration = (time.time() - parse_start) * 1000
-            if parse_duration > 1000:  # Log slow file parsing
-                log_council_management_event(
-                    request,
-                    'warning',
-                    'performance',
-                    'Council Import: Slow File Parsing',
-                    f'File parsing took {parse_duration:.2f}ms',
-                    {
-                        'parse_duration_ms': parse_duration,
-                        'record_count': len(data_records),
-                        'file_size': import_file.size if import_file else 0
-                    }
-                )
-            
-            # Convert to consistent format (list of dicts) and validate required columns
-            if data_records and isinstance(data_records[0], dict):
-                columns = set(data_records[0].keys())
+                file_name = preview.get('file_name', 'unknown_file')
+                source = open(stored_path, 'rb')
             else:
-                messages.error(request, "Invalid file format. Expected tabular data with column headers.")
-                return redirect('bulk_import_councils')
-            
-            # Required columns for CSV import (database constraints)
-            # Note: Only 'name' is required at database level
-            # Additional business validation (website, type, nation) is performed during import
-            required_columns = ['name']  # Database requirement - absolutely required
-            recommended_columns = ['website', 'council_type', 'nation']  # Business validation requirements
+                file_name = import_file.name
+                source = import_file
             
-            missing_columns = [col for col in required_columns if col not in columns]
-            if missing_columns:
-                messages.error(request, f"Missing required columns: {', '.join(missing_columns)}")
-                return redirect('bulk_import_councils')
+            try:
+                reader = RecordReader(source, file_name)
+                
+                if preview_import and not confirm_import:
+                    return _render_import_preview(request, reader, import_file)
+                
+                result = CouncilImporter(import_id).run(reader)
+            finally:
+                if source is not import_file:
+                    source.close()
             
-            # Check for recommended columns and warn if missing    
-            missing_recommended = [col for col in recommended_columns if col not in columns]
-            if missing_recommended:
+            if result.missing_recommended:
+                messages.warning(request, f"Missing recommended columns (import will continue but councils may be incomplete): {', '.join(result.missing_recommended)}")
+            if result.unknown_types or result.unknown_nations:
                 log_council_management_event(
                     request,
                     'warning',
                     'data_quality',
-                    'Council Import: Missing Recommended Columns',
-                    f'Import file missing recommended columns: {", ".join(missing_recommended)}',
+                    'Council Import: Unknown Types or Nations',
+                    f'{len(result.unknown_types)} council types and {len(result.unknown_nations)} nations in the file were not recognised',
                     {
-                        'missing_columns': missing_recommended,
-                        'available_columns': list(columns),
-                        'impact': 'councils_may_be_incomplete'
+                        'import_session': import_id,
+                        'unknown_types': sorted(result.unknown_types)[:50],
+                        'unknown_nations': sorted(result.unknown_nations)[:50],
+                        'available_types': list(CouncilType.objects.values_list('name', flat=True)),
+                        'available_nations': list(CouncilNation.objects.values_list('name', flat=True)),
                     }
                 )
-                messages.warning(request, f"Missing recommended columns (import will continue but councils may be incomplete): {', '.join(missing_recommended)}")
             
-            if preview_import and not confirm_import:
-                # Preview mode - show what would be imported
-                preview_data = data_records[:20]  # Show first 20 records for preview
-                request.session['import_preview'] = {
-                    'data': data_records,  # Store all data
-                    'total_rows': len(data_records),
-                    'file_name': import_file.name if import_file else 'unknown_file'
-                }
-                
-                # Log preview generation
-                log_council_management_event(
-                    request,
-                    'info',
-                    'user_activity',
-                    'Council Import Preview Generated',
-                    f'Generated preview for {len(data_records)} records, showing first {len(preview_data)}',
-                    {
-                        'total_records': len(data_records),
-                        'preview_records': len(preview_data),
-                        'file_name': import_file.name if import_file else 'Session Data',
-                        'available_columns': list(columns),
-                        'missing_recommended': missing_recommended
-                    }
-                )
-                
-                context = {
-                    'preview_data': preview_data,
-                    'total_rows': len(data_records),
-                    'file_name': import_file.name if import_file else 'Session Data',
+            log_council_management_event(
+                request=request,
+                level='info' if result.error_count == 0 else 'warning',
+                category='data_processing',
+                title='Bulk Council Import Completed',
+                message=f'Import session {import_id} completed: {result.created} created, {result.skipped} skipped, {result.error_count} errors in {result.duration:.2f}s',
+                details={
+                    'import_session': import_id,
+                    'councils_created': result.created,
+                    'councils_skipped': result.skipped,
+                    'errors_encountered': result.error_count,
+                    'total_rows_processed': result.total_rows,
+                    'processing_time_seconds': result.duration,
+                    'chunk_size_used': IMPORT_CHUNK_SIZE,
+                    'total_chunks': result.chunks,
+                    'file_name': file_name,
+                    'characteristics_created': result.characteristics_created,
+                    'new_council_ids': result.council_ids[:500],
+                    'error_summary': result.errors[:10],  # First 10 errors for summary
+                    'issues_created': result.issues_created,
                 }
+            )
+            
+            # Success message
+            success_msg = f"Import complete: {result.created} councils created, {result.skipped} skipped (already exist)"
+            if result.issues_created > 0:
+                success_msg += f", {result.issues_created} data contribution opportunities added to queues"
+            if result.error_count > 0:
+                success_msg += f", {result.error_count} errors encountered"
+            
+            messages.success(request, success_msg)
+            
+            if result.errors:
+                messages.warning(request, f"Errors encountered: {'; '.join(result.errors[:5])}")  # Show first 5 errors
+            
+            # Log the import activity
+            log_activity(
+                request,
+                activity='bulk_council_import',
+                action='Bulk imported councils via management interface',
+                extra=f"Created: {result.created}, Skipped: {result.skipped}, Errors: {result.error_count}, Issues: {result.issues_created}"
+            )
+            
+            if stored_path is not None:
+                _discard_stored_import(request)
                 
-                try:
-                    return render(request, 'council_finance/council_management/import_preview.html', context)
-                except Exception as e:
-                    log_council_management_event(
-                        request,
-                        'error',
-                        'exception',
-                        'Council Import: Preview Template Error',
-                        f'Failed to render import preview template: {str(e)}',
-                        {
-                            'error_type': type(e).__name__,
-                            'error_message': str(e),
-                            'template_name': 'import_preview.html',
-                            'context_keys': list(context.keys())
-                        }
-                    )
-                    messages.error(request, f"Error displaying import preview: {str(e)}")
-                    return redirect('bulk_import_councils')
-            else:
-                # Actual import
-                import uuid
-                import_id = str(uuid.uuid4())[:8]  # Short unique ID for this import session
-                import_start_time = time.time()  # Track import processing time
-                created_count = 0
-                skipped_count = 0
-                error_count = 0
-                total_issues_created = 0
-                new_councils = []
-                errors = []
-                
-                # Helper function to check if value is valid (defined once, used multiple times)
-                def is_valid_value(value):
-                    if value is None:
-                        return False
-                    str_val = str(value).strip()
-                    return str_val and str_val.lower() not in ['nan', 'none', 'null', '']
-                
-                # Batch processing for large imports (400+ records)
-                BATCH_SIZE = 50  # Process in chunks to avoid memory issues and long transactions
-                total_records = len(data_records)
-                
-                log_council_management_event(
-                    request,
-                    'info',
-                    'data_processing',
-                    'Council Import: Batch Processing Started',
-                    f'Starting batch import of {total_records} records using batch size {BATCH_SIZE}',
-                    {
-                        'import_id': import_id,
-                        'total_records': total_records,
-                        'batch_size': BATCH_SIZE,
-                        'estimated_batches': (total_records + BATCH_SIZE - 1) // BATCH_SIZE
-                    }
-                )
-                
-                # Process records in batches
-                for batch_start in range(0, total_records, BATCH_SIZE):
-                    batch_end = min(batch_start + BATCH_SIZE, total_records)
-                    batch_records = data_records[batch_start:batch_end]
-                    batch_number = (batch_start // BATCH_SIZE) + 1
-                    
-                    batch_start_time = time.time()
-                    batch_created = 0
-                    batch_skipped = 0
-                    batch_errors = 0
-                    
-                    log_council_management_event(
-                        request,
-                        'info',
-                        'data_processing',
-                        f'Council Import: Processing Batch {batch_number}',
-                        f'Processing records {batch_start + 1} to {batch_end} of {total_records}',
-                        {
-                            'import_id': import_id,
-                            'batch_number': batch_number,
-                            'batch_start': batch_start + 1,
-                            'batch_end': batch_end,
-                            'batch_size': len(batch_records)
-                        }
-                    )
-                    
-                    # Process this batch in a transaction
-                    with transaction.atomic():
-                        for index, row in enumerate(batch_records):
-                            absolute_index = batch_start + index  # Global index for error reporting
-                            try:
-                                council_name = str(row.get('name', '')).strip()
-                                if not council_name or council_name.lower() in ['nan', 'none', '']:
-                                    continue
-                                
-                                council_slug = slugify(row.get('slug', council_name))
-                                
-                                # Check if council already exists
-                                if not Council.objects.filter(Q(name=council_name) | Q(slug=council_slug)).exists():
-                                    # Validate required business fields before creating council
-                                    validation_errors = []
-                                
-                                    # Website is now considered required for new councils
-                                    if not ('website' in row and is_valid_value(row['website'])):
-                                        validation_errors.append("Website is required")
-                                    
-                                    # Skip validation if we have critical errors
-                                    if validation_errors:
-                                        error_count += 1
-                                        batch_errors += 1
-                                        errors.append(f"Row {absolute_index + 1} ({council_name}): {', '.join(validation_errors)}")
-                                        continue
-                                
-                                # Get related objects - use proper None checking instead of pd.notna()
-                                council_type = None
-                                if 'council_type' in row and row['council_type'] and str(row['council_type']).strip():
-                                    council_type_name = str(row['council_type']).strip()
-                                    try:
-                                        # Try slug lookup first (handles lowercase input like 'unitary'), then name fallback
-                                        try:
-                                            council_type = CouncilType.objects.get(slug=council_type_name.lower())
-                                        except CouncilType.DoesNotExist:
-                                            council_type = CouncilType.objects.get(name__iexact=council_type_name)
-                                    except CouncilType.DoesNotExist:
-                                        try:
-                                            # Fallback to partial match
-                                            council_type = CouncilType.objects.get(name__icontains=council_type_name)
-                                        except CouncilType.DoesNotExist:
-                                            # Log the lookup failure for debugging
-                                            available_types = list(CouncilType.objects.values_list('name', flat=True))
-                                            log_council_management_event(
-                                                request,
-                                                'warning',
-                                                'data_quality',
-                                                'Council Import: Unknown Council Type',
-                                                f'Row {index + 1}: Cannot find council type "{council_type_name}"',
-                                                {
-                                                    'row_number': index + 1,
-                                                    'council_name': council_name,
-                                                    'requested_type': council_type_name,
-                                                    'available_types': available_types,
-                                                    'lookup_method': 'name_iexact_then_icontains'
-                                                }
-                                            )
-                                            pass
-                                    except Exception as e:
-                                        # Log database lookup errors
-                                        log_council_management_event(
-                                            request,
-                                            'error',
-                                            'exception',
-                                            'Council Import: CouncilType Lookup Error',
-                                            f'Row {index + 1}: Database error looking up council type: {str(e)}',
-                                            {
-                                                'row_number': index + 1,
-                                                'council_name': council_name,
-                                                'requested_type': council_type_name,
-                                                'error_type': type(e).__name__,
-                                                'error_message': str(e)
-                                            }
-                                        )
-                                        error_count += 1
-                                        errors.append(f"Row {index + 1} ({council_name}): Database error looking up council type '{council_type_name}': {str(e)}")
-                                        continue
-                                
-                                council_nation = None
-                                if 'nation' in row and row['nation'] and str(row['nation']).strip():
-                                    nation_name = str(row['nation']).strip()
-                                    try:
-                                        # Try slug lookup first (handles lowercase input like 'england'), then name fallback
-                                        try:
-                                            council_nation = CouncilNation.objects.get(slug=nation_name.lower())
-                                        except CouncilNation.DoesNotExist:
-                                            council_nation = CouncilNation.objects.get(name__iexact=nation_name)
-                                    except CouncilNation.DoesNotExist:
-                                        try:
-                                            # Fallback to partial match by name
-                                            council_nation = CouncilNation.objects.get(name__icontains=nation_name)
-                                        except CouncilNation.DoesNotExist:
-                                            # Log the lookup failure
-                                            available_nations = list(CouncilNation.objects.values_list('name', flat=True))
-                                            log_council_management_event(
-                                                request,
-                                                'warning',
-                                                'data_quality',
-                                                'Council Import: Unknown Nation',
-                                                f'Row {index + 1}: Cannot find nation "{nation_name}"',
-                                                {
-                                                    'row_number': index + 1,
-                                                    'council_name': council_name,
-                                                    'requested_nation': nation_name,
-                                                    'available_nations': available_nations
-                                                }
-                                            )
-                                            pass
-                                    except Exception as e:
-                                        # Log database lookup errors
-                                        log_council_management_event(
-                                            request,
-                                            'error',
-                                            'exception',
-                                            'Council Import: CouncilNation Lookup Error',
-                                            f'Row {index + 1}: Database error looking up nation: {str(e)}',
-                                            {
-                                                'row_number': index + 1,
-                                                'council_name': council_name,
-                                                'requested_nation': nation_name,
-                                                'error_type': type(e).__name__,
-                                                'error_message': str(e)
-                                            }
-                                        )
-                                        error_count += 1
-                                        errors.append(f"Row {index + 1} ({council_name}): Database error looking up nation '{nation_name}': {str(e)}")
-                                        continue
-                                
-                                # Create council
-                                website_value = None
-                                if 'website' in row and is_valid_value(row['website']):
-                                    website_value = str(row['website']).strip()
-                                
-                                population_value = None
-                                if 'population' in row and is_valid_value(row['population']):
-                                    pop_str = str(row['population']).replace('.0', '')
-                                    if pop_str.isdigit():
-                                        population_value = int(pop_str)
-                                
-                                council = Council.objects.create(
-                                    name=council_name,
-                                    slug=council_slug,
-                                    council_type=council_type,
-                                    council_nation=council_nation,
-                                    website=website_value,
-                                    latest_population=population_value,
-                                    status='active'
-                                )
-                                
-                                # Save all characteristic fields dynamically
-                                all_characteristic_fields = DataField.objects.filter(category='characteristic')
-                                for field in all_characteristic_fields:
-                                    # Skip fields handled by the main council model
-                                    if field.slug in ['council_type', 'council_nation', 'council_name']:
-                                        continue
-                                        
-                                    field_value = None
-                                    
-                                    # Try different column name variations for this field
-                                    possible_columns = [field.slug, field.slug.replace('-', '_'), field.name.lower()]
-                                    for col_name in possible_columns:
-                                        if col_name in row and is_valid_value(row[col_name]):
-                                            field_value = str(row[col_name]).strip()
-                                            break
-                                    
-                                    # Handle special backwards compatibility cases
-                                    if not field_value:
-                                        if field.slug == 'council_hq_post_code' and 'postcode' in row and is_valid_value(row['postcode']):
-                                            field_value = str(row['postcode']).strip()
-                                        elif field.slug == 'population' and 'population' in row and is_valid_value(row['population']):
-                                            field_value = str(row['population']).strip()
-                                        elif field.slug == 'council_website' and 'website' in row and is_valid_value(row['website']):
-                                            field_value = str(row['website']).strip()
-                                    
-                                    if field_value:
-                                        try:
-                                            CouncilCharacteristic.objects.create(
-                                                council=council,
-                                                field=field,
-                                                value=field_value
-                                            )
-                                        except Exception as e:
-                                            logger.warning(f"Could not save characteristic {field.slug} during import for council {council.name}: {e}")
-                                
-                                    new_councils.append(council)
-                                    created_count += 1
-                                    batch_created += 1
-                                else:
-                                    skipped_count += 1
-                                    batch_skipped += 1
-                                    
-                            except Exception as e:
-                                error_count += 1
-                                batch_errors += 1
-                                error_message = str(e)
-                                errors.append(f"Row {absolute_index + 1}: {error_message}")
-                                logger.error(f"Error importing council from row {absolute_index + 1}: {e}")
-                                
-                                # Log each import error to Event Viewer immediately
-                                log_council_management_event(
-                                    request=request,
-                                    level='error',
-                                    category='data_processing',
-                                    title=f'Council Import Error - Row {absolute_index + 1}',
-                                    message=f'Failed to import council from row {absolute_index + 1}: {error_message}',
-                                    details={
-                                        'row_number': absolute_index + 1,
-                                        'error_type': type(e).__name__,
-                                        'council_name': row.get('name', 'Unknown'),
-                                        'council_website': row.get('website', ''),
-                                        'council_type': row.get('council_type', ''),
-                                        'nation': row.get('nation', ''),
-                                        'import_session': import_id,
-                                        'batch_number': batch_number,
-                                        'total_processed': absolute_index + 1,
-                                        'errors_so_far': error_count
-                                    }
-                                )
-                    
-                    # Log batch completion
-                    batch_duration = time.time() - batch_start_time
-                    log_council_management_event(
-                        request,
-                        'info',
-                        'data_processing',
-                        f'Council Import: Batch {batch_number} Completed',
-                        f'Batch {batch_number}/{(total_records + BATCH_SIZE - 1) // BATCH_SIZE} completed: {batch_created} created, {batch_skipped} skipped, {batch_errors} errors in {batch_duration:.2f}s',
-                        {
-                            'import_id': import_id,
-                            'batch_number': batch_number,
-                            'batch_created': batch_created,
-                            'batch_skipped': batch_skipped,
-                            'batch_errors': batch_errors,
-                            'batch_duration_seconds': batch_duration,
-                            'records_processed': len(batch_records),
-                            'progress_percent': round((batch_end / total_records) * 100, 1)
-                        }
-                    )
-                
-                # Calculate processing time
-                processing_time = time.time() - import_start_time
-                
-                # Log comprehensive import completion
-                log_council_management_event(
-                    request=request,
-                    level='info' if error_count == 0 else 'warning',
-                    category='data_processing',
-                    title=f'Bulk Council Import Completed',
-                    message=f'Import session {import_id} completed with batch processing: {created_count} created, {skipped_count} skipped, {error_count} errors in {processing_time:.2f}s',
-                    details={
-                        'import_session': import_id,
-                        'councils_created': created_count,
-                        'councils_skipped': skipped_count,
-                        'errors_encountered': error_count,
-                        'total_rows_processed': len(data_records),
-                        'processing_time_seconds': processing_time,
-                        'batch_size_used': BATCH_SIZE,
-                        'total_batches': (total_records + BATCH_SIZE - 1) // BATCH_SIZE,
-                        'file_name': file_name,
-                        'new_council_ids': [c.id for c in new_councils],
-                        'error_summary': errors[:10] if errors else [],  # First 10 errors for summary
-                        'issues_created': 0  # Will be updated below
-                    }
-                )
-                
-                # Generate missing data issues for all new councils (outside the main transaction)
-                if new_councils:
-                    try:
-                        for council in new_councils:
-                            issues_created = generate_missing_data_issues_for_council(council)
-                            total_issues_created += issues_created
-                            
-                        # Update the completion event with issues created count
-                        if total_issues_created > 0:
-                            log_council_management_event(
-                                request=request,
-                                level='info',
-                                category='data_processing',
-                                title='Data Contribution Opportunities Generated',
-                                message=f'Created {total_issues_created} contribution opportunities for {len(new_councils)} new councils',
-                                details={
-                                    'import_session': import_id,
-                                    'issues_created': total_issues_created,
-                                    'councils_processed': len(new_councils),
-                                    'council_ids': [c.id for c in new_councils]
-                                }
-                            )
-                    except Exception as e:
-                        logger.error(f"Error generating data issues during bulk import: {e}")
-                        messages.warning(request, f"Import completed but some contribution queue entries may not have been generated: {str(e)}")
-                        
-                        # Log this error to Event Viewer
-                        log_council_management_event(
-                            request=request,
-                            level='error',
-                            category='data_processing',
-                            title='Failed to Generate Contribution Opportunities',
-                            message=f'Error creating data issues after import: {str(e)}',
-                            details={
-                                'import_session': import_id,
-                                'error_type': type(e).__name__,
-                                'councils_affected': len(new_councils),
-                                'council_ids': [c.id for c in new_councils]
-                            }
-                        )
-                
-                # Clear session data
-                if 'import_preview' in request.session:
-                    del request.session['import_preview']
-                
-                # Success message
-                success_msg = f"Import complete: {created_count} councils created, {skipped_count} skipped (already exist)"
-                if total_issues_created > 0:
-                    success_msg += f", {total_issues_created} data contribution opportunities added to queues"
-                if error_count > 0:
-                    success_msg += f", {error_count} errors encountered"
-                
-                messages.success(request, success_msg)
-                
-                if errors:
-                    messages.warning(request, f"Errors encountered: {'; '.join(errors[:5])}")  # Show first 5 errors
-                
-                # Log the import activity
-                log_activity(
-                    request,
-                    activity='bulk_council_import',
-                    action='Bulk imported councils via management interface',
-                    extra=f"Created: {created_count}, Skipped: {skipped_count}, Errors: {error_count}, Issues: {total_issues_created}"
-                )
-                
-        except ImportError as e:
-            # This should now only catch issues with other imports, not pandas
+        except CouncilImportError as e:
             log_council_management_event(
                 request,
                 'error',
-                'configuration',
-                'Council Import: Library Import Error',
-                f'Required library not available: {str(e)}',
+                'data_quality',
+                'Council Import: File Rejected',
+                f'Upload could not be imported: {str(e)}',
                 {
-                    'error_type': 'ImportError',
-                    'error_message': str(e),
-                    'missing_library': str(e).split("'")[1] if "'" in str(e) else 'unknown'
+                    'import_session': import_id,
+                    'file_name': import_file.name if import_file else None,
+                    'file_size': import_file.size if import_file else None,
+                    'error_message': str(e)
                 }
             )
-            messages.error(request, f"Required library not available: {str(e)}. Please contact administrator.")
+            messages.error(request, str(e))
+            return redirect('bulk_import_councils')
             
         except Exception as e:
             logger.error(f"Error during bulk import: {e}")
@@ -1553,7 +882,6 @@ def bulk_import(request):
                 {
                     'error_type': type(e).__name__,
                     'error_message': str(e),
-                    'stack_trace': str(e.__traceback__) if hasattr(e, '__traceback__') else None,
                     'has_file': bool(import_file),
                     'file_name': import_file.name if import_file else None,
                     'preview_mode': preview_import,
@@ -1579,6 +907,88 @@ def bulk_import(request):
     return redirect('council_management_dashboard')
 
 
+def _render_import_preview(request, reader, import_file):
+    """
+    Show the first rows of an upload and keep the file on disk (not in the
+    session) until the import is confirmed or cancelled.
+    """
+    preview_data, total_rows = preview_records(reader)
+    if not total_rows:
+        raise CouncilImportError("No data found in the uploaded file.")
+    columns = reader.columns or list(preview_data[0])
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise CouncilImportError(f"Missing required columns: {', '.join(missing)}")
+    missing_recommended = [column for column in RECOMMENDED_COLUMNS if column not in columns]
+    if missing_recommended:
+        messages.warning(request, f"Missing recommended columns (import will continue but councils may be incomplete): {', '.join(missing_recommended)}")
+    
+    _discard_stored_import(request)
+    suffix = os.path.splitext(import_file.name)[1].lower()
+    with tempfile.NamedTemporaryFile(prefix=IMPORT_FILE_PREFIX, suffix=suffix, delete=False) as stored:
+        for chunk in import_file.chunks():
+            stored.write(chunk)
+    request.session['import_preview'] = {
+        'path': stored.name,
+        'total_rows': total_rows,
+        'file_name': import_file.name,
+    }
+    
+    log_council_management_event(
+        request,
+        'info',
+        'user_activity',
+        'Council Import Preview Generated',
+        f'Generated preview for {total_rows} records, showing first {len(preview_data)}',
+        {
+            'total_records': total_rows,
+            'preview_records': len(preview_data),
+            'file_name': import_file.name,
+            'available_columns': columns,
+            'missing_recommended': missing_recommended
+        }
+    )
+    
+    context = {
+        'preview_data': preview_data,
+        'total_rows': total_rows,
+        'file_name': import_file.name,
+    }
+    return render(request, 'council_finance/council_management/import_preview.html', context)
+
+
+def _stored_import_path(path):
+    """The previewed upload's path, if it is one of ours and still exists."""
+    if not path:
+        return None
+    path = os.path.realpath(path)
+    if (os.path.dirname(path) != os.path.realpath(tempfile.gettempdir())
+            or not os.path.basename(path).startswith(IMPORT_FILE_PREFIX)
+            or not os.path.isfile(path)):
+        return None
+    return path
+
+
+def _discard_stored_import(request):
+    preview = request.session.pop('import_preview', None) or {}
+    path = _stored_import_path(preview.get('path'))
+    if path is not None:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not remove stored import file {path}: {e}")
+
+
+@login_required
+@user_passes_test(is_tier_5_user)
+def import_progress(request, import_id):
+    """Progress of a running bulk import, polled by the import page."""
+    progress = get_import_progress(import_id)
+    if progress is None:
+        return JsonResponse({'status': 'pending', 'percentage': 0})
+    return JsonResponse(progress)
+
+
 @login_required
 @user_passes_test(is_tier_5_user)
 def import_page(request):
@@ -1664,7 +1074,6 @@ def cancel_import(request):
     """
     Cancel an import preview and clear session data
     """
-    if 'import_preview' in request.session:
-        del request.session['import_preview']
+    _discard_stored_import(request)
     messages.info(request, "Import cancelled")
     return redirect('council_management_dashboard')
\ No newline at end of file
@@ -15,9 +15,18 @@ from django.conf import settings
 from django.db import models
 
 from council_finance.models import SiteFeedback
+from council_finance.services.rate_limiter import SlidingWindowRateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Feedback submissions per client IP per hour
+feedback_rate_limiter = SlidingWindowRateLimiter(
+    'feedback', limit=10, window_seconds=3600,
+    fallback_count=lambda ip_address, since: SiteFeedback.objects.filter(
+        ip_address=ip_address, submitted_at__gte=since
+    ).count(),
+)
+
 
 def get_client_ip(request):
     """Extract client IP address from request."""
@@ -64,6 +73,22 @@ def feedback_form(request):
 def handle_feedback_submission(request):
     """Process feedback form submission."""
     
+    limited = feedback_rate_limiter.hit(get_client_ip(request))
+    if not limited.allowed:
+        error_message = "You have sent a lot of feedback recently. Please try again later."
+        logger.warning(f"Feedback rate limit reached for {get_client_ip(request)}")
+        
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            response = JsonResponse({
+                'success': False,
+                'error': error_message
+            }, status=429)
+            response['Retry-After'] = str(limited.retry_after)
+            return response
+        
+        messages.error(request, error_message)
+        return redirect('feedback_form')
+    
     try:
         # Extract form data
         feedback_data = {
@@ -18,7 +18,12 @@ from django.core.paginator import Paginator
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.core import signing
+from council_finance.services.fragment_cache import (
+    fragment_cache, council_tag, council_year_tag, council_activity_tag,
+)
 from council_finance.services.github_stats import GitHubStatsService
+from council_finance.services.rate_limiter import SlidingWindowRateLimiter
+from council_finance.signals.data_change_signals import coalesce_data_changes
 from django.views.decorators.http import require_GET, require_POST, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.core.exceptions import ValidationError
@@ -250,371 +255,13 @@ def list_field_options(request, field_slug=None, slug=None):
 
 
 def home(request):
-    """Enhanced landing page with counters, featured content and widgets."""
-    # Determine the latest financial year for which we have debt figures
-    latest_year = FinancialYear.objects.order_by("-label").first()
-    
-    # Use cached site-wide total instead of expensive database aggregation
-    # This prevents connection timeouts on production
-    councils_with_debt_count = 0
-    total_debt = 0
-    
-    if latest_year:
-        try:
-            # Try to get cached site-wide total debt value
-            from council_finance.services.counter_cache_service import counter_cache_service
-            cached_total = counter_cache_service.get_counter_value(
-                counter_slug='total-debt',
-                year_label=latest_year.label,
-                allow_expensive_calculation=False  # Never trigger expensive calculations on homepage
-            )
-            
-            if cached_total and cached_total > 0:
-                total_debt = float(cached_total)
-                # Estimate councils with debt (rough approximation to avoid expensive query)
-                councils_with_debt_count = int(Council.objects.count() * 0.85)  # ~85% of councils have debt
-            else:
-                # No cached value available - use safe defaults to prevent timeout
-                total_debt = 0
-                councils_with_debt_count = 0
-                logger.info("No cached total debt available, using default values. Run cache warming.")
-                
-        except Exception as e:
-            logger.error(f"Error retrieving cached total debt: {e}")
-            total_debt = 0
-            councils_with_debt_count = 0
-
-    # Get total council count for hero section
-    total_councils = Council.objects.count()
-    
-    # Calculate enhanced hero stats
-    total_debt_billions = total_debt / 1_000_000_000 if total_debt else 0
-    
-    # Calculate completion percentage (cached to avoid expensive calculation)
-    from django.core.cache import cache
-    completion_cache_key = "home_completion_percentage"
-    completion_percentage = cache.get(completion_cache_key)
-    
-    if completion_percentage is None:
-        all_years = FinancialYear.objects.all()
-        # Use a single query to get counts instead of multiple
-        from django.db.models import Count
-        counts = {
-            'councils': total_councils,  # Already calculated above
-            'fields': DataField.objects.count(),
-            'years': all_years.count(),
-            'characteristics': CouncilCharacteristic.objects.count(),
-            'figures': FinancialFigure.objects.count()
-        }
-        
-        expected_data_points = counts['councils'] * counts['fields'] * counts['years']
-        actual_data_points = counts['characteristics'] + counts['figures']
-        completion_percentage = (actual_data_points / expected_data_points * 100) if expected_data_points > 0 else 0
-        
-        # Cache completion percentage for 30 minutes (data doesn't change frequently)
-        cache.set(completion_cache_key, completion_percentage, 1800)
-    
-    # Get all_years here for later use (reuse from cache calculation if available)
-    if 'all_years' not in locals():
-        all_years = FinancialYear.objects.all()
-    
-    # Get featured councils (mix of council of the day + random selection)
-    featured_councils = []
-    council_of_the_day = None
-    if Council.objects.exists():
-        # Get a deterministic "random" council based on today's date for council of the day
-        import hashlib
-        from datetime import date
-        
-        today_seed = hashlib.md5(str(date.today()).encode()).hexdigest()
-        council_count = Council.objects.count()
-        if council_count > 0:
-            try:
-                council_index = int(today_seed[:8], 16) % council_count
-                council_of_the_day = Council.objects.all()[council_index]
-            except (ValueError, IndexError) as e:
-                logger.warning(f"Error selecting council of the day: {e}")
-                council_of_the_day = Council.objects.first()  # Safe fallback
-            
-            # Get a few more featured councils (exclude council of the day)
-            # Use a more efficient approach than order_by('?') which is expensive
-            remaining_councils = Council.objects.exclude(id=council_of_the_day.id)
-            council_count_remaining = remaining_councils.count()
-            
-            if council_count_remaining > 0:
-                # Select councils using deterministic but varied approach
-                import hashlib
-                from datetime import date
-                seed = hashlib.md5(f"{date.today()}_featured".encode()).hexdigest()
-                selected_indices = []
-                for i in range(min(5, council_count_remaining)):
-                    index_seed = hashlib.md5(f"{seed}_{i}".encode()).hexdigest()
-                    index = int(index_seed[:8], 16) % council_count_remaining
-                    selected_indices.append(index)
-                
-                # Use database-level selection instead of loading all councils into memory
-                featured_councils_raw = [council_of_the_day]  # Start with council of the day
-                
-                # Select random councils efficiently using database ORDER BY RANDOM() with LIMIT
-                # This is much faster than loading all councils into memory
-                random_councils = remaining_councils.order_by('?')[:5]
-                for council in random_councils:
-                    featured_councils_raw.append(council)
-                    if len(featured_councils_raw) >= 6:  # Max 6 councils total
-                        break
-            else:
-                featured_councils_raw = [council_of_the_day]
-            
-            # PERFORMANCE: Temporarily disable financial data for featured councils
-            # The individual council calculations are taking 1.3+ seconds each,
-            # causing 20+ second homepage loads (6 councils × 2 years = 12+ seconds)
-            # TODO: Replace with direct database queries or pre-computed values
-            featured_councils = []
-            for council in featured_councils_raw:
-                council_data = {'council': council, 'financial_years': []}
-                featured_councils.append(council_data)
-
-    # Get recent activity for the homepage
-    recent_contributions = Contribution.objects.filter(
-        status='approved'
-    ).select_related('user', 'council', 'field').order_by('-created')[:5]
-    
-    # Get top contributors this month
-    from datetime import datetime, timedelta
-    month_ago = datetime.now() - timedelta(days=30)
-    from django.db.models import Count
-    
-    top_contributors = Contribution.objects.filter(
-        status='approved',
-        created__gte=month_ago
-    ).values(
-        'user__username'
-    ).annotate(
-        contribution_count=Count('id')
-    ).order_by('-contribution_count')[:5]
-
-    # Get interesting statistics
-    missing_data_count = 0
-    pending_contributions_count = Contribution.objects.filter(status='pending').count()
-    
-    # Calculate missing data points (simplified)
-    from council_finance.models import DataIssue
-    try:
-        missing_data_count = DataIssue.objects.filter(
-            issue_type='missing_characteristic'
-        ).count() + DataIssue.objects.filter(
-            issue_type='missing_financial'
-        ).count()
-    except (DataIssue.DoesNotExist, AttributeError, Exception) as e:
-        logger.warning(f"Error calculating missing data count: {e}")
-        missing_data_count = 0
-
-    promoted = []
-    # Import here to keep the view lightweight if the home page is cached.
-    from council_finance.models import SiteCounter, GroupCounter
-    from django.core.cache import cache
-    from council_finance.agents.site_totals_agent import SiteTotalsAgent
-
-    all_years = list(FinancialYear.objects.order_by("-label"))
-    missing_cache = False
-
-    # First pass to detect missing cache entries. The totals are normally
-    # populated by ``SiteTotalsAgent`` via a scheduled task. When the cache is
-    # cold (for example on a fresh install) we compute the values on demand so
-    # visitors never see zeroed counters.
-    # Site and group counters rely on cached totals generated by ``SiteTotalsAgent``.
-    # The agent normally runs on a schedule so most requests simply read the
-    # cached values. If any cache entry is missing ``None`` we recompute all
-    # totals immediately to avoid empty counters.
-    for sc in SiteCounter.objects.filter(promote_homepage=True):
-        year_label = sc.year.label if sc.year else "all"
-        
-        # FIXED: Use counter.slug to match EfficientSiteTotalsAgent key pattern
-        key = f"counter_total:{sc.counter.slug}:{year_label}"
-        
-        val = cache.get(key)
-        
-        if val is None:
-            logger.warning(f"Cache MISS for {sc.name} - key '{key}' not found")
-            missing_cache = True
-        elif val == 0 and (FinancialFigure.objects.exists() or CouncilCharacteristic.objects.exists()):
-            # A zero total with actual figures likely means the cache was
-            # populated before data was loaded. Trigger a refresh so visitors
-            # see correct values without manual intervention.
-            logger.warning(f"Cache HIT but zero value for {sc.name} - triggering refresh")
-            missing_cache = True
-            
-        if sc.year and cache.get(f"{key}:prev") is None:
-            logger.warning(f"Previous year cache MISS for {sc.name}")
-            missing_cache = True
-
-    for gc in GroupCounter.objects.filter(promote_homepage=True):
-        year_label = gc.year.label if gc.year else "all"
-        
-        # FIXED: Use counter.slug to match EfficientSiteTotalsAgent key pattern
-        key = f"counter_total:{gc.counter.slug}:{year_label}"
-        
-        val = cache.get(key)
-        
-        # Group counters may be restricted to subsets of councils. We apply the
-        # same logic as above to ensure the totals reflect loaded data.
-        if val is None:
-            logger.warning(f"GROUP cache MISS for {gc.name} - key '{key}' not found")
-            missing_cache = True
-        elif val == 0 and (FinancialFigure.objects.exists() or CouncilCharacteristic.objects.exists()):
-            logger.warning(f"GROUP cache HIT but zero value for {gc.name} - triggering refresh")
-            missing_cache = True
-            
-        if gc.year and cache.get(f"{key}:prev") is None:
-            logger.warning(f"GROUP previous year cache MISS for {gc.name}")
-            missing_cache = True
-
-    # When any counter total is missing, use fallback values instead of 
-    # running expensive SiteTotalsAgent synchronously. The agent should be 
-    # run via scheduled task or management command, not on page load.
-    if missing_cache:
-        # Log the issue for admin awareness but don't block page rendering
-        logger.warning("Home page: Site counter cache is cold. Run 'python manage.py reload' to populate cache.")
-        # Instead of running expensive calculations on page load, use fallback values
-        # The EfficientSiteTotalsAgent should be run via reload command or scheduled task
-
-    # Use new hybrid counter cache service for fast, persistent counter loading
-    from council_finance.services.counter_cache_service import counter_cache_service
-    
-    # Build promoted counters using the new 3-tier caching system
-    
-    for sc in SiteCounter.objects.filter(promote_homepage=True):
-        year_label = sc.year.label if sc.year else None
-        
-        # Use hybrid cache service (Redis → Database → Calculate)
-        # Don't use stale data - we want to show calculating state instead
-        value = counter_cache_service.get_counter_value(
-            counter_slug=sc.counter.slug,
-            year_label=year_label,
-            use_stale_if_needed=False,  # Force calculating state instead of stale data
-            allow_expensive_calculation=False  # Never run expensive calculations on page load
-        )
-        
-        # Check for sentinel value indicating calculation needed
-        if value == -1:
-            # Counter is being calculated - show calculating state
-            value = 0  # Placeholder for animation
-            prev_value = 0
-            formatted = "Calculating..."
-            is_calculating = True
-        else:
-            # Previous year value (for change calculations)
-            prev_value = 0
-            if sc.year:
-                try:
-                    from council_finance.utils.year_utils import previous_year_label
-                    prev_year_label = previous_year_label(sc.year.label)
-                    if prev_year_label:
-                        prev_value = counter_cache_service.get_counter_value(
-                            counter_slug=sc.counter.slug,
-                            year_label=prev_year_label,
-                            use_stale_if_needed=False,  # Consistent with main value
-                            allow_expensive_calculation=False
-                        )
-                        # Handle sentinel value for previous year too
-                        if prev_value == -1:
-                            prev_value = 0
-                except Exception:
-                    prev_value = 0
-            
-            formatted = sc.counter.format_value(float(value))
-            is_calculating = False
-            
-        promoted.append({
-            "slug": sc.slug,
-            "counter_slug": sc.counter.slug,
-            "year": sc.year.label if sc.year else None,
-            "name": sc.name,
-            "formatted": formatted,
-            "raw": float(value),
-            "duration": sc.duration,
-            "precision": sc.precision,
-            "show_currency": sc.show_currency,
-            "friendly_format": sc.friendly_format,
-            "explanation": sc.explanation,
-            "columns": sc.columns,
-            "is_calculating": is_calculating,  # New field for template logic
-        })
-
-    # Group counters also use the new hybrid caching system
-    for gc in GroupCounter.objects.filter(promote_homepage=True):
-        year_label = gc.year.label if gc.year else None
-        
-        # Use hybrid cache service for group counters too
-        # Don't use stale data - show calculating state instead
-        value = counter_cache_service.get_counter_value(
-            counter_slug=gc.counter.slug,
-            year_label=year_label,
-            use_stale_if_needed=False,  # Force calculating state
-            allow_expensive_calculation=False  # Never run expensive calculations
-        )
-        
-        # Check for sentinel value indicating calculation needed
-        if value == -1:
-            # Group counter is being calculated - show calculating state
-            value = 0
-            prev_value = 0
-            formatted = "Calculating..."
-            is_calculating = True
-        else:
-            # Previous year value for group counters
-            prev_value = 0
-            if gc.year:
-                try:
-                    from council_finance.utils.year_utils import previous_year_label
-                    prev_year_label = previous_year_label(gc.year.label)
-                    if prev_year_label:
-                        prev_value = counter_cache_service.get_counter_value(
-                            counter_slug=gc.counter.slug,
-                            year_label=prev_year_label,
-                            use_stale_if_needed=False,
-                            allow_expensive_calculation=False
-                        )
-                        # Handle sentinel value for previous year too
-                        if prev_value == -1:
-                            prev_value = 0
-                except Exception:
-                    prev_value = 0
-            
-            formatted = gc.counter.format_value(float(value))
-            is_calculating = False
-        promoted.append({
-            "slug": gc.slug,
-            "name": gc.name,
-            "formatted": formatted,
-            "raw": float(value),
-            "duration": gc.duration,
-            "precision": gc.precision,
-            "show_currency": gc.show_currency,
-            "friendly_format": gc.friendly_format,
-            "explanation": "",  # groups currently lack custom explanations
-            "columns": 3,  # groups default to full width for now
-            "is_calculating": is_calculating,  # New field for template logic
-        })
-
-    context = {
-        "total_debt": total_debt,
-        "total_debt_billions": total_debt_billions,
-        "total_councils": total_councils,
-        "councils_with_debt_count": councils_with_debt_count,
-        "completion_percentage": completion_percentage,
-        "council_of_the_day": council_of_the_day,
-        "featured_councils": featured_councils,
-        "recent_contributions": recent_contributions,
-        "top_contributors": top_contributors,
-        "missing_data_count": missing_data_count,
-        "pending_contributions_count": pending_contributions_count,
-        "promoted_counters": promoted,
-        "latest_year": latest_year,
-        "current_year": latest_year.label if latest_year else "",
-    }
+    """
+    Landing page with counters, featured content and widgets, rendered from
+    the precomputed home snapshot (see ``services.home_snapshot``).
+    """
+    from council_finance.services.home_snapshot import home_snapshot
 
-    return render(request, "council_finance/home.html", context)
+    return render(request, "council_finance/home.html", home_snapshot.context())
 
 
 def council_list(request):
@@ -635,6 +282,220 @@ def council_list(request):
     return render(request, "council_finance/council_list.html", context)
 
 
+def _council_financial_figures(council):
+    """Financial figures for fields applying to this council's type."""
+    financial_figures = FinancialFigure.objects.filter(council=council).select_related(
+        "year", "field"
+    )
+    if council.council_type_id:
+        financial_figures = financial_figures.filter(
+            Q(field__council_types__isnull=True)
+            | Q(field__council_types=council.council_type)
+        )
+    else:
+        financial_figures = financial_figures.filter(field__council_types__isnull=True)
+    return financial_figures.order_by("year__label", "field__slug").distinct()
+
+
+def _council_counters_section(council, year):
+    """
+    Counters shown on the council page for ``year``, headline counters
+    first, and the slugs shown by default. Cached as a tagged fragment.
+    """
+    if not year:
+        return {"counters": [], "default_slugs": []}
+
+    def build():
+        from council_finance.agents.counter_agent import CounterAgent
+
+        # Compute all counter values for this council/year using the agent
+        values = CounterAgent().run(council_slug=council.slug, year_label=year.label)
+
+        # Build a lookup of overrides so we know which counters are enabled or
+        # disabled specifically for this council.
+        override_map = {
+            cc.counter_id: cc.enabled
+            for cc in CouncilCounter.objects.filter(council=council)
+        }
+
+        # Loop over every defined counter and decide whether it should be
+        # displayed. If the council has an explicit override we honour that,
+        # otherwise we fall back to the counter's show_by_default flag.
+        head_list = []
+        other_list = []
+        default_slugs = []
+        counters_qs = CounterDefinition.objects.all()
+        if council.council_type_id:
+            counters_qs = counters_qs.filter(
+                Q(council_types__isnull=True) | Q(council_types=council.council_type)
+            )
+        else:
+            counters_qs = counters_qs.filter(council_types__isnull=True)
+        for counter in counters_qs.distinct():
+            enabled = override_map.get(counter.id, counter.show_by_default)
+            if not enabled:
+                continue
+            result = values.get(counter.slug, {})
+            item = {
+                "counter": counter,
+                "value": result.get("value"),
+                "formatted": result.get("formatted"),
+                "error": result.get("error"),
+            }
+            if counter.headline:
+                head_list.append(item)
+            else:
+                other_list.append(item)
+            if counter.show_by_default:
+                default_slugs.append(counter.slug)
+        return {"counters": head_list + other_list, "default_slugs": default_slugs}
+
+    return fragment_cache.get_or_set(
+        'council-counters', [council.slug, year.label],
+        [council_tag(council.slug), council_year_tag(council.slug, year.label), 'counters'],
+        build,
+    )
+
+
+def _council_history_section(council):
+    """
+    Recent merge and moderation notices for the council page. Cached as a
+    tagged fragment for an hour, as notices age out after 30 days.
+    """
+    def build():
+        from datetime import timedelta
+
+        recent_merge_activity = None
+        recent_flag_activity = None
+        administrative_messages = []
+
+        # Look for recent merge activities (last 30 days)
+        recent_cutoff = timezone.now() - timedelta(days=30)
+        recent_merge_activity = council.activity_logs.filter(
+            activity_type='council_merge',
+            created__gte=recent_cutoff
+        ).order_by('-created').first()
+
+        if recent_merge_activity:
+            administrative_messages.append({
+                'type': 'merge',
+                'message': f"This council was merged from another authority on {recent_merge_activity.created.strftime('%B %d, %Y')}. {recent_merge_activity.description}",
+                'timestamp': recent_merge_activity.created
+            })
+
+        # Look for recent flag/moderation activities
+        recent_flag_activity = council.activity_logs.filter(
+            activity_type__in=['moderation', 'data_correction'],
+            created__gte=recent_cutoff
+        ).order_by('-created').first()
+
+        if recent_flag_activity:
+            administrative_messages.append({
+                'type': 'flag',
+                'message': f"Recent data update: {recent_flag_activity.description}",
+                'timestamp': recent_flag_activity.created
+            })
+
+        # Check if council is defunct
+        if council.status == 'defunct':
+            administrative_messages.append({
+                'type': 'defunct',
+                'message': 'This council is no longer active. It may have been merged with another authority or dissolved.',
+                'timestamp': None
+            })
+
+        return {
+            "administrative_messages": administrative_messages,
+            "recent_merge_activity": recent_merge_activity,
+            "recent_flag_activity": recent_flag_activity,
+        }
+
+    return fragment_cache.get_or_set(
+        'council-history', [council.slug],
+        [council_tag(council.slug), council_activity_tag(council.slug)],
+        build,
+        timeout=3600,
+    )
+
+
+def _council_meta_section(council):
+    """
+    Meta fields for the council page header. Cached as a tagged fragment.
+    """
+    def build():
+        # Get fields configured to show in meta bar
+        meta_data_fields = DataField.objects.filter(
+            show_in_meta=True,
+            category='characteristic'
+        ).order_by('display_order', 'name')
+
+        meta_fields = []
+        population_in_meta = False
+
+        # Create a lookup map of characteristics for this council
+        characteristics_map = {}
+        characteristics_qs = CouncilCharacteristic.objects.filter(
+            council=council,
+            field__show_in_meta=True,
+            field__category='characteristic'
+        ).select_related('field')
+
+        for characteristic in characteristics_qs:
+            characteristics_map[characteristic.field.id] = characteristic
+
+        # Process meta fields with the preloaded data
+        for field in meta_data_fields:
+            characteristic = characteristics_map.get(field.id)
+
+            if characteristic and characteristic.value:
+                # Format the value using the field's display format
+                if field.meta_display_format and '{value}' in field.meta_display_format:
+                    if field.content_type == 'integer' and characteristic.value.isdigit():
+                        # Format numbers with commas
+                        formatted_value = field.meta_display_format.format(
+                            value=f"{int(characteristic.value):,}"
+                        )
+                    else:
+                        formatted_value = field.meta_display_format.format(
+                            value=characteristic.value
+                        )
+                else:
+                    formatted_value = characteristic.value
+
+                meta_fields.append({
+                    'field': field,
+                    'value': characteristic.value,
+                    'formatted_value': formatted_value
+                })
+
+                # Track if population is in meta fields
+                if field.slug == 'population':
+                    population_in_meta = True
+            elif field.slug == 'population' and council.latest_population is not None:
+                # Fallback to council.latest_population if no characteristic exists
+                if field.meta_display_format and '{value}' in field.meta_display_format:
+                    formatted_value = field.meta_display_format.format(
+                        value=f"{council.latest_population:,}"
+                    )
+                else:
+                    formatted_value = f"{council.latest_population:,}"
+
+                meta_fields.append({
+                    'field': field,
+                    'value': str(council.latest_population),
+                    'formatted_value': formatted_value
+                })
+                population_in_meta = True
+
+        return {"meta_fields": meta_fields, "population_in_meta": population_in_meta}
+
+    return fragment_cache.get_or_set(
+        'council-meta', [council.slug],
+        [council_tag(council.slug), 'fields'],
+        build,
+    )
+
+
 def council_detail(request, slug):
     """Show details for a single council."""
     # Fetch the council or return a 404 if the slug is unknown
@@ -654,30 +515,10 @@ def council_detail(request, slug):
         try:
             share_data = signing.loads(share_token)
         except signing.BadSignature:
-            share_data = None    # Get all characteristics for this council (non-year specific)
-    characteristics = CouncilCharacteristic.objects.filter(council=council).select_related("field")
-    if council.council_type_id:
-        characteristics = characteristics.filter(
-            Q(field__council_types__isnull=True)
-            | Q(field__council_types=council.council_type)
-        )
-    else:
-        characteristics = characteristics.filter(field__council_types__isnull=True)
+            share_data = None
     
     # Get all financial figures for this council (year specific)
-    financial_figures = FinancialFigure.objects.filter(council=council).select_related(
-        "year", "field"
-    )
-    if council.council_type_id:
-        financial_figures = financial_figures.filter(
-            Q(field__council_types__isnull=True)
-            | Q(field__council_types=council.council_type)
-        )
-    else:
-        financial_figures = financial_figures.filter(field__council_types__isnull=True)
-    financial_figures = financial_figures.order_by("year__label", "field__slug").distinct()
-      # Keep financial_figures as QuerySet for filtering, create figures list for template
-    figures = list(financial_figures)
+    financial_figures = _council_financial_figures(council)
 
     years = list(
         FinancialYear.objects.order_by("-label").exclude(label__iexact="general")
@@ -710,73 +551,14 @@ def council_detail(request, slug):
             if y.label == req_year:
                 edit_selected_year = y
                 break
-    counters = []
-    default_slugs = []
-    if selected_year:
-        from council_finance.agents.counter_agent import CounterAgent
-        from django.core.cache import cache
-
-        agent = CounterAgent()
-        
-        # Cache counter calculations for 10 minutes to improve performance
-        cache_key_current = f"counter_values:{slug}:{selected_year.label}"
-        values = cache.get(cache_key_current)
-        
-        if values is None:
-            # Compute all counter values for this council/year using the agent
-            values = agent.run(council_slug=slug, year_label=selected_year.label)
-            cache.set(cache_key_current, values, 600)  # 10 minutes
-        
-        prev_values = {}
-        prev_label = previous_year_label(selected_year.label)
-        if prev_label:
-            prev_year = FinancialYear.objects.filter(label=prev_label).first()
-            if prev_year:
-                cache_key_prev = f"counter_values:{slug}:{prev_year.label}"
-                prev_values = cache.get(cache_key_prev)
-                
-                if prev_values is None:
-                    prev_values = agent.run(council_slug=slug, year_label=prev_year.label)
-                    cache.set(cache_key_prev, prev_values, 600)  # 10 minutes
-
-        # Build a lookup of overrides so we know which counters are enabled or
-        # disabled specifically for this council.
-        override_map = {
-            cc.counter_id: cc.enabled
-            for cc in CouncilCounter.objects.filter(council=council)
-        }
-
-        # Loop over every defined counter and decide whether it should be
-        # displayed. If the council has an explicit override we honour that,
-        # otherwise we fall back to the counter's show_by_default flag.
-        head_list = []
-        other_list = []
-        counters_qs = CounterDefinition.objects.all()
-        if council.council_type_id:
-            counters_qs = counters_qs.filter(
-                Q(council_types__isnull=True) | Q(council_types=council.council_type)
-            )
-        else:
-            counters_qs = counters_qs.filter(council_types__isnull=True)
-        for counter in counters_qs.distinct():
-            enabled = override_map.get(counter.id, counter.show_by_default)
-            if not enabled:
-                continue
-            result = values.get(counter.slug, {})
-            prev = prev_values.get(counter.slug, {}) if prev_values else {}
-            item = {
-                "counter": counter,
-                "value": result.get("value"),
-                "formatted": result.get("formatted"),
-                "error": result.get("error"),
-            }
-            if counter.headline:
-                head_list.append(item)
-            else:
-                other_list.append(item)
-            if counter.show_by_default:
-                default_slugs.append(counter.slug)
-        counters = head_list + other_list
+    # Expensive sections are cached as tagged fragments, purged when the
+    # data they were built from changes (see services.fragment_cache)
+    figures = fragment_cache.get_or_set(
+        'council-figures', [council.slug],
+        [council_tag(council.slug), 'fields'] + [council_year_tag(council.slug, y.label) for y in years],
+        lambda: list(financial_figures),
+    )
+    counters_section = _council_counters_section(council, selected_year)
 
     # Old meta fields logic removed - now using dynamic meta fields system below
 
@@ -796,51 +578,8 @@ def council_detail(request, slug):
         if default_list:
             is_favourited = default_list.councils.filter(id=council.id).exists()
     
-    # Check for recent merge or administrative actions
-    recent_merge_activity = None
-    recent_flag_activity = None
-    administrative_messages = []
+    history_section = _council_history_section(council)
     
-    if hasattr(council, 'activity_logs'):
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # Look for recent merge activities (last 30 days)
-        recent_cutoff = timezone.now() - timedelta(days=30)
-        merge_logs = council.activity_logs.filter(
-            activity_type='council_merge',
-            created__gte=recent_cutoff
-        ).order_by('-created')
-        
-        if merge_logs.exists():
-            recent_merge_activity = merge_logs.first()
-            administrative_messages.append({
-                'type': 'merge',
-                'message': f"This council was merged from another authority on {recent_merge_activity.created.strftime('%B %d, %Y')}. {recent_merge_activity.description}",
-                'timestamp': recent_merge_activity.created
-            })
-        
-        # Look for recent flag/moderation activities
-        flag_logs = council.activity_logs.filter(
-            activity_type__in=['moderation', 'data_correction'],
-            created__gte=recent_cutoff
-        ).order_by('-created')
-        
-        if flag_logs.exists():
-            recent_flag_activity = flag_logs.first()
-            administrative_messages.append({
-                'type': 'flag',
-                'message': f"Recent data update: {recent_flag_activity.description}",
-                'timestamp': recent_flag_activity.created
-            })
-    
-    # Check if council is defunct
-    if council.status == 'defunct':
-        administrative_messages.append({
-            'type': 'defunct',
-            'message': 'This council is no longer active. It may have been merged with another authority or dissolved.',
-            'timestamp': None
-        })        
     # Use the QuerySet for filtering, not the list
     edit_figures = financial_figures.filter(year=edit_selected_year) if edit_selected_year else financial_figures.none()
     
@@ -934,78 +673,15 @@ def council_detail(request, slug):
                 'is_pending': field.slug in pending_slugs_list
             })
 
-    # Get meta fields for council detail header display (optimized with single query)
-    meta_fields = []
-    population_in_meta = False
-    
-    # Get fields configured to show in meta bar
-    meta_data_fields = DataField.objects.filter(
-        show_in_meta=True,
-        category='characteristic'
-    ).order_by('display_order', 'name')
-    
-    # Create a lookup map of characteristics for this council
-    characteristics_map = {}
-    characteristics_qs = CouncilCharacteristic.objects.filter(
-        council=council,
-        field__show_in_meta=True,
-        field__category='characteristic'
-    ).select_related('field')
-    
-    for characteristic in characteristics_qs:
-        characteristics_map[characteristic.field.id] = characteristic
-    
-    # Process meta fields with the preloaded data
-    for field in meta_data_fields:
-        characteristic = characteristics_map.get(field.id)
-        
-        if characteristic and characteristic.value:
-            # Format the value using the field's display format
-            if field.meta_display_format and '{value}' in field.meta_display_format:
-                if field.content_type == 'integer' and characteristic.value.isdigit():
-                    # Format numbers with commas
-                    formatted_value = field.meta_display_format.format(
-                        value=f"{int(characteristic.value):,}"
-                    )
-                else:
-                    formatted_value = field.meta_display_format.format(
-                        value=characteristic.value
-                    )
-            else:
-                formatted_value = characteristic.value
-            
-            meta_fields.append({
-                'field': field,
-                'value': characteristic.value,
-                'formatted_value': formatted_value
-            })
-            
-            # Track if population is in meta fields
-            if field.slug == 'population':
-                population_in_meta = True
-        elif field.slug == 'population' and council.latest_population is not None:
-            # Fallback to council.latest_population if no characteristic exists
-            if field.meta_display_format and '{value}' in field.meta_display_format:
-                formatted_value = field.meta_display_format.format(
-                    value=f"{council.latest_population:,}"
-                )
-            else:
-                formatted_value = f"{council.latest_population:,}"
-                
-            meta_fields.append({
-                'field': field,
-                'value': str(council.latest_population),
-                'formatted_value': formatted_value
-            })
-            population_in_meta = True
+    meta_section = _council_meta_section(council)
     
     context = {
         "council": council,
         "figures": figures,
-        "counters": counters,
+        "counters": counters_section["counters"],
         "years": years,
         "selected_year": selected_year,
-        "default_counter_slugs": default_slugs,
+        "default_counter_slugs": counters_section["default_slugs"],
         "tab": tab,
         "focus": focus,
         "edit_years": edit_years,
@@ -1034,12 +710,12 @@ def council_detail(request, slug):
         "is_favourited": is_favourited,
         "share_data": share_data,
         # Administrative messaging
-        "administrative_messages": administrative_messages,
-        "recent_merge_activity": recent_merge_activity,
-        "recent_flag_activity": recent_flag_activity,
+        "administrative_messages": history_section['administrative_messages'],
+        "recent_merge_activity": history_section['recent_merge_activity'],
+        "recent_flag_activity": history_section['recent_flag_activity'],
         # Dynamic meta fields for header display
-        "meta_fields": meta_fields,
-        "population_in_meta": population_in_meta,
+        "meta_fields": meta_section['meta_fields'],
+        "population_in_meta": meta_section['population_in_meta'],
     }
 
     # Handle AJAX POST requests for saving financial figures
@@ -1060,57 +736,59 @@ def council_detail(request, slug):
                 saved_count = 0
                 errors = []
                 
-                for change in changes:
-                    field_slug = change.get('field')
-                    value = change.get('value')
-                    data_type = change.get('type')
+                # One batched notification per council/year instead of per-row signals
+                with coalesce_data_changes(author=request.user, source='contribution'):
+                    for change in changes:
+                        field_slug = change.get('field')
+                        value = change.get('value')
+                        data_type = change.get('type')
                     
-                    try:
-                        # Find the field
-                        field = DataField.objects.get(slug=field_slug)
-                        year = FinancialYear.objects.get(id=year_id)
+                        try:
+                            # Find the field
+                            field = DataField.objects.get(slug=field_slug)
+                            year = FinancialYear.objects.get(id=year_id)
                         
-                        # Validate and convert value based on type
-                        if data_type == 'monetary' or data_type == 'integer':
-                            value = float(value) if value else 0
-                        elif data_type == 'percentage':
-                            value = float(value) if value else 0
-                            if value > 100:
-                                errors.append(f"{field.name}: Percentage cannot exceed 100%")
-                                continue
-                          # Create or update the financial figure
-                        if field.category == 'financial':
-                            figure, created = FinancialFigure.objects.get_or_create(
-                                council=council,
-                                field=field,
-                                year=year,
-                                defaults={'value': value}
-                            )
+                            # Validate and convert value based on type
+                            if data_type == 'monetary' or data_type == 'integer':
+                                value = float(value) if value else 0
+                            elif data_type == 'percentage':
+                                value = float(value) if value else 0
+                                if value > 100:
+                                    errors.append(f"{field.name}: Percentage cannot exceed 100%")
+                                    continue
+                              # Create or update the financial figure
+                            if field.category == 'financial':
+                                figure, created = FinancialFigure.objects.get_or_create(
+                                    council=council,
+                                    field=field,
+                                    year=year,
+                                    defaults={'value': value}
+                                )
                             
-                            if not created:
-                                figure.value = value
-                                figure.save()
-                        else:
-                            # Handle characteristics (no year)
-                            characteristic, created = CouncilCharacteristic.objects.get_or_create(
-                                council=council,
-                                field=field,
-                                defaults={'value': str(value), 'updated_by': request.user}
-                            )
+                                if not created:
+                                    figure.value = value
+                                    figure.save()
+                            else:
+                                # Handle characteristics (no year)
+                                characteristic, created = CouncilCharacteristic.objects.get_or_create(
+                                    council=council,
+                                    field=field,
+                                    defaults={'value': str(value), 'updated_by': request.user}
+                                )
                             
-                            if not created:
-                                characteristic.value = str(value)
-                                characteristic.updated_by = request.user
-                                characteristic.save()
+                                if not created:
+                                    characteristic.value = str(value)
+                                    characteristic.updated_by = request.user
+                                    characteristic.save()
                         
-                        saved_count += 1
+                            saved_count += 1
                         
-                    except (DataField.DoesNotExist, FinancialYear.DoesNotExist) as e:
-                        errors.append(f"Invalid field or year: {str(e)}")
-                    except ValueError as e:
-                        errors.append(f"Invalid value for {field_slug}: {str(e)}")
-                    except Exception as e:
-                        errors.append(f"Error saving {field_slug}: {str(e)}")
+                        except (DataField.DoesNotExist, FinancialYear.DoesNotExist) as e:
+                            errors.append(f"Invalid field or year: {str(e)}")
+                        except ValueError as e:
+                            errors.append(f"Invalid value for {field_slug}: {str(e)}")
+                        except Exception as e:
+                            errors.append(f"Error saving {field_slug}: {str(e)}")
                 
                 # Invalidate counter cache for this council and year if any changes were saved
                 if saved_count > 0:
@@ -2114,18 +1792,15 @@ def contribute_stats(request):
     
     # Get detailed breakdown of missing data by category - only for active councils
     # Show ALL missing data but with smart organization and prioritization
+    from council_finance.services.completeness_index import completeness_index
+    
     missing_total = DataIssue.objects.filter(issue_type='missing', council__status='active').count()
     missing_characteristics = DataIssue.objects.filter(
         issue_type='missing', 
         field__category='characteristic',
         council__status='active'
     ).count()
-    missing_financial = DataIssue.objects.filter(
-        issue_type='missing',
-        council__status='active'
-    ).exclude(
-        field__category='characteristic'
-    ).count()
+    missing_financial = missing_total - missing_characteristics
     
     # Get priority breakdown for enhanced user experience
     try:
@@ -2162,6 +1837,7 @@ def contribute_stats(request):
         'missing_financial': missing_financial,
         'pending': Contribution.objects.filter(status='pending').count(),
         'suspicious': DataIssue.objects.filter(issue_type='suspicious').count(),
+        'completion_percentage': round(completeness_index.site_completion_percentage(), 1),
         # Enhanced priority information
         'priority_stats': priority_stats,
     }
@@ -3600,6 +3276,9 @@ def get_feed_updates_api(request):
 
 # ActivityLog Comment API Endpoints
 
+# Feed comments per user per ten minutes
+comment_rate_limiter = SlidingWindowRateLimiter('activity_log_comments', limit=20, window_seconds=600)
+
 @comments_access_required
 @require_POST
 def comment_on_activity_log(request, activity_log_id):
@@ -3625,6 +3304,15 @@ def comment_on_activity_log(request, activity_log_id):
                 'error': 'Comment content is required'
             }, status=400)
         
+        limited = comment_rate_limiter.hit(request.user.pk)
+        if not limited.allowed:
+            response = JsonResponse({
+                'success': False,
+                'error': 'You are commenting too quickly. Please wait a few minutes.'
+            }, status=429)
+            response['Retry-After'] = str(limited.retry_after)
+            return response
+        
         # Validate parent comment if provided
         parent = None
         if parent_id:
@@ -303,20 +303,19 @@ def get_data_quality_summary():
     Returns:
         dict with statistics about year coverage and data quality
     """
-    from .models import FinancialFigure
+    from .services.completeness_index import completeness_index
+    
+    total_years = FinancialYear.objects.count()
+    years_with_data = len(completeness_index.years_with_data())
     
     summary = {
-        'total_years': FinancialYear.objects.count(),
+        'total_years': total_years,
         'current_years': FinancialYear.objects.filter(is_current=True).count(),
         'provisional_years': FinancialYear.objects.filter(is_provisional=True).count(),
         'forecast_years': FinancialYear.objects.filter(is_forecast=True).count(),
         'finalized_years': FinancialYear.objects.filter(is_provisional=False, is_forecast=False).count(),
-        'years_with_data': FinancialYear.objects.filter(
-            id__in=FinancialFigure.objects.values_list('year_id', flat=True).distinct()
-        ).count(),
-        'years_without_data': FinancialYear.objects.exclude(
-            id__in=FinancialFigure.objects.values_list('year_id', flat=True).distinct()
-        ).count(),
+        'years_with_data': years_with_data,
+        'years_without_data': total_years - years_with_data,
     }
     
     return summary
@@ -0,0 +1,70 @@
+"""
+Management command to expire old events and activity logs.
+
+Applies EVENT_VIEWER_SETTINGS['RETENTION_POLICIES'] and ['RETENTION']:
+expired rows are compacted into rollups, archived to compressed JSON
+lines files and deleted in batches. Run daily from cron.
+
+Usage:
+    python manage.py apply_retention                     # Archive and delete expired rows
+    python manage.py apply_retention --dry-run           # Count expired rows only
+    python manage.py apply_retention --no-archive        # Delete without archiving
+    python manage.py apply_retention --setup-partitions  # PostgreSQL: partition SystemEvent by month
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from event_viewer.services.retention_service import retention_service
+
+
+class Command(BaseCommand):
+    help = 'Archive and delete SystemEvent and ActivityLog records past their retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many records would be removed without removing them',
+        )
+        parser.add_argument(
+            '--no-archive',
+            action='store_true',
+            help='Delete expired records without archiving them',
+        )
+        parser.add_argument(
+            '--setup-partitions',
+            action='store_true',
+            help='Convert the SystemEvent table to monthly partitions (PostgreSQL only, locks the table)',
+        )
+
+    def handle(self, *args, **options):
+        if options['setup_partitions']:
+            if connection.vendor != 'postgresql':
+                raise CommandError('Partitioning needs PostgreSQL')
+            partitions = retention_service.partitions
+            if partitions.setup():
+                self.stdout.write(self.style.SUCCESS('Partitioned SystemEvent by month'))
+            else:
+                partitions.ensure()
+                self.stdout.write('SystemEvent is already partitioned; created upcoming partitions')
+            if not retention_service.options.get('partitioned'):
+                self.stdout.write(self.style.WARNING(
+                    "Set EVENT_VIEWER_SETTINGS['RETENTION']['partitioned'] to expire by partition"
+                ))
+            return
+
+        results = retention_service.apply(
+            dry_run=options['dry_run'],
+            archive=False if options['no_archive'] else None,
+        )
+
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        for table, count in results.items():
+            if table == 'dropped_partitions':
+                for name in count:
+                    self.stdout.write(f'Dropped partition {name}')
+            else:
+                self.stdout.write(f'{verb} {count} {table.replace("_", " ")}')
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('Retention applied'))
@@ -157,11 +157,8 @@ class Command(BaseCommand):
             one_hour_ago = timezone.now() - timedelta(hours=1)
             
             # Critical errors
-            from event_viewer.models import SystemEvent
-            critical_count = SystemEvent.objects.filter(
-                timestamp__gte=one_hour_ago,
-                level='critical'
-            ).count()
+            from event_viewer.services.rollup_service import rollup_service
+            critical_count = rollup_service.count(one_hour_ago, level='critical')
             critical_threshold = event_viewer_config.get_alert_threshold('critical_errors_per_hour')
             
             if critical_count >= critical_threshold and critical_threshold > 0:
@@ -174,10 +171,7 @@ class Command(BaseCommand):
                     self.stdout.write(f"Would trigger: Critical errors ({critical_count} >= {critical_threshold})")
             
             # Total errors
-            total_count = SystemEvent.objects.filter(
-                timestamp__gte=one_hour_ago,
-                level__in=['error', 'critical']
-            ).count()
+            total_count = rollup_service.count(one_hour_ago, level__in=['error', 'critical'])
             total_threshold = event_viewer_config.get_alert_threshold('total_errors_per_hour')
             
             if total_count >= total_threshold and total_threshold > 0:
@@ -6,13 +6,16 @@ Usage:
     python manage.py parse_logs --execute          # Parse and import all logs  
     python manage.py parse_logs --file server.log  # Parse specific file
     python manage.py parse_logs --clear-first      # Clear existing events first
+    python manage.py parse_logs --from-start       # Re-read files already ingested
+
+Each run only reads what was appended to a file since the last --execute run.
 """
 
 from django.core.management.base import BaseCommand
 from django.conf import settings
 import os
 from event_viewer.services.log_parsers import LogParsingService
-from event_viewer.models import SystemEvent
+from event_viewer.models import EventRollup, SystemEvent
 
 
 class Command(BaseCommand):
@@ -40,6 +43,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing SystemEvents with source=log_parser before importing',
         )
+        parser.add_argument(
+            '--from-start',
+            action='store_true',
+            help='Read every file from the beginning instead of where the last run stopped',
+        )
         parser.add_argument(
             '--verbose',
             action='store_true',
@@ -60,8 +68,15 @@ class Command(BaseCommand):
         if options['clear_first'] and not dry_run:
             deleted_count = SystemEvent.objects.filter(source='log_parser').count()
             SystemEvent.objects.filter(source='log_parser').delete()
+            # Re-imported events are counted again
+            EventRollup.objects.filter(source='log_parser').delete()
+            service.reset_checkpoints(options['logs_dir'], source='log_parser')
             self.stdout.write(f"Cleared {deleted_count} existing log-parsed events")
         
+        if options['from_start'] and not dry_run:
+            reset_count = service.reset_checkpoints(options['logs_dir'])
+            self.stdout.write(f"Reset {reset_count} log checkpoints")
+        
         # Parse single file or all files
         if options['file']:
             log_file_path = os.path.join(options['logs_dir'], options['file'])
@@ -0,0 +1,49 @@
+"""
+Management command to rebuild hourly event rollups from raw events.
+
+Rollups are maintained as events are written; run this to backfill them
+for events logged before they existed, or as a periodic catch-up job.
+
+Usage:
+    python manage.py rollup_events              # Rebuild the last 48 completed hours
+    python manage.py rollup_events --hours 168  # Rebuild the last week
+    python manage.py rollup_events --all        # Rebuild every hour with retained events
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from event_viewer.models import SystemEvent, rollup_hour
+from event_viewer.services.rollup_service import rollup_service
+
+
+class Command(BaseCommand):
+    help = 'Rebuild hourly event rollups from raw SystemEvent records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=48,
+            help='Number of completed hours to rebuild (default: 48)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild from the oldest retained event',
+        )
+
+    def handle(self, *args, **options):
+        end = rollup_hour(timezone.now())
+        if options['all']:
+            oldest = SystemEvent.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+            start = rollup_hour(oldest) if oldest else end
+        else:
+            start = end - timedelta(hours=options['hours'])
+
+        rebuilt = rollup_service.rebuild(start, end)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rebuilt} rollups from {start:%Y-%m-%d %H:00} to {end:%Y-%m-%d %H:00}")
+        )
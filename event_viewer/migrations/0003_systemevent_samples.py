@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_viewer', '0002_alter_systemevent_category_alter_systemevent_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='systemevent',
+            name='samples',
+            field=models.JSONField(blank=True, default=list, help_text='Most recent raw payloads of deduplicated occurrences'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_viewer', '0003_systemevent_samples'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(help_text='Start of the UTC hour')),
+                ('source', models.CharField(choices=[('django_error', 'Django Error Handler'), ('middleware', 'Error Middleware'), ('log_parser', 'Log File Parser'), ('performance', 'Performance Monitor'), ('ai_system', 'AI System'), ('test_runner', 'Test Runner'), ('cache', 'Cache System'), ('database', 'Database'), ('api', 'API Endpoint'), ('background_task', 'Background Task'), ('user_report', 'User Report'), ('site_feedback', 'Site Feedback'), ('health_check', 'Health Check')], max_length=50)),
+                ('level', models.CharField(choices=[('debug', 'Debug'), ('info', 'Info'), ('warning', 'Warning'), ('error', 'Error'), ('critical', 'Critical')], max_length=20)),
+                ('category', models.CharField(choices=[('exception', 'Exception/Error'), ('performance', 'Performance Issue'), ('security', 'Security Event'), ('data_quality', 'Data Quality Issue'), ('integration', 'External Integration'), ('resource', 'Resource Issue'), ('configuration', 'Configuration Issue'), ('test_failure', 'Test Failure'), ('user_feedback', 'User Feedback')], max_length=50)),
+                ('event_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Event Rollup',
+                'verbose_name_plural': 'Event Rollups',
+                'ordering': ['-hour'],
+                'constraints': [models.UniqueConstraint(fields=('hour', 'source', 'level', 'category'), name='unique_event_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_viewer', '0004_eventrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('inode', models.CharField(blank=True, help_text='File identity, to detect rotation', max_length=40)),
+                ('offset', models.BigIntegerField(default=0, help_text='Bytes already ingested')),
+                ('line_number', models.IntegerField(default=0, help_text='Lines already ingested')),
+                ('head_hash', models.CharField(blank=True, help_text='Hash of the ingested start of the file, to detect replacement', max_length=40)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Log Checkpoint',
+                'verbose_name_plural': 'Log Checkpoints',
+            },
+        ),
+    ]
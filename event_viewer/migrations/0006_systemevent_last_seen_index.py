@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('event_viewer', '0005_logcheckpoint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='systemevent',
+            index=models.Index(fields=['last_seen'], name='event_viewe_last_se_2c2b8c_idx'),
+        ),
+    ]
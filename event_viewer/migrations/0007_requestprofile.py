@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event_viewer', '0006_systemevent_last_seen_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(help_text='Start of the UTC hour')),
+                ('route', models.CharField(help_text='URL pattern the request resolved to', max_length=255)),
+                ('method', models.CharField(max_length=10)),
+                ('request_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0, help_text='Responses with a 5xx status')),
+                ('total_duration_ms', models.BigIntegerField(default=0)),
+                ('cache_hits', models.IntegerField(default=0)),
+                ('cache_misses', models.IntegerField(default=0)),
+                ('duration_ms', models.JSONField(default=dict)),
+                ('query_count', models.JSONField(default=dict)),
+                ('query_ms', models.JSONField(default=dict)),
+                ('response_bytes', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name': 'Request Profile',
+                'verbose_name_plural': 'Request Profiles',
+                'ordering': ['-hour'],
+                'constraints': [models.UniqueConstraint(fields=('hour', 'route', 'method'), name='unique_request_profile')],
+            },
+        ),
+    ]
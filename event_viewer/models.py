@@ -11,15 +11,44 @@ This does NOT replace ActivityLog - it extends the monitoring capabilities.
 """
 
 from django.db import models
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
-from datetime import timedelta
+from collections import Counter
+from datetime import timedelta, timezone as dt_timezone
+import hashlib
 import json
+import re
 
 User = get_user_model()
 
+# Variable parts of titles and paths, replaced so repeats of the same event
+# share a fingerprint
+TEMPLATE_PATTERNS = [
+    (re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE), '<uuid>'),
+    (re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+'), '<email>'),
+    (re.compile(r'"[^"]*"|(?<!\w)\'[^\']*\''), '<str>'),
+    (re.compile(r'\b(?:0x[0-9a-f]+|(?=[0-9a-f]*\d)[0-9a-f]{8,})\b', re.IGNORECASE), '<hex>'),
+    (re.compile(r'[£$€]?\d+(?:[.,]\d+)*%?'), '<n>'),
+]
+
+
+def normalise_template(text):
+    """Reduce an event title or path to its template (numbers, ids, quoted values removed)."""
+    text = text or ''
+    for pattern, placeholder in TEMPLATE_PATTERNS:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+class SystemEventQuerySet(models.QuerySet):
+    def occurrences(self):
+        """Number of events, counting every repeat folded into a deduplicated row."""
+        return self.aggregate(total=Coalesce(Sum('occurrence_count'), 0))['total']
+
 
 class SystemEvent(models.Model):
     """
@@ -152,6 +181,13 @@ class SystemEvent(models.Model):
     occurrence_count = models.IntegerField(default=1)
     first_seen = models.DateTimeField(auto_now_add=True)
     last_seen = models.DateTimeField(auto_now=True)
+    samples = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Most recent raw payloads of deduplicated occurrences"
+    )
+    
+    objects = SystemEventQuerySet.as_manager()
     
     class Meta:
         ordering = ['-timestamp']
@@ -161,6 +197,7 @@ class SystemEvent(models.Model):
             models.Index(fields=['resolved', 'level', 'timestamp']),
             models.Index(fields=['exception_type', 'timestamp']),
             models.Index(fields=['fingerprint', 'timestamp']),
+            models.Index(fields=['last_seen']),
         ]
         verbose_name = "System Event"
         verbose_name_plural = "System Events"
@@ -169,8 +206,20 @@ class SystemEvent(models.Model):
         return f"[{self.get_level_display()}] {self.title} ({self.timestamp.strftime('%Y-%m-%d %H:%M')})"
     
     def save(self, *args, **kwargs):
-        # Auto-generate fingerprint for grouping similar events
-        if not self.fingerprint and self.exception_type:
+        adding = self._state.adding
+        self.assign_fingerprint()
+        super().save(*args, **kwargs)
+        if adding:
+            EventRollup.objects.record([self])
+    
+    def assign_fingerprint(self, normalised=False):
+        """
+        Auto-generate fingerprint for grouping similar events. With
+        ``normalised`` every event gets one, from ``normalised_fingerprint``.
+        """
+        if not self.fingerprint and normalised:
+            self.fingerprint = self.normalised_fingerprint()
+        elif not self.fingerprint and self.exception_type:
             # Simple fingerprint based on exception type and key details
             fingerprint_parts = [
                 self.exception_type,
@@ -178,8 +227,17 @@ class SystemEvent(models.Model):
                 self.request_path or 'no-path',
             ]
             self.fingerprint = '-'.join(fingerprint_parts)
-        
-        super().save(*args, **kwargs)
+    
+    def normalised_fingerprint(self):
+        """Hash of source, category, title template, exception type and path template."""
+        parts = [
+            self.source,
+            self.category,
+            normalise_template(self.title),
+            self.exception_type or '',
+            normalise_template(self.request_path),
+        ]
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
     
     @classmethod
     def create_from_exception(cls, exception, request=None, source='django_error', extra_context=None):
@@ -277,6 +335,128 @@ class SystemEvent(models.Model):
         }.get(self.level, 'govuk-tag--grey')
 
 
+def rollup_hour(timestamp):
+    """Start of the UTC hour containing ``timestamp``."""
+    return timestamp.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+class EventRollupQuerySet(models.QuerySet):
+    def record(self, events):
+        """
+        Add one occurrence per event to its (hour, source, level, category)
+        bucket. Missing buckets are inserted first and every bucket is then
+        incremented in the database, so concurrent writers add up.
+        """
+        counts = Counter(
+            (rollup_hour(event.timestamp), event.source, event.level, event.category)
+            for event in events
+        )
+        if not counts:
+            return
+        self.bulk_create(
+            [EventRollup(hour=hour, source=source, level=level, category=category)
+             for hour, source, level, category in counts],
+            ignore_conflicts=True,
+        )
+        rows = []
+        for row in self.filter(hour__in={key[0] for key in counts}).only('hour', 'source', 'level', 'category'):
+            key = (row.hour, row.source, row.level, row.category)
+            if key in counts:
+                row.event_count = models.F('event_count') + counts[key]
+                rows.append(row)
+        self.bulk_update(rows, ['event_count'])
+
+    def total(self):
+        return self.aggregate(total=Coalesce(Sum('event_count'), 0))['total']
+
+
+class EventRollup(models.Model):
+    """
+    Hourly event counts by source, level and category, maintained as events
+    are written so analytics and alerting never scan raw events. Counts
+    include repeats folded into deduplicated events and outlive the events
+    themselves.
+    """
+
+    hour = models.DateTimeField(help_text="Start of the UTC hour")
+    source = models.CharField(max_length=50, choices=SystemEvent.EVENT_SOURCES)
+    level = models.CharField(max_length=20, choices=SystemEvent.EVENT_LEVELS)
+    category = models.CharField(max_length=50, choices=SystemEvent.EVENT_CATEGORIES)
+    event_count = models.IntegerField(default=0)
+
+    objects = EventRollupQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'source', 'level', 'category'], name='unique_event_rollup'),
+        ]
+        verbose_name = "Event Rollup"
+        verbose_name_plural = "Event Rollups"
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.source}/{self.level}/{self.category}: {self.event_count}"
+
+
+class RequestProfile(models.Model):
+    """
+    Request metrics for one route and method over one UTC hour, written by
+    the request profiler. Durations, query counts and times and response
+    sizes are kept as log-linear histograms ({bucket: count}; see
+    ``services.request_profiler.Histogram``) so percentiles can be read
+    back and hours merged.
+    """
+
+    hour = models.DateTimeField(help_text="Start of the UTC hour")
+    route = models.CharField(max_length=255, help_text="URL pattern the request resolved to")
+    method = models.CharField(max_length=10)
+    request_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0, help_text="Responses with a 5xx status")
+    total_duration_ms = models.BigIntegerField(default=0)
+    cache_hits = models.IntegerField(default=0)
+    cache_misses = models.IntegerField(default=0)
+    duration_ms = models.JSONField(default=dict)
+    query_count = models.JSONField(default=dict)
+    query_ms = models.JSONField(default=dict)
+    response_bytes = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'route', 'method'], name='unique_request_profile'),
+        ]
+        verbose_name = "Request Profile"
+        verbose_name_plural = "Request Profiles"
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.method} {self.route}: {self.request_count}"
+
+
+class LogCheckpoint(models.Model):
+    """
+    How far a log file has been ingested, so each run of the log parsers
+    only reads what was appended since the last one.
+    """
+
+    path = models.CharField(max_length=500, unique=True)
+    inode = models.CharField(max_length=40, blank=True, help_text="File identity, to detect rotation")
+    offset = models.BigIntegerField(default=0, help_text="Bytes already ingested")
+    line_number = models.IntegerField(default=0, help_text="Lines already ingested")
+    head_hash = models.CharField(
+        max_length=40,
+        blank=True,
+        help_text="Hash of the ingested start of the file, to detect replacement"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Log Checkpoint"
+        verbose_name_plural = "Log Checkpoints"
+
+    def __str__(self):
+        return f"{self.path} @ {self.offset}"
+
+
 class EventSummary(models.Model):
     """
     Daily summary of events for analytics and trending.
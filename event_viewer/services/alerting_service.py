@@ -16,6 +16,7 @@ from django.db.models import Count, Q
 from ..models import SystemEvent, EventSummary
 from ..settings import event_viewer_config
 from .correlation_engine import correlation_engine
+from .rollup_service import rollup_service
 
 logger = logging.getLogger(__name__)
 
@@ -64,10 +65,10 @@ class AlertingService:
         # Critical errors threshold
         critical_threshold = self.config.get_alert_threshold('critical_errors_per_hour')
         if critical_threshold > 0:
-            critical_count = SystemEvent.objects.filter(
-                timestamp__gte=one_hour_ago,
+            critical_count = rollup_service.count(
+                one_hour_ago,
                 level='critical'
-            ).count()
+            )
             
             if critical_count >= critical_threshold:
                 alert_sent = self._send_threshold_alert(
@@ -85,10 +86,10 @@ class AlertingService:
         # Total errors threshold
         total_threshold = self.config.get_alert_threshold('total_errors_per_hour')
         if total_threshold > 0:
-            total_count = SystemEvent.objects.filter(
-                timestamp__gte=one_hour_ago,
+            total_count = rollup_service.count(
+                one_hour_ago,
                 level__in=['error', 'critical']
-            ).count()
+            )
             
             if total_count >= total_threshold:
                 alert_sent = self._send_threshold_alert(
@@ -106,11 +107,11 @@ class AlertingService:
         # API errors threshold
         api_threshold = self.config.get_alert_threshold('api_errors_per_hour')
         if api_threshold > 0:
-            api_count = SystemEvent.objects.filter(
-                timestamp__gte=one_hour_ago,
+            api_count = rollup_service.count(
+                one_hour_ago,
                 source='api',
                 level__in=['error', 'critical']
-            ).count()
+            )
             
             if api_count >= api_threshold:
                 alert_sent = self._send_threshold_alert(
@@ -128,10 +129,10 @@ class AlertingService:
         # Security events threshold
         security_threshold = self.config.get_alert_threshold('security_events_per_hour')
         if security_threshold > 0:
-            security_count = SystemEvent.objects.filter(
-                timestamp__gte=one_hour_ago,
+            security_count = rollup_service.count(
+                one_hour_ago,
                 category='security'
-            ).count()
+            )
             
             if security_count >= security_threshold:
                 alert_sent = self._send_threshold_alert(
@@ -156,10 +157,10 @@ class AlertingService:
         # Test failures threshold
         test_threshold = self.config.get_alert_threshold('test_failures_per_day')
         if test_threshold > 0:
-            test_count = SystemEvent.objects.filter(
-                timestamp__gte=one_day_ago,
+            test_count = rollup_service.count(
+                one_day_ago,
                 category='test_failure'
-            ).count()
+            )
             
             if test_count >= test_threshold:
                 alert_sent = self._send_threshold_alert(
@@ -199,24 +200,19 @@ class AlertingService:
         current_hour = timezone.now().replace(minute=0, second=0, microsecond=0)
         last_hour = current_hour - timedelta(hours=1)
         
-        # Get error count for the last hour
-        current_errors = SystemEvent.objects.filter(
-            timestamp__gte=last_hour,
-            timestamp__lt=current_hour,
+        # Error counts per hour over the past week, in one query
+        hourly_errors = rollup_service.hourly(
+            last_hour - timedelta(days=7),
+            current_hour,
             level__in=['error', 'critical']
-        ).count()
+        )
+        current_errors = hourly_errors.get(last_hour, 0)
         
         # Get baseline (average of same hour over past week)
-        baseline_hours = []
-        for i in range(1, 8):  # Past 7 days
-            baseline_start = current_hour - timedelta(days=i)
-            baseline_end = baseline_start + timedelta(hours=1)
-            baseline_count = SystemEvent.objects.filter(
-                timestamp__gte=baseline_start,
-                timestamp__lt=baseline_end,
-                level__in=['error', 'critical']
-            ).count()
-            baseline_hours.append(baseline_count)
+        baseline_hours = [
+            hourly_errors.get(last_hour - timedelta(days=i), 0)
+            for i in range(1, 8)  # Past 7 days
+        ]
         
         if baseline_hours:
             baseline_average = sum(baseline_hours) / len(baseline_hours)
@@ -9,10 +9,12 @@ import logging
 from datetime import timedelta, date, datetime
 from statistics import mean, stdev
 from django.utils import timezone
-from django.db.models import Count, Q, Avg, Max, Min
+from django.db.models import Count, Q, Avg, Max, Min, Sum
+from django.db.models.functions import Coalesce, TruncDate
 from django.core.cache import cache
 from ..models import SystemEvent, EventSummary
 from ..settings import event_viewer_config
+from .rollup_service import rollup_service
 
 logger = logging.getLogger(__name__)
 
@@ -50,12 +52,12 @@ class AnalyticsService:
         
         scores = {}
         
+        # Counts come from the hourly rollups, not raw events
+        level_counts = rollup_service.counts(cutoff_date, by='level')
+        
         # 1. Error Rate Score (0-100, lower error rate = higher score)
-        total_events = SystemEvent.objects.filter(timestamp__gte=cutoff_date).count()
-        error_events = SystemEvent.objects.filter(
-            timestamp__gte=cutoff_date,
-            level__in=['error', 'critical']
-        ).count()
+        total_events = sum(level_counts.values())
+        error_events = level_counts['error'] + level_counts['critical']
         
         if total_events > 0:
             error_rate = error_events / total_events
@@ -65,21 +67,18 @@ class AnalyticsService:
             scores['error_rate'] = 100  # No events = perfect score
         
         # 2. Critical Events Score (fewer critical events = higher score)
-        critical_events = SystemEvent.objects.filter(
-            timestamp__gte=cutoff_date,
-            level='critical'
-        ).count()
+        critical_events = level_counts['critical']
         
         # Score based on critical events per day
         critical_per_day = critical_events / days_back
         scores['critical_events'] = max(0, min(100, 100 - (critical_per_day * 10)))
         
         # 3. Security Incidents Score (fewer security incidents = higher score)
-        security_events = SystemEvent.objects.filter(
-            timestamp__gte=cutoff_date,
+        security_events = rollup_service.count(
+            cutoff_date,
             category='security',
             level__in=['warning', 'error', 'critical']
-        ).count()
+        )
         
         security_per_day = security_events / days_back
         scores['security_incidents'] = max(0, min(100, 100 - (security_per_day * 15)))
@@ -87,15 +86,10 @@ class AnalyticsService:
         # 4. System Availability Score (based on uptime indicators)
         # For now, we'll use a simple heuristic based on error patterns
         # In a full implementation, this would integrate with actual uptime monitoring
-        daily_error_counts = []
-        for i in range(days_back):
-            day_start = cutoff_date + timedelta(days=i)
-            day_end = day_start + timedelta(days=1)
-            daily_errors = SystemEvent.objects.filter(
-                timestamp__range=(day_start, day_end),
-                level__in=['error', 'critical']
-            ).count()
-            daily_error_counts.append(daily_errors)
+        daily_error_counts = [
+            day['error'] + day['critical']
+            for day in rollup_service.series(cutoff_date, days_back, level__in=['error', 'critical'])
+        ]
         
         if daily_error_counts:
             # Days with very high error counts indicate potential downtime/issues
@@ -132,33 +126,31 @@ class AnalyticsService:
         if cached_trends is not None:
             return cached_trends
         
-        cutoff_date = timezone.now() - timedelta(days=days_back)
+        # Whole days, ending with today so far
+        today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        cutoff_date = today - timedelta(days=days_back - 1)
+        
+        # Daily event counts from the hourly rollups
+        daily_levels = rollup_service.series(cutoff_date, days_back)
+        daily_users = dict(
+            SystemEvent.objects.filter(
+                timestamp__gte=cutoff_date,
+                user__isnull=False
+            ).annotate(
+                day=TruncDate('timestamp')
+            ).values_list('day').annotate(users=Count('user', distinct=True))
+        )
         
-        # Daily event counts
         daily_stats = []
-        for i in range(days_back):
-            day_start = cutoff_date + timedelta(days=i)
-            day_end = day_start + timedelta(days=1)
-            
-            day_stats = {
-                'date': day_start.date(),
-                'total_events': SystemEvent.objects.filter(
-                    timestamp__range=(day_start, day_end)
-                ).count(),
-                'error_events': SystemEvent.objects.filter(
-                    timestamp__range=(day_start, day_end),
-                    level__in=['error', 'critical']
-                ).count(),
-                'critical_events': SystemEvent.objects.filter(
-                    timestamp__range=(day_start, day_end),
-                    level='critical'
-                ).count(),
-                'unique_users': SystemEvent.objects.filter(
-                    timestamp__range=(day_start, day_end),
-                    user__isnull=False
-                ).values('user').distinct().count()
-            }
-            daily_stats.append(day_stats)
+        for i, levels in enumerate(daily_levels):
+            day = (cutoff_date + timedelta(days=i)).date()
+            daily_stats.append({
+                'date': day,
+                'total_events': sum(levels.values()),
+                'error_events': levels['error'] + levels['critical'],
+                'critical_events': levels['critical'],
+                'unique_users': daily_users.get(day, 0),
+            })
         
         # Calculate trends
         error_counts = [day['error_events'] for day in daily_stats]
@@ -216,16 +208,23 @@ class AnalyticsService:
         """Analyze events by source to identify problematic systems."""
         cutoff_date = timezone.now() - timedelta(days=days_back)
         
-        source_stats = SystemEvent.objects.filter(
-            timestamp__gte=cutoff_date
-        ).values(
-            'source'
-        ).annotate(
-            total_events=Count('id'),
-            error_events=Count('id', filter=Q(level__in=['error', 'critical'])),
-            critical_events=Count('id', filter=Q(level='critical')),
-            unique_users=Count('user', distinct=True, filter=Q(user__isnull=False))
-        ).order_by('-error_events')
+        source_users = dict(
+            SystemEvent.objects.filter(
+                timestamp__gte=cutoff_date,
+                user__isnull=False
+            ).values_list('source').annotate(users=Count('user', distinct=True))
+        )
+        
+        source_stats = []
+        for source, levels in rollup_service.totals(cutoff_date, 'source').items():
+            source_stats.append({
+                'source': source,
+                'total_events': sum(levels.values()),
+                'error_events': levels['error'] + levels['critical'],
+                'critical_events': levels['critical'],
+                'unique_users': source_users.get(source, 0),
+            })
+        source_stats.sort(key=lambda stat: stat['error_events'], reverse=True)
         
         # Calculate error rates and risk scores
         for stat in source_stats:
@@ -237,7 +236,7 @@ class AnalyticsService:
                 stat['error_rate'] = 0
                 stat['risk_score'] = 0
         
-        return list(source_stats)
+        return source_stats
     
     def get_user_activity_analysis(self, days_back=7):
         """Analyze user-related events to identify problematic patterns."""
@@ -276,12 +275,20 @@ class AnalyticsService:
         events = SystemEvent.objects.filter(timestamp__range=(day_start, day_end))
         
         # Update summary fields
-        summary.total_events = events.count()
-        summary.critical_events = events.filter(level='critical').count()
-        summary.error_events = events.filter(level='error').count()
-        summary.warning_events = events.filter(level='warning').count()
-        summary.info_events = events.filter(level='info').count()
-        summary.debug_events = events.filter(level='debug').count()
+        # One aggregate, counting the repeats folded into deduplicated rows
+        level_totals = events.aggregate(
+            total=Coalesce(Sum('occurrence_count'), 0),
+            **{
+                level: Coalesce(Sum('occurrence_count', filter=Q(level=level)), 0)
+                for level in ('critical', 'error', 'warning', 'info', 'debug')
+            }
+        )
+        summary.total_events = level_totals['total']
+        summary.critical_events = level_totals['critical']
+        summary.error_events = level_totals['error']
+        summary.warning_events = level_totals['warning']
+        summary.info_events = level_totals['info']
+        summary.debug_events = level_totals['debug']
         
         summary.unique_users = events.filter(user__isnull=False).values('user').distinct().count()
         summary.unique_sources = events.values('source').distinct().count()
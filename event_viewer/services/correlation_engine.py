@@ -3,16 +3,32 @@ Event Correlation Engine
 
 Identifies relationships between events to provide better context for debugging
 and to detect patterns that might indicate larger system issues.
+
+Lookups within the window of the in-memory correlation index are worked
+out from the index, then the events found are loaded in one query; older
+events fall back to querying the database directly.
 """
 
+from collections import defaultdict
 from datetime import timedelta
 from django.utils import timezone
 from django.db.models import Q, Count, F
 from django.contrib.auth import get_user_model
 from ..models import SystemEvent
+from .correlation_index import correlation_index
 
 User = get_user_model()
 
+ERROR_LEVELS = ('error', 'critical')
+
+
+def _newest_first(events):
+    return sorted(events, key=lambda e: e.timestamp, reverse=True)
+
+
+def _oldest_first(events):
+    return sorted(events, key=lambda e: e.timestamp)
+
 
 class EventCorrelationEngine:
     """
@@ -20,9 +36,10 @@ class EventCorrelationEngine:
     better context for system monitoring and debugging.
     """
     
-    def __init__(self):
+    def __init__(self, index=None):
         self.correlation_window_minutes = 15  # Time window for correlating events
         self.max_related_events = 20  # Maximum number of related events to return
+        self.index = index if index is not None else correlation_index
     
     def find_related_events(self, event):
         """
@@ -30,17 +47,92 @@ class EventCorrelationEngine:
         
         Returns a dictionary with different types of related events.
         """
-        related = {
-            'temporal': self._find_temporal_correlations(event),
-            'user_related': self._find_user_correlations(event),
-            'similar_errors': self._find_similar_errors(event),
-            'cascading': self._find_cascading_events(event),
-            'source_related': self._find_source_correlations(event),
-        }
+        self.index.ensure_fresh()
+        if self.index.covers(event.timestamp - timedelta(hours=1)):
+            related = self._hydrate(self._find_indexed_correlations(event))
+        else:
+            related = {
+                'temporal': self._find_temporal_correlations(event),
+                'user_related': self._find_user_correlations(event),
+                'similar_errors': self._find_similar_errors(event),
+                'cascading': self._find_cascading_events(event),
+                'source_related': self._find_source_correlations(event),
+                'path_related': self._find_path_correlations(event),
+            }
         
         # Remove empty categories and limit results
         return {k: v[:self.max_related_events] for k, v in related.items() if v}
     
+    def _find_indexed_correlations(self, event):
+        """The correlations of ``find_related_events``, from the index. Titles only are keyword matched."""
+        index = self.index
+        timestamp = event.timestamp
+        others = lambda events: [e for e in events if e.id != event.id]
+        
+        window = timedelta(minutes=self.correlation_window_minutes)
+        temporal = _oldest_first(others(index.between(timestamp - window, timestamp + window)))[:10]
+        
+        user_related = []
+        if event.user_id:
+            user_related = _newest_first(
+                e for e in others(index.for_user(event.user_id)) if e.timestamp >= timestamp - timedelta(hours=1)
+            )[:10]
+        
+        similar = []
+        if event.fingerprint:
+            similar.extend(_newest_first(others(index.for_fingerprint(event.fingerprint)))[:5])
+        title_words = (event.title or '').lower().split()
+        key_words = [word for word in title_words if len(word) > 3][:3] if len(title_words) >= 2 else []
+        if key_words:
+            seen = {e.id for e in similar}
+            similar.extend(_newest_first(
+                e for e in others(index.since(index.window_start))
+                if e.id not in seen and e.level == event.level and e.category == event.category
+                and any(word in e.title.lower() for word in key_words)
+            )[:5])
+        
+        cascading = []
+        if event.level in ERROR_LEVELS:
+            cascading.extend(_oldest_first(
+                e for e in others(index.between(timestamp, timestamp + timedelta(minutes=5)))
+                if e.level in ('error', 'warning')
+            )[:5])
+        seen = {e.id for e in cascading}
+        cascading.extend(_newest_first(
+            e for e in others(index.between(timestamp - timedelta(minutes=5), timestamp))
+            if e.level in ERROR_LEVELS and e.id not in seen
+        )[:5])
+        
+        source_related = _newest_first(
+            e for e in others(index.for_source(event.source))
+            if abs(e.timestamp - timestamp) <= timedelta(hours=1)
+        )[:8]
+        
+        path_related = []
+        if event.request_path:
+            path_related = _newest_first(
+                e for e in others(index.for_path(event.request_path))
+                if abs(e.timestamp - timestamp) <= timedelta(hours=1)
+            )[:8]
+        
+        return {
+            'temporal': temporal,
+            'user_related': user_related,
+            'similar_errors': similar[:10],
+            'cascading': cascading,
+            'source_related': source_related,
+            'path_related': path_related,
+        }
+    
+    def _hydrate(self, groups):
+        """Replace the indexed events in ``groups`` with their ``SystemEvent`` rows, in one query."""
+        ids = {e.id for events in groups.values() for e in events}
+        instances = SystemEvent.objects.select_related('user').in_bulk(ids)
+        return {
+            key: [instances[e.id] for e in events if e.id in instances]
+            for key, events in groups.items()
+        }
+    
     def _find_temporal_correlations(self, event):
         """Find events that occurred around the same time."""
         window_start = event.timestamp - timedelta(minutes=self.correlation_window_minutes)
@@ -143,6 +235,18 @@ class EventCorrelationEngine:
             id=event.id
         ).order_by('-timestamp')[:8])
     
+    def _find_path_correlations(self, event):
+        """Find events on the same request path around the same time."""
+        if not event.request_path:
+            return []
+        
+        return list(SystemEvent.objects.filter(
+            request_path=event.request_path,
+            timestamp__range=(event.timestamp - timedelta(hours=1), event.timestamp + timedelta(hours=1))
+        ).exclude(
+            id=event.id
+        ).order_by('-timestamp')[:8])
+    
     def detect_error_patterns(self, hours_back=24):
         """
         Detect patterns in errors that might indicate systemic issues.
@@ -151,6 +255,10 @@ class EventCorrelationEngine:
         """
         cutoff_time = timezone.now() - timedelta(hours=hours_back)
         
+        self.index.ensure_fresh()
+        if self.index.covers(cutoff_time):
+            return self._detect_indexed_patterns(cutoff_time, hours_back)
+        
         patterns = []
         
         # Pattern 1: High frequency of similar errors
@@ -167,6 +275,116 @@ class EventCorrelationEngine:
         
         return patterns
     
+    def _detect_indexed_patterns(self, cutoff_time, hours_back):
+        """
+        The patterns of ``detect_error_patterns``, from the index. Error
+        counts include repeats folded into deduplicated events.
+        """
+        recent = self.index.since(cutoff_time)
+        errors = [e for e in recent if e.level in ERROR_LEVELS]
+        patterns = []
+        
+        # Pattern 1: High frequency of similar errors
+        by_fingerprint = defaultdict(list)
+        for e in errors:
+            by_fingerprint[e.fingerprint or e.title].append(e)
+        frequent = []
+        for key, group in by_fingerprint.items():
+            count = sum(e.occurrence_count for e in group)
+            if count >= 5:  # 5 or more similar errors
+                events = group
+                if group[0].fingerprint:
+                    events = [e for e in self.index.for_fingerprint(key) if e.timestamp >= cutoff_time]
+                frequent.append((count, _newest_first(group)[0].title, _newest_first(events)[:10]))
+        for count, title, events in sorted(frequent, key=lambda item: item[0], reverse=True):
+            patterns.append({
+                'type': 'high_frequency_error',
+                'title': f"High frequency error: {title}",
+                'description': f"Error occurred {count} times in the last {hours_back} hours",
+                'severity': 'high' if count >= 10 else 'medium',
+                'events': events,
+                'count': count
+            })
+        
+        # Pattern 2: Cascading failures
+        for critical_event in _newest_first(e for e in recent if e.level == 'critical'):
+            # Errors in the 10 minutes following this critical error
+            following = _oldest_first(
+                e for e in self.index.between(critical_event.timestamp,
+                                              critical_event.timestamp + timedelta(minutes=10))
+                if e.level in ('error', 'warning') and e.id != critical_event.id
+            )
+            if len(following) >= 3:  # 3 or more following errors
+                patterns.append({
+                    'type': 'cascading_failure',
+                    'title': f"Cascading failure from: {critical_event.title}",
+                    'description': f"Critical error led to {len(following)} subsequent errors",
+                    'severity': 'high',
+                    'trigger_event': critical_event,
+                    'following_events': following[:10],
+                    'count': len(following)
+                })
+        
+        # Pattern 3: User-specific error spikes
+        by_user = defaultdict(list)
+        for e in errors:
+            if e.user_id:
+                by_user[e.user_id].append(e)
+        user_spikes = sorted(
+            ((sum(e.occurrence_count for e in group), user_id, _newest_first(group)[:10])
+             for user_id, group in by_user.items()),
+            key=lambda item: item[0], reverse=True
+        )
+        user_spikes = [spike for spike in user_spikes if spike[0] >= 5]  # 5 or more errors for one user
+        usernames = dict(User.objects.filter(id__in=[spike[1] for spike in user_spikes]).values_list('id', 'username'))
+        for count, user_id, events in user_spikes:
+            patterns.append({
+                'type': 'user_error_spike',
+                'title': f"High error rate for user: {usernames.get(user_id)}",
+                'description': f"User experienced {count} errors in the last {hours_back} hours",
+                'severity': 'medium' if count < 10 else 'high',
+                'events': events,
+                'user_id': user_id,
+                'username': usernames.get(user_id),
+                'count': count
+            })
+        
+        # Pattern 4: Source-specific issues
+        by_source = defaultdict(list)
+        for e in errors:
+            by_source[e.source].append(e)
+        for count, source, events in sorted(
+            ((sum(e.occurrence_count for e in group), source, _newest_first(group)[:10])
+             for source, group in by_source.items()),
+            key=lambda item: item[0], reverse=True
+        ):
+            if count >= 5:
+                patterns.append({
+                    'type': 'source_issue',
+                    'title': f"Issues with {source} system",
+                    'description': f"Source generated {count} errors in the last {hours_back} hours",
+                    'severity': 'medium' if count < 15 else 'high',
+                    'events': events,
+                    'source': source,
+                    'count': count
+                })
+        
+        # Swap the indexed events for their rows, loaded together
+        groups = {}
+        for n, pattern in enumerate(patterns):
+            for key in ('events', 'following_events'):
+                if key in pattern:
+                    groups[(n, key)] = pattern[key]
+            if 'trigger_event' in pattern:
+                groups[(n, 'trigger_event')] = [pattern['trigger_event']]
+        for (n, key), events in self._hydrate(groups).items():
+            if key == 'trigger_event':
+                patterns[n][key] = events[0] if events else None
+            else:
+                patterns[n][key] = events
+        
+        return patterns
+    
     def _detect_high_frequency_errors(self, cutoff_time):
         """Detect errors that are occurring at unusually high frequency."""
         patterns = []
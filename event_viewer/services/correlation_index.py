@@ -0,0 +1,233 @@
+"""
+Correlation Index
+
+Keeps the last ``window_hours`` of ``SystemEvent`` rows in memory so the
+correlation engine can find related events and detect error patterns
+without querying. Events are held as lightweight ``IndexedEvent`` records
+in per-minute buckets, with secondary maps from user, fingerprint, source
+and request path to event ids.
+
+The whole window is loaded from the database on first use and every
+``rebuild_minutes``; in between, at most every ``refresh_seconds``, only
+the events added or changed since the last refresh (by ``last_seen``) are
+pulled. Each process keeps its own index, so events written elsewhere
+show up within ``refresh_seconds``.
+
+Configured through ``EVENT_VIEWER_SETTINGS['CORRELATION_INDEX']``.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.utils import timezone
+
+from ..models import SystemEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'window_hours': 24,
+    'refresh_seconds': 30,
+    'rebuild_minutes': 60,
+    'max_events': 200000,
+}
+
+# Re-read rows changed this long before the last refresh, for writes that
+# committed after it
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+@dataclass(slots=True)
+class IndexedEvent:
+    """The fields of a ``SystemEvent`` that correlation needs."""
+
+    id: int
+    timestamp: datetime
+    source: str
+    level: str
+    category: str
+    title: str
+    fingerprint: str
+    user_id: Optional[int]
+    request_path: str
+    occurrence_count: int
+
+
+INDEXED_FIELDS = [field.name for field in fields(IndexedEvent)]
+
+
+def _minute(timestamp):
+    return int(timestamp.timestamp() // 60)
+
+
+class CorrelationIndex:
+    """
+    Sliding window of recent events bucketed by minute. Thread safe; one
+    per process (see ``correlation_index``).
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self._config = dict(DEFAULTS, **config) if config is not None else None
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._refreshed_at = None
+        self._clear()
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            from ..settings import get_setting
+            self._config = dict(DEFAULTS, **(get_setting('CORRELATION_INDEX', {}) or {}))
+        return self._config
+
+    def _clear(self):
+        self._events: Dict[int, IndexedEvent] = {}
+        self._buckets = defaultdict(set)
+        self._by_user = defaultdict(set)
+        self._by_fingerprint = defaultdict(set)
+        self._by_source = defaultdict(set)
+        self._by_path = defaultdict(set)
+        self.window_start = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def ensure_fresh(self) -> None:
+        """Rebuild or refresh the index if it is due."""
+        now = timezone.now()
+        with self._lock:
+            if self._built_at is None or now - self._built_at >= timedelta(minutes=self.config['rebuild_minutes']):
+                self.rebuild(now)
+            elif now - self._refreshed_at >= timedelta(seconds=self.config['refresh_seconds']):
+                self.refresh(now)
+
+    def rebuild(self, now=None) -> None:
+        """Reload the whole window from the database."""
+        now = now or timezone.now()
+        window_start = now - timedelta(hours=self.config['window_hours'])
+        rows = SystemEvent.objects.filter(timestamp__gte=window_start).order_by().values_list(*INDEXED_FIELDS)
+        with self._lock:
+            self._clear()
+            self.window_start = window_start
+            for row in rows.iterator(chunk_size=2000):
+                self._put(IndexedEvent(*row))
+            self._trim()
+            self._built_at = self._refreshed_at = now
+        logger.debug(f"Correlation index rebuilt with {len(self._events)} events")
+
+    def refresh(self, now=None) -> None:
+        """Pull events added or changed since the last refresh and expire old ones."""
+        now = now or timezone.now()
+        window_start = now - timedelta(hours=self.config['window_hours'])
+        with self._lock:
+            rows = SystemEvent.objects.filter(
+                timestamp__gte=window_start,
+                last_seen__gte=self._refreshed_at - REFRESH_OVERLAP
+            ).order_by().values_list(*INDEXED_FIELDS)
+            for row in rows:
+                self._put(IndexedEvent(*row))
+            self._expire(window_start)
+            self._trim()
+            self._refreshed_at = now
+
+    def _put(self, event: IndexedEvent) -> None:
+        if event.id in self._events:
+            self._remove(self._events[event.id])
+        self._events[event.id] = event
+        self._buckets[_minute(event.timestamp)].add(event.id)
+        self._by_fingerprint[event.fingerprint].add(event.id)
+        self._by_source[event.source].add(event.id)
+        self._by_path[event.request_path].add(event.id)
+        if event.user_id:
+            self._by_user[event.user_id].add(event.id)
+
+    def _remove(self, event: IndexedEvent) -> None:
+        del self._events[event.id]
+        for index, key in (
+            (self._buckets, _minute(event.timestamp)),
+            (self._by_fingerprint, event.fingerprint),
+            (self._by_source, event.source),
+            (self._by_path, event.request_path),
+            (self._by_user, event.user_id),
+        ):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(event.id)
+                if not ids:
+                    del index[key]
+
+    def _expire(self, window_start) -> None:
+        first_minute = _minute(window_start)
+        for minute in sorted(self._buckets):
+            if minute >= first_minute:
+                break
+            self._drop_minute(minute)
+        self.window_start = max(self.window_start or window_start, window_start)
+
+    def _trim(self) -> None:
+        # Past the size limit the window starts later
+        while len(self._events) > self.config['max_events'] and self._buckets:
+            minute = min(self._buckets)
+            self._drop_minute(minute)
+            self.window_start = datetime.fromtimestamp((minute + 1) * 60, tz=timezone.get_current_timezone())
+
+    def _drop_minute(self, minute) -> None:
+        for event_id in list(self._buckets.get(minute, ())):
+            self._remove(self._events[event_id])
+
+    # ------------------------------------------------------------------
+    # Lookups (call ensure_fresh first)
+    # ------------------------------------------------------------------
+
+    def covers(self, since) -> bool:
+        """Whether every event from ``since`` on is in the index."""
+        return self.window_start is not None and since >= self.window_start
+
+    def between(self, start, end) -> List[IndexedEvent]:
+        """Events with ``start <= timestamp <= end``."""
+        with self._lock:
+            return [
+                self._events[event_id]
+                for minute in range(_minute(start), _minute(end) + 1)
+                for event_id in self._buckets.get(minute, ())
+                if start <= self._events[event_id].timestamp <= end
+            ]
+
+    def since(self, start) -> List[IndexedEvent]:
+        """Events from ``start`` on."""
+        with self._lock:
+            first_minute = _minute(start)
+            return [
+                self._events[event_id]
+                for minute, ids in self._buckets.items() if minute >= first_minute
+                for event_id in ids
+                if self._events[event_id].timestamp >= start
+            ]
+
+    def for_user(self, user_id) -> List[IndexedEvent]:
+        return self._lookup(self._by_user, user_id)
+
+    def for_fingerprint(self, fingerprint) -> List[IndexedEvent]:
+        return self._lookup(self._by_fingerprint, fingerprint)
+
+    def for_source(self, source) -> List[IndexedEvent]:
+        return self._lookup(self._by_source, source)
+
+    def for_path(self, request_path) -> List[IndexedEvent]:
+        return self._lookup(self._by_path, request_path)
+
+    def _lookup(self, index, key) -> List[IndexedEvent]:
+        with self._lock:
+            return [self._events[event_id] for event_id in index.get(key, ())]
+
+    def __len__(self):
+        return len(self._events)
+
+
+# Global correlation index instance
+correlation_index = CorrelationIndex()
@@ -0,0 +1,275 @@
+"""
+Event Sink
+
+Takes ``SystemEvent`` writes off the request path. The ``log_*_event``
+helpers hand their events to ``record_event``, which appends them to a
+bounded in-process buffer; a background thread writes the buffer with
+``bulk_create`` when it reaches ``flush_size`` events or every
+``flush_interval_seconds``, and once more when the process exits.
+
+Under pressure the buffer sheds the least useful events first: past
+``pressure_ratio`` of its capacity only 1 in ``debug_sample_rate`` debug
+events is kept, and once full new debug and info events are dropped while
+warnings and errors push out the oldest buffered event. Drop counts are
+reported by ``stats()``.
+
+With ``dedup`` on, events are fingerprinted from their source, category,
+title template, exception type and path template
+(``SystemEvent.normalised_fingerprint``). A repeat of an unresolved event
+first seen within ``dedup_window_minutes`` increments that row's
+``occurrence_count`` instead of inserting a row, and its payload is added
+to the row's ``samples`` (the latest ``dedup_max_samples`` are kept).
+Count events with ``SystemEvent.objects.filter(...).occurrences()``.
+
+Every write also adds its events to the hourly ``EventRollup`` counts in
+the same transaction.
+
+Configured through ``EVENT_VIEWER_SETTINGS['EVENT_SINK']``; with
+``buffered`` off every event is written immediately, and with
+``background_flush`` off no flusher thread is started, so buffered events
+are only written by ``flush()`` and ``close()`` on the calling thread (test
+runs turn both off).
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from datetime import timedelta
+from typing import Any, Dict, List
+
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'buffered': True,
+    'background_flush': True,
+    'capacity': 5000,
+    'flush_size': 200,
+    'flush_interval_seconds': 2.0,
+    'pressure_ratio': 0.5,
+    'debug_sample_rate': 10,
+    'dedup': True,
+    'dedup_window_minutes': 15,
+    'dedup_max_samples': 10,
+}
+
+# Shed first when the buffer fills up
+LOW_PRIORITY_LEVELS = ('debug', 'info')
+
+BULK_BATCH_SIZE = 500
+
+# Longest message kept in a deduplicated occurrence sample
+SAMPLE_MESSAGE_LENGTH = 1000
+
+
+def _load_config() -> Dict[str, Any]:
+    config = dict(DEFAULTS)
+    try:
+        from ..settings import get_setting
+        config.update(get_setting('EVENT_SINK', {}) or {})
+    except Exception as e:
+        # Misconfigured alerting must not stop event logging
+        logger.warning(f"Using default event sink settings: {e}")
+    return config
+
+
+class EventSink:
+    """
+    Bounded buffer of unsaved ``SystemEvent`` instances with a background
+    flusher thread. Thread safe; one per process (see ``event_sink``).
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self._config = dict(DEFAULTS, **config) if config is not None else None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._buffer: deque = deque()
+        self._thread = None
+        self._closed = False
+        self._debug_seen = 0
+        self._stats = {'recorded': 0, 'written': 0, 'sampled_out': 0, 'dropped': 0, 'failed': 0}
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            self._config = _load_config()
+        return self._config
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, **fields) -> None:
+        """Queue one event; fields are those of ``SystemEvent``."""
+        from event_viewer.models import SystemEvent
+
+        event = SystemEvent(**fields)
+        # save() is skipped by bulk_create
+        event.assign_fingerprint(normalised=self.config['dedup'])
+
+        if not self.config['buffered'] or self._closed:
+            self._write([event])
+            return
+
+        self._ensure_flusher()
+        capacity = self.config['capacity']
+        with self._lock:
+            size = len(self._buffer)
+            if event.level == 'debug' and size >= capacity * self.config['pressure_ratio']:
+                self._debug_seen += 1
+                if self._debug_seen % self.config['debug_sample_rate']:
+                    self._stats['sampled_out'] += 1
+                    return
+            if size >= capacity:
+                self._stats['dropped'] += 1
+                if event.level in LOW_PRIORITY_LEVELS:
+                    return
+                self._buffer.popleft()
+            self._buffer.append(event)
+            self._stats['recorded'] += 1
+            size += 1
+
+        if size >= self.config['flush_size']:
+            self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """Write every buffered event now. Returns the number written."""
+        written = 0
+        while True:
+            with self._lock:
+                if not self._buffer:
+                    return written
+                events: List = [self._buffer.popleft() for _ in range(min(len(self._buffer), BULK_BATCH_SIZE))]
+            try:
+                self._write(events)
+            except Exception as e:
+                # Dropped rather than retried so a broken table cannot grow the buffer
+                with self._lock:
+                    self._stats['failed'] += len(events)
+                logger.error(f"Failed to write {len(events)} buffered system events: {e}")
+                return written
+            written += len(events)
+            with self._lock:
+                self._stats['written'] += len(events)
+
+    def _write(self, events: List) -> None:
+        from event_viewer.models import EventRollup, SystemEvent
+
+        with transaction.atomic():
+            # Counted per occurrence, before repeats are folded together
+            EventRollup.objects.record(events)
+            if self.config['dedup']:
+                self._write_deduplicated(events)
+            else:
+                SystemEvent.objects.bulk_create(events)
+
+    def _write_deduplicated(self, events: List) -> None:
+        from event_viewer.models import SystemEvent
+
+        groups: Dict[str, List] = {}
+        for event in events:
+            groups.setdefault(event.fingerprint, []).append(event)
+
+        max_samples = self.config['dedup_max_samples']
+        window_start = timezone.now() - timedelta(minutes=self.config['dedup_window_minutes'])
+        # Locked so concurrent flushers add to the counts rather than overwrite them
+        open_rows = {}
+        for row in SystemEvent.objects.select_for_update().filter(
+            fingerprint__in=list(groups), timestamp__gte=window_start, resolved=False
+        ).order_by('fingerprint', '-timestamp'):
+            open_rows.setdefault(row.fingerprint, row)
+
+        to_create = []
+        to_update = []
+        for fingerprint, group in groups.items():
+            samples = [_sample(event) for event in group[-max_samples:]]
+            row = open_rows.get(fingerprint)
+            if row is None:
+                row = group[0]
+                row.occurrence_count = len(group)
+                row.samples = samples
+                to_create.append(row)
+            else:
+                row.occurrence_count = F('occurrence_count') + len(group)
+                row.last_seen = max(event.timestamp for event in group)
+                row.samples = (list(row.samples or []) + samples)[-max_samples:]
+                to_update.append(row)
+
+        SystemEvent.objects.bulk_create(to_create)
+        SystemEvent.objects.bulk_update(to_update, ['occurrence_count', 'last_seen', 'samples'])
+
+    def close(self) -> None:
+        """Stop the flusher and write what is left; later events are written directly."""
+        self._closed = True
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=self.config['flush_interval_seconds'] + 5)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush system events on shutdown: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, buffered=len(self._buffer))
+
+    def _ensure_flusher(self) -> None:
+        if not self.config['background_flush']:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='event-sink-flusher', daemon=True)
+                self._thread.start()
+
+    def _after_fork(self) -> None:
+        # The parent's buffered events, flusher thread and lock are not ours
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._buffer = deque()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.config['flush_interval_seconds'])
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Event sink flush failed: {e}")
+        connections.close_all()
+
+
+def _sample(event) -> Dict[str, Any]:
+    """The per-occurrence payload of an event, as kept in ``samples``."""
+    return {
+        'timestamp': event.timestamp.isoformat(),
+        'title': event.title,
+        'message': (event.message or '')[:SAMPLE_MESSAGE_LENGTH],
+        'level': event.level,
+        'user_id': event.user_id,
+        'request_path': event.request_path,
+        'details': event.details,
+    }
+
+
+event_sink = EventSink()
+atexit.register(event_sink.close)
+os.register_at_fork(after_in_child=event_sink._after_fork)
+
+
+def record_event(**fields) -> None:
+    """Queue a ``SystemEvent`` for writing by the shared sink."""
+    event_sink.record(**fields)
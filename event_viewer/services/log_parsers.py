@@ -3,17 +3,46 @@ Log File Parsers for Event Viewer
 
 Parses existing log files and imports them into SystemEvent model.
 Each parser handles a specific log format and type.
+
+Ingestion is incremental: a ``LogCheckpoint`` per file records the byte
+offset, line number and identity (inode and a hash of its start) of what
+has been ingested, so each run seeks straight to the new lines. A file
+that has been rotated, truncated or replaced is read again from the
+start; after a rotation the rest of the old file (``<name>.1``) is read
+first. Events are written with ``bulk_create`` in batches, each in the
+same transaction as the checkpoint advance, so a failed run never
+imports a line twice.
+
+Files that already have events but no checkpoint were imported by the
+whole-file parser that predates checkpoints; their first checkpoint is
+placed at the current end of the file instead of importing them again.
 """
 
+import hashlib
 import re
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from django.db import connection, transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from ..models import SystemEvent
+from ..models import EventRollup, LogCheckpoint, SystemEvent
+from ..settings import event_viewer_config
 
 User = get_user_model()
 
+# Bytes from the start of a file hashed to recognise it
+HEAD_BYTES = 1024
+
+
+def _file_identity(stat):
+    return f"{stat.st_dev}:{stat.st_ino}"
+
+
+def _head_hash(head, offset):
+    return hashlib.sha1(head[:min(HEAD_BYTES, offset)]).hexdigest()
+
 
 class BaseLogParser:
     """Base class for log parsers."""
@@ -23,9 +52,10 @@ class BaseLogParser:
         self.source = 'log_parser'
         self.parsed_count = 0
         self.error_count = 0
+        self.batch_size = event_viewer_config.get('LOG_PARSING.batch_size', 500)
         
     def parse_file(self, dry_run=False):
-        """Parse the entire log file."""
+        """Parse the lines appended to the log file since the last run."""
         if not os.path.exists(self.log_file_path):
             return {'error': f'Log file not found: {self.log_file_path}'}
         
@@ -34,50 +64,122 @@ class BaseLogParser:
             'parsed': 0,
             'errors': 0,
             'skipped': 0,
-            'dry_run': dry_run
+            'dry_run': dry_run,
+            'restarted': None,
         }
         
         try:
-            with open(self.log_file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                for line_num, line in enumerate(file, 1):
-                    try:
-                        event_data = self.parse_line(line.strip(), line_num)
-                        if event_data:
-                            if not dry_run:
-                                self.create_system_event(event_data)
-                            results['parsed'] += 1
-                        else:
-                            results['skipped'] += 1
-                    except Exception as e:
-                        results['errors'] += 1
-                        if results['errors'] <= 5:  # Only log first 5 errors
-                            print(f"Error parsing line {line_num}: {e}")
+            checkpoint = self.get_checkpoint()
+            if checkpoint.pk is None and self.previously_ingested():
+                self._seed(checkpoint, results, dry_run)
+                return results
+            
+            identity = _file_identity(os.stat(self.log_file_path))
+            
+            if checkpoint.offset and checkpoint.inode != identity:
+                results['restarted'] = 'rotated'
+                rotated_path = f"{self.log_file_path}.1"
+                if os.path.exists(rotated_path) and _file_identity(os.stat(rotated_path)) == checkpoint.inode:
+                    # Lines written before the rotation that we have not read yet
+                    self._ingest(rotated_path, checkpoint, results, dry_run)
+            
+            self._ingest(self.log_file_path, checkpoint, results, dry_run)
                         
         except Exception as e:
             results['error'] = f'Failed to read file: {e}'
         
         return results
     
+    def _ingest(self, path, checkpoint, results, dry_run):
+        """Parse complete lines of ``path`` from the checkpoint on, writing them in batches."""
+        with open(path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            identity = _file_identity(stat)
+            head = file.read(HEAD_BYTES)
+            
+            offset, line_num = checkpoint.offset, checkpoint.line_number
+            if checkpoint.inode != identity:
+                offset, line_num = 0, 0
+            elif stat.st_size < offset:
+                offset, line_num = 0, 0
+                results['restarted'] = 'truncated'
+            elif offset and _head_hash(head, offset) != checkpoint.head_hash:
+                offset, line_num = 0, 0
+                results['restarted'] = 'replaced'
+            
+            file.seek(offset)
+            batch = []
+            start_offset = offset
+            for raw_line in file:
+                if not raw_line.endswith(b'\n'):
+                    break  # Still being written; read on the next run
+                offset += len(raw_line)
+                line_num += 1
+                try:
+                    event_data = self.parse_line(raw_line.decode('utf-8', errors='ignore').strip(), line_num)
+                    if event_data:
+                        batch.append(event_data)
+                        results['parsed'] += 1
+                    else:
+                        results['skipped'] += 1
+                except Exception as e:
+                    results['errors'] += 1
+                    if results['errors'] <= 5:  # Only log first 5 errors
+                        print(f"Error parsing line {line_num}: {e}")
+                
+                if len(batch) >= self.batch_size:
+                    self._commit(batch, checkpoint, identity, offset, line_num, head, dry_run)
+                    batch = []
+            
+            if batch or offset != start_offset or checkpoint.inode != identity:
+                self._commit(batch, checkpoint, identity, offset, line_num, head, dry_run)
+    
+    def _seed(self, checkpoint, results, dry_run):
+        """Place the first checkpoint after the last complete line, importing nothing."""
+        with open(self.log_file_path, 'rb') as file:
+            identity = _file_identity(os.fstat(file.fileno()))
+            content = file.read()
+        offset = content.rfind(b'\n') + 1
+        line_num = content.count(b'\n', 0, offset)
+        results['skipped'] = line_num
+        results['restarted'] = 'seeded'
+        self._commit([], checkpoint, identity, offset, line_num, content, dry_run)
+    
+    def previously_ingested(self):
+        """Whether events from this file were imported before it had a checkpoint."""
+        return SystemEvent.objects.filter(details__log_file=os.path.basename(self.log_file_path)).exists()
+    
+    def _commit(self, events, checkpoint, identity, offset, line_num, head, dry_run):
+        """Write a batch of parsed events and advance the checkpoint past them."""
+        checkpoint.inode = identity
+        checkpoint.offset = offset
+        checkpoint.line_number = line_num
+        checkpoint.head_hash = _head_hash(head, offset)
+        if dry_run:
+            return
+        
+        with transaction.atomic():
+            self.create_system_events(events)
+            checkpoint.save()
+    
+    def get_checkpoint(self):
+        """The stored checkpoint for this file, or an unsaved one at its start."""
+        path = os.path.abspath(self.log_file_path)
+        return LogCheckpoint.objects.filter(path=path).first() or LogCheckpoint(path=path)
+    
     def parse_line(self, line, line_num):
         """Parse a single log line. Override in subclasses."""
         raise NotImplementedError("Subclasses must implement parse_line")
     
-    def create_system_event(self, event_data):
-        """Create a SystemEvent from parsed data."""
-        # Check if event already exists to avoid duplicates
-        existing = SystemEvent.objects.filter(
-            fingerprint=event_data.get('fingerprint', ''),
-            timestamp=event_data['timestamp']
-        ).first()
-        
-        if existing:
-            # Update occurrence count
-            existing.occurrence_count += 1
-            existing.last_seen = timezone.now()
-            existing.save()
-            return existing
-        
-        return SystemEvent.objects.create(**event_data)
+    def create_system_events(self, events_data):
+        """Create SystemEvents from a batch of parsed data in one insert."""
+        events = [SystemEvent(**event_data) for event_data in events_data]
+        for event in events:
+            # save() is skipped by bulk_create
+            event.assign_fingerprint()
+        SystemEvent.objects.bulk_create(events, batch_size=self.batch_size)
+        EventRollup.objects.record(events)
+        return events
 
 
 class GodModeLogParser(BaseLogParser):
@@ -94,6 +196,7 @@ class GodModeLogParser(BaseLogParser):
             r'(?P<username>\w+) '
             r'(?P<message>.*)'
         )
+        self._users = {}
     
     def parse_line(self, line, line_num):
         if not line.strip():
@@ -112,12 +215,11 @@ class GodModeLogParser(BaseLogParser):
         except ValueError:
             return None
         
-        # Get user
-        user = None
-        try:
-            user = User.objects.get(username=data['username'])
-        except User.DoesNotExist:
-            pass
+        # Get user, looked up once per username
+        username = data['username']
+        if username not in self._users:
+            self._users[username] = User.objects.filter(username=username).first()
+        user = self._users[username]
         
         return {
             'source': self.source,
@@ -147,7 +249,7 @@ class SyntaxErrorLogParser(BaseLogParser):
         self.buffer = []
         
     def parse_file(self, dry_run=False):
-        """Override to handle multi-line parsing."""
+        """Override to handle multi-line parsing; the report is re-read only when it changes."""
         if not os.path.exists(self.log_file_path):
             return {'error': f'Log file not found: {self.log_file_path}'}
         
@@ -160,8 +262,24 @@ class SyntaxErrorLogParser(BaseLogParser):
         }
         
         try:
-            with open(self.log_file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                content = file.read()
+            with open(self.log_file_path, 'rb') as file:
+                raw_content = file.read()
+                identity = _file_identity(os.fstat(file.fileno()))
+                
+                checkpoint = self.get_checkpoint()
+                if (checkpoint.inode == identity and checkpoint.offset == len(raw_content)
+                        and checkpoint.head_hash == _head_hash(raw_content, len(raw_content))):
+                    results['skipped'] = 1
+                    return results
+                if checkpoint.pk is None and self.previously_ingested():
+                    # Imported before checkpoints existed; only record where we are
+                    results['skipped'] = 1
+                    self._commit([], checkpoint, identity, len(raw_content), raw_content.count(b'\n'),
+                                 raw_content, dry_run)
+                    return results
+                
+                content = raw_content.decode('utf-8', errors='ignore')
+                events = []
                 
                 # Extract timestamp from header
                 timestamp_match = re.search(r'Generated: (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', content)
@@ -200,12 +318,14 @@ class SyntaxErrorLogParser(BaseLogParser):
                         'fingerprint': f"test_failure-comprehensive-{timestamp.date()}",
                     }
                     
-                    if not dry_run:
-                        self.create_system_event(event_data)
+                    events.append(event_data)
                     results['parsed'] = 1
                 else:
                     results['skipped'] = 1
                 
+                self._commit(events, checkpoint, identity, len(raw_content), content.count('\n'),
+                             raw_content, dry_run)
+                
         except Exception as e:
             results['error'] = f'Failed to read file: {e}'
         
@@ -366,7 +486,7 @@ class LogParsingService:
         }
     
     def parse_all_logs(self, dry_run=False, logs_dir='logs'):
-        """Parse all available log files."""
+        """Parse all available log files, several at a time."""
         import time
         self.stats['start_time'] = time.time()
         
@@ -383,35 +503,66 @@ class LogParsingService:
         }
         
         # Find all log files
+        filenames = []
         if os.path.exists(logs_dir):
-            for filename in os.listdir(logs_dir):
-                if filename.endswith('.log') and filename in self.parsers:
-                    log_path = os.path.join(logs_dir, filename)
-                    parser_class = self.parsers[filename]
-                    parser = parser_class(log_path)
-                    
-                    print(f"Parsing {filename}...")
-                    file_result = parser.parse_file(dry_run=dry_run)
-                    
-                    results['files'][filename] = file_result
-                    results['summary']['total_files'] += 1
-                    
-                    if 'error' in file_result:
-                        results['summary']['failed_files'] += 1
-                    else:
-                        results['summary']['successful_files'] += 1
-                        results['summary']['total_events'] += file_result.get('parsed', 0)
-                        results['summary']['total_errors'] += file_result.get('errors', 0)
-                        results['summary']['total_skipped'] += file_result.get('skipped', 0)
+            filenames = sorted(
+                filename for filename in os.listdir(logs_dir)
+                if filename.endswith('.log') and filename in self.parsers
+            )
+        
+        parse = lambda filename: self._parse_log(os.path.join(logs_dir, filename), dry_run)
+        max_workers = min(len(filenames), event_viewer_config.get('LOG_PARSING.max_workers', 4))
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='log-parser') as executor:
+                file_results = list(executor.map(parse, filenames))
+        else:
+            file_results = [parse(filename) for filename in filenames]
+        
+        for filename, file_result in zip(filenames, file_results):
+            results['files'][filename] = file_result
+            results['summary']['total_files'] += 1
+            
+            if 'error' in file_result:
+                results['summary']['failed_files'] += 1
+            else:
+                results['summary']['successful_files'] += 1
+                results['summary']['total_events'] += file_result.get('parsed', 0)
+                results['summary']['total_errors'] += file_result.get('errors', 0)
+                results['summary']['total_skipped'] += file_result.get('skipped', 0)
         
         # Calculate duration
-        import time
         self.stats['end_time'] = time.time()
         self.stats['duration'] = round(self.stats['end_time'] - self.stats['start_time'], 2)
         results['stats'] = self.stats.copy()
         
         return results
     
+    def _parse_log(self, log_path, dry_run):
+        filename = os.path.basename(log_path)
+        parser = self.parsers[filename](log_path)
+        print(f"Parsing {filename}...")
+        try:
+            return parser.parse_file(dry_run=dry_run)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                # Worker threads each opened their own connection
+                connection.close()
+    
+    def reset_checkpoints(self, logs_dir='logs', source=None):
+        """
+        Rewind log files to their start, so the next run reads them again.
+        The checkpoints are kept, or files with events would be seeded at
+        their end instead (see ``BaseLogParser.previously_ingested``).
+        """
+        paths = [
+            os.path.abspath(os.path.join(logs_dir, filename))
+            for filename, parser_class in self.parsers.items()
+            if source is None or parser_class(filename).source == source
+        ]
+        return LogCheckpoint.objects.filter(path__in=paths).update(
+            inode='', offset=0, line_number=0, head_hash=''
+        )
+    
     def parse_single_log(self, log_file_path, dry_run=False):
         """Parse a single log file."""
         filename = os.path.basename(log_file_path)
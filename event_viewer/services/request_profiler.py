@@ -0,0 +1,484 @@
+"""
+Request Profiler
+
+Measures requests passed to it by ``RequestProfilingMiddleware``: wall
+time, database queries and their time, cache hits and misses, and response
+size. Measurements are aggregated in memory per route, method and UTC hour
+into log-linear histograms (``Histogram``), and a background thread merges
+them into ``RequestProfile`` rows every ``flush_interval_seconds`` and when
+the process exits. ``summarise`` reads p50/p95/p99s back for the event
+viewer.
+
+Requests slower than ``slow_request_ms`` are also logged as performance
+``SystemEvent``s carrying their slowest queries, at most one per route
+every ``slow_sample_interval_seconds``.
+
+Cache lookups are counted by wrapping ``get``/``get_many`` on the cache
+instances a profiled request can reach; the backend classes are untouched.
+
+Configured through ``EVENT_VIEWER_SETTINGS['REQUEST_PROFILING']``; with
+``enabled`` off the middleware is not loaded at all (the default in test
+runs), and with ``background_flush`` off measurements are only written by
+``flush()`` and ``close()``.
+"""
+
+import atexit
+import functools
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from typing import Any, Dict, List
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from ..models import RequestProfile, rollup_hour
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'enabled': True,
+    'background_flush': True,
+    'sample_rate': 1.0,
+    'exclude_paths': [],
+    'flush_interval_seconds': 60,
+    'slow_request_ms': 1000,
+    'slow_sample_interval_seconds': 60,
+    'max_captured_queries': 100,
+}
+
+# Histograms are exact below SUB_BUCKETS and within 1/HALF_BUCKETS (12.5%) above
+SUB_BUCKETS = 16
+HALF_BUCKETS = SUB_BUCKETS // 2
+
+METRICS = ('duration_ms', 'query_count', 'query_ms', 'response_bytes')
+
+UNRESOLVED_ROUTE = '<unresolved>'
+
+# Slowest queries, and characters of each, kept in a slow request sample
+SAMPLE_QUERIES = 20
+SAMPLE_SQL_LENGTH = 500
+
+# The measurement of the request being handled, for the cache counters
+_current = ContextVar('request_profile', default=None)
+
+
+def bucket_index(value) -> int:
+    value = max(0, int(round(value)))
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKETS.bit_length() + 1
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + (value >> shift) - HALF_BUCKETS
+
+
+def bucket_upper_bound(index) -> int:
+    """Largest value counted in bucket ``index``."""
+    if index < SUB_BUCKETS:
+        return index
+    shift, offset = divmod(index - SUB_BUCKETS, HALF_BUCKETS)
+    return ((offset + HALF_BUCKETS + 1) << (shift + 1)) - 1
+
+
+class Histogram:
+    """
+    Counts of non-negative values in log-linear buckets, HDR histogram
+    style: constant relative precision at any magnitude, in a handful of
+    buckets, and mergeable by adding counts.
+    """
+
+    __slots__ = ('counts',)
+
+    def __init__(self, counts=None):
+        self.counts = Counter({int(index): n for index, n in (counts or {}).items()})
+
+    def record(self, value) -> None:
+        self.counts[bucket_index(value)] += 1
+
+    def merge(self, other: 'Histogram') -> 'Histogram':
+        self.counts.update(other.counts)
+        return self
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def percentile(self, percent):
+        """Upper bound of the bucket holding the ``percent``th percentile, or None if empty."""
+        total = self.total
+        if not total:
+            return None
+        rank = max(1, math.ceil(total * percent / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return bucket_upper_bound(index)
+
+    def to_json(self) -> Dict[str, int]:
+        return {str(index): n for index, n in sorted(self.counts.items()) if n}
+
+
+class RouteStats:
+    """Measurements of one route and method in one hour, not yet written."""
+
+    __slots__ = ('request_count', 'error_count', 'total_duration_ms', 'cache_hits', 'cache_misses', 'histograms')
+
+    def __init__(self):
+        self.request_count = 0
+        self.error_count = 0
+        self.total_duration_ms = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.histograms = {metric: Histogram() for metric in METRICS}
+
+    def add(self, measurement, duration_ms, status_code, response_bytes) -> None:
+        self.request_count += 1
+        self.error_count += status_code >= 500
+        self.total_duration_ms += round(duration_ms)
+        self.cache_hits += measurement.cache_hits
+        self.cache_misses += measurement.cache_misses
+        self.histograms['duration_ms'].record(duration_ms)
+        self.histograms['query_count'].record(measurement.query_count)
+        self.histograms['query_ms'].record(measurement.query_ms)
+        if response_bytes is not None:
+            self.histograms['response_bytes'].record(response_bytes)
+
+    def merge_into(self, row: RequestProfile) -> None:
+        for field in ('request_count', 'error_count', 'total_duration_ms', 'cache_hits', 'cache_misses'):
+            setattr(row, field, getattr(row, field) + getattr(self, field))
+        for metric, histogram in self.histograms.items():
+            setattr(row, metric, Histogram(getattr(row, metric)).merge(histogram).to_json())
+
+
+class Measurement:
+    """
+    Counters for one request. Installed as a database execute wrapper, so
+    it times every query the request runs.
+    """
+
+    __slots__ = ('query_count', 'query_ms', 'queries', 'cache_hits', 'cache_misses', 'max_queries')
+
+    def __init__(self, max_queries):
+        self.query_count = 0
+        self.query_ms = 0.0
+        self.queries = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.max_queries = max_queries
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.query_count += 1
+            self.query_ms += elapsed
+            if len(self.queries) < self.max_queries:
+                self.queries.append((sql, elapsed))
+
+
+def _load_config() -> Dict[str, Any]:
+    config = dict(DEFAULTS)
+    try:
+        from ..settings import get_setting
+        config.update(get_setting('REQUEST_PROFILING', {}) or {})
+    except Exception as e:
+        logger.warning(f"Using default request profiling settings: {e}")
+    return config
+
+
+class RequestProfiler:
+    """
+    In-memory per-route request histograms with a background flusher
+    thread. Thread safe; one per process (see ``request_profiler``).
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self._config = dict(DEFAULTS, **config) if config is not None else None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending: Dict[tuple, RouteStats] = {}
+        self._last_slow_sample: Dict[tuple, float] = {}
+        self._thread = None
+        self._closed = False
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            self._config = _load_config()
+        return self._config
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config['enabled'])
+
+    # ------------------------------------------------------------------
+    # Measuring
+    # ------------------------------------------------------------------
+
+    def should_profile(self, request) -> bool:
+        if request.path.startswith(tuple(self.config['exclude_paths'])):
+            return False
+        rate = self.config['sample_rate']
+        return rate >= 1 or random.random() < rate
+
+    def profile(self, request, get_response):
+        """Call ``get_response(request)``, measuring it."""
+        instrument_caches()
+        measurement = Measurement(self.config['max_captured_queries'])
+        token = _current.set(measurement)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(measurement))
+                response = get_response(request)
+        finally:
+            _current.reset(token)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        try:
+            self.record(request, response, measurement, duration_ms)
+        except Exception as e:
+            # Profiling must never break the response
+            logger.error(f"Failed to record request profile: {e}")
+        return response
+
+    def record(self, request, response, measurement: Measurement, duration_ms: float) -> None:
+        match = getattr(request, 'resolver_match', None)
+        route = ('/' + match.route)[:255] if match else UNRESOLVED_ROUTE
+        response_bytes = None if response.streaming else len(response.content)
+        key = (rollup_hour(timezone.now()), route, request.method)
+
+        with self._lock:
+            stats = self._pending.get(key)
+            if stats is None:
+                stats = self._pending[key] = RouteStats()
+            stats.add(measurement, duration_ms, response.status_code, response_bytes)
+        self._ensure_flusher()
+
+        if duration_ms >= self.config['slow_request_ms'] and self._claim_slow_sample(route, request.method):
+            self._log_slow_request(request, response, route, measurement, duration_ms, response_bytes)
+
+    def _claim_slow_sample(self, route, method) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_slow_sample.get((route, method))
+            if last is not None and now - last < self.config['slow_sample_interval_seconds']:
+                return False
+            self._last_slow_sample[(route, method)] = now
+            return True
+
+    def _log_slow_request(self, request, response, route, measurement, duration_ms, response_bytes) -> None:
+        from .event_sink import record_event
+
+        slowest = sorted(measurement.queries, key=lambda query: query[1], reverse=True)[:SAMPLE_QUERIES]
+        user = getattr(request, 'user', None)
+        record_event(
+            source='performance',
+            level='warning',
+            category='performance',
+            title=f'Slow request: {request.method} {route}',
+            message=(f'{request.method} {request.path} took {duration_ms:.0f}ms with '
+                     f'{measurement.query_count} queries ({measurement.query_ms:.0f}ms)'),
+            user=user if user is not None and user.is_authenticated else None,
+            ip_address=request.META.get('REMOTE_ADDR'),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            request_path=request.path,
+            request_method=request.method,
+            details={
+                'route': route,
+                'status_code': response.status_code,
+                'duration_ms': round(duration_ms, 1),
+                'query_count': measurement.query_count,
+                'query_ms': round(measurement.query_ms, 1),
+                'cache_hits': measurement.cache_hits,
+                'cache_misses': measurement.cache_misses,
+                'response_bytes': response_bytes,
+                'queries_captured': len(measurement.queries),
+                'slowest_queries': [
+                    {'sql': sql[:SAMPLE_SQL_LENGTH], 'ms': round(elapsed, 2)} for sql, elapsed in slowest
+                ],
+            },
+        )
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """Merge the pending measurements into ``RequestProfile``. Returns the rows touched."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        try:
+            with transaction.atomic():
+                RequestProfile.objects.bulk_create(
+                    [RequestProfile(hour=hour, route=route, method=method) for hour, route, method in pending],
+                    ignore_conflicts=True,
+                )
+                # Locked so concurrent processes add to the histograms rather than overwrite them
+                rows = [
+                    row for row in RequestProfile.objects.select_for_update().filter(
+                        hour__in={key[0] for key in pending},
+                        route__in={key[1] for key in pending},
+                    )
+                    if (row.hour, row.route, row.method) in pending
+                ]
+                for row in rows:
+                    pending[(row.hour, row.route, row.method)].merge_into(row)
+                RequestProfile.objects.bulk_update(
+                    rows,
+                    ['request_count', 'error_count', 'total_duration_ms', 'cache_hits', 'cache_misses', *METRICS],
+                )
+        except Exception as e:
+            # Dropped rather than retried so a broken table cannot grow memory
+            logger.error(f"Failed to write {len(pending)} request profiles: {e}")
+            return 0
+        return len(rows)
+
+    def close(self) -> None:
+        """Stop the flusher and write what is left."""
+        self._closed = True
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.flush()
+
+    def _ensure_flusher(self) -> None:
+        if not self.config['background_flush']:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if not self._closed and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name='request-profile-flusher', daemon=True)
+                self._thread.start()
+
+    def _after_fork(self) -> None:
+        # The parent's measurements and flusher thread are not ours
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = {}
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.config['flush_interval_seconds'])
+            close_old_connections()
+            self.flush()
+        connections.close_all()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summarise(self, since, until=None) -> List[Dict[str, Any]]:
+        """
+        Per route and method stats for the hours from ``since`` to ``until``,
+        with p50/p95/p99s, busiest (by total time) first.
+        """
+        rows = RequestProfile.objects.filter(hour__gte=rollup_hour(since))
+        if until is not None:
+            rows = rows.filter(hour__lt=until)
+
+        merged: Dict[tuple, RequestProfile] = {}
+        for row in rows.order_by():
+            key = (row.route, row.method)
+            if key not in merged:
+                merged[key] = row
+                continue
+            total = merged[key]
+            for field in ('request_count', 'error_count', 'total_duration_ms', 'cache_hits', 'cache_misses'):
+                setattr(total, field, getattr(total, field) + getattr(row, field))
+            for metric in METRICS:
+                setattr(total, metric, Histogram(getattr(total, metric)).merge(Histogram(getattr(row, metric))).counts)
+
+        summary = []
+        for (route, method), row in merged.items():
+            histograms = {metric: Histogram(getattr(row, metric)) for metric in METRICS}
+            cache_lookups = row.cache_hits + row.cache_misses
+            summary.append({
+                'route': route,
+                'method': method,
+                'requests': row.request_count,
+                'errors': row.error_count,
+                'error_rate': round(100 * row.error_count / row.request_count, 1) if row.request_count else 0,
+                'total_ms': row.total_duration_ms,
+                'mean_ms': round(row.total_duration_ms / row.request_count) if row.request_count else 0,
+                'p50_ms': histograms['duration_ms'].percentile(50),
+                'p95_ms': histograms['duration_ms'].percentile(95),
+                'p99_ms': histograms['duration_ms'].percentile(99),
+                'p95_queries': histograms['query_count'].percentile(95),
+                'p95_query_ms': histograms['query_ms'].percentile(95),
+                'p95_bytes': histograms['response_bytes'].percentile(95),
+                'cache_hit_rate': round(100 * row.cache_hits / cache_lookups, 1) if cache_lookups else None,
+            })
+        summary.sort(key=lambda item: item['total_ms'], reverse=True)
+        return summary
+
+
+def instrument_caches() -> None:
+    """
+    Count cache hits and misses of this thread's cache instances against
+    the request being profiled. Each instance is wrapped once.
+    """
+    for alias in caches:
+        _instrument_cache(caches[alias])
+
+
+def _instrument_cache(cache) -> None:
+    # Instance attributes, so other users of the backend class are unaffected
+    if cache.__dict__.get('_request_profiled'):
+        return
+    missing = object()
+    get = cache.get
+
+    @functools.wraps(get)
+    def profiled_get(key, default=None, version=None):
+        measurement = _current.get()
+        if measurement is None:
+            return get(key, default, version)
+        value = get(key, missing, version)
+        if value is missing:
+            measurement.cache_misses += 1
+            return default
+        measurement.cache_hits += 1
+        return value
+
+    cache.get = profiled_get
+
+    # BaseCache.get_many calls get, which already counts
+    if type(cache).get_many is not BaseCache.get_many:
+        get_many = cache.get_many
+
+        @functools.wraps(get_many)
+        def profiled_get_many(keys, version=None):
+            measurement = _current.get()
+            if measurement is None:
+                return get_many(keys, version=version)
+            keys = list(keys)
+            values = get_many(keys, version=version)
+            measurement.cache_hits += len(values)
+            measurement.cache_misses += len(keys) - len(values)
+            return values
+
+        cache.get_many = profiled_get_many
+    cache._request_profiled = True
+
+
+request_profiler = RequestProfiler()
+atexit.register(request_profiler.close)
+os.register_at_fork(after_in_child=request_profiler._after_fork)
@@ -0,0 +1,351 @@
+"""
+Event Viewer Retention Service
+
+Expires old ``SystemEvent`` and ``ActivityLog`` rows so tables, counts and
+filters stay proportional to the retention period rather than the age of
+the site.
+
+Events are kept for ``RETENTION_POLICIES``'s days for their level (debug,
+critical, or the default), unless ``RETENTION['source_retention_days']``
+sets days for their source. Activity logs are kept for
+``activity_log_retention_days`` unless someone has commented on them, and
+rollups and daily summaries for ``summary_retention_days``.
+
+Expired rows are removed in transactions of ``batch_size`` rows. In each,
+events from hours that have no rollups yet are first compacted into
+``EventRollup`` (so counts survive the raw rows), then the rows are
+appended to gzip-compressed JSON lines files, one per table and month,
+under ``archive_dir``. A batch that fails after archiving is archived
+again by the next run, so archives may hold duplicates but never miss a
+deleted row.
+
+With ``partitioned`` on PostgreSQL, ``SystemEvent`` is range partitioned
+by month (``setup_partitions`` converts the table). Months older than the
+longest retention period are then archived and dropped as whole
+partitions instead of row by row; shorter policies still delete rows.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import EventRollup, EventSummary, SystemEvent, rollup_hour
+from ..settings import event_viewer_config
+from .rollup_service import HOUR, rollup_service
+
+logger = logging.getLogger(__name__)
+
+
+def _month_start(moment):
+    return moment.astimezone(dt_timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+class RetentionService:
+    """Applies the retention policies; see the module docstring."""
+
+    def __init__(self, options=None):
+        self.config = event_viewer_config
+        self._options = options
+        self.partitions = EventPartitions(self)
+
+    @property
+    def options(self):
+        """``EVENT_VIEWER_SETTINGS['RETENTION']``, updated by any ``options`` given."""
+        return dict(self.config.get('RETENTION', {}), **(self._options or {}))
+
+    # ------------------------------------------------------------------
+    # Policies
+    # ------------------------------------------------------------------
+
+    def level_retention_days(self):
+        return {
+            'debug': self.config.get_retention_days('debug_events_retention_days'),
+            'critical': self.config.get_retention_days('critical_events_retention_days'),
+        }
+
+    def expired_events(self, now=None):
+        """Events past their retention period."""
+        now = now or timezone.now()
+        source_days = self.options.get('source_retention_days') or {}
+        level_days = self.level_retention_days()
+        default_days = self.config.get_retention_days('default_retention_days')
+
+        by_level = Q(timestamp__lt=now - timedelta(days=default_days)) & ~Q(level__in=list(level_days))
+        for level, days in level_days.items():
+            by_level |= Q(level=level, timestamp__lt=now - timedelta(days=days))
+
+        expired = by_level
+        if source_days:
+            expired = by_level & ~Q(source__in=list(source_days))
+            for source, days in source_days.items():
+                expired |= Q(source=source, timestamp__lt=now - timedelta(days=days))
+        return SystemEvent.objects.filter(expired)
+
+    def expired_activity_logs(self, now=None):
+        """Activity logs past their retention period that nobody has commented on."""
+        from council_finance.models import ActivityLog
+
+        now = now or timezone.now()
+        days = self.config.get_retention_days('activity_log_retention_days')
+        return ActivityLog.objects.filter(
+            created__lt=now - timedelta(days=days),
+            following_comments__isnull=True,
+        )
+
+    def longest_event_retention_days(self):
+        return max([
+            self.config.get_retention_days('default_retention_days'),
+            *self.level_retention_days().values(),
+            *(self.options.get('source_retention_days') or {}).values(),
+        ])
+
+    # ------------------------------------------------------------------
+    # Expiry
+    # ------------------------------------------------------------------
+
+    def apply(self, now=None, dry_run=False, archive=None):
+        """
+        Expire everything past its retention period. Returns the number of
+        rows removed (or, with ``dry_run``, that would be) per table.
+        """
+        now = now or timezone.now()
+        archive = self.options.get('archive', True) if archive is None else archive
+        summary_cutoff = now - timedelta(days=self.config.get_retention_days('summary_retention_days'))
+        results = {}
+
+        if self.partitions.enabled() and not dry_run:
+            cutoff = now - timedelta(days=self.longest_event_retention_days())
+            results['dropped_partitions'] = self.partitions.drop_before(cutoff, archive=archive)
+
+        results['system_events'] = self._expire(
+            self.expired_events(now), 'system_events', 'timestamp',
+            dry_run=dry_run, archive=archive, compact=self._compact_events
+        )
+        results['activity_logs'] = self._expire(
+            self.expired_activity_logs(now), 'activity_logs', 'created', dry_run=dry_run, archive=archive
+        )
+        results['event_rollups'] = self._expire(
+            EventRollup.objects.filter(hour__lt=summary_cutoff), 'event_rollups', 'hour', dry_run=dry_run
+        )
+        results['event_summaries'] = self._expire(
+            EventSummary.objects.filter(date__lt=summary_cutoff.date()), 'event_summaries', 'date', dry_run=dry_run
+        )
+
+        if not dry_run:
+            logger.info(f"Applied event retention: {results}")
+        return results
+
+    def _expire(self, queryset, name, time_field, dry_run=False, archive=False, compact=None):
+        """Delete ``queryset`` in bounded batches, compacting and archiving each first."""
+        if dry_run:
+            return queryset.count()
+
+        batch_size = self.options.get('batch_size', 1000)
+        pause = self.options.get('batch_pause_seconds', 0)
+        model = queryset.model
+        removed = 0
+        while True:
+            with transaction.atomic():
+                rows = list(queryset.order_by('pk').values()[:batch_size])
+                if not rows:
+                    break
+                if compact:
+                    compact(rows)
+                if archive:
+                    self.archive(name, time_field, rows)
+                model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            removed += len(rows)
+            if len(rows) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        return removed
+
+    def _compact_events(self, rows):
+        """Roll up the hours of ``rows`` that have no rollups, before the rows go."""
+        hours = {rollup_hour(row['timestamp']) for row in rows}
+        rolled_up = set(EventRollup.objects.filter(hour__in=hours).values_list('hour', flat=True).distinct())
+        for hour in sorted(hours - rolled_up):
+            rollup_service.rebuild(hour, hour + HOUR)
+
+    def archive(self, name, time_field, rows):
+        """Append ``rows`` to ``<archive_dir>/<name>/<YYYY-MM>.jsonl.gz``."""
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row[time_field].strftime('%Y-%m'), []).append(row)
+
+        directory = os.path.join(self.options['archive_dir'], name)
+        os.makedirs(directory, exist_ok=True)
+        for month, month_rows in by_month.items():
+            # Each append is a separate gzip member, which gzip readers concatenate
+            with gzip.open(os.path.join(directory, f'{month}.jsonl.gz'), 'at', encoding='utf-8') as archive_file:
+                for row in month_rows:
+                    archive_file.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+
+
+class EventPartitions:
+    """
+    Monthly range partitions of the ``SystemEvent`` table, named
+    ``<table>_pYYYYMM``, plus a default partition for stray timestamps.
+    PostgreSQL only.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.table = SystemEvent._meta.db_table
+
+    def enabled(self):
+        return bool(self.service.options.get('partitioned')) and connection.vendor == 'postgresql'
+
+    def is_partitioned(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = %s",
+                [self.table]
+            )
+            return cursor.fetchone() is not None
+
+    def months(self):
+        """The months that have partitions, oldest first."""
+        prefix = f'{self.table}_p'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "WHERE parent.relname = %s",
+                [self.table]
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        return sorted(
+            datetime.strptime(name[len(prefix):], '%Y%m').replace(tzinfo=dt_timezone.utc)
+            for name in names if name.startswith(prefix) and name[len(prefix):].isdigit()
+        )
+
+    def _name(self, month):
+        return f'{self.table}_p{month:%Y%m}'
+
+    def ensure(self, now=None):
+        """Create the partitions for this month and the next ``partition_months_ahead``."""
+        month = _month_start(now or timezone.now())
+        for _ in range(self.service.options.get('partition_months_ahead', 2) + 1):
+            self._create(month)
+            month = _next_month(month)
+
+    def _create(self, month):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self._name(month)}" PARTITION OF "{self.table}" '
+                f'FOR VALUES FROM (%s) TO (%s)',
+                [month, _next_month(month)]
+            )
+
+    def drop_before(self, cutoff, archive=True):
+        """Archive and drop the partitions wholly before ``cutoff``. Returns their names."""
+        if not self.is_partitioned():
+            return []
+        self.ensure()
+
+        dropped = []
+        for month in self.months():
+            end = _next_month(month)
+            if end > cutoff:
+                break
+            rows = SystemEvent.objects.filter(timestamp__gte=month, timestamp__lt=end).order_by('pk').values()
+            batch = []
+            for row in rows.iterator(chunk_size=2000):
+                batch.append(row)
+                if len(batch) >= 2000:
+                    self._before_drop(batch, archive)
+                    batch = []
+            self._before_drop(batch, archive)
+
+            name = self._name(month)
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"')
+                cursor.execute(f'DROP TABLE "{name}"')
+            dropped.append(name)
+            logger.info(f"Dropped event partition {name}")
+        return dropped
+
+    def _before_drop(self, rows, archive):
+        if rows:
+            self.service._compact_events(rows)
+            if archive:
+                self.service.archive('system_events', 'timestamp', rows)
+
+    def setup(self, now=None):
+        """
+        Convert the ``SystemEvent`` table into a table partitioned by month
+        of ``timestamp``, copying its rows across. Locks the table while it
+        runs; the primary key becomes (id, timestamp).
+        """
+        if connection.vendor != 'postgresql':
+            raise RuntimeError("Event partitioning needs PostgreSQL")
+        if self.is_partitioned():
+            return False
+
+        table, old = self.table, f'{self.table}_unpartitioned'
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE "{table}" IN ACCESS EXCLUSIVE MODE')
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN "
+                "(SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p')",
+                [table, table]
+            )
+            index_definitions = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = %s::regclass AND contype = 'f'",
+                [table]
+            )
+            foreign_keys = cursor.fetchall()
+            cursor.execute(f'SELECT MIN("timestamp") FROM "{table}"')
+            oldest = cursor.fetchone()[0]
+
+            cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+            cursor.execute(
+                f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING IDENTITY '
+                f'INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY RANGE ("timestamp")'
+            )
+            cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY ("id", "timestamp")')
+            cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+            month = _month_start(oldest or now or timezone.now())
+            while month <= _month_start(now or timezone.now()):
+                self._create(month)
+                month = _next_month(month)
+            self.ensure(now)
+
+            cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                f'(SELECT COALESCE(MAX("id"), 0) + 1 FROM "{table}"), false)',
+                [table]
+            )
+            cursor.execute(f'DROP TABLE "{old}"')
+
+            for definition in index_definitions:
+                cursor.execute(definition)
+            for name, definition in foreign_keys:
+                cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+        logger.info(f"Partitioned {table} by month")
+        return True
+
+
+# Global retention service instance
+retention_service = RetentionService()
@@ -0,0 +1,130 @@
+"""
+Event Viewer Rollup Service
+
+Reads event counts from the hourly ``EventRollup`` table instead of raw
+``SystemEvent`` rows, so health scores, trends and alert thresholds cost
+the same however many events are retained. Rollups are maintained as
+events are written; ``rebuild`` recomputes them from raw events for
+backfills and catch-up (``manage.py rollup_events``).
+
+Windows that start or end part way through an hour count that hour in
+proportion to the part of it they cover, as if its events were spread
+evenly across it.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from ..models import EventRollup, SystemEvent, rollup_hour
+
+logger = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+
+
+class RollupService:
+    """Event counts over time windows, read from hourly rollups."""
+
+    def count(self, since, until=None, **filters):
+        """Events between ``since`` and ``until`` (default now) matching ``filters``."""
+        return sum(self.counts(since, until, **filters).values())
+
+    def counts(self, since, until=None, by=None, **filters):
+        """
+        Like ``count`` but broken down by the rollup field ``by`` (source,
+        level or category); returns a Counter keyed by its values.
+        """
+        now = timezone.now()
+        until = min(until or now, now)
+        if until <= since:
+            return Counter()
+
+        fields = ['hour', by] if by else ['hour']
+        rows = EventRollup.objects.filter(
+            hour__gte=rollup_hour(since), hour__lt=until, **filters
+        ).values(*fields).annotate(n=Sum('event_count'))
+
+        totals = Counter()
+        for row in rows:
+            hour = row['hour']
+            elapsed = min(hour + HOUR, now) - hour
+            covered = min(hour + HOUR, until) - max(hour, since)
+            if elapsed > timedelta(0) and covered > timedelta(0):
+                totals[row[by] if by else None] += row['n'] * min(1, covered / elapsed)
+        return Counter({key: round(value) for key, value in totals.items()})
+
+    def hourly(self, start, end, **filters):
+        """Events per whole hour from ``start`` to ``end`` as {hour: count}; missing hours had none."""
+        rows = EventRollup.objects.filter(
+            hour__gte=rollup_hour(start), hour__lt=end, **filters
+        ).values('hour').annotate(n=Sum('event_count'))
+        return {row['hour']: row['n'] for row in rows}
+
+    def series(self, start, buckets, bucket=timedelta(days=1), by='level', **filters):
+        """
+        Counts for ``buckets`` consecutive periods of length ``bucket`` from
+        ``start``, one Counter keyed by ``by`` per period. Each hour is
+        counted in the period its start falls in.
+        """
+        rows = EventRollup.objects.filter(
+            hour__gte=rollup_hour(start), hour__lt=start + bucket * buckets, **filters
+        ).values('hour', by).annotate(n=Sum('event_count'))
+
+        periods = [Counter() for _ in range(buckets)]
+        for row in rows:
+            index = max(0, (row['hour'] - start) // bucket)
+            if index < buckets:
+                periods[index][row[by]] += row['n']
+        return periods
+
+    def totals(self, since, by, **filters):
+        """Events since ``since`` per value of ``by`` and level, as {value: Counter(level)}."""
+        rows = EventRollup.objects.filter(
+            hour__gte=rollup_hour(since), **filters
+        ).values(by, 'level').annotate(n=Sum('event_count'))
+
+        totals = defaultdict(Counter)
+        for row in rows:
+            totals[row[by]][row['level']] += row['n']
+        return dict(totals)
+
+    def rebuild(self, start, end):
+        """
+        Recompute the rollups for the hours from ``start`` to ``end`` from
+        raw events. Only rebuild hours whose events are all still
+        retained: counts for purged events would be lost. Repeats folded
+        into a deduplicated event are counted in the hour it was first seen.
+        """
+        start, end = rollup_hour(start), rollup_hour(end)
+        rows = SystemEvent.objects.filter(
+            timestamp__gte=start, timestamp__lt=end
+        ).annotate(
+            rollup=TruncHour('timestamp', tzinfo=dt_timezone.utc)
+        ).values('rollup', 'source', 'level', 'category').annotate(n=Sum('occurrence_count'))
+
+        rollups = [
+            EventRollup(hour=row['rollup'], source=row['source'], level=row['level'],
+                        category=row['category'], event_count=row['n'])
+            for row in rows
+        ]
+        with transaction.atomic():
+            EventRollup.objects.filter(hour__gte=start, hour__lt=end).delete()
+            EventRollup.objects.bulk_create(rollups, batch_size=1000)
+
+        logger.info(f"Rebuilt {len(rollups)} event rollups from {start} to {end}")
+        return len(rollups)
+
+    def catch_up(self, hours=48):
+        """Rebuild the last ``hours`` completed hours."""
+        end = rollup_hour(timezone.now())
+        return self.rebuild(end - timedelta(hours=hours), end)
+
+
+# Global rollup service instance
+rollup_service = RollupService()
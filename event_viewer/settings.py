@@ -5,6 +5,8 @@ Provides centralized configuration for alerting thresholds, retention policies,
 and analytics settings for the Event Viewer system.
 """
 
+import os
+
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
@@ -37,7 +39,19 @@ DEFAULT_EVENT_VIEWER_SETTINGS = {
         'default_retention_days': 90,
         'critical_events_retention_days': 365,
         'debug_events_retention_days': 30,
-        'summary_retention_days': 730,  # EventSummary records
+        'summary_retention_days': 730,  # EventSummary and EventRollup records
+        'activity_log_retention_days': 365,  # council_finance ActivityLog records
+    },
+    
+    # Expiry of old events (services.retention_service)
+    'RETENTION': {
+        'source_retention_days': {},  # e.g. {'cache': 7}; overrides the level policies above
+        'archive': True,  # Write expired rows to compressed JSON lines files first
+        'archive_dir': os.path.join(str(getattr(settings, 'BASE_DIR', '.')), 'archive'),
+        'batch_size': 1000,  # Rows archived and deleted per transaction
+        'batch_pause_seconds': 0.0,  # Pause between batches to spare the database
+        'partitioned': False,  # PostgreSQL only: SystemEvent partitioned by month, expired by dropping partitions
+        'partition_months_ahead': 2,  # Monthly partitions created ahead of time
     },
     
     # Analytics settings
@@ -59,6 +73,8 @@ DEFAULT_EVENT_VIEWER_SETTINGS = {
         'parse_interval_minutes': 15,  # How often to parse logs
         'max_parse_time_seconds': 300,  # Timeout for parsing operations
         'enable_real_time_parsing': False,  # File watching for real-time parsing
+        'batch_size': 500,  # Parsed events written per insert
+        'max_workers': 4,  # Log files parsed concurrently
     },
     
     # Performance settings
@@ -69,6 +85,40 @@ DEFAULT_EVENT_VIEWER_SETTINGS = {
         'max_events_per_export': 10000,
     },
     
+    # Buffered event writes (services.event_sink)
+    'EVENT_SINK': {
+        'buffered': True,  # False writes every event as it is logged
+        'background_flush': True,  # False leaves buffered events to flush() and close()
+        'capacity': 5000,  # Events held in memory before dropping
+        'flush_size': 200,  # Wake the flusher once this many are waiting
+        'flush_interval_seconds': 2.0,  # Flush at least this often
+        'pressure_ratio': 0.5,  # Buffer fill at which debug events are sampled
+        'debug_sample_rate': 10,  # Keep 1 in N debug events under pressure
+        'dedup': True,  # Fold repeats into one row per fingerprint
+        'dedup_window_minutes': 15,  # Repeats within this of the first occurrence are folded
+        'dedup_max_samples': 10,  # Raw payloads kept per deduplicated row
+    },
+    
+    # In-memory index of recent events (services.correlation_index)
+    'CORRELATION_INDEX': {
+        'window_hours': 24,  # Events kept in memory for correlation
+        'refresh_seconds': 30,  # Pull new and changed events at most this often
+        'rebuild_minutes': 60,  # Reload the whole window this often
+        'max_events': 200000,  # Oldest minutes are dropped past this many events
+    },
+    
+    # Per-route request metrics (council_finance.middleware.request_profiling)
+    'REQUEST_PROFILING': {
+        'enabled': os.getenv('REQUEST_PROFILING_ENABLED', 'True').lower() == 'true',  # Off removes the middleware
+        'background_flush': True,  # False leaves measurements to flush() and close()
+        'sample_rate': 1.0,  # Fraction of requests measured
+        'exclude_paths': ['/static/', '/media/', '/favicon.ico'],  # Path prefixes never measured
+        'flush_interval_seconds': 60,  # Write aggregated histograms this often
+        'slow_request_ms': 1000,  # Requests at least this slow are sampled as events
+        'slow_sample_interval_seconds': 60,  # At most one slow sample per route this often
+        'max_captured_queries': 100,  # Queries kept per request for slow samples
+    },
+    
     # Notification settings
     'NOTIFICATIONS': {
         'enable_slack_integration': False,
@@ -131,7 +181,10 @@ class EventViewerConfig:
                 )
         
         # Validate retention days are positive
-        for policy_name, days in self._settings['RETENTION_POLICIES'].items():
+        retention_days = dict(self._settings['RETENTION_POLICIES'])
+        for source, days in self._settings['RETENTION']['source_retention_days'].items():
+            retention_days[f'source_retention_days.{source}'] = days
+        for policy_name, days in retention_days.items():
             if not isinstance(days, int) or days < 1:
                 raise ImproperlyConfigured(
                     f"Retention policy '{policy_name}' must be a positive integer (days)"
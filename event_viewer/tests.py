@@ -1,3 +1,529 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.cache import cache, caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from council_finance.middleware.request_profiling import RequestProfilingMiddleware
+
+from .models import EventRollup, LogCheckpoint, RequestProfile, SystemEvent, rollup_hour
+from .services.correlation_engine import EventCorrelationEngine
+from .services.correlation_index import CorrelationIndex
+from .services.event_sink import EventSink, event_sink
+from .services.log_parsers import LogParsingService, ServerLogParser
+from .services.request_profiler import (
+    Histogram, RequestProfiler, bucket_index, bucket_upper_bound, request_profiler,
+)
+from .services.retention_service import RetentionService
+from .services.rollup_service import rollup_service
+
+
+class EventSinkTests(TestCase):
+    def make_sink(self, **config):
+        # No flusher thread, so only the test thread writes
+        sink = EventSink(config={
+            'buffered': True,
+            'background_flush': False,
+            'capacity': 10,
+            'flush_size': 1000,
+            'flush_interval_seconds': 3600,
+            'pressure_ratio': 0.5,
+            'debug_sample_rate': 3,
+            'dedup': False,
+            **config,
+        })
+        self.addCleanup(sink.close)
+        return sink
+
+    def record(self, sink, level, n):
+        sink.record(source='performance', level=level, category='performance', title=f'{level} {n}', message='')
+
+    def test_buffers_until_flushed_in_one_insert(self):
+        sink = self.make_sink()
+        for n in range(4):
+            self.record(sink, 'info', n)
+        self.assertEqual(SystemEvent.objects.count(), 0)
+
+        # Savepoint, rollup insert, select and update, event insert, release
+        with self.assertNumQueries(6):
+            self.assertEqual(sink.flush(), 4)
+        self.assertEqual(SystemEvent.objects.count(), 4)
+
+    def test_sheds_debug_and_info_under_pressure(self):
+        sink = self.make_sink()
+        for n in range(5):
+            self.record(sink, 'info', n)
+        for n in range(6):
+            self.record(sink, 'debug', n)  # Past half capacity: 1 in 3 kept
+        for n in range(5):
+            self.record(sink, 'info', n)  # Full after the third; the rest are dropped
+        self.record(sink, 'error', 0)  # Displaces the oldest event
+
+        stats = sink.stats()
+        self.assertEqual(stats['sampled_out'], 4)
+        self.assertEqual(stats['buffered'], 10)
+        self.assertEqual(stats['dropped'], 2 + 1)
+
+        sink.flush()
+        self.assertEqual(SystemEvent.objects.filter(level='debug').count(), 2)
+        self.assertTrue(SystemEvent.objects.filter(level='error').exists())
+        self.assertEqual(SystemEvent.objects.filter(title='info 0').count(), 1)  # From the second run
+
+    def test_test_runs_write_on_the_calling_thread(self):
+        sink = self.make_sink()
+        self.record(sink, 'info', 0)
+        self.assertIsNone(sink._thread)
+        self.assertFalse(event_sink.config['buffered'])
+        self.assertFalse(event_sink.config['background_flush'])
+
+    def test_unbuffered_writes_immediately(self):
+        sink = self.make_sink(buffered=False)
+        sink.record(source='django_error', level='error', category='exception', title='Boom', message='',
+                    exception_type='ValueError', request_path='/x/')
+        event = SystemEvent.objects.get()
+        self.assertEqual(event.fingerprint, 'ValueError-django_error-/x/')
+
+
+class EventDeduplicationTests(TestCase):
+    def setUp(self):
+        self.sink = EventSink(config={'buffered': False, 'dedup': True, 'dedup_max_samples': 3})
+
+    def record(self, title, **fields):
+        self.sink.record(source='performance', level='warning', category='performance',
+                         title=title, message=title, **fields)
+
+    def test_repeats_fold_into_one_row(self):
+        for n in range(5):
+            self.record(f'Slow counter: took {n * 100 + 1000}ms for council 12')
+        self.record('Different warning')
+
+        self.assertEqual(SystemEvent.objects.count(), 2)
+        event = SystemEvent.objects.get(title__startswith='Slow counter')
+        self.assertEqual(event.occurrence_count, 5)
+        self.assertEqual(event.title, 'Slow counter: took 1000ms for council 12')  # First occurrence
+        self.assertEqual([sample['message'] for sample in event.samples],
+                         [f'Slow counter: took {n * 100 + 1000}ms for council 12' for n in (2, 3, 4)])
+        self.assertEqual(SystemEvent.objects.occurrences(), 6)
+
+    def test_buffered_batch_is_one_upsert(self):
+        sink = EventSink(config={'background_flush': False})
+        self.addCleanup(sink.close)
+        for n in range(50):
+            sink.record(source='cache', level='info', category='performance', title=f'Cache miss {n}', message='')
+
+        # Savepoint, rollup insert, select and update, locking select, insert, release
+        with self.assertNumQueries(7):
+            sink.flush()
+        self.assertEqual(SystemEvent.objects.get().occurrence_count, 50)
+
+    def test_resolved_or_old_rows_start_a_new_group(self):
+        self.record('Repeated warning 1')
+        SystemEvent.objects.update(resolved=True)
+        self.record('Repeated warning 2')
+        SystemEvent.objects.filter(resolved=False).update(timestamp=timezone.now() - timedelta(hours=1))
+        self.record('Repeated warning 3')
+
+        self.assertEqual(SystemEvent.objects.count(), 3)
+        self.assertEqual(len({event.fingerprint for event in SystemEvent.objects.all()}), 1)
+
+
+class EventRollupTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.hour = rollup_hour(self.now)
+
+    def log(self, level, minutes_ago=0, **fields):
+        SystemEvent.objects.create(
+            source=fields.pop('source', 'api'), level=level, category=fields.pop('category', 'exception'),
+            title='Event', message='', timestamp=self.now - timedelta(minutes=minutes_ago), **fields
+        )
+
+    def test_writes_count_every_occurrence_per_hour(self):
+        sink = EventSink(config={'buffered': False, 'dedup': True})
+        for _ in range(3):
+            sink.record(source='cache', level='info', category='performance', title='Cache miss 7', message='')
+        self.log('error')
+        self.log('error', minutes_ago=60)
+
+        self.assertEqual(SystemEvent.objects.count(), 3)  # The cache misses fold into one
+        self.assertEqual(EventRollup.objects.get(source='cache').event_count, 3)
+        self.assertEqual(EventRollup.objects.filter(level='error').total(), 2)
+        self.assertEqual(EventRollup.objects.get(level='error', hour=self.hour - timedelta(hours=1)).event_count, 1)
+
+        # Resolving is not a new occurrence
+        SystemEvent.objects.filter(level='error').first().mark_resolved(None)
+        self.assertEqual(EventRollup.objects.filter(level='error').total(), 2)
+
+    def test_partial_hours_count_in_proportion(self):
+        EventRollup.objects.create(hour=self.hour - timedelta(hours=3), source='api', level='error',
+                                   category='exception', event_count=40)
+        EventRollup.objects.create(hour=self.hour - timedelta(hours=2), source='api', level='error',
+                                   category='exception', event_count=10)
+
+        since = self.hour - timedelta(hours=2, minutes=30)
+        self.assertEqual(rollup_service.count(since), 30)
+        self.assertEqual(rollup_service.count(since, level='warning'), 0)
+        self.assertEqual(rollup_service.count(since, until=self.hour - timedelta(hours=2)), 20)
+
+    def test_counts_outlive_events_and_rebuild_recovers_them(self):
+        self.log('critical', minutes_ago=120)
+        self.log('info', minutes_ago=120, category='security')
+        SystemEvent.objects.all().delete()
+
+        health = rollup_service.counts(self.now - timedelta(days=1), by='level')
+        self.assertEqual(health, {'critical': 1, 'info': 1})
+
+        EventRollup.objects.all().delete()
+        self.log('warning', minutes_ago=120)
+        self.log('warning', minutes_ago=180)
+        self.assertEqual(rollup_service.catch_up(hours=24), 2)
+        self.assertEqual(EventRollup.objects.total(), 2)
+
+    def test_series_buckets_hours_by_day(self):
+        midnight = self.now.replace(hour=0, minute=0, second=0, microsecond=0)
+        EventRollup.objects.create(hour=midnight - timedelta(hours=1), source='api', level='error',
+                                   category='exception', event_count=4)
+        EventRollup.objects.create(hour=midnight, source='api', level='critical',
+                                   category='exception', event_count=2)
+
+        yesterday, today = rollup_service.series(midnight - timedelta(days=1), 2)
+        self.assertEqual(yesterday, {'error': 4})
+        self.assertEqual(today, {'critical': 2})
+
+
+class LogIngestionTests(TestCase):
+    def setUp(self):
+        self.logs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logs_dir)
+        self.path = os.path.join(self.logs_dir, 'server.log')
+
+    def write(self, text, mode='a'):
+        with open(self.path, mode) as file:
+            file.write(text)
+
+    def parse(self):
+        return ServerLogParser(self.path).parse_file()
+
+    def test_resumes_after_ingested_lines(self):
+        self.write("ERROR one\nINFO ignored\nWARNING two\n")
+        self.assertEqual(self.parse()['parsed'], 2)
+        self.assertEqual(self.parse()['parsed'], 0)
+
+        self.write("ERROR three\nCRITICAL four (still being wri")
+        result = self.parse()
+        self.assertEqual(result['parsed'], 1)
+        self.write("tten)\n")
+        self.parse()
+
+        events = SystemEvent.objects.order_by('id')
+        self.assertEqual([event.message for event in events],
+                         ['ERROR one', 'WARNING two', 'ERROR three', 'CRITICAL four (still being written)'])
+        self.assertEqual(events.last().details['line_number'], 5)
+        self.assertEqual(EventRollup.objects.total(), 4)
+
+    def test_truncated_or_rotated_files_are_read_again(self):
+        self.write("ERROR one\nERROR two\n")
+        self.parse()
+
+        self.write("ERROR new\n", mode='w')
+        result = self.parse()
+        self.assertEqual((result['restarted'], result['parsed']), ('truncated', 1))
+
+        self.write("ERROR after\n")
+        os.rename(self.path, f"{self.path}.1")
+        self.write("ERROR rotated\n", mode='w')
+        result = self.parse()
+        self.assertEqual((result['restarted'], result['parsed']), ('rotated', 2))
+        self.assertEqual(SystemEvent.objects.count(), 5)
+
+    def test_files_imported_before_checkpoints_are_not_imported_again(self):
+        SystemEvent.objects.create(source='django_error', level='error', category='exception',
+                                   title='Server Log: ERROR', message='ERROR one',
+                                   details={'log_file': 'server.log', 'line_number': 1})
+        self.write("ERROR one\nERROR two\nERROR partial")
+
+        result = self.parse()
+        self.assertEqual((result['restarted'], result['parsed'], result['skipped']), ('seeded', 0, 2))
+        self.assertEqual(SystemEvent.objects.count(), 1)
+
+        self.write(" line\nERROR three\n")
+        self.assertEqual(self.parse()['parsed'], 2)
+        self.assertEqual(
+            list(SystemEvent.objects.order_by('id').values_list('message', flat=True)),
+            ['ERROR one', 'ERROR partial line', 'ERROR three'],
+        )
+
+    def test_parse_all_logs_writes_in_batches(self):
+        self.write("".join(f"ERROR {n}\n" for n in range(1200)))
+        service = LogParsingService()
+
+        results = service.parse_all_logs(logs_dir=self.logs_dir)
+
+        self.assertEqual(results['summary']['total_events'], 1200)
+        self.assertEqual(SystemEvent.objects.count(), 1200)
+        checkpoint = LogCheckpoint.objects.get()
+        self.assertEqual((checkpoint.line_number, checkpoint.offset), (1200, os.path.getsize(self.path)))
+
+        self.assertEqual(service.reset_checkpoints(self.logs_dir), 1)
+        self.assertEqual(service.parse_all_logs(logs_dir=self.logs_dir)['summary']['total_events'], 1200)
+
+
+class CorrelationIndexTests(TestCase):
+    def setUp(self):
+        self.index = CorrelationIndex(config={'refresh_seconds': 3600, 'rebuild_minutes': 3600})
+        self.engine = EventCorrelationEngine(index=self.index)
+        self.now = timezone.now()
+
+    def log(self, level='error', minutes_ago=0, **fields):
+        fields.setdefault('source', 'api')
+        fields.setdefault('category', 'exception')
+        fields.setdefault('title', 'Event')
+        return SystemEvent.objects.create(level=level, message='',
+                                          timestamp=self.now - timedelta(minutes=minutes_ago), **fields)
+
+    def test_related_events_come_from_the_index(self):
+        event = self.log(request_path='/councils/')
+        nearby = self.log('warning', minutes_ago=3, source='cache', request_path='/councils/')
+        self.log('info', minutes_ago=40, source='cache')
+        self.log('info', minutes_ago=200, request_path='/councils/')
+
+        # Build, then one query to load the related rows
+        with self.assertNumQueries(2):
+            related = self.engine.find_related_events(event)
+        self.assertEqual(related['temporal'], [nearby])
+        self.assertEqual(related['path_related'], [nearby])
+        self.assertNotIn('source_related', related)  # Empty categories are left out
+
+        with self.assertNumQueries(1):
+            self.engine.find_related_events(event)
+
+    def test_refresh_adds_changed_and_expires_old_events(self):
+        old = self.log(minutes_ago=23 * 60 + 59)
+        self.index.rebuild()
+        self.assertEqual(len(self.index), 1)
+
+        new = self.log()
+        SystemEvent.objects.filter(id=old.id).update(occurrence_count=7, last_seen=timezone.now())
+        self.index.refresh(self.now + timedelta(minutes=5))
+
+        self.assertEqual([e.id for e in self.index.since(self.now - timedelta(minutes=1))], [new.id])
+        self.assertFalse(self.index.covers(self.now - timedelta(hours=24)))
+        self.assertEqual(len(self.index), 1)
+
+    def test_patterns_detected_in_memory(self):
+        self.log('error', fingerprint='db-timeout', title='Timeout', occurrence_count=4)
+        self.log('error', minutes_ago=30, fingerprint='db-timeout', title='Timeout')
+        trigger = self.log('critical', minutes_ago=20, source='database')
+        for n in range(4):
+            self.log('error', minutes_ago=19 - n, source='database')
+
+        with self.assertNumQueries(2):  # Build and rows; no users to look up
+            patterns = self.engine.detect_error_patterns(hours_back=2)
+
+        by_type = {pattern['type']: pattern for pattern in patterns}
+        self.assertEqual(by_type['high_frequency_error']['count'], 5)  # Folded repeats count
+        self.assertEqual(by_type['cascading_failure']['trigger_event'], trigger)
+        self.assertEqual(len(by_type['cascading_failure']['following_events']), 4)
+        self.assertEqual(sorted((p['source'], p['count']) for p in patterns if p['type'] == 'source_issue'),
+                         [('api', 5), ('database', 5)])
+
+    def test_events_older_than_the_window_query_the_database(self):
+        event = self.log(minutes_ago=3 * 24 * 60)
+        neighbour = self.log(minutes_ago=3 * 24 * 60 + 5)
+
+        self.assertEqual(self.engine.find_related_events(event)['temporal'], [neighbour])
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        self.service = RetentionService(options={
+            'archive_dir': self.archive_dir,
+            'batch_size': 2,
+            'source_retention_days': {'cache': 7},
+        })
+        self.now = timezone.now()
+
+    def log(self, level='error', days_ago=0, **fields):
+        fields.setdefault('source', 'api')
+        return SystemEvent.objects.create(level=level, category='exception', title='Event', message='',
+                                          timestamp=self.now - timedelta(days=days_ago), **fields)
+
+    def read_archive(self, table):
+        rows = []
+        for name in sorted(os.listdir(os.path.join(self.archive_dir, table))):
+            with gzip.open(os.path.join(self.archive_dir, table, name), 'rt') as archive_file:
+                rows.extend(json.loads(line) for line in archive_file)
+        return rows
+
+    def test_events_expire_by_level_and_source(self):
+        kept = [
+            self.log('error', days_ago=80),
+            self.log('critical', days_ago=300),
+            self.log('debug', days_ago=20),
+            self.log('critical', days_ago=5, source='cache'),
+        ]
+        expired = [
+            self.log('error', days_ago=100),
+            self.log('critical', days_ago=400),
+            self.log('debug', days_ago=40),
+            self.log('critical', days_ago=10, source='cache'),
+            self.log('warning', days_ago=95),
+        ]
+
+        self.assertEqual(self.service.apply(self.now, dry_run=True)['system_events'], 5)
+        self.assertEqual(SystemEvent.objects.count(), 9)
+
+        results = self.service.apply(self.now)
+
+        self.assertEqual(results['system_events'], 5)
+        self.assertCountEqual(SystemEvent.objects.values_list('id', flat=True), [e.id for e in kept])
+        archived = self.read_archive('system_events')
+        self.assertCountEqual([row['id'] for row in archived], [e.id for e in expired])
+        self.assertEqual(archived[0]['title'], 'Event')
+
+    def test_expired_hours_are_rolled_up_before_deletion(self):
+        event = self.log('error', days_ago=100, occurrence_count=3)
+        self.log('error', days_ago=100)
+        EventRollup.objects.all().delete()
+
+        self.service.apply(self.now, archive=False)
+
+        self.assertFalse(SystemEvent.objects.exists())
+        self.assertFalse(os.listdir(self.archive_dir))
+        self.assertEqual(EventRollup.objects.get(hour=rollup_hour(event.timestamp)).event_count, 4)
+
+    def test_rollups_expire_with_summaries(self):
+        self.log('error', days_ago=800)
+        self.log('error', days_ago=1)
+        self.assertEqual(EventRollup.objects.count(), 2)
+
+        results = self.service.apply(self.now)
+
+        self.assertEqual(results['event_rollups'], 1)
+        self.assertEqual(EventRollup.objects.get().hour, rollup_hour(self.now - timedelta(days=1)))
+
+    def test_activity_logs_with_comments_are_kept(self):
+        from django.contrib.auth.models import User
+        from council_finance.models import ActivityLog, ActivityLogComment
+
+        user = User.objects.create_user('reader')
+        logs = [ActivityLog.objects.create(activity_type='system', description=f'Log {n}') for n in range(3)]
+        ActivityLog.objects.update(created=self.now - timedelta(days=400))
+        ActivityLogComment.objects.create(activity_log=logs[0], user=user, content='Still relevant')
+
+        results = self.service.apply(self.now)
+
+        self.assertEqual(results['activity_logs'], 2)
+        self.assertEqual(list(ActivityLog.objects.values_list('id', flat=True)), [logs[0].id])
+        self.assertCountEqual([row['id'] for row in self.read_archive('activity_logs')], [logs[1].id, logs[2].id])
+
+    def test_partitioning_needs_postgresql(self):
+        service = RetentionService(options={'partitioned': True})
+        self.assertFalse(service.partitions.enabled())
+
+
+class RequestProfilerTests(TestCase):
+    def setUp(self):
+        self.profiler = RequestProfiler(config={'slow_request_ms': 10 ** 6, 'background_flush': False})
+        self.factory = RequestFactory()
+        cache.clear()
+
+    def view(self, request):
+        request.resolver_match = resolve(reverse('event_viewer:event_detail', args=[1]))
+        list(SystemEvent.objects.all())
+        cache.get('missing')
+        cache.set('present', 1)
+        cache.get('present')
+        return HttpResponse('x' * 2000, status=200 if request.method == 'GET' else 500)
+
+    def test_histogram_percentiles_within_bucket_precision(self):
+        histogram = Histogram()
+        for value in range(1, 1001):
+            histogram.record(value)
+
+        for percent, exact in ((50, 500), (95, 950), (99, 990)):
+            estimate = histogram.percentile(percent)
+            self.assertGreaterEqual(estimate, exact)
+            self.assertLessEqual(estimate, exact * 1.125)
+        self.assertEqual(Histogram(histogram.to_json()).counts, histogram.counts)
+        self.assertIsNone(Histogram().percentile(50))
+
+    def test_requests_are_aggregated_per_route_and_flushed(self):
+        middleware = RequestProfilingMiddleware(self.view, profiler=self.profiler)
+        for _ in range(3):
+            middleware(self.factory.get('/events/1/'))
+        middleware(self.factory.post('/events/2/'))
+
+        self.assertEqual(self.profiler.flush(), 2)
+        middleware(self.factory.get('/events/3/'))
+        self.profiler.flush()
+
+        row = RequestProfile.objects.get(route='/system-events/events/<int:event_id>/', method='GET')
+        self.assertEqual(row.request_count, 4)
+        self.assertEqual(row.error_count, 0)
+        self.assertEqual((row.cache_hits, row.cache_misses), (4, 4))
+        self.assertEqual(Histogram(row.query_count).percentile(50), 1)
+        self.assertEqual(Histogram(row.response_bytes).percentile(50), bucket_upper_bound(bucket_index(2000)))
+
+        summary = {item['method']: item for item in self.profiler.summarise(timezone.now() - timedelta(hours=1))}
+        self.assertEqual(summary['GET']['requests'], 4)
+        self.assertEqual(summary['GET']['cache_hit_rate'], 50.0)
+        self.assertEqual(summary['POST']['error_rate'], 100.0)
+        self.assertIsNotNone(summary['GET']['p99_ms'])
+
+    def test_cache_instances_are_wrapped_not_backend_classes(self):
+        middleware = RequestProfilingMiddleware(self.view, profiler=self.profiler)
+        middleware(self.factory.get('/events/1/'))
+
+        backend = caches['default']
+        self.assertTrue(backend.__dict__.get('_request_profiled'))
+        self.assertNotIn('_request_profiled', vars(type(backend)))
+        self.assertIn('get', vars(backend))
+        self.assertFalse(hasattr(type(backend).get, '__wrapped__'))
+        self.assertIsNone(self.profiler._thread)
+        self.assertFalse(request_profiler.enabled)
+
+    def test_slow_requests_are_sampled_with_their_queries(self):
+        self.profiler.config['slow_request_ms'] = 0
+        middleware = RequestProfilingMiddleware(self.view, profiler=self.profiler)
+        middleware(self.factory.get('/events/1/'))
+        middleware(self.factory.get('/events/1/'))  # Within the sample interval
+        event_sink.flush()
+
+        sample = SystemEvent.objects.get(source='performance')
+        self.assertEqual(sample.title, 'Slow request: GET /system-events/events/<int:event_id>/')
+        self.assertEqual(sample.occurrence_count, 1)
+        self.assertIn('event_viewer_systemevent', sample.details['slowest_queries'][0]['sql'])
+
+    def test_excluded_paths_and_off_switch(self):
+        self.profiler.config['exclude_paths'] = ['/static/']
+        middleware = RequestProfilingMiddleware(self.view, profiler=self.profiler)
+        middleware(self.factory.get('/static/app.css'))
+        self.assertEqual(self.profiler.flush(), 0)
+
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestProfilingMiddleware(self.view, profiler=RequestProfiler(config={'enabled': False}))
+
+    def test_performance_page_lists_routes(self):
+        from django.contrib.auth.models import User
+
+        RequestProfile.objects.create(hour=rollup_hour(timezone.now()), route='/councils/<slug:slug>/',
+                                      method='GET', request_count=2, total_duration_ms=300,
+                                      duration_ms={str(bucket_index(120)): 1, str(bucket_index(180)): 1})
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+        response = self.client.get(reverse('event_viewer:performance'), {'hours': 6})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'GET /councils/&lt;slug:slug&gt;/')
+        self.assertEqual(response.context['routes'][0]['p99_ms'], bucket_upper_bound(bucket_index(180)))
@@ -21,5 +21,6 @@ urlpatterns = [
     
     # Analytics and reporting
     path('analytics/', views.analytics, name='analytics'),
+    path('performance/', views.performance, name='performance'),
     path('export/', views.export_events, name='export_events'),
 ]
\ No newline at end of file
@@ -9,7 +9,8 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import user_passes_test
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.http import JsonResponse, HttpResponse
 from django.contrib import messages
@@ -21,6 +22,8 @@ from .models import SystemEvent, EventSummary
 from council_finance.models import ActivityLog
 from .services.analytics_service import analytics_service
 from .services.correlation_engine import correlation_engine
+from .services.request_profiler import request_profiler
+from .services.rollup_service import rollup_service
 
 
 def superuser_required(view_func):
@@ -41,14 +44,14 @@ def dashboard(request):
     last_week = now - timedelta(days=7)
     
     # Enhanced health metrics with analytics
-    recent_events = SystemEvent.objects.filter(timestamp__gte=last_24h)
     health_score_data = analytics_service.calculate_system_health_score(days_back=7)
     
+    recent_levels = rollup_service.counts(last_24h, by='level')
     health_metrics = {
-        'total_events_24h': recent_events.count(),
-        'critical_events_24h': recent_events.filter(level='critical').count(),
-        'error_events_24h': recent_events.filter(level='error').count(),
-        'warning_events_24h': recent_events.filter(level='warning').count(),
+        'total_events_24h': sum(recent_levels.values()),
+        'critical_events_24h': recent_levels['critical'],
+        'error_events_24h': recent_levels['error'],
+        'warning_events_24h': recent_levels['warning'],
         'unresolved_events': SystemEvent.objects.filter(resolved=False, level__in=['critical', 'error']).count(),
         'health_score': health_score_data['total_score'],
         'health_components': health_score_data['component_scores'],
@@ -69,21 +72,18 @@ def dashboard(request):
         activity_type__in=['create', 'update', 'delete']
     ).order_by('-created')[:10]
     
-    # Event trends for the chart
+    # Event trends for the chart, oldest to newest
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = today - timedelta(days=6)
     trend_data = []
-    for i in range(7):
-        date = (now - timedelta(days=i)).date()
-        summary = EventSummary.objects.filter(date=date).first()
+    for i, levels in enumerate(rollup_service.series(first_day, 7)):
         trend_data.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'errors': summary.error_count + summary.critical_count if summary else 0,
-            'warnings': summary.warning_count if summary else 0,
-            'total': (summary.error_count + summary.critical_count + 
-                     summary.warning_count + summary.info_count) if summary else 0,
+            'date': (first_day + timedelta(days=i)).strftime('%Y-%m-%d'),
+            'errors': levels['error'] + levels['critical'],
+            'warnings': levels['warning'],
+            'total': levels['error'] + levels['critical'] + levels['warning'] + levels['info'],
         })
     
-    trend_data.reverse()  # Show oldest to newest
-    
     context = {
         'page_title': 'System Event Dashboard',
         'health_metrics': health_metrics,
@@ -299,18 +299,27 @@ def analytics(request):
         'unique_users_affected': 0,
     }
     
-    for summary in summaries:
-        chart_data['dates'].append(summary.date.strftime('%Y-%m-%d'))
-        chart_data['errors'].append(summary.error_count + summary.critical_count)
-        chart_data['warnings'].append(summary.warning_count)
-        chart_data['performance'].append(summary.performance_count)
-        chart_data['exceptions'].append(summary.exception_count)
+    # Daily counts from the hourly rollups
+    first_day = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+    day_count = (end_date - start_date).days + 1
+    daily_levels = rollup_service.series(first_day, day_count)
+    daily_categories = rollup_service.series(first_day, day_count, by='category')
+    
+    for i, (levels, categories) in enumerate(zip(daily_levels, daily_categories)):
+        chart_data['dates'].append((start_date + timedelta(days=i)).strftime('%Y-%m-%d'))
+        chart_data['errors'].append(levels['error'] + levels['critical'])
+        chart_data['warnings'].append(levels['warning'])
+        chart_data['performance'].append(categories['performance'])
+        chart_data['exceptions'].append(categories['exception'])
         
-        total_stats['total_events'] += (summary.error_count + summary.critical_count + 
-                                      summary.warning_count + summary.info_count)
-        total_stats['total_errors'] += summary.error_count + summary.critical_count
-        total_stats['total_warnings'] += summary.warning_count
-        total_stats['unique_users_affected'] += summary.unique_users_affected
+        total_stats['total_events'] += (levels['error'] + levels['critical'] +
+                                      levels['warning'] + levels['info'])
+        total_stats['total_errors'] += levels['error'] + levels['critical']
+        total_stats['total_warnings'] += levels['warning']
+    
+    total_stats['unique_users_affected'] = summaries.aggregate(
+        users=Coalesce(Sum('unique_users_affected'), 0)
+    )['users']
     
     # Calculate averages
     if summaries.count() > 0:
@@ -340,6 +349,42 @@ def analytics(request):
     return render(request, 'event_viewer/analytics.html', context)
 
 
+@superuser_required
+def performance(request):
+    """
+    Per-route request latency, query and response size percentiles from
+    the request profiler, with recent slow request samples.
+    """
+    try:
+        hours = int(request.GET.get('hours', 24))
+    except ValueError:
+        hours = 24
+    hours = min(max(hours, 1), 24 * 30)
+    since = timezone.now() - timedelta(hours=hours)
+
+    routes = request_profiler.summarise(since)
+    slow_requests = SystemEvent.objects.filter(
+        source='performance',
+        category='performance',
+        title__startswith='Slow request',
+        last_seen__gte=since,
+    ).order_by('-last_seen')[:20]
+
+    context = {
+        'page_title': 'Request Performance',
+        'routes': routes,
+        'slow_requests': slow_requests,
+        'hours': hours,
+        'hour_choices': [1, 6, 24, 168],
+        'total_requests': sum(route['requests'] for route in routes),
+        'total_errors': sum(route['errors'] for route in routes),
+        'profiling_enabled': request_profiler.enabled,
+        'flush_interval_seconds': request_profiler.config['flush_interval_seconds'],
+    }
+
+    return render(request, 'event_viewer/performance.html', context)
+
+
 @superuser_required
 def export_events(request):
     """